@@ -21,14 +21,33 @@ def terminate_guest(userid):
         print("Error in delete user: %s" % res)
 
 
+def terminate_guests(userids):
+    """Destroy many virtual machines in one request.
+
+    Input parameters:
+    :userids:   list of USERIDs of the guests
+    """
+    res = sdk_client.send_request('guest_delete_bulk', userids)
+    if res and 'overallRC' in res and res['overallRC']:
+        print("Error in delete users: %s" % res)
+        return
+    for result in res['output']:
+        if result['result'] != 'success':
+            print("Error in delete user %s: %s" % (result['userid'],
+                                                  result['errmsg']))
+
+
 def main():
-    if len(sys.argv) != 2:
+    if len(sys.argv) < 2:
         print('need param for guest name')
         exit(1)
 
-    guest_id = sys.argv[1]
-    print('destroy %s' % guest_id)
-    terminate_guest(guest_id)
+    guest_ids = sys.argv[1:]
+    print('destroy %s' % ' '.join(guest_ids))
+    if len(guest_ids) == 1:
+        terminate_guest(guest_ids[0])
+    else:
+        terminate_guests(guest_ids)
 
 
 if __name__ == "__main__":
@@ -39,7 +39,8 @@ setuptools.setup(
             'volumeops/templates/sles_attach_volume.j2',
             'volumeops/templates/sles_detach_volume.j2',
             'volumeops/templates/ubuntu_attach_volume.j2',
-            'volumeops/templates/ubuntu_detach_volume.j2'
+            'volumeops/templates/ubuntu_detach_volume.j2',
+            'volumeops/templates/batch_volumes.j2'
         ]
     },
     classifiers=[
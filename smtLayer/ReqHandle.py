@@ -22,6 +22,7 @@ from six import string_types
 from smtLayer import changeVM
 from smtLayer import cmdVM
 from smtLayer import deleteVM
+from smtLayer import generalUtils
 from smtLayer import getHost
 from smtLayer import getVM
 from smtLayer import makeVM
@@ -37,6 +38,54 @@ modId = "RQH"
 version = '1.0.0'         # Version of this script
 
 
+class SMTRequest(object):
+    """
+    Structured form of a request.
+    It carries the function, subfunction, userid and parms that
+    ReqHandle.parseCmdline would get from the request command, so the
+    callers do not build a command string which is then split again.
+    The parms use the same keys as ReqHandle.parms, e.g. 'cmd' for
+    'CmdVM <userid> CMD <cmd>'.
+    """
+
+    def __init__(self, function, subfunction, userid='', parms=None):
+        """
+        Constructor
+
+        Input:
+           function    - Function name, e.g. 'GETVM'.
+           subfunction - Subfunction name, e.g. 'DIRECTORY'.
+           userid      - Target userid, if the function has one.
+           parms       - Dictionary of additional parms.
+        """
+
+        self.function = function.upper()
+        self.subfunction = subfunction.upper()
+        self.userid = userid.upper()
+        if parms is None:
+            parms = {}
+        self.parms = parms
+
+    def __eq__(self, other):
+        return (isinstance(other, SMTRequest) and
+                self.__dict__ == other.__dict__)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __str__(self):
+        # The request in the form of the request command, for logging.
+        module = ReqHandle.funcModule.get(self.function)
+        if module is None:
+            return ' '.join([op for op in (self.function, self.userid,
+                             self.subfunction) if op])
+        return ' '.join(generalUtils.buildCmdline(self, module.posOpsList,
+                                                  module.keyOpsList))
+
+    def __repr__(self):
+        return 'SMTRequest(' + str(self) + ')'
+
+
 class ReqHandle(object):
     """
     Systems Management Ultra Thin Layer Request Handle.
@@ -92,6 +141,26 @@ class ReqHandle(object):
             lambda rh: smapi.doIt(rh)],
     }
 
+    # Modules which handle the functions of structured requests.
+    funcModule = {
+        'CHANGEVM': changeVM,
+        'CMDVM': cmdVM,
+        'DELETEVM': deleteVM,
+        'GETHOST': getHost,
+        'GETVM': getVM,
+        'MAKEVM': makeVM,
+        'MIGRATEVM': migrateVM,
+        'POWERVM': powerVM,
+        'SMAPI': smapi,
+    }
+
+    # Functions whose parseCmdline does nothing more than the generic
+    # operand parsing.  Structured requests of them are only validated
+    # and go straight to doIt, the others are turned into a command list
+    # for the function's parseCmdline which sets defaults and checks
+    # the operands further.
+    directFunctions = ('CMDVM', 'GETHOST', 'GETVM', 'SMAPI')
+
     def __init__(self, **kwArgs):
         """
         Constructor
@@ -214,7 +283,7 @@ class ReqHandle(object):
         Parse the request command string.
 
         Input:
-           Self with request filled in.
+           Request as a string, a list or a SMTRequest.
 
         Output:
            Request Handle updated with the parsed information so that
@@ -225,7 +294,9 @@ class ReqHandle(object):
         self.printSysLog("Enter ReqHandle.parseCmdline")
 
         # Save the request data based on the type of operand.
-        if isinstance(requestData, list):
+        if isinstance(requestData, SMTRequest):
+            return self.parseRequest(requestData)
+        elif isinstance(requestData, list):
             self.requestString = ' '.join(requestData)  # Request as a string
             self.request = requestData                  # Request as a list
         elif isinstance(requestData, string_types):
@@ -274,6 +345,53 @@ class ReqHandle(object):
                          str(self.results['overallRC']))
         return self.results
 
+    def parseRequest(self, request):
+        """
+        Fill in the request handle from a structured request.
+
+        Input:
+           SMTRequest
+
+        Output:
+           Request Handle updated with the request information.
+           Return code - 0: successful, non-zero: error
+        """
+
+        self.printSysLog("Enter ReqHandle.parseRequest")
+
+        self.requestString = str(request)
+        if request.function not in self.funcModule:
+            # Unrecognized function
+            self.function = request.function
+            msg = msgs.msg['0007'][1] % (modId, self.function)
+            self.printLn("ES", msg)
+            self.updateResults(msgs.msg['0007'][0])
+        elif request.function in self.directFunctions:
+            module = self.funcModule[request.function]
+            self.request = None
+            self.totalParms = 0
+            self.function = request.function
+            self.subfunction = request.subfunction
+            self.userid = request.userid
+            self.parms = dict(request.parms)
+            if self.subfunction not in module.subfuncHandler:
+                # Subfunction is missing.
+                subList = ', '.join(sorted(module.subfuncHandler.keys()))
+                msg = msgs.msg['0011'][1] % (module.modId, subList)
+                self.printLn("ES", msg)
+                self.updateResults(msgs.msg['0011'][0])
+            else:
+                generalUtils.checkParms(self, module.posOpsList,
+                                        module.keyOpsList)
+        else:
+            module = self.funcModule[request.function]
+            self.parseCmdline(generalUtils.buildCmdline(request,
+                module.posOpsList, module.keyOpsList))
+
+        self.printSysLog("Exit ReqHandle.parseRequest, rc: " +
+                         str(self.results['overallRC']))
+        return self.results
+
     def printLn(self, respType, respString):
         """
         Add one or lines of output to the response list.
@@ -42,6 +42,7 @@ subfuncHandler = {
     'DEDICATE': ['dedicate', lambda rh: dedicate(rh)],
     'UNDEDICATE': ['undedicate', lambda rh: undedicate(rh)],
     'AEMOD': ['addAEMOD', lambda rh: addAEMOD(rh)],
+    'FORMATDISK': ['formatDisk', lambda rh: formatDisk(rh)],
     'IPL': ['addIPL', lambda rh: addIPL(rh)],
     'LOADDEV': ['addLOADDEV', lambda rh: addLOADDEV(rh)],
     'HELP': ['help', lambda rh: help(rh)],
@@ -79,6 +80,10 @@ posOpsList = {
     'AEMOD': [
         ['Activation Engine Modification Script',
          'aeScript', True, 2]],
+    'FORMATDISK': [
+        ['Virtual address', 'vaddr', True, 2],
+        ['Disk type', 'diskType', True, 2],
+        ['File system', 'fileSystem', True, 2]],
     'IPL': [
         ['Virtual Address or NSS name', 'addrOrNSS', True, 2]],
     'PUNCHFILE': [
@@ -114,6 +119,9 @@ keyOpsList = {
     'AEMOD': {
         '--invparms': ['invParms', 1, 2],
         '--showparms': ['showParms', 0, 0]},
+    'FORMATDISK': {
+        '--mode': ['mode', 1, 2],
+        '--showparms': ['showParms', 0, 0]},
     'HELP': {},
     'IPL': {
         '--loadparms': ['loadParms', 1, 2],
@@ -700,6 +708,40 @@ def doIt(rh):
     return rh.results['overallRC']
 
 
+def formatDisk(rh):
+    """
+    Installs a Linux filesystem on a minidisk which is already defined in
+    the virtual machine's directory entry.
+
+    Input:
+       Request Handle with the following properties:
+          function    - 'CHANGEVM'
+          subfunction - 'FORMATDISK'
+          userid      - userid of the virtual machine
+          parms['diskType']   - Disk type, 3390 or 9336
+          parms['fileSystem'] - Linux filesystem to install on the disk.
+          parms['mode']       - Disk access mode
+          parms['vaddr']      - Virtual address
+
+    Output:
+       Request Handle updated with the results.
+       Return code - 0: ok, non-zero: error
+    """
+
+    rh.printSysLog("Enter changeVM.formatDisk")
+
+    installFS(
+        rh,
+        rh.parms['vaddr'],
+        rh.parms.get('mode', 'W'),
+        rh.parms['fileSystem'],
+        rh.parms['diskType'])
+
+    rh.printSysLog("Exit changeVM.formatDisk, rc: " +
+                   str(rh.results['overallRC']))
+    return rh.results['overallRC']
+
+
 def getVersion(rh):
     """
     Get the version of this function.
@@ -779,7 +821,7 @@ def parseCmdline(rh):
         generalUtils.parseCmdline(rh, posOpsList, keyOpsList)
 
     if rh.results['overallRC'] == 0:
-        if rh.subfunction in ['ADD3390', 'ADD9336']:
+        if rh.subfunction in ['ADD3390', 'ADD9336', 'FORMATDISK']:
             if ('fileSystem' in rh.parms and rh.parms['fileSystem'] not in
                 ['ext2', 'ext3', 'ext4', 'xfs', 'swap']):
                 # Invalid file system specified.
@@ -787,6 +829,14 @@ def parseCmdline(rh):
                 rh.printLn("ES", msg)
                 rh.updateResults(msgs.msg['0015'][0])
 
+    if rh.results['overallRC'] == 0:
+        if rh.subfunction == 'FORMATDISK':
+            if rh.parms['diskType'] not in ['3390', '9336']:
+                # Invalid disk type specified.
+                msg = msgs.msg['0018'][1] % (modId, rh.parms['diskType'])
+                rh.printLn("ES", msg)
+                rh.updateResults(msgs.msg['0018'][0])
+
     rh.printSysLog("Exit changeVM.parseCmdLine, rc: " +
         str(rh.results['overallRC']))
     return rh.results['overallRC']
@@ -974,6 +1024,9 @@ def showInvLines(rh):
                "--multipw <multi_pw> --filesystem <fsType>")
     rh.printLn("N", "  python " + rh.cmdName +
                " ChangeVM <userid> aemod <aeScript> --invparms <invParms>")
+    rh.printLn("N", "  python " + rh.cmdName +
+               " ChangeVM <userid> formatdisk <vAddr> <diskType> <fsType>")
+    rh.printLn("N", "                    --mode <mode>")
     rh.printLn("N", "  python " + rh.cmdName +
                " ChangeVM <userid> IPL <addrOrNSS> --loadparms <loadParms>")
     rh.printLn("N", "                    --parms <parmString>")
@@ -1016,6 +1069,9 @@ def showOperandLines(rh):
     rh.printLn("N", "      aemod         - Sends an activation " +
                "engine script to the managed virtual")
     rh.printLn("N", "                      machine.")
+    rh.printLn("N", "      formatdisk    - Installs a Linux filesystem " +
+               "on a minidisk in the virtual")
+    rh.printLn("N", "                      machine's directory entry.")
     rh.printLn("N", "      help          - Displays this help " +
                "information.")
     rh.printLn("N", "      ipl           - Sets the IPL statement in " +
@@ -1062,11 +1118,16 @@ def showOperandLines(rh):
                    "Specifies the size of the ECKD minidisk.  ")
         rh.printLn("N", "      <diskSize9336>        - " +
                    "Specifies the size of the FBA type minidisk.")
+        rh.printLn("N", "      <diskType>            - " +
+                   "Specifies the minidisk type, 3390 or 9336.")
         rh.printLn("N", "      <file>                - " +
                    "File to punch to the target system.")
         rh.printLn("N", "      --filesystem <fsType> - " +
                    "Specifies type of filesystem to be created on")
         rh.printLn("N", "                              the minidisk.")
+        rh.printLn("N", "      <fsType>              - " +
+                   "Specifies type of filesystem to be created on")
+        rh.printLn("N", "                              the minidisk.")
         rh.printLn("N", "      --invparms <invParms> - " +
                    "Specifies the parameters to be specified in the")
         rh.printLn("N", "                              " +
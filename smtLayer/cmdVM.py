@@ -59,6 +59,7 @@ as a key.  Each keyword has a dictionary that lists:
 keyOpsList = {
     'CMD': {
         '--showparms': ['showParms', 0, 0],
+        '--timeout': ['timeout', 1, 1],
     },
 }
 
@@ -141,6 +142,7 @@ def invokeCmd(rh):
           subfunction - 'CMD'
           userid      - userid of the virtual machine
           parms['cmd']   - Command to send
+          parms['timeout'] - (Optional) Seconds to wait for the command
 
     Output:
        Request Handle updated with the results.
@@ -149,7 +151,8 @@ def invokeCmd(rh):
 
     rh.printSysLog("Enter cmdVM.invokeCmd, userid: " + rh.userid)
 
-    results = execCmdThruIUCV(rh, rh.userid, rh.parms['cmd'])
+    results = execCmdThruIUCV(rh, rh.userid, rh.parms['cmd'],
+                              timeout=rh.parms.get('timeout'))
 
     if results['overallRC'] == 0:
         rh.printLn("N", results['response'])
@@ -222,7 +225,7 @@ def showInvLines(rh):
     if rh.subfunction != '':
         rh.printLn("N", "Usage:")
     rh.printLn("N", "  python " + rh.cmdName +
-        " CmdVM <userid> cmd <cmdToSend>")
+        " CmdVM <userid> cmd <cmdToSend> [--timeout <secs>]")
     rh.printLn("N", "  python " + rh.cmdName +
         " CmdVM help")
     rh.printLn("N", "  python " + rh.cmdName +
@@ -254,5 +257,7 @@ def showOperandLines(rh):
         "Userid of the target virtual machine")
     rh.printLn("N", "      <cmdToSend>   - " +
         "Command to send to the virtual machine's OS.")
+    rh.printLn("N", "      --timeout <secs> - " +
+        "Seconds to wait for the command, 0 means no limit.")
 
     return
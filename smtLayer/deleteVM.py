@@ -17,6 +17,7 @@
 from smtLayer import generalUtils
 from smtLayer import msgs
 from smtLayer.vmUtils import invokeSMCLI, isLoggedOn, purgeReader
+from smtLayer.vmUtils import resetIUCVSession
 
 modId = "DVM"
 version = "1.0.0"
@@ -158,6 +159,10 @@ def doIt(rh):
         rh.printLn("N", " ")
 
     # Call the subfunction handler
+    if rh.subfunction == 'DIRECTORY':
+        # The guest is going away, so is its IUCV session.
+        resetIUCVSession(rh.userid)
+
     subfuncHandler[rh.subfunction][1](rh)
 
     rh.printSysLog("Exit deleteVM.doIt, rc: " + str(rh.results['overallRC']))
@@ -334,3 +334,128 @@ def parseCmdline(rh, posOpsList, keyOpsList):
     rh.printSysLog("Exit generalUtils.parseCmdLine, rc: " +
         str(rh.results['overallRC']))
     return rh.results['overallRC']
+
+
+def checkParms(rh, posOpsList, keyOpsList):
+    """
+    Validate the parms of a structured request against the operand lists
+    which generalUtils.parseCmdline uses to parse the request command.
+
+    Input:
+       Request Handle with the function, subfunction and parms filled in.
+       Positional Operands List, see generalUtils.parseCmdline.
+       Keyword Operands List, see generalUtils.parseCmdline.
+
+    Output:
+       Request Handle updated with the results of the validation.
+       Return code - 0: ok, non-zero: error
+    """
+
+    rh.printSysLog("Enter generalUtils.checkParms")
+
+    known = set()
+    ops = posOpsList.get(rh.subfunction, [])
+    for currOp in range(0, len(ops)):
+        key = ops[currOp][1]
+        known.add(key)
+        if key not in rh.parms:
+            if ops[currOp][2] is True:
+                # Required positional operand is missing.
+                msg = msgs.msg['0002'][1] % (modId, rh.function,
+                    rh.subfunction, ops[currOp][0], (currOp + 1))
+                rh.printLn("ES", msg)
+                rh.updateResults(msgs.msg['0002'][0])
+                break
+        elif ops[currOp][3] == 1 and not isinstance(rh.parms[key], int):
+            # Positional operand is not an integer.
+            msg = msgs.msg['0001'][1] % (modId, rh.function,
+                rh.subfunction, (currOp + 1), ops[currOp][0],
+                rh.parms[key])
+            rh.printLn("ES", msg)
+            rh.updateResults(msgs.msg['0001'][0])
+            break
+
+    if rh.results['overallRC'] == 0:
+        ops = keyOpsList.get(rh.subfunction, {})
+        for keyword in ops:
+            key = ops[keyword][0]
+            known.add(key)
+            if key not in rh.parms or ops[keyword][2] != 1:
+                continue
+            values = rh.parms[key]
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                if not isinstance(value, int):
+                    # Keyword operand is not an integer.
+                    msg = msgs.msg['0004'][1] % (modId, rh.function,
+                        rh.subfunction, keyword, value)
+                    rh.printLn("ES", msg)
+                    rh.updateResults(msgs.msg['0004'][0])
+                    break
+            if rh.results['overallRC'] != 0:
+                break
+
+    if rh.results['overallRC'] == 0:
+        for key in sorted(rh.parms):
+            if key not in known:
+                # Parm is not an operand of the subfunction.
+                msg = msgs.msg['0005'][1] % (modId, rh.function,
+                    rh.subfunction, key)
+                rh.printLn("ES", msg)
+                rh.updateResults(msgs.msg['0005'][0])
+                break
+
+    rh.printSysLog("Exit generalUtils.checkParms, rc: " +
+        str(rh.results['overallRC']))
+    return rh.results['overallRC']
+
+
+def buildCmdline(request, posOpsList, keyOpsList):
+    """
+    Build the request command as a list from a structured request, so that
+    it can be parsed by the function's parseCmdline.
+
+    Input:
+       Structured request (ReqHandle.SMTRequest).
+       Positional Operands List, see generalUtils.parseCmdline.
+       Keyword Operands List, see generalUtils.parseCmdline.
+
+    Output:
+       Request command as a list.
+    """
+
+    cmd = [request.function]
+    if request.userid:
+        cmd.append(request.userid)
+    cmd.append(request.subfunction)
+
+    parms = dict(request.parms)
+    for op in posOpsList.get(request.subfunction, []):
+        if op[1] not in parms:
+            # Positional operands after a missing one can not be given.
+            break
+        cmd.append(str(parms.pop(op[1])))
+
+    ops = keyOpsList.get(request.subfunction, {})
+    restOfLine = []
+    for keyword in sorted(ops):
+        key = ops[keyword][0]
+        if key not in parms:
+            continue
+        value = parms.pop(key)
+        if not isinstance(value, list):
+            value = [value]
+        if ops[keyword][1] == 0:
+            if value[0] is True:
+                cmd.append(keyword)
+        elif ops[keyword][1] < 0:
+            # The keyword takes the rest of the operands, so it goes last.
+            restOfLine = [keyword] + [str(v) for v in value]
+        else:
+            cmd.append(keyword)
+            cmd.extend([str(v) for v in value])
+
+    # Unknown parms are left for parseCmdline to report.
+    cmd.extend(sorted(parms))
+    return cmd + restOfLine
@@ -40,6 +40,7 @@ subfuncHandler = {
     'FCPDEVICES': ['help', lambda rh: getFcpDevices(rh)],
     'GENERAL': ['help', lambda rh: getGeneralInfo(rh)],
     'HELP': ['help', lambda rh: help(rh)],
+    'USAGE': ['getUsageInfo', lambda rh: getUsageInfo(rh)],
     'VERSION': ['getVersion', lambda rh: getVersion(rh)],
     }
 
@@ -76,6 +77,7 @@ keyOpsList = {
     'FCPDEVICES': {'--showparms': ['showParms', 0, 0]},
     'GENERAL': {'--showparms': ['showParms', 0, 0]},
     'HELP': {'--showparms': ['showParms', 0, 0]},
+    'USAGE': {'--showparms': ['showParms', 0, 0]},
     'VERSION': {'--showparms': ['showParms', 0, 0]},
     }
 
@@ -485,24 +487,7 @@ def getGeneralInfo(rh):
         rh.printLn("ES", msg)
 
     # Get LPAR memory in use
-    parm = ["-T", "dummy", "-k", "detailed_cpu=show=no"]
-
-    lparMemUsed = "no info"
-    results = invokeSMCLI(rh, "System_Performance_Information_Query",
-                          parm)
-    if results['overallRC'] == 0:
-        for line in results['response'].splitlines():
-            if "MEMORY_IN_USE=" in line:
-                lparMemUsed = line.split("=")[1]
-                lparMemUsed = generalUtils.getSizeFromPage(rh, lparMemUsed)
-    else:
-        # SMAPI API failed, so we put out messages
-        # 300 and 405 for consistency
-        rh.printLn("ES", results['response'])
-        rh.updateResults(results)    # Use results from invokeSMCLI
-        msg = msgs.msg['0405'][1] % (modId, "LPAR memory in use",
-            "(see message 300)", results['response'])
-        rh.printLn("ES", msg)
+    lparMemUsed = _getLparMemUsed(rh)
 
     # Get IPL Time
     ipl = ""
@@ -547,6 +532,82 @@ def getGeneralInfo(rh):
     return rh.results['overallRC']
 
 
+def _getLparMemUsed(rh):
+    """
+    Obtain the memory in use of the LPAR.
+
+    Input:
+       Request Handle
+
+    Output:
+       Memory in use with a magnitude, or "no info" if it is not
+       available.  The request handle is updated with the error.
+    """
+
+    parm = ["-T", "dummy", "-k", "detailed_cpu=show=no"]
+
+    lparMemUsed = "no info"
+    results = invokeSMCLI(rh, "System_Performance_Information_Query",
+                          parm)
+    if results['overallRC'] == 0:
+        for line in results['response'].splitlines():
+            if "MEMORY_IN_USE=" in line:
+                lparMemUsed = line.split("=")[1]
+                lparMemUsed = generalUtils.getSizeFromPage(rh, lparMemUsed)
+    else:
+        # SMAPI API failed, so we put out messages
+        # 300 and 405 for consistency
+        rh.printLn("ES", results['response'])
+        rh.updateResults(results)    # Use results from invokeSMCLI
+        msg = msgs.msg['0405'][1] % (modId, "LPAR memory in use",
+            "(see message 300)", results['response'])
+        rh.printLn("ES", msg)
+    return lparMemUsed
+
+
+def getUsageInfo(rh):
+    """
+    Obtain the CPU and memory usage of the host.  This is the part of
+    the general information which changes while the host is running,
+    so it can be refreshed more often without the other queries.
+
+    Input:
+       Request Handle with the following properties:
+          function    - 'GETHOST'
+          subfunction - 'USAGE'
+
+    Output:
+       Request Handle updated with the results.
+       Return code - 0: ok
+       Return code - 4: problem getting some info
+    """
+
+    rh.printSysLog("Enter getHost.getUsageInfo")
+
+    rh.results['overallRC'] = 0
+    lparCpuUsed = "no info"
+    with open('/proc/sysinfo', 'r') as myFile:
+        for line in myFile:
+            # Get used physical CPU in this LPAR
+            if "LPAR CPUs Configured" in line:
+                lparCpuUsed = line.split()[3]
+    if lparCpuUsed == "no info":
+        msg = msgs.msg['0405'][1] % (modId, "LPAR CPUs Configured",
+                                     "cat /proc/sysinfo", "not found")
+        rh.printLn("ES", msg)
+        rh.updateResults(msgs.msg['0405'][0])
+
+    lparMemUsed = _getLparMemUsed(rh)
+
+    outstr = "LPAR CPU Used: " + lparCpuUsed
+    outstr += "\nLPAR Memory Used: " + lparMemUsed
+
+    rh.printLn("N", outstr)
+    rh.printSysLog("Exit getHost.getUsageInfo, rc: " +
+                   str(rh.results['overallRC']))
+    return rh.results['overallRC']
+
+
 def getVersion(rh):
     """
     Get the version of this function.
@@ -634,6 +695,7 @@ def showInvLines(rh):
     rh.printLn("N", "  python " + rh.cmdName + " GetHost fcpdevices")
     rh.printLn("N", "  python " + rh.cmdName + " GetHost general")
     rh.printLn("N", "  python " + rh.cmdName + " GetHost help")
+    rh.printLn("N", "  python " + rh.cmdName + " GetHost usage")
     rh.printLn("N", "  python " + rh.cmdName + " GetHost version")
     return
 
@@ -661,6 +723,8 @@ def showOperandLines(rh):
         "Returns the general information related to the z/VM")
     rh.printLn("N", "                      hypervisor environment.")
     rh.printLn("N", "      help          - Returns this help information.")
+    rh.printLn("N", "      usage         - " +
+        "Returns the CPU and memory usage of the z/VM hypervisor.")
     rh.printLn("N", "      version       - Show the version of this function")
     if rh.subfunction != '':
         rh.printLn("N", "Operand(s):")
@@ -19,7 +19,7 @@ import subprocess
 
 from smtLayer import generalUtils
 from smtLayer import msgs
-from smtLayer.vmUtils import execCmdThruIUCV, getPerfInfo, invokeSMCLI
+from smtLayer.vmUtils import getPerfInfo, invokeSMCLI, pingThruIUCV
 from smtLayer.vmUtils import isLoggedOn
 
 modId = 'GVM'
@@ -65,10 +65,15 @@ as a key.  Each keyword has a dictionary that lists:
   - the type of data for those values (1: int, 2: string)
 """
 keyOpsList = {
-    'CONSOLEOUTPUT': {'--showparms': ['showParms', 0, 0]},
+    'CONSOLEOUTPUT': {
+        '--notransfer': ['noTransfer', 0, 0],
+        '--showparms': ['showParms', 0, 0],
+        '--userids': ['userids', 1, 2]},
     'DIRECTORY': {'--showparms': ['showParms', 0, 0]},
     'HELP': {},
-    'ISREACHABLE': {'--showparms': ['showParms', 0, 0]},
+    'ISREACHABLE': {
+        '--nocache': ['noCache', 0, 0],
+        '--showparms': ['showParms', 0, 0]},
     'STATUS': {
         '--all': ['allBasic', 0, 0],
         '--cpu': ['cpu', 0, 0],
@@ -84,7 +89,12 @@ def checkIsReachable(rh):
     Check if a virtual machine is reachable.
 
     Input:
-       Request Handle
+       Request Handle with the following properties:
+          function    - 'GETVM'
+          subfunction - 'ISREACHABLE'
+          userid      - userid of the virtual machine
+          parms['noCache'] - (Optional) True to send a command even if
+                             the guest answered one recently.
 
     Output:
        Request Handle updated with the results.
@@ -97,8 +107,8 @@ def checkIsReachable(rh):
 
     rh.printSysLog("Enter getVM.checkIsReachable, userid: " + rh.userid)
 
-    strCmd = "echo 'ping'"
-    results = execCmdThruIUCV(rh, rh.userid, strCmd)
+    results = pingThruIUCV(rh, rh.userid,
+                           useCache=not rh.parms.get('noCache', False))
 
     if results['overallRC'] == 0:
         rh.printLn("N", rh.userid + ": reachable")
@@ -156,9 +166,16 @@ def getConsole(rh):
 
     Input:
        Request Handle with the following properties:
-          function    - 'CMDVM'
-          subfunction - 'CMD'
+          function    - 'GETVM'
+          subfunction - 'CONSOLEOUTPUT'
           userid      - userid of the virtual machine
+          parms['noTransfer'] - (Optional) True if the console was
+                                already transferred to our reader.
+          parms['userids']    - (Optional) Comma separated userids of
+                                other virtual machines whose console
+                                spool files are listed too, one line
+                                for each userid.  It is not an error
+                                when a userid has no spool files.
 
     Output:
        Request Handle updated with the results.
@@ -167,23 +184,24 @@ def getConsole(rh):
 
     rh.printSysLog("Enter getVM.getConsole")
 
-    # Transfer the console to this virtual machine.
-    parms = ["-T", rh.userid]
-    results = invokeSMCLI(rh, "Image_Console_Get", parms)
+    if not rh.parms.get('noTransfer', False):
+        # Transfer the console to this virtual machine.
+        parms = ["-T", rh.userid]
+        results = invokeSMCLI(rh, "Image_Console_Get", parms)
 
-    if results['overallRC'] != 0:
-        if (results['overallRC'] == 8 and results['rc'] == 8 and
-            results['rs'] == 8):
-            # Give a more specific message.  Userid is either
-            # not logged on or not spooling their console.
-            msg = msgs.msg['0409'][1] % (modId, rh.userid)
-        else:
-            msg = results['response']
-        rh.updateResults(results)    # Use results from invokeSMCLI
-        rh.printLn("ES", msg)
-        rh.printSysLog("Exit getVM.parseCmdLine, rc: " +
-                       str(rh.results['overallRC']))
-        return rh.results['overallRC']
+        if results['overallRC'] != 0:
+            if (results['overallRC'] == 8 and results['rc'] == 8 and
+                results['rs'] == 8):
+                # Give a more specific message.  Userid is either
+                # not logged on or not spooling their console.
+                msg = msgs.msg['0409'][1] % (modId, rh.userid)
+            else:
+                msg = results['response']
+            rh.updateResults(results)    # Use results from invokeSMCLI
+            rh.printLn("ES", msg)
+            rh.printSysLog("Exit getVM.parseCmdLine, rc: " +
+                           str(rh.results['overallRC']))
+            return rh.results['overallRC']
 
     # Check whether the reader is online
     with open('/sys/bus/ccw/drivers/vmur/0.0.000c/online', 'r') as myfile:
@@ -253,18 +271,36 @@ def getConsole(rh):
                        str(rh.results['overallRC']))
         return rh.results['overallRC']
 
-    # Now for each line that contains our user and is a
-    # class T console file, add the spool id to our list
+    # Now for each line that contains one of our users and is a
+    # class T console file, add the spool id to the list of the user
+    userids = [rh.userid]
+    if 'userids' in rh.parms:
+        for userid in rh.parms['userids'].upper().split(','):
+            if userid != '' and userid not in userids:
+                userids.append(userid)
+    spoolIds = dict((userid, []) for userid in userids)
     spoolFiles = files.split('\n')
-    outstr = ""
     for myfile in spoolFiles:
-        if (myfile != "" and
-                myfile.split()[0] == rh.userid and
-                myfile.split()[2] == "T" and
-                myfile.split()[3] == "CON"):
+        fields = myfile.split()
+        if (len(fields) > 3 and
+                fields[0] in spoolIds and
+                fields[2] == "T" and
+                fields[3] == "CON"):
+            spoolIds[fields[0]].append(fields[1])
+
+    if 'userids' in rh.parms:
+        for userid in userids:
+            rh.printLn("N", "List of spool files containing "
+                       "console logs from %s: %s" %
+                       (userid, ' '.join(spoolIds[userid])))
+        rh.results['overallRC'] = 0
+        rh.printSysLog("Exit getVM.getConsole, rc: " +
+                       str(rh.results['overallRC']))
+        return rh.results['overallRC']
 
-            fileId = myfile.split()[1]
-            outstr += fileId + " "
+    outstr = ""
+    for fileId in spoolIds[rh.userid]:
+        outstr += fileId + " "
 
     # No files in our list
     if outstr == "":
@@ -540,13 +576,15 @@ def showOperandLines(rh):
         rh.printLn("N", "Sub-Functions(s):")
     rh.printLn("N", "      consoleoutput - " +
         "Obtains the console log from the virtual machine.")
+    rh.printLn("N", "                      " +
+        "[ --notransfer ] [ --userids <userid>,... ]")
     rh.printLn("N", "      directory     - " +
         "Displays the user directory lines for the virtual machine.")
     rh.printLn("N", "      help          - " +
         "Displays this help information.")
     rh.printLn("N", "      isreachable   - " +
         "Determine whether the virtual OS in a virtual machine")
-    rh.printLn("N", "                      is reachable")
+    rh.printLn("N", "                      is reachable. [ --nocache ]")
     rh.printLn("N", "      status        - " +
         "show the log on/off status of the virtual machine")
     rh.printLn("N", "      version       - " +
@@ -555,6 +593,12 @@ def showOperandLines(rh):
         rh.printLn("N", "Operand(s):")
     rh.printLn("N", "      <userid>      - " +
         "Userid of the target virtual machine")
+    rh.printLn("N", "      --notransfer  - " +
+        "The console was already transferred to the reader.")
+    rh.printLn("N", "      --userids     - " +
+        "Other userids whose console spool files are listed too.")
+    rh.printLn("N", "      --nocache     - " +
+        "Send a command even if the OS answered one recently.")
     rh.printLn("N", "      [ --all | --cpu | " +
         "--memory | --power ]")
     rh.printLn("N", "                    - " +
@@ -210,6 +210,14 @@ msg = {
         #   the function with a maximum wait time and polling
         #   interval time which are evenly divisible and of an
         #   acceptable duration.
+    '0018': [{'overallRC': 4, 'rc': 4, 'rs': 18},
+            "ULT%s0018E The disk type was not '3390' or '9336': %s",
+            ('RQH', 'DISK_TYPE')],
+        # Explain: An error was detected while parsing the command.
+        #   The type of disk does not match one of the valid values.
+        # SysAct: Processing of the subfunction terminates.
+        # UserResp: Correct the syntax to use a valid disk type
+        #   and reissue the command.
 
     # 0200-0299: Utility Messages
     '0200': [{'overallRC': 4, 'rc': 4, 'rs': 200},
@@ -532,6 +540,17 @@ msg = {
         #   and the target system may contain useful information to
         #   identify the failure.  Reinvoke the function after you
         #   correct the problem.
+    '0320': [{'overallRC': 2, 'rc': 4, 'rs': 110},
+            "ULT%s0320E Timed out after %s seconds while sending a " +
+            "command through IUCV to %s. cmd: %s",
+            ('SMP', 'SECONDS', 'USERID', 'CMD')],
+        # Explain: The IUCVCLNT program did not finish within the
+        #   timeout, it was stopped.  The rs is the ETIMEDOUT errno,
+        #   as the IUCV socket errors use the errno as rs.
+        # SysAct: Processing of the function terminates.
+        # UserResp: Check whether the command hangs on the target system
+        #   or raise the guest iucv_command_timeout option, then reinvoke
+        #   the function.
 
     # General subfunction processing messages
     '0400': [{'overallRC': 4, 'rc': 4, 'rs': 400},
@@ -18,7 +18,8 @@ import time
 
 from smtLayer import generalUtils
 from smtLayer import msgs
-from smtLayer.vmUtils import execCmdThruIUCV, invokeSMCLI
+from smtLayer.vmUtils import execCmdThruIUCV, invokeSMCLI, pingThruIUCV
+from smtLayer.vmUtils import resetIUCVSession
 from smtLayer.vmUtils import isLoggedOn
 from smtLayer.vmUtils import waitForOSState, waitForVMState
 
@@ -49,6 +50,9 @@ subfuncHandler = {
     'WAIT': ['wait', lambda rh: wait(rh)],
     }
 
+# Subfunctions which stop or restart the virtual machine.
+stateChangingSubfuncs = ('OFF', 'ON', 'PAUSE', 'REBOOT', 'RESET', 'SOFTOFF')
+
 """
 List of positional operands based on subfunction.
 Each subfunction contains a list which has a dictionary with the following
@@ -205,8 +209,7 @@ def checkIsReachable(rh):
     rh.printSysLog("Enter powerVM.checkIsReachable, userid: " +
         rh.userid)
 
-    strCmd = "echo 'ping'"
-    results = execCmdThruIUCV(rh, rh.userid, strCmd)
+    results = pingThruIUCV(rh, rh.userid)
 
     if results['overallRC'] == 0:
         rh.printLn("N", rh.userid + ": reachable")
@@ -308,6 +311,11 @@ def doIt(rh):
                     str(rh.parms[key]))
         rh.printLn("N", " ")
 
+    if rh.subfunction in stateChangingSubfuncs:
+        # The guest is going to be stopped or restarted, so what was known
+        # about its IUCV channel does not hold any longer.
+        resetIUCVSession(rh.userid)
+
     # Call the subfunction handler
     subfuncHandler[rh.subfunction][1](rh)
 
@@ -78,7 +78,7 @@ class SMT(object):
         Process a request.
 
         Input:
-           Request as either a string or a list.
+           Request as either a string, a list or a ReqHandle.SMTRequest.
            captureLogs=<True|False>
               Enables or disables log capture per request.
               This overrides the value from SMT.
@@ -0,0 +1,94 @@
+# Copyright 2021 IBM Corp.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from smtLayer import getVM
+from smtLayer.ReqHandle import ReqHandle
+from smtLayer.ReqHandle import SMTRequest
+from smtLayer.tests.unit import base
+
+
+class SMTReqHandleTestCase(base.SMTTestCase):
+    """Test cases for ReqHandle.py in smtLayer."""
+
+    def _parse(self, requestData):
+        rh = ReqHandle(smt=mock.Mock())
+        rh.parseCmdline(requestData)
+        return rh
+
+    def test_parse_request_same_as_string(self):
+        string = self._parse("getvm user1 status --cpu")
+        typed = self._parse(SMTRequest('getvm', 'status', 'user1',
+                                       {'cpu': True}))
+        self.assertEqual(0, typed.results['overallRC'])
+        for attr in ('function', 'subfunction', 'userid', 'parms'):
+            self.assertEqual(getattr(string, attr), getattr(typed, attr))
+        self.assertEqual('GETVM USER1 STATUS --cpu', typed.requestString)
+
+    def test_parse_request_no_quoting(self):
+        cmd = "echo 'a b' | grep \"a\""
+        rh = self._parse(SMTRequest('cmdvm', 'cmd', 'user1', {'cmd': cmd}))
+        self.assertEqual(0, rh.results['overallRC'])
+        self.assertEqual({'cmd': cmd}, rh.parms)
+
+    def test_parse_request_list_operands(self):
+        operands = ['-T', 'USER1', '-k', 'switch_name=VSW1']
+        request = SMTRequest('smapi', 'api', 'user1',
+                             {'apiName': 'Vswitch_Query',
+                              'operands': operands})
+        self.assertEqual('SMAPI USER1 API Vswitch_Query --operands '
+                         '-T USER1 -k switch_name=VSW1', str(request))
+        string = self._parse(str(request))
+        typed = self._parse(request)
+        self.assertEqual(string.parms, typed.parms)
+
+    def test_parse_request_missing_operand(self):
+        rh = self._parse(SMTRequest('getvm', 'fcpinfo', 'user1'))
+        self.assertEqual(4, rh.results['overallRC'])
+        self.assertEqual(2, rh.results['rs'])
+
+    def test_parse_request_unknown_parm(self):
+        rh = self._parse(SMTRequest('getvm', 'directory', 'user1',
+                                    {'bad': True}))
+        self.assertEqual(5, rh.results['rs'])
+
+    def test_parse_request_bad_subfunction(self):
+        rh = self._parse(SMTRequest('getvm', 'bad', 'user1'))
+        self.assertEqual(11, rh.results['rs'])
+
+    def test_parse_request_bad_function(self):
+        rh = self._parse(SMTRequest('bad', 'bad', 'user1'))
+        self.assertEqual(7, rh.results['rs'])
+
+    def test_parse_request_not_integer(self):
+        rh = self._parse(SMTRequest('powervm', 'softoff', 'user1',
+                                    {'wait': True, 'poll': 'x'}))
+        self.assertEqual(4, rh.results['rs'])
+
+    def test_parse_request_through_function_parser(self):
+        # powerVM sets defaults in its parseCmdline, so it is still used
+        rh = self._parse(SMTRequest('powervm', 'softoff', 'user1',
+                                    {'wait': True, 'poll': 5}))
+        self.assertEqual(0, rh.results['overallRC'])
+        self.assertEqual('off', rh.parms['desiredState'])
+        self.assertEqual(5, rh.parms['poll'])
+        self.assertEqual('POWERVM USER1 SOFTOFF --poll 5 --wait',
+                         rh.requestString)
+
+    @mock.patch.object(getVM, 'doIt')
+    def test_drive_request(self, doIt):
+        rh = self._parse(SMTRequest('getvm', 'directory', 'user1'))
+        rh.driveFunction()
+        doIt.assert_called_once_with(rh)
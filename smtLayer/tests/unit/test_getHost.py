@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
+
 from smtLayer import getHost
 from smtLayer.tests.unit import base
 
@@ -48,3 +50,19 @@ class SMTGetHostTestCase(base.SMTTestCase):
         parts = ['v1', '3390-?', 1, 10016]
         size = getHost._getDiskSize(parts)
         self.assertEqual(7384596480, size)
+
+    @mock.patch.object(getHost, 'invokeSMCLI')
+    def test_getUsageInfo(self, invokeSMCLI):
+        rh = mock.Mock()
+        rh.results = {'overallRC': 0}
+        rh.printSysLog = mock.Mock()
+        invokeSMCLI.return_value = {'overallRC': 0,
+                                    'response': 'MEMORY_IN_USE=262144'}
+        sysinfo = 'LPAR CPUs Total:     8\nLPAR CPUs Configured:     6\n'
+        with mock.patch('smtLayer.getHost.open',
+                        mock.mock_open(read_data=sysinfo), create=True):
+            with mock.patch('smtLayer.generalUtils.getSizeFromPage',
+                            return_value='1024.0M'):
+                getHost.getUsageInfo(rh)
+        rh.printLn.assert_called_once_with(
+            "N", "LPAR CPU Used: 6\nLPAR Memory Used: 1024.0M")
@@ -36,3 +36,45 @@ class SMTGetVMTestCase(base.SMTTestCase):
         raw_data = '\n'.join(fake_response)
         ret = getVM.extract_fcp_data(rh, raw_data, 'free')
         self.assertEqual(ret, '\n'.join(fake_response[0:10]))
+
+    @mock.patch.object(getVM.subprocess, 'check_output')
+    @mock.patch.object(getVM, 'invokeSMCLI')
+    def test_getConsole_userids(self, invokeSMCLI, check_output):
+        rh = mock.Mock()
+        rh.userid = 'USER1'
+        rh.parms = {'noTransfer': True, 'userids': 'user1,USER2,USER3'}
+        rh.results = {'overallRC': 0}
+        files = (b'ORIGINID FILE CLASS RECORDS  CPY HOLD DATE  TIME\n'
+                 b'USER1    0001 T CON 00000010 001 NONE 10/19 10:00:00\n'
+                 b'USER2    0002 T CON 00000010 001 NONE 10/19 10:00:00\n'
+                 b'USER1    0003 T CON 00000010 001 NONE 10/19 10:00:01\n'
+                 b'USER2    0004 A PUN 00000010 001 NONE 10/19 10:00:01\n')
+        check_output.side_effect = [b'', files]
+        with mock.patch('smtLayer.getVM.open',
+                        mock.mock_open(read_data='1\n'), create=True):
+            getVM.getConsole(rh)
+        # the consoles are already transferred
+        invokeSMCLI.assert_not_called()
+        prefix = "List of spool files containing console logs from"
+        self.assertEqual([mock.call("N", "%s USER1: 0001 0003" % prefix),
+                          mock.call("N", "%s USER2: 0002" % prefix),
+                          mock.call("N", "%s USER3: " % prefix)],
+                         rh.printLn.call_args_list)
+        self.assertEqual(0, rh.results['overallRC'])
+
+    @mock.patch.object(getVM.subprocess, 'check_output')
+    @mock.patch.object(getVM, 'invokeSMCLI')
+    def test_getConsole_reader_offline(self, invokeSMCLI, check_output):
+        rh = mock.Mock()
+        rh.userid = 'USER1'
+        rh.parms = {}
+        rh.results = {'overallRC': 4}
+        invokeSMCLI.return_value = {'overallRC': 0}
+        with mock.patch('smtLayer.getVM.open',
+                        mock.mock_open(read_data='0\n'), create=True):
+            getVM.getConsole(rh)
+        invokeSMCLI.assert_called_once_with(rh, "Image_Console_Get",
+                                            ["-T", 'USER1'])
+        rh.updateResults.assert_called_once_with(
+            getVM.msgs.msg['0411'][0])
+        check_output.assert_not_called()
@@ -15,6 +15,7 @@
 #    under the License.
 
 import mock
+import threading
 
 from smtLayer import vmUtils
 from smtLayer import ReqHandle
@@ -48,3 +49,97 @@ class SMTvmUtilsTestCase(base.SMTTestCase):
             exec_cmd.assert_called_once_with(
                 ['sudo', '/opt/zthin/bin/smcli', 'Image_Query_DM',
                  '--addRCheader', '-T', 'fakeuid'], close_fds=True)
+
+
+class FakeIUCVClient(object):
+    """Stands in for the IUCVCLNT process."""
+
+    def __init__(self, output=b'', returncode=0, hang=False):
+        self.output = output
+        self.returncode = returncode
+        self.hang = hang
+        self.killed = threading.Event()
+
+    def communicate(self):
+        if self.hang:
+            self.killed.wait(10)
+        return (self.output, None)
+
+    def kill(self):
+        self.returncode = -9
+        self.killed.set()
+
+
+class SMTIUCVSessionTestCase(base.SMTTestCase):
+    """Test cases for the IUCV sessions in vmUtils.py."""
+
+    def setUp(self):
+        super(SMTIUCVSessionTestCase, self).setUp()
+        vmUtils.resetIUCVSession('FAKEUSER')
+        self.addCleanup(vmUtils.resetIUCVSession, 'FAKEUSER')
+        self.rh = mock.Mock()
+
+    @mock.patch('subprocess.Popen')
+    def test_execCmdThruIUCV(self, popen):
+        popen.return_value = FakeIUCVClient(output=b'/root\n')
+        results = vmUtils.execCmdThruIUCV(self.rh, 'fakeuser', 'pwd',
+                                          timeout=0)
+        self.assertEqual(0, results['overallRC'])
+        self.assertEqual('/root\n', results['response'])
+        popen.assert_called_once_with(
+            ['sudo', '/opt/zthin/bin/IUCV/iucvclnt', 'fakeuser', 'pwd'],
+            stdout=mock.ANY, stderr=mock.ANY, close_fds=True)
+        health = vmUtils.getIUCVSessionHealth('fakeuser')['FAKEUSER']
+        self.assertEqual(1, health['commands'])
+        self.assertEqual(0, health['pending'])
+        self.assertEqual(0, health['failures'])
+
+        # a healthy session answers the ping without IUCVCLNT
+        results = vmUtils.pingThruIUCV(self.rh, 'fakeuser')
+        self.assertEqual(0, results['overallRC'])
+        popen.assert_called_once()
+
+        # unless the cache is not wanted
+        vmUtils.pingThruIUCV(self.rh, 'fakeuser', useCache=False)
+        self.assertEqual(2, popen.call_count)
+
+        # or the guest is restarted
+        vmUtils.resetIUCVSession('fakeuser')
+        vmUtils.pingThruIUCV(self.rh, 'fakeuser')
+        self.assertEqual(3, popen.call_count)
+
+    @mock.patch('subprocess.Popen')
+    def test_execCmdThruIUCV_channel_failure(self, popen):
+        popen.return_value = FakeIUCVClient(
+            output=b'ERROR connecting socket: Return code 4, '
+                   b'Reason code 111.', returncode=4)
+        results = vmUtils.execCmdThruIUCV(self.rh, 'fakeuser', 'pwd',
+                                          timeout=0)
+        self.assertEqual(2, results['overallRC'])
+        self.assertEqual(4, results['rc'])
+        self.assertEqual(111, results['rs'])
+        health = vmUtils.getIUCVSessionHealth('FAKEUSER')['FAKEUSER']
+        self.assertEqual(1, health['failures'])
+        self.assertFalse(vmUtils.getIUCVSession('fakeuser').isHealthy(10))
+
+    @mock.patch('subprocess.Popen')
+    def test_execCmdThruIUCV_command_failure(self, popen):
+        popen.return_value = FakeIUCVClient(
+            output=b'Return code 8, Reason code 1.', returncode=8)
+        results = vmUtils.execCmdThruIUCV(self.rh, 'fakeuser', 'false',
+                                          timeout=0)
+        self.assertEqual(8, results['rc'])
+        # the guest answered, so the channel is fine
+        self.assertTrue(vmUtils.getIUCVSession('fakeuser').isHealthy(10))
+
+    @mock.patch('subprocess.Popen')
+    def test_execCmdThruIUCV_timeout(self, popen):
+        client = FakeIUCVClient(hang=True)
+        popen.return_value = client
+        results = vmUtils.execCmdThruIUCV(self.rh, 'fakeuser', 'sleep 60',
+                                          timeout=0.1)
+        self.assertTrue(client.killed.is_set())
+        self.assertEqual(2, results['overallRC'])
+        self.assertEqual(4, results['rc'])
+        self.assertEqual(110, results['rs'])
+        self.assertIn('0320E', results['response'])
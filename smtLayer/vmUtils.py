@@ -14,16 +14,111 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
 import re
 import subprocess
 from subprocess import CalledProcessError
+import threading
 import time
 
 from smtLayer import msgs
+from zvmsdk import config
 
 modId = 'VMU'
 version = '1.0.0'         # Version of this script
 
+# IUCV sessions of the guests by userid, see getIUCVSession.
+iucvSessions = {}
+iucvSessionsLock = threading.Lock()
+# Ids of the commands sent through IUCV, used to match the log entries.
+iucvCmdIds = itertools.count(1)
+
+
+class IUCVSession(object):
+    """
+    State of the IUCV channel to the IUCV server of one guest.
+
+    The IUCV server in a guest accepts one connection at a time and runs
+    one command for each connection, so the commands for one guest are
+    sent one after another through its session while the commands for
+    different guests run concurrently.  The session also keeps the health
+    of the channel, which lets a guest that answered a command recently
+    be reported reachable without sending another command.
+    """
+
+    def __init__(self, userid):
+        self.userid = userid
+        self.lock = threading.Lock()
+        self.commands = 0         # Number of commands sent
+        self.pending = 0          # Commands sent or waiting to be sent
+        self.failures = 0         # Consecutive channel failures
+        self.lastReply = 0        # Time of the last successful command
+        self.lastFailure = 0      # Time of the last channel failure
+
+    def isHealthy(self, maxAge):
+        """
+        Return True if the guest answered a command within maxAge seconds
+        and the channel has not failed since then.
+        """
+
+        with iucvSessionsLock:
+            return (maxAge > 0 and self.lastReply > self.lastFailure and
+                    time.time() - self.lastReply < maxAge)
+
+    def getHealth(self):
+        with iucvSessionsLock:
+            return {'userid': self.userid,
+                    'commands': self.commands,
+                    'pending': self.pending,
+                    'failures': self.failures,
+                    'last_reply': self.lastReply,
+                    'last_failure': self.lastFailure}
+
+
+def getIUCVSession(userid):
+    """
+    Get the IUCV session of a guest, it is created when first used.
+    """
+
+    userid = userid.upper()
+    with iucvSessionsLock:
+        session = iucvSessions.get(userid)
+        if session is None:
+            session = IUCVSession(userid)
+            iucvSessions[userid] = session
+        return session
+
+
+def resetIUCVSession(userid):
+    """
+    Forget the health of the IUCV channel to a guest, e.g. when the guest
+    is powered off or restarted.
+    """
+
+    with iucvSessionsLock:
+        iucvSessions.pop(userid.upper(), None)
+
+
+def getIUCVSessionHealth(userid=None):
+    """
+    Get the health of the IUCV sessions.
+
+    Input:
+       (Optional) userid of the guest, all the sessions are returned
+          when it is not specified.
+
+    Output:
+       Dictionary of the session health by userid, each contains the
+       number of commands sent and pending, the number of consecutive
+       failures and the times of the last reply and failure.
+    """
+
+    with iucvSessionsLock:
+        sessions = list(iucvSessions.values())
+    return dict((session.userid, session.getHealth())
+                for session in sessions
+                if userid is None or session.userid == userid.upper())
+
 
 def disableEnableDisk(rh, userid, vaddr, option):
     """
@@ -77,7 +172,7 @@ def disableEnableDisk(rh, userid, vaddr, option):
     return results
 
 
-def execCmdThruIUCV(rh, userid, strCmd, hideInLog=[]):
+def execCmdThruIUCV(rh, userid, strCmd, hideInLog=[], timeout=None):
     """
     Send a command to a virtual machine using IUCV.
 
@@ -87,6 +182,8 @@ def execCmdThruIUCV(rh, userid, strCmd, hideInLog=[]):
        Command string to send
        (Optional) List of strCmd words (by index) to hide in
           sysLog by replacing the word with "<hidden>".
+       (Optional) Seconds to wait for the command, it defaults to the
+          guest.iucv_command_timeout option, 0 means no limit.
 
     Output:
        Dictionary containing the following:
@@ -102,15 +199,57 @@ def execCmdThruIUCV(rh, userid, strCmd, hideInLog=[]):
           to suppress it.  Instead, any error messages are put in the
           response dictionary element that is returned.
     """
+    cmdId = str(next(iucvCmdIds))
     if len(hideInLog) == 0:
         rh.printSysLog("Enter vmUtils.execCmdThruIUCV, userid: " +
-                       userid + " cmd: " + strCmd)
+                       userid + " id: " + cmdId + " cmd: " + strCmd)
     else:
         logCmd = strCmd.split(' ')
         for i in hideInLog:
             logCmd[i] = '<hidden>'
         rh.printSysLog("Enter vmUtils.execCmdThruIUCV, userid: " +
-                       userid + " cmd: " + ' '.join(logCmd))
+                       userid + " id: " + cmdId + " cmd: " +
+                       ' '.join(logCmd))
+
+    if timeout is None:
+        timeout = config.CONF.guest.iucv_command_timeout
+
+    session = getIUCVSession(userid)
+    with iucvSessionsLock:
+        session.pending += 1
+    try:
+        with session.lock:
+            with iucvSessionsLock:
+                session.commands += 1
+            results = _sendCmdThruIUCV(rh, userid, strCmd, timeout)
+    finally:
+        with iucvSessionsLock:
+            session.pending -= 1
+
+    # A failed command still proves the channel works, only the failures
+    # of IUCVCLNT itself count against the session.
+    with iucvSessionsLock:
+        if results['overallRC'] == 0 or results['rc'] == 8:
+            session.lastReply = time.time()
+            session.failures = 0
+            failures = 0
+        else:
+            session.lastFailure = time.time()
+            session.failures += 1
+            failures = session.failures
+    if failures == 1:
+        rh.printSysLog("IUCV channel to " + session.userid +
+                       " failed, rc: " + str(results['rc']))
+
+    rh.printSysLog("Exit vmUtils.execCmdThruIUCV, id: " + cmdId +
+                   ", rc: " + str(results['rc']))
+    return results
+
+
+def _sendCmdThruIUCV(rh, userid, strCmd, timeout):
+    """
+    Run IUCVCLNT to send a command, see execCmdThruIUCV.
+    """
 
     iucvpath = '/opt/zthin/bin/IUCV/'
     results = {
@@ -125,11 +264,29 @@ def execCmdThruIUCV(rh, userid, strCmd, hideInLog=[]):
            iucvpath + "iucvclnt",
            userid,
            strCmd]
+    timer = None
+    timedOut = []
     try:
-        results['response'] = subprocess.check_output(
-                cmd,
-                stderr=subprocess.STDOUT,
-                close_fds=True)
+        proc = subprocess.Popen(cmd,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                close_fds=True)
+        if timeout > 0:
+            def _kill():
+                timedOut.append(True)
+                proc.kill()
+            timer = threading.Timer(timeout, _kill)
+            timer.start()
+        output = proc.communicate()[0]
+        if timedOut:
+            # The command did not finish in time.
+            results = dict(msgs.msg['0320'][0])
+            results['response'] = msgs.msg['0320'][1] % (modId, timeout,
+                userid, strCmd)
+            return results
+        if proc.returncode != 0:
+            raise CalledProcessError(proc.returncode, cmd, output)
+        results['response'] = output
         if isinstance(results['response'], bytes):
             results['response'] = bytes.decode(results['response'])
     except CalledProcessError as e:
@@ -197,12 +354,37 @@ def execCmdThruIUCV(rh, userid, strCmd, hideInLog=[]):
         msg = msgs.msg['0421'][1] % (modId, strCmd,
             type(e).__name__, str(e))
         results['response'] = msg
+    finally:
+        if timer is not None:
+            timer.cancel()
 
-    rh.printSysLog("Exit vmUtils.execCmdThruIUCV, rc: " +
-                   str(results['rc']))
     return results
 
 
+def pingThruIUCV(rh, userid, useCache=True):
+    """
+    Check whether a virtual machine answers through IUCV.  A guest whose
+    IUCV session got a reply within the guest.iucv_reachable_interval
+    option is reachable without sending another command.
+
+    Input:
+       Request Handle
+       Userid of the target virtual machine
+       (Optional) False to always send the command, e.g. when the guest
+          is about to be stopped or deleted.
+
+    Output:
+       Dictionary of the results, see execCmdThruIUCV.
+    """
+
+    if useCache and getIUCVSession(userid).isHealthy(
+            config.CONF.guest.iucv_reachable_interval):
+        rh.printSysLog("IUCV session to " + userid + " is healthy")
+        return {'overallRC': 0, 'rc': 0, 'rs': 0, 'errno': 0,
+                'response': []}
+    return execCmdThruIUCV(rh, userid, "echo 'ping'")
+
+
 def getPerfInfo(rh, useridlist):
     """
     Get the performance information for a userid
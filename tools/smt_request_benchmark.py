@@ -0,0 +1,60 @@
+"""
+Micro-benchmark of the per-request overhead in smtLayer.
+
+It compares preparing SMT requests from the command strings, which are
+split by shlex and parsed operand by operand, with preparing them from
+the structured requests (ReqHandle.SMTRequest).  The requests are only
+parsed, nothing is sent to z/VM.
+
+Usage: PYTHONPATH=. python tools/smt_request_benchmark.py [count]
+"""
+
+import logging
+import sys
+import timeit
+
+from smtLayer.ReqHandle import ReqHandle
+from smtLayer.ReqHandle import SMTRequest
+
+
+class _Daemon(object):
+    """Stands in for the SMT daemon so that no syslog handler is set up."""
+    logger = logging.getLogger('smt_request_benchmark')
+
+
+REQUESTS = [
+    ("getvm USER1 directory",
+     SMTRequest('getvm', 'directory', 'USER1')),
+    ("cmdVM USER1 CMD 'cat /proc/cmdline | grep -a \"^root=\"'",
+     SMTRequest('cmdvm', 'cmd', 'USER1',
+                {'cmd': 'cat /proc/cmdline | grep -a "^root="'})),
+    ("SMAPI USER1 API Virtual_Network_Vswitch_Query_Extended "
+     "--operands -k switch_name=VSW1 -k VEPA_status=yes",
+     SMTRequest('smapi', 'api', 'USER1',
+                {'apiName': 'Virtual_Network_Vswitch_Query_Extended',
+                 'operands': ['-k', 'switch_name=VSW1',
+                              '-k', 'VEPA_status=yes']})),
+    ("PowerVM USER1 softoff --wait",
+     SMTRequest('powervm', 'softoff', 'USER1', {'wait': True})),
+]
+
+
+def _parse(requestData):
+    rh = ReqHandle(smt=_Daemon())
+    rh.parseCmdline(requestData)
+    assert rh.results['overallRC'] == 0, rh.results
+    return rh
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print("%-60s %12s %12s" % ('request', 'string(us)', 'typed(us)'))
+    for string, typed in REQUESTS:
+        before = timeit.timeit(lambda: _parse(string), number=count)
+        after = timeit.timeit(lambda: _parse(typed), number=count)
+        print("%-60s %12.2f %12.2f" % (string[:60], before / count * 1e6,
+                                      after / count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
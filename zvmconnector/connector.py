@@ -19,6 +19,7 @@ from zvmconnector import restclient
 
 CONN_TYPE_SOCKET = 'socket'
 CONN_TYPE_REST = 'rest'
+CONN_TYPE_INPROCESS = 'inprocess'
 
 
 class baseConnection(object):
@@ -35,12 +36,26 @@ class socketConnection(baseConnection):
         return self.client.call(api_name, *api_args, **api_kwargs)
 
 
+class inprocessConnection(baseConnection):
+
+    def __init__(self):
+        # Imported here so that the socket and rest connections can be used
+        # without the SDK server dependencies installed
+        from zvmsdk import sdkserver
+        self.server = sdkserver.get_inprocess_server()
+
+    def request(self, api_name, *api_args, **api_kwargs):
+        return self.server.call(api_name, *api_args, **api_kwargs)
+
+
 class restConnection(baseConnection):
 
     def __init__(self, ip_addr='127.0.0.1', port=8080, ssl_enabled=False,
-                 verify=False, token_path=None):
+                 verify=False, token_path=None,
+                 pool_size=restclient.DEFAULT_POOL_SIZE, keep_alive=True):
         self.client = restclient.RESTClient(ip_addr, port, ssl_enabled, verify,
-                                            token_path)
+                                            token_path, pool_size=pool_size,
+                                            keep_alive=keep_alive)
 
     def request(self, api_name, *api_args, **api_kwargs):
         return self.client.call(api_name, *api_args, **api_kwargs)
@@ -50,12 +65,16 @@ class ZVMConnector(object):
 
     def __init__(self, ip_addr=None, port=None, timeout=3600,
                  connection_type=None, ssl_enabled=False, verify=False,
-                 token_path=None):
+                 token_path=None, pool_size=restclient.DEFAULT_POOL_SIZE,
+                 keep_alive=True):
         """
         :param str ip_addr:         IP address of SDK server
         :param int port:            Port of SDK server daemon
         :param int timeout:         Wait timeout if request no response
-        :param str connection_type: The value should be 'socket' or 'rest'
+        :param str connection_type: The value should be 'socket', 'rest' or
+                                    'inprocess', 'inprocess' calls the SDK
+                                    API in this process and is only usable
+                                    on the SDK server host
         :param boolean ssl_enabled: Whether SSL enabled or not. If enabled,
                                     use HTTPS instead of HTTP. The https
                                     server should enable SSL to support this.
@@ -65,26 +84,37 @@ class ZVMConnector(object):
                                     case it must be a path to a CA bundle
                                     to use. Default to False.
         :param str token_path:      The path of token file.
+        :param int pool_size:       The max number of connections kept to
+                                    the REST server for reuse.
+        :param boolean keep_alive:  Whether to keep the connections to the
+                                    REST server open for following requests.
         """
         if (connection_type is not None and
                 connection_type.lower() == CONN_TYPE_SOCKET):
             connection_type = CONN_TYPE_SOCKET
+        elif (connection_type is not None and
+                connection_type.lower() == CONN_TYPE_INPROCESS):
+            connection_type = CONN_TYPE_INPROCESS
         else:
             connection_type = CONN_TYPE_REST
         self.conn = self._get_connection(ip_addr, port, timeout,
                                          connection_type, ssl_enabled, verify,
-                                         token_path)
+                                         token_path, pool_size, keep_alive)
 
     def _get_connection(self, ip_addr, port, timeout,
                         connection_type, ssl_enabled, verify,
-                        token_path):
+                        token_path, pool_size=restclient.DEFAULT_POOL_SIZE,
+                        keep_alive=True):
         if connection_type == CONN_TYPE_SOCKET:
             return socketConnection(ip_addr or '127.0.0.1', port or 2000,
                                     timeout)
+        elif connection_type == CONN_TYPE_INPROCESS:
+            return inprocessConnection()
         else:
             return restConnection(ip_addr or '127.0.0.1', port or 8080,
                                   ssl_enabled=ssl_enabled, verify=verify,
-                                  token_path=token_path)
+                                  token_path=token_path, pool_size=pool_size,
+                                  keep_alive=keep_alive)
 
     def send_request(self, api_name, *api_args, **api_kwargs):
         """Refer to SDK API documentation.
@@ -12,17 +12,24 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import base64
 import json
 import os
 import requests
 import six
 import tempfile
 import threading
+import time
 import uuid
 
+from requests import adapters
+
 # TODO:set up configuration file only for RESTClient and configure this value
 TOKEN_LOCK = threading.Lock()
 CHUNKSIZE = 4096
+# the token is refreshed this number of seconds before it expires
+TOKEN_REFRESH_MARGIN = 60
+DEFAULT_POOL_SIZE = 10
 
 
 REST_REQUEST_ERROR = [{'overallRC': 101, 'modID': 110, 'rc': 101},
@@ -97,6 +104,19 @@ def fill_kwargs_in_body(body, **kwargs):
         body[key] = kwargs.get(key)
 
 
+def fill_paging_in_query(query, **kwargs):
+    # append the paging and fields kwargs to the query list, fields is
+    # joined into one comma separated query parameter
+    for key in ('limit', 'marker', 'fields'):
+        value = kwargs.get(key)
+        if value is None:
+            continue
+        if key == 'fields':
+            value = ','.join(value)
+        query.append('%s=%s' % (key, value))
+    return query
+
+
 def req_version(start_index, *args, **kwargs):
     url = '/'
     body = None
@@ -105,6 +125,9 @@ def req_version(start_index, *args, **kwargs):
 
 def req_guest_list(start_index, *args, **kwargs):
     url = '/guests'
+    query = fill_paging_in_query([], **kwargs)
+    if query:
+        url += '?' + '&'.join(query)
     body = None
     return url, body
 
@@ -130,12 +153,27 @@ def req_guest_create(start_index, *args, **kwargs):
     return url, body
 
 
+def req_guest_create_bulk(start_index, *args, **kwargs):
+    url = '/guests/create/bulk'
+    body = {'guests': args[start_index]}
+    return url, body
+
+
+def req_guest_delete_bulk(start_index, *args, **kwargs):
+    url = '/guests/delete/bulk'
+    body = {'delete': {'userid_list': args[start_index]}}
+    return url, body
+
+
 def req_guest_inspect_stats(start_index, *args, **kwargs):
     if type(args[start_index]) is str:
         url = '/guests/stats?userid=%s' % args[start_index]
     else:
         userids = ','.join(args[start_index])
         url = '/guests/stats?userid=%s' % userids
+    query = fill_paging_in_query([], **kwargs)
+    if query:
+        url += '&' + '&'.join(query)
     body = None
 
     return url, body
@@ -158,9 +196,15 @@ def req_guests_get_nic_info(start_index, *args, **kwargs):
     userid = kwargs.get('userid', None)
     nic_id = kwargs.get('nic_id', None)
     vswitch = kwargs.get('vswitch', None)
+    limit = kwargs.get('limit', None)
+    marker = kwargs.get('marker', None)
+    fields = kwargs.get('fields', None)
     if ((userid is None) and
             (nic_id is None) and
-            (vswitch is None)):
+            (vswitch is None) and
+            (limit is None) and
+            (marker is None) and
+            (fields is None)):
         append = ''
     else:
         append = "?"
@@ -170,6 +214,12 @@ def req_guests_get_nic_info(start_index, *args, **kwargs):
             append += 'nic_id=%s&' % nic_id
         if vswitch is not None:
             append += 'vswitch=%s&' % vswitch
+        if limit is not None:
+            append += 'limit=%s&' % limit
+        if marker is not None:
+            append += 'marker=%s&' % marker
+        if fields is not None:
+            append += 'fields=%s&' % ','.join(fields)
         append = append.strip('&')
     url = url + append
     body = None
@@ -213,6 +263,7 @@ def req_guest_unpause(start_index, *args, **kwargs):
 def req_guest_reboot(start_index, *args, **kwargs):
     url = '/guests/%s/action'
     body = {'action': 'reboot'}
+    fill_kwargs_in_body(body, **kwargs)
     return url, body
 
 
@@ -282,6 +333,28 @@ def req_guest_live_resize_mem(start_index, *args, **kwargs):
     return url, body
 
 
+def req_guest_live_resize(start_index, *args, **kwargs):
+    url = '/guests/%s/action'
+    body = {'action': 'live_resize'}
+    fill_kwargs_in_body(body, **kwargs)
+    return url, body
+
+
+def req_guest_live_migrate_bulk(start_index, *args, **kwargs):
+    url = '/guests/migrate/bulk'
+    body = {'migrate': {'userid_list': args[start_index],
+                        'dest_zcc_userid': args[start_index + 1],
+                        'destination': args[start_index + 2]}}
+    fill_kwargs_in_body(body['migrate'], **kwargs)
+    return url, body
+
+
+def req_guest_live_resize_bulk(start_index, *args, **kwargs):
+    url = '/guests/resize/bulk'
+    body = {'resize': {'resizes': args[start_index]}}
+    return url, body
+
+
 def req_guest_grow_root_volume(start_index, *args, **kwargs):
     url = '/guests/%s/action'
     body = {'action': 'grow_root_volume',
@@ -366,6 +439,28 @@ def req_guest_create_network_interface(start_index, *args, **kwargs):
     return url, body
 
 
+def req_guest_create_network_interface_bulk(start_index, *args, **kwargs):
+    url = '/guests/interface/bulk'
+    body = {'interface': {'interfaces': args[start_index]}}
+    fill_kwargs_in_body(body['interface'], **kwargs)
+    return url, body
+
+
+def req_guest_get_console_output_bulk(start_index, *args, **kwargs):
+    url = '/guests/console/bulk'
+    body = {'console': {'userid_list': args[start_index]}}
+    fill_kwargs_in_body(body['console'], **kwargs)
+    return url, body
+
+
+def req_guest_execute_cmd_bulk(start_index, *args, **kwargs):
+    url = '/guests/cmd/bulk'
+    body = {'execute': {'userid_list': args[start_index],
+                        'cmd': args[start_index + 1]}}
+    fill_kwargs_in_body(body['execute'], **kwargs)
+    return url, body
+
+
 def req_guest_delete_network_interface(start_index, *args, **kwargs):
     url = '/guests/%s/interface'
     body = {'interface': {'os_version': args[start_index],
@@ -380,6 +475,12 @@ def req_guest_get_power_state(start_index, *args, **kwargs):
     return url, body
 
 
+def req_guest_get_iucv_session_health(start_index, *args, **kwargs):
+    url = '/guests/%s/iucv_session'
+    body = None
+    return url, body
+
+
 def req_guest_create_disks(start_index, *args, **kwargs):
     url = '/guests/%s/disks'
     body = {'disk_info': {'disk_list': args[start_index]}}
@@ -411,6 +512,18 @@ def req_volume_detach(start_index, *args, **kwargs):
     return url, body
 
 
+def req_volume_attach_bulk(start_index, *args, **kwargs):
+    url = '/guests/volumes/bulk'
+    body = {'info': {'connections': args[start_index]}}
+    return url, body
+
+
+def req_volume_detach_bulk(start_index, *args, **kwargs):
+    url = '/guests/volumes/bulk'
+    body = {'info': {'connections': args[start_index]}}
+    return url, body
+
+
 def req_volume_refresh_bootmap(start_index, *args, **kwargs):
     url = '/volumes/volume_refresh_bootmap'
     fcpchannel = kwargs.get('fcpchannels', None)
@@ -445,9 +558,13 @@ def req_get_volume_connector(start_index, *args, **kwargs):
 
 def req_get_all_fcp_usage(start_index, *args, **kwargs):
     url = '/volumes/fcp'
+    query = []
     userid = kwargs.get('userid', None)
     if userid:
-        url += "?userid=%s" % userid
+        query.append("userid=%s" % userid)
+    fill_paging_in_query(query, **kwargs)
+    if query:
+        url += '?' + '&'.join(query)
     body = None
     return url, body
 
@@ -469,12 +586,21 @@ def req_set_fcp_usage(start_index, *args, **kwargs):
 
 def req_host_get_info(start_index, *args, **kwargs):
     url = '/host'
+    if kwargs.get('refresh'):
+        url += '?refresh=%s' % kwargs['refresh']
     body = None
     return url, body
 
 
 def req_host_get_guest_list(start_index, *args, **kwargs):
     url = '/host/guests'
+    # process appends in GET method
+    query = fill_paging_in_query([], **kwargs)
+    for key in ('sdk_managed', 'migrated'):
+        if kwargs.get(key) is not None:
+            query.append('%s=%s' % (key, kwargs[key]))
+    if query:
+        url += '?' + '&'.join(query)
     body = None
     return url, body
 
@@ -523,13 +649,16 @@ def req_image_import(start_index, *args, **kwargs):
 
 def req_image_query(start_index, *args, **kwargs):
     url = '/images'
+    query = []
     image_name = kwargs.get('imagename', None)
-    if image_name is None:
-        append = ''
-    else:
-        append = "?"
-        append += "imagename=%s" % image_name
-    url += append
+    if image_name is not None:
+        query.append("imagename=%s" % image_name)
+    os_distro = kwargs.get('os_distro', None)
+    if os_distro is not None:
+        query.append("os_distro=%s" % os_distro)
+    fill_paging_in_query(query, **kwargs)
+    if query:
+        url += '?' + '&'.join(query)
     body = None
     return url, body
 
@@ -598,6 +727,20 @@ def req_vswitch_query(start_index, *args, **kwargs):
     return url, body
 
 
+def req_vswitch_cache_stats(start_index, *args, **kwargs):
+    url = '/vswitch_cache'
+    body = None
+    return url, body
+
+
+def req_vswitch_cache_refresh(start_index, *args, **kwargs):
+    url = '/vswitch_cache'
+    body = {'vswitch_cache': {}}
+    if kwargs.get('vswitch_names') is not None:
+        body['vswitch_cache']['vswitch_names'] = kwargs['vswitch_names']
+    return url, body
+
+
 def req_vswitch_grant_user(start_index, *args, **kwargs):
     url = '/vswitches/%s'
     body = {'vswitch': {'grant_userid': args[start_index]}}
@@ -637,6 +780,16 @@ DATABASE = {
         'args_required': 3,
         'params_path': 0,
         'request': req_guest_create},
+    'guest_create_bulk': {
+        'method': 'POST',
+        'args_required': 1,
+        'params_path': 0,
+        'request': req_guest_create_bulk},
+    'guest_delete_bulk': {
+        'method': 'POST',
+        'args_required': 1,
+        'params_path': 0,
+        'request': req_guest_delete_bulk},
     'guest_list': {
         'method': 'GET',
         'args_required': 0,
@@ -743,6 +896,21 @@ DATABASE = {
         'args_required': 2,
         'params_path': 1,
         'request': req_guest_resize_mem},
+    'guest_live_resize': {
+        'method': 'POST',
+        'args_required': 1,
+        'params_path': 1,
+        'request': req_guest_live_resize},
+    'guest_live_migrate_bulk': {
+        'method': 'POST',
+        'args_required': 3,
+        'params_path': 0,
+        'request': req_guest_live_migrate_bulk},
+    'guest_live_resize_bulk': {
+        'method': 'POST',
+        'args_required': 1,
+        'params_path': 0,
+        'request': req_guest_live_resize_bulk},
     'guest_grow_root_volume': {
         'method': 'POST',
         'args_required': 2,
@@ -803,6 +971,21 @@ DATABASE = {
         'args_required': 3,
         'params_path': 1,
         'request': req_guest_create_network_interface},
+    'guest_create_network_interface_bulk': {
+        'method': 'POST',
+        'args_required': 1,
+        'params_path': 0,
+        'request': req_guest_create_network_interface_bulk},
+    'guest_get_console_output_bulk': {
+        'method': 'POST',
+        'args_required': 1,
+        'params_path': 0,
+        'request': req_guest_get_console_output_bulk},
+    'guest_execute_cmd_bulk': {
+        'method': 'POST',
+        'args_required': 2,
+        'params_path': 0,
+        'request': req_guest_execute_cmd_bulk},
     'guest_delete_network_interface': {
         'method': 'DELETE',
         'args_required': 3,
@@ -813,6 +996,11 @@ DATABASE = {
         'args_required': 1,
         'params_path': 1,
         'request': req_guest_get_power_state},
+    'guest_get_iucv_session_health': {
+        'method': 'GET',
+        'args_required': 1,
+        'params_path': 1,
+        'request': req_guest_get_iucv_session_health},
     'guest_create_disks': {
         'method': 'POST',
         'args_required': 2,
@@ -838,6 +1026,16 @@ DATABASE = {
         'args_required': 1,
         'params_path': 0,
         'request': req_volume_detach},
+    'volume_attach_bulk': {
+        'method': 'POST',
+        'args_required': 1,
+        'params_path': 0,
+        'request': req_volume_attach_bulk},
+    'volume_detach_bulk': {
+        'method': 'DELETE',
+        'args_required': 1,
+        'params_path': 0,
+        'request': req_volume_detach_bulk},
     'volume_refresh_bootmap': {
         'method': 'PUT',
         'args_required': 0,
@@ -943,6 +1141,16 @@ DATABASE = {
         'args_required': 1,
         'params_path': 1,
         'request': req_vswitch_delete},
+    'vswitch_cache_stats': {
+        'method': 'GET',
+        'args_required': 0,
+        'params_path': 0,
+        'request': req_vswitch_cache_stats},
+    'vswitch_cache_refresh': {
+        'method': 'PUT',
+        'args_required': 0,
+        'params_path': 0,
+        'request': req_vswitch_cache_refresh},
     'vswitch_grant_user': {
         'method': 'PUT',
         'args_required': 2,
@@ -971,11 +1179,25 @@ def get_data_file(fpath):
         return open(fpath, 'rb')
 
 
+def get_token_expiration(token):
+    """Get the expiration time from the payload of a JWT token, the token is
+    not verified. Return None if the token has no expiration time."""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(
+            payload.encode('ascii')).decode('utf-8'))
+        return float(claims['exp'])
+    except Exception:
+        return None
+
+
 class RESTClient(object):
 
     def __init__(self, ip='127.0.0.1', port=8888,
                  ssl_enabled=False, verify=False,
-                 token_path=None):
+                 token_path=None, pool_size=DEFAULT_POOL_SIZE,
+                 keep_alive=True):
         # SSL enable or not
         if ssl_enabled:
             self.base_url = "https://" + ip + ":" + str(port)
@@ -988,6 +1210,25 @@ class RESTClient(object):
                 raise CACertNotFound('CA certificate file not found.')
         self.verify = verify
         self.token_path = token_path
+        self._token = None
+        self._token_expiration = None
+        self._token_lock = threading.Lock()
+        self._session = self._create_session(pool_size, keep_alive)
+
+    def _create_session(self, pool_size, keep_alive):
+        # connections to the server are kept in the pool and reused by the
+        # following requests, unless keep_alive is disabled
+        session = requests.Session()
+        adapter = adapters.HTTPAdapter(pool_connections=1,
+                                       pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def close(self):
+        self._session.close()
 
     def _check_arguments(self, api_name, *args, **kwargs):
         # check api_name exist or not
@@ -1027,8 +1268,8 @@ class RESTClient(object):
 
         url = self.base_url + '/token'
         method = 'POST'
-        response = requests.request(method, url, headers=_headers,
-                                    verify=self.verify)
+        response = self._session.request(method, url, headers=_headers,
+                                         verify=self.verify)
         if response.status_code == 503:
             # service unavailable
             raise ServiceUnavailable(response)
@@ -1040,6 +1281,18 @@ class RESTClient(object):
 
         return token
 
+    def _get_cached_token(self, refresh=False):
+        """Return the cached token, a new token is got when there is no
+        cached one, the cached one is about to expire or refresh is True."""
+        with self._token_lock:
+            if (refresh or self._token is None or
+                (self._token_expiration is not None and
+                 time.time() > self._token_expiration - TOKEN_REFRESH_MARGIN)):
+                token = self._get_token()
+                self._token = token
+                self._token_expiration = get_token_expiration(token)
+            return self._token
+
     def _get_url_body_headers(self, api_name, *args, **kwargs):
         headers = {}
         headers['Content-Type'] = 'application/json'
@@ -1091,19 +1344,27 @@ class RESTClient(object):
                 body = body
 
         if self.token_path is not None:
-            _headers['X-Auth-Token'] = self._get_token()
+            _headers['X-Auth-Token'] = self._get_cached_token()
 
         content_type = headers['Content-Type']
         stream = content_type == 'application/octet-stream'
         if stream:
-            response = requests.request(method, url, data=body,
-                                        headers=_headers,
-                                        verify=self.verify,
-                                        stream=stream)
+            response = self._session.request(method, url, data=body,
+                                             headers=_headers,
+                                             verify=self.verify,
+                                             stream=stream)
         else:
-            response = requests.request(method, url, data=body,
-                                        headers=_headers,
-                                        verify=self.verify)
+            response = self._session.request(method, url, data=body,
+                                             headers=_headers,
+                                             verify=self.verify)
+            if self.token_path is not None and response.status_code == 401:
+                # the cached token is expired or revoked, get a new one
+                # and try again
+                _headers['X-Auth-Token'] = self._get_cached_token(
+                    refresh=True)
+                response = self._session.request(method, url, data=body,
+                                                 headers=_headers,
+                                                 verify=self.verify)
         return response
 
     def call(self, api_name, *args, **kwargs):
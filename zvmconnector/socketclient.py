@@ -112,10 +112,9 @@ class SDKSocketClient(object):
             return_blocks = []
             try:
                 while True:
-                    block = cs.recv(4096)
+                    block = cs.recv(65536)
                     if not block:
                         break
-                    block = bytes.decode(block)
                     return_blocks.append(block)
             except socket.error as err:
                 # When the sdkserver cann't handle all the client request,
@@ -135,7 +134,9 @@ class SDKSocketClient(object):
         # the standard result form, so client just return the received
         # data
         if return_blocks:
-            results = json.loads(''.join(return_blocks))
+            # decode once all the blocks are received, a multi-byte
+            # character may be split across blocks
+            results = json.loads(b''.join(return_blocks).decode('utf-8'))
         else:
             results = self._construct_socket_error(4)
         return results
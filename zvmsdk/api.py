@@ -13,6 +13,7 @@
 #    under the License.
 
 
+import copy
 import netaddr
 import six
 
@@ -145,8 +146,8 @@ class SDKAPI(object):
                  Integer, time to wait for vm to be deactivate, the
                  recommended value is 300
                - poll_interval=<value>
-                 Integer, how often to signal guest while waiting for it
-                 to be deactivate, the recommended value is 20
+                 Integer, deprecated and ignored, the state of the guest
+                 is polled every [guest]state_poll_interval seconds
 
         :returns: None
         """
@@ -156,14 +157,17 @@ class SDKAPI(object):
             self._vmops.guest_softstop(userid, **kwargs)
 
     @check_guest_exist()
-    def guest_reboot(self, userid):
+    def guest_reboot(self, userid, timeout=0):
         """Reboot a virtual machine
         :param str userid: the id of the virtual machine to be reboot
+        :param int timeout: the timeout of waiting virtual machine reachable
+                            after reboot, default as 0, which mean not wait
+                            for virtual machine reachable status
         :returns: None
         """
         action = "reboot guest '%s'" % userid
         with zvmutils.log_and_reraise_sdkbase_error(action):
-            self._vmops.guest_reboot(userid)
+            self._vmops.guest_reboot(userid, timeout)
 
     @check_guest_exist()
     def guest_reset(self, userid):
@@ -210,6 +214,28 @@ class SDKAPI(object):
         with zvmutils.log_and_reraise_sdkbase_error(action):
             return self._vmops.get_power_state(userid)
 
+    @check_guest_exist()
+    def guest_get_iucv_session_health(self, userid):
+        """Get the health of the IUCV session used to send commands to
+        the guest.
+
+        :param userid: the user id of the guest
+        :returns: Dictionary contains:
+                  userid: (str) the user id of the guest
+                  commands: (int) the number of commands sent
+                  pending: (int) the number of commands sent or waiting
+                           to be sent
+                  failures: (int) the number of consecutive failures of
+                            the IUCV channel
+                  last_reply: (float) the time of the last command that
+                              succeeded, 0 if none
+                  last_failure: (float) the time of the last failure of
+                                the IUCV channel, 0 if none
+        """
+        action = "get IUCV session health of guest '%s'" % userid
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._vmops.get_iucv_session_health(userid)
+
     @check_guest_exist()
     def guest_get_info(self, userid):
         """Get the status of a virtual machine.
@@ -275,23 +301,54 @@ class SDKAPI(object):
             inst_info['user_direct'] = user_direct
             return inst_info
 
-    def guest_list(self):
+    def guest_list(self, limit=None, marker=None):
         """list names of all the VMs on this host.
 
-        :returns: names of the vm on this host, in a list.
+        :param int limit: the max number of names to return, all the names
+               are returned when it is not specified
+        :param str marker: only the names sorted after this userid are
+               returned
+        :returns: names of the vm on this host, in a list, the names are
+                  sorted when limit or marker is specified.
         """
+        self._check_paging_input(limit)
         action = "list guests on host"
         with zvmutils.log_and_reraise_sdkbase_error(action):
-            return self._vmops.guest_list()
+            userids = self._vmops.guest_list()
+        if limit is None and marker is None:
+            return userids
+        if marker is not None:
+            marker = marker.upper()
+        return zvmutils.paginate(userids, limit=limit, marker=marker)
+
+    def _check_paging_input(self, limit, fields=None):
+        if limit is not None:
+            if (isinstance(limit, bool) or
+                not isinstance(limit, six.integer_types) or limit < 1):
+                errmsg = ("Invalid limit input %s, limit should be a "
+                          "positive integer." % limit)
+                LOG.error(errmsg)
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+        if fields is not None:
+            if (not isinstance(fields, list) or not fields or
+                not all(isinstance(f, six.string_types) for f in fields)):
+                errmsg = ("Invalid fields input %s, fields should be a "
+                          "list of field names." % fields)
+                LOG.error(errmsg)
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
 
-    def host_get_info(self):
+    def host_get_info(self, refresh=False):
         """ Retrieve host information including host, memory, disk etc.
 
+        :param bool refresh: the static information like host name and the
+               usage of CPU, memory and disk pool are cached separately,
+               each with its own expiration interval, set refresh to True
+               to query all the information from the host again.
         :returns: Dictionary describing resources
         """
         action = "get host information"
         with zvmutils.log_and_reraise_sdkbase_error(action):
-            return self._hostops.get_info()
+            return self._hostops.get_info(refresh=refresh)
 
     def host_get_diskpool_volumes(self, disk_pool=None):
         """ Retrieve diskpool volumes.
@@ -343,13 +400,28 @@ class SDKAPI(object):
         with zvmutils.log_and_reraise_sdkbase_error(action):
             return self._hostops.get_volume_info(volume_name.upper())
 
-    def host_get_guest_list(self):
+    def host_get_guest_list(self, limit=None, marker=None, sdk_managed=None,
+                            migrated=None):
         """list names of all the VMs on the host.
-        :returns: names of the vm on this hypervisor, in a list.
+
+        :param int limit: the max number of names to return, all the names
+               are returned when it is not specified
+        :param str marker: only the names sorted after this userid are
+               returned, the last name of the previous page is used as the
+               marker to get the next page
+        :param bool sdk_managed: when specified, only return the VMs that
+               are (or are not) created or registered by SDK
+        :param bool migrated: when specified, only return the VMs that are
+               (or are not) migrated to other host
+        :returns: sorted names of the vm on this hypervisor, in a list.
         """
+        self._check_paging_input(limit)
+
         action = "list guests on the host"
         with zvmutils.log_and_reraise_sdkbase_error(action):
-            return self._hostops.guest_list()
+            return self._hostops.guest_list(limit=limit, marker=marker,
+                                            sdk_managed=sdk_managed,
+                                            migrated=migrated)
 
     def host_diskpool_get_info(self, disk_pool=None):
         """ Retrieve diskpool information.
@@ -435,19 +507,34 @@ class SDKAPI(object):
             LOG.error("Failed to import image '%s'" % image_name)
             raise
 
-    def image_query(self, imagename=None):
+    def image_query(self, imagename=None, limit=None, marker=None,
+                    fields=None, os_distro=None):
         """Get the list of image info in image repository
 
         :param imagename:  Used to retrieve the specified image info,
                if not specified, all images info will be returned
+        :param int limit: the max number of images to return, the images
+               are sorted by name when it is specified
+        :param str marker: only the images whose name sorts after this
+               image name are returned
+        :param list fields: the names of the fields to return for each
+               image, all the fields are returned when it is not specified
+        :param str os_distro: only the images of this os distro, like rhel7.2,
+               are returned, case insensitive
 
         :returns: A list that contains the specified or all images info
         """
+        self._check_paging_input(limit, fields)
         try:
-            return self._imageops.image_query(imagename)
+            images = self._imageops.image_query(imagename, limit=limit,
+                                                marker=marker,
+                                                os_distro=os_distro)
         except exception.SDKBaseException:
             LOG.error("Failed to query image")
             raise
+        if fields is None:
+            return images
+        return [zvmutils.select_fields(image, fields) for image in images]
 
     def image_export(self, image_name, dest_url, remote_host=None):
         """Export the image to the specified location
@@ -665,6 +752,7 @@ class SDKAPI(object):
             #   'mac_address': '02:55:36:00:00:10', 'mac_ip_version': '4',
             #   'mac_ip_address': '9.152.85.95'}]
             adapters_info = self._smtclient.get_adapters_info(userid)
+            records = []
             for adapter in adapters_info:
                 interface = adapter.get('adapter_address')
                 switch = adapter.get('lan_name')
@@ -680,9 +768,10 @@ class SDKAPI(object):
                                     (interface, port_macs))
                     else:
                         LOG.info("Port found for nic %s." % interface)
-                with zvmutils.log_and_reraise_sdkbase_error(action):
-                    self._NetworkDbOperator.switch_add_record(
-                                userid, interface, port, switch)
+                records.append({'userid': userid, 'interface': interface,
+                                'port': port, 'switch': switch})
+            with zvmutils.log_and_reraise_sdkbase_error(action):
+                self._NetworkDbOperator.switch_add_records(records)
             LOG.info("Guest %s registered." % userid)
 
     # Deregister the guest (not delete), this function has no relationship with
@@ -775,6 +864,134 @@ class SDKAPI(object):
                 self._vmops.live_migrate_vm(userid, destination,
                                             parms, lgr_action)
 
+    def guest_live_migrate_bulk(self, userid_list, dest_zcc_userid,
+                                destination, parms=None, concurrency=None):
+        """Move many running virtual machines to another z/VM system
+        within the SSI cluster, for example to evacuate this system for
+        maintenance. The eligibility of the vms is tested in parallel, then
+        the eligible vms are moved, by at most
+        CONF.guest.max_concurrent_live_migrate vms to the same destination
+        at the same time.
+
+        :param userid_list: (list) the userids of the vms to be relocated
+        :param dest_zcc_userid: (str) the userid of zcc on destination
+        :param destination: (str) the system ID of the z/VM system to which
+               the vms will be relocated.
+        :param parms: (dict) the options for each relocation, the same as
+               guest_live_migrate.
+        :param concurrency: (int) the maximum number of vms of this request
+               moved at the same time, it can only lower the configured one.
+        :returns: a dict like:
+               {'results': (list) the results in the order of userid_list,
+                           each is a dict with the keys 'userid', 'result'
+                           ('success' or 'failed'), 'errmsg' and 'timings'
+                           (the seconds taken by the steps 'test' and
+                           'move'),
+                'moved': (int) the number of vms moved,
+                'failed': (int) the number of vms not moved,
+                'elapsed': (float) the seconds taken by the request,
+                'throughput': (float) the vms moved per minute}
+        """
+        if not userid_list or not isinstance(userid_list, list):
+            errmsg = ("API guest_live_migrate_bulk: userid_list should be a "
+                      "non-empty list")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        if not dest_zcc_userid or not destination:
+            errmsg = ("API guest_live_migrate_bulk: dest_zcc_userid and "
+                      "destination are required")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        if concurrency is not None and (not isinstance(concurrency, int) or
+                                        concurrency < 1):
+            errmsg = ("API guest_live_migrate_bulk: Invalid concurrency %s, "
+                      "it should be a positive integer" % concurrency)
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        userids = []
+        for userid in userid_list:
+            userid = userid.upper()
+            if userid not in userids:
+                userids.append(userid)
+        self._vmops.check_guests_exist_in_db(userids)
+
+        action = "move guests %s to SSI '%s'" % (', '.join(userids),
+                                                 destination)
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._vmops.live_migrate_bulk(userids, dest_zcc_userid,
+                                                 destination, parms or {},
+                                                 concurrency=concurrency)
+
+    def _check_guest_create_input(self, disk_list, dedicate_vdevs, loaddev):
+        if disk_list:
+
+            # special case for swap disk, for boot from volume, might add swap
+            # disk but not disk pool given, then we use vdisk instead
+            swap_only = False
+            if len(disk_list) == 1:
+                disk = disk_list[0]
+                if 'format' in disk and disk['format'].lower() == 'swap':
+                    swap_only = True
+
+            for disk in disk_list:
+                if not isinstance(disk, dict):
+                    errmsg = ('Invalid "disk_list" input, it should be a '
+                              'dictionary. Details could be found in doc.')
+                    LOG.error(errmsg)
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+                # 'size' is required for each disk
+                if 'size' not in disk.keys():
+                    errmsg = ('Invalid "disk_list" input, "size" is required '
+                              'for each disk.')
+                    LOG.error(errmsg)
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+                # check disk_pool
+                disk_pool = disk.get('disk_pool') or CONF.zvm.disk_pool
+                if not swap_only:
+                    if disk_pool is None:
+                        errmsg = ("Invalid disk_pool input, disk_pool should"
+                                  " be configured for sdkserver.")
+                        LOG.error(errmsg)
+                        raise exception.SDKInvalidInputFormat(msg=errmsg)
+                    # 'disk_pool' format check
+                    if ':' not in disk_pool or (disk_pool.split(':')[0].upper()
+                        not in ['ECKD', 'FBA']):
+                        errmsg = ("Invalid disk_pool input, its format must be"
+                                  " ECKD:eckdpoolname or FBA:fbapoolname")
+                        LOG.error(errmsg)
+                        raise exception.SDKInvalidInputFormat(msg=errmsg)
+                else:
+                    # in this case, it's swap only, and we will check whether
+                    # no VDISK is allowed, if not allow, then return error
+                    if disk_pool is None and CONF.zvm.swap_force_mdisk:
+                        errmsg = ("Invalid disk_pool input, disk_pool should"
+                                  " be configured for sdkserver and use"
+                                  " VDISK as swap disk is not configured."
+                                  " check CONF.zvm.swap_force_mdisk for"
+                                  " additional information.")
+                        LOG.error(errmsg)
+                        raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+                # 'format' value check
+                if ('format' in disk.keys()) and (disk['format'].lower() not in
+                                                  ('ext2', 'ext3', 'ext4',
+                                                  'swap', 'xfs', 'none')):
+                    errmsg = ("Invalid disk_pool input, supported 'format' "
+                              "includes 'ext2', 'ext3', 'ext4', 'xfs', "
+                              "'swap', 'none'")
+                    LOG.error(errmsg)
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+        if dedicate_vdevs and not isinstance(dedicate_vdevs, list):
+            errmsg = ('Invalid "dedicate_vdevs" input, it should be a '
+                              'list. Details could be found in doc.')
+            LOG.error(errmsg)
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+        if loaddev and not isinstance(loaddev, dict):
+            errmsg = ('Invalid "loaddev" input, it should be a '
+                              'dictionary. Details could be found in doc.')
+            LOG.error(errmsg)
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+
     def guest_create(self, userid, vcpus, memory, disk_list=None,
                      user_profile='',
                      max_cpu=CONF.zvm.user_default_max_cpu,
@@ -852,77 +1069,7 @@ class SDKAPI(object):
         dedicate_vdevs = dedicate_vdevs or []
 
         userid = userid.upper()
-        if disk_list:
-
-            # special case for swap disk, for boot from volume, might add swap
-            # disk but not disk pool given, then we use vdisk instead
-            swap_only = False
-            if len(disk_list) == 1:
-                disk = disk_list[0]
-                if 'format' in disk and disk['format'].lower() == 'swap':
-                    swap_only = True
-
-            for disk in disk_list:
-                if not isinstance(disk, dict):
-                    errmsg = ('Invalid "disk_list" input, it should be a '
-                              'dictionary. Details could be found in doc.')
-                    LOG.error(errmsg)
-                    raise exception.SDKInvalidInputFormat(msg=errmsg)
-                # 'size' is required for each disk
-                if 'size' not in disk.keys():
-                    errmsg = ('Invalid "disk_list" input, "size" is required '
-                              'for each disk.')
-                    LOG.error(errmsg)
-                    raise exception.SDKInvalidInputFormat(msg=errmsg)
-
-                # check disk_pool
-                disk_pool = disk.get('disk_pool') or CONF.zvm.disk_pool
-                if not swap_only:
-                    if disk_pool is None:
-                        errmsg = ("Invalid disk_pool input, disk_pool should"
-                                  " be configured for sdkserver.")
-                        LOG.error(errmsg)
-                        raise exception.SDKInvalidInputFormat(msg=errmsg)
-                    # 'disk_pool' format check
-                    if ':' not in disk_pool or (disk_pool.split(':')[0].upper()
-                        not in ['ECKD', 'FBA']):
-                        errmsg = ("Invalid disk_pool input, its format must be"
-                                  " ECKD:eckdpoolname or FBA:fbapoolname")
-                        LOG.error(errmsg)
-                        raise exception.SDKInvalidInputFormat(msg=errmsg)
-                else:
-                    # in this case, it's swap only, and we will check whether
-                    # no VDISK is allowed, if not allow, then return error
-                    if disk_pool is None and CONF.zvm.swap_force_mdisk:
-                        errmsg = ("Invalid disk_pool input, disk_pool should"
-                                  " be configured for sdkserver and use"
-                                  " VDISK as swap disk is not configured."
-                                  " check CONF.zvm.swap_force_mdisk for"
-                                  " additional information.")
-                        LOG.error(errmsg)
-                        raise exception.SDKInvalidInputFormat(msg=errmsg)
-
-                # 'format' value check
-                if ('format' in disk.keys()) and (disk['format'].lower() not in
-                                                  ('ext2', 'ext3', 'ext4',
-                                                  'swap', 'xfs', 'none')):
-                    errmsg = ("Invalid disk_pool input, supported 'format' "
-                              "includes 'ext2', 'ext3', 'ext4', 'xfs', "
-                              "'swap', 'none'")
-                    LOG.error(errmsg)
-                    raise exception.SDKInvalidInputFormat(msg=errmsg)
-
-        if dedicate_vdevs and not isinstance(dedicate_vdevs, list):
-            errmsg = ('Invalid "dedicate_vdevs" input, it should be a '
-                              'list. Details could be found in doc.')
-            LOG.error(errmsg)
-            raise exception.SDKInvalidInputFormat(msg=errmsg)
-
-        if loaddev and not isinstance(loaddev, dict):
-            errmsg = ('Invalid "loaddev" input, it should be a '
-                              'dictionary. Details could be found in doc.')
-            LOG.error(errmsg)
-            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        self._check_guest_create_input(disk_list, dedicate_vdevs, loaddev)
 
         if not user_profile or len(user_profile) == 0:
             user_profile = CONF.zvm.user_profile
@@ -935,6 +1082,85 @@ class SDKAPI(object):
                                          dedicate_vdevs, loaddev, account,
                                          comment_list)
 
+    def guest_create_bulk(self, guests):
+        """Create many vms in z/VM. The user directories and the disks of
+        the vms are created in parallel, by at most
+        CONF.guest.max_concurrent_guest_create vms at the same time, and the
+        vms are added to database in one transaction.
+
+        :param list guests: a list of dicts, each has the keys 'userid',
+               'vcpus' and 'memory', and optionally the other parameters of
+               guest_create as the keys, in the same format as guest_create,
+               a userid can only occur once in the list.
+        :returns: a list of the results in the order of guests, each is a
+               dict like:
+               {'userid': (str) the guest,
+                'result': (str) 'success' or 'failed',
+                'errmsg': (str) the error message if failed,
+                'disk_list': (list) the disks of the guest, the same as the
+                             output of guest_create,
+                'timings': (dict) the seconds taken by the steps
+                           'directory', 'database', 'disks' and 'namelist'}
+        """
+        if not guests:
+            errmsg = ("API guest_create_bulk: "
+                      "guests is required but not provided")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        known_keys = set(('userid', 'vcpus', 'memory', 'disk_list',
+                          'user_profile', 'max_cpu', 'max_mem', 'ipl_from',
+                          'ipl_param', 'ipl_loadparam', 'dedicate_vdevs',
+                          'loaddev', 'account', 'comment_list'))
+        to_create = []
+        for guest in guests:
+            if not isinstance(guest, dict):
+                errmsg = ("API guest_create_bulk: each guest should be a "
+                          "dictionary")
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            missing = [key for key in ('userid', 'vcpus', 'memory')
+                       if not guest.get(key)]
+            if missing:
+                errmsg = ("API guest_create_bulk: %s is required in each "
+                          "guest" % ', '.join(missing))
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            unknown = set(guest) - known_keys
+            if unknown:
+                errmsg = ("API guest_create_bulk: unknown keys %s of guest "
+                          "%s" % (', '.join(sorted(unknown)), guest['userid']))
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            userid = guest['userid'].upper()
+            if userid in [spec['userid'] for spec in to_create]:
+                errmsg = ("API guest_create_bulk: guest %s occurs more "
+                          "than once" % userid)
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            disk_list = guest.get('disk_list') or []
+            dedicate_vdevs = guest.get('dedicate_vdevs') or []
+            loaddev = guest.get('loaddev') or {}
+            self._check_guest_create_input(disk_list, dedicate_vdevs,
+                                           loaddev)
+            to_create.append({
+                'userid': userid,
+                'cpu': guest['vcpus'],
+                'memory': guest['memory'],
+                'disk_list': disk_list,
+                'profile': (guest.get('user_profile') or
+                            CONF.zvm.user_profile),
+                'max_cpu': guest.get('max_cpu',
+                                     CONF.zvm.user_default_max_cpu),
+                'max_mem': guest.get('max_mem',
+                                     CONF.zvm.user_default_max_memory),
+                'ipl_from': guest.get('ipl_from', ''),
+                'ipl_param': guest.get('ipl_param', ''),
+                'ipl_loadparam': guest.get('ipl_loadparam', ''),
+                'dedicate_vdevs': dedicate_vdevs,
+                'loaddev': loaddev,
+                'account': guest.get('account', ''),
+                'comment_list': guest.get('comment_list')})
+
+        action = "create guests %s" % ', '.join(spec['userid']
+                                                 for spec in to_create)
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._vmops.create_vm_bulk(to_create)
+
     @check_guest_exist()
     def guest_live_resize_cpus(self, userid, cpu_cnt):
         """Live resize virtual cpus of guests.
@@ -952,6 +1178,84 @@ class SDKAPI(object):
             self._vmops.live_resize_cpus(userid, cpu_cnt)
         LOG.info("%s successfully." % action)
 
+    def _check_live_resize_input(self, api_name, cpu_cnt, memory):
+        if cpu_cnt is None and memory is None:
+            errmsg = ("API %s: cpu_cnt or memory is required but neither is "
+                      "provided" % api_name)
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        if cpu_cnt is not None and (not isinstance(cpu_cnt, int) or
+                                    not 1 <= cpu_cnt <= 64):
+            errmsg = ("API %s: Invalid cpu_cnt %s, it should be an integer "
+                      "between 1 and 64" % (api_name, cpu_cnt))
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+    @check_guest_exist()
+    def guest_live_resize(self, userid, cpu_cnt=None, memory=None):
+        """Live resize virtual cpus and memory of guests together. The
+        user directory is read and updated once for both, and the active
+        state is read once.
+
+        :param userid: (str) the userid of the guest to be live resized
+        :param cpu_cnt: (int) The number of virtual cpus that the guest
+               should have in active state after live resize, in the same
+               format as guest_live_resize_cpus.
+        :param memory: (str) The memory size that the guest should have
+               in available status after live resize, in the same format as
+               the size of guest_live_resize_mem.
+        :returns: a dict of the seconds taken by each step of the resize,
+               the steps are 'read_directory', 'read_active',
+               'update_directory', 'define_cpus', 'online_cpus',
+               'define_memory', 'online_memory' and 'total', the steps not
+               needed are not included.
+        """
+        self._check_live_resize_input('guest_live_resize', cpu_cnt, memory)
+        action = "live resize guest '%s'" % userid
+        LOG.info("Begin to %s" % action)
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            timings = self._vmops.live_resize(userid, cpu_cnt=cpu_cnt,
+                                              memory=memory)
+        LOG.info("%s successfully." % action)
+        return timings
+
+    def guest_live_resize_bulk(self, resizes):
+        """Live resize virtual cpus and memory of many guests, the guests
+        are handled in parallel.
+
+        :param list resizes: a list of dicts, each has the keys 'userid',
+               and 'cpu_cnt' and 'memory' in the format of
+               guest_live_resize, a guest can only occur once in the list.
+        :returns: a list of the results in the order of resizes, each is a
+               dict like:
+               {'userid': (str) the guest,
+                'result': (str) 'success' or 'failed',
+                'errmsg': (str) the error message if failed,
+                'timings': (dict) the seconds taken by each step}
+        """
+        if not resizes:
+            errmsg = ("API guest_live_resize_bulk: "
+                      "resizes is required but not provided")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        userids = []
+        for resize in resizes:
+            if not resize.get('userid'):
+                errmsg = ("API guest_live_resize_bulk: userid is required "
+                          "in each resize")
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            resize['userid'] = resize['userid'].upper()
+            if resize['userid'] in userids:
+                errmsg = ("API guest_live_resize_bulk: guest %s occurs more "
+                          "than once" % resize['userid'])
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            userids.append(resize['userid'])
+            self._check_live_resize_input('guest_live_resize_bulk',
+                                          resize.get('cpu_cnt'),
+                                          resize.get('memory'))
+        self._vmops.check_guests_exist_in_db(userids)
+
+        action = "live resize guests %s" % ', '.join(userids)
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._vmops.live_resize_bulk(resizes)
+
     @check_guest_exist()
     def guest_resize_cpus(self, userid, cpu_cnt):
         """Resize virtual cpus of guests.
@@ -1230,6 +1534,91 @@ class SDKAPI(object):
 
         return output
 
+    @check_guest_exist()
+    def guest_get_console_output_bulk(self, userid_list, cursors=None):
+        """Get the console output of the guests, only the output after the
+        cursor of each guest is returned. The consoles are transferred in
+        parallel.
+
+        :param list userid_list: the user ids of the guests
+        :param dict cursors: userid -> the cursor returned by the previous
+               call for the guest, the last console_log_size kilobytes of
+               the console log are returned for a guest without cursor
+        :returns: a dict of userid -> a dict like:
+               {'output': (str) the console log after the cursor,
+                'cursor': (int) the cursor to pass in the next call,
+                'skipped': (int) the bytes after the cursor not returned as
+                           they are more than console_log_size kilobytes,
+                'errmsg': (str) the error message if the new console output
+                          failed to be got, the output is what was got
+                          before}
+        """
+        if not userid_list:
+            errmsg = ("API guest_get_console_output_bulk: "
+                      "userid_list is required but not provided")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        upper_cursors = {}
+        for userid, cursor in (cursors or {}).items():
+            if (not isinstance(cursor, six.integer_types) or
+                    cursor < 0):
+                errmsg = ("API guest_get_console_output_bulk: Invalid cursor "
+                          "%s of guest %s, it should be a non-negative "
+                          "integer" % (cursor, userid))
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            upper_cursors[userid.upper()] = cursor
+
+        action = "get the console output of guests %s" % ', '.join(userid_list)
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._vmops.get_console_output_bulk(userid_list,
+                                                       upper_cursors)
+
+    @check_guest_exist()
+    def guest_execute_cmd_bulk(self, userid_list, cmd, concurrency=None,
+                               timeout=None):
+        """Execute a command in the operating system of the guests through
+        IUCV, the guests are handled in parallel.
+
+        :param list userid_list: the user ids of the guests
+        :param str cmd: the command to execute
+        :param int concurrency: the max number of guests handled at a time,
+               it is limited by the max_worker_count option of the
+               sdkserver section, which is also the default value
+        :param int timeout: the seconds to wait for the command on each
+               guest, the iucv_command_timeout option of the guest section
+               is used if it is not specified, 0 means no limit
+        :returns: a list of the results in the order of userid_list, each
+               is a dict like:
+               {'userid': (str) the user id of the guest,
+                'overallRC': (int) 0 if the command succeeded,
+                'rc': (int) the return code,
+                'rs': (int) the reason code,
+                'output': (list) the output lines of the command,
+                'errmsg': (str) the error message if it failed,
+                'duration': (float) the seconds taken on the guest}
+        """
+        if not userid_list:
+            errmsg = ("API guest_execute_cmd_bulk: "
+                      "userid_list is required but not provided")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        if not cmd:
+            errmsg = ("API guest_execute_cmd_bulk: "
+                      "cmd is required but not provided")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        if concurrency is not None and concurrency < 1:
+            errmsg = ("API guest_execute_cmd_bulk: Invalid concurrency %s, "
+                      "it should be a positive integer" % concurrency)
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        if timeout is not None and timeout < 0:
+            errmsg = ("API guest_execute_cmd_bulk: Invalid timeout %s, "
+                      "it should not be negative" % timeout)
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+        action = "execute command on guests %s" % ', '.join(userid_list)
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._vmops.execute_cmd_bulk(userid_list, cmd,
+                                                concurrency=concurrency,
+                                                timeout=timeout)
+
     def guest_delete(self, userid):
         """Delete guest.
 
@@ -1252,11 +1641,50 @@ class SDKAPI(object):
         with zvmutils.log_and_reraise_sdkbase_error(action):
             return self._vmops.delete_vm(userid)
 
+    def guest_delete_bulk(self, userid_list):
+        """Delete many guests. The guests logged on are forced off all
+        together, the user directories are deleted by at most
+        CONF.guest.max_concurrent_guest_delete guests at the same time, and
+        the database records of the guests are removed in one transaction.
+
+        :param userid_list: a list of the user ids of the vms
+        :returns: a list of the results in the order of userid_list, each
+               is a dict like:
+               {'userid': (str) the guest,
+                'result': (str) 'success' or 'failed',
+                'errmsg': (str) the error message if failed,
+                'timings': (dict) the seconds taken by the steps 'logoff',
+                           'directory', 'revoke' and 'database'}
+               A guest which does not exist is reported as success with
+               no timings, the same as guest_delete.
+        """
+        if not userid_list or not isinstance(userid_list, list):
+            errmsg = ("API guest_delete_bulk: userid_list should be a "
+                      "non-empty list")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        userids = []
+        for userid in userid_list:
+            userid = userid.upper()
+            if userid not in userids:
+                userids.append(userid)
+
+        action = "delete guests %s" % ', '.join(userids)
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._vmops.delete_vm_bulk(userids)
+
     @check_guest_exist()
-    def guest_inspect_stats(self, userid_list):
+    def guest_inspect_stats(self, userid_list, limit=None, marker=None,
+                            fields=None):
         """Get the statistics including cpu and mem of the guests
 
         :param userid_list: a single userid string or a list of guest userids
+        :param int limit: the max number of guests to inspect, the guests
+               are sorted by userid when it is specified
+        :param str marker: only the guests whose userid sorts after this
+               userid are inspected
+        :param list fields: the names of the statistics to return for each
+               guest, all the statistics are returned when it is not
+               specified
         :returns: dictionary describing the cpu statistics of the vm
                   in the form {'UID1':
                   {
@@ -1290,11 +1718,21 @@ class SDKAPI(object):
                   for the guests that are shutdown or not exist, no data
                   returned in the dictionary
         """
+        self._check_paging_input(limit, fields)
         if not isinstance(userid_list, list):
             userid_list = [userid_list]
+        if limit is not None or marker is not None:
+            if marker is not None:
+                marker = marker.upper()
+            userid_list = zvmutils.paginate(userid_list, limit=limit,
+                                            marker=marker)
         action = "get the statistics of guest '%s'" % str(userid_list)
         with zvmutils.log_and_reraise_sdkbase_error(action):
-            return self._monitor.inspect_stats(userid_list)
+            stats = self._monitor.inspect_stats(userid_list)
+        if fields is None:
+            return stats
+        return dict((userid, zvmutils.select_fields(data, fields))
+                    for userid, data in stats.items())
 
     @check_guest_exist()
     def guest_inspect_vnics(self, userid_list):
@@ -1585,11 +2023,15 @@ class SDKAPI(object):
         """
         return self._volumeop.get_volume_connector(userid, reserve)
 
-    def get_all_fcp_usage(self, userid=None):
+    def get_all_fcp_usage(self, userid=None, limit=None, marker=None):
         """API for getting all the FCP usage for specified userid.
 
         :param str userid: the user id of the guest. if userid is None,
                            will return all the fcp usage in database.
+        :param int limit: the max number of FCPs to return, the FCPs are
+                          sorted by FCP ID when it is specified
+        :param str marker: only the FCPs whose ID sorts after this FCP ID
+                           are returned
 
         :returns: dict describing reserved,connections values of the FCP
                   in database. For example:
@@ -1602,7 +2044,14 @@ class SDKAPI(object):
                   the keys are the fcp IDs, the value is a list contains
                   [userid, reserved, connections] values.
         """
-        return self._volumeop.get_all_fcp_usage(userid)
+        self._check_paging_input(limit)
+        usage = self._volumeop.get_all_fcp_usage(userid)
+        if limit is None and marker is None:
+            return usage
+        if marker is not None:
+            marker = marker.lower()
+        fcps = zvmutils.paginate(usage.keys(), limit=limit, marker=marker)
+        return dict((fcp, usage[fcp]) for fcp in fcps)
 
     @check_fcp_exist()
     def get_fcp_usage(self, fcp):
@@ -1719,6 +2168,91 @@ class SDKAPI(object):
         """
         self._volumeop.detach_volume_from_instance(connection_info)
 
+    def volume_attach_bulk(self, connection_infos):
+        """ Attach volumes to guests. The volumes are grouped by guest, the
+            FCP devices needed by the volumes of one guest are dedicated
+            once and the volumes are configured in the guest by one punched
+            script, the guests are handled in parallel.
+
+        :param list connection_infos: a list of connection_info, each is
+               in the format of the connection_info of volume_attach.
+        :returns: a list of the results in the order of connection_infos,
+               each is a dict like:
+               {'assigner_id': (str) the guest of the volume,
+                'target_lun': (str) the LUN of the volume,
+                'mount_point': (str) the mount point of the volume,
+                'result': (str) 'success' or 'failed',
+                'errmsg': (str) the error message if failed}
+        """
+        return self._volumeop.attach_volumes_to_instances(connection_infos)
+
+    def volume_detach_bulk(self, connection_infos):
+        """ Detach volumes from guests. The volumes are grouped by guest,
+            the volumes of one guest are deconfigured in the guest by one
+            punched script and the FCP devices not used any more are
+            undedicated once, the guests are handled in parallel.
+
+        :param list connection_infos: a list of connection_info, each is
+               in the format of the connection_info of volume_detach.
+        :returns: a list of the results in the same format as
+               volume_attach_bulk.
+        """
+        return self._volumeop.detach_volumes_from_instances(connection_infos)
+
+    def _check_guest_networks(self, guest_networks):
+        if len(guest_networks) == 0:
+            errmsg = ("API guest_create_network_interface: "
+                      "Network information is required but not provided")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+        for network in guest_networks:
+            if (('mac_addr' in network.keys()) and
+                (network['mac_addr'] is not None)):
+                if not zvmutils.valid_mac_addr(network['mac_addr']):
+                    errmsg = ("API guest_create_network_interface: "
+                              "Invalid mac address, format should be "
+                              "xx:xx:xx:xx:xx:xx, and x is a hexadecimal "
+                              "digit")
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+            if (('ip_addr' in network.keys()) and
+                (network['ip_addr'] is not None)):
+                if not netaddr.valid_ipv4(network['ip_addr']):
+                    errmsg = ("API guest_create_network_interface: "
+                              "Invalid management IP address, it should be "
+                              "the value between 0.0.0.0 and 255.255.255.255")
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+            if (('dns_addr' in network.keys()) and
+                (network['dns_addr'] is not None)):
+                if not isinstance(network['dns_addr'], list):
+                    raise exception.SDKInvalidInputTypes(
+                        'guest_config_network',
+                        str(list), str(type(network['dns_addr'])))
+                for dns in network['dns_addr']:
+                    if not netaddr.valid_ipv4(dns):
+                        errmsg = ("API guest_create_network_interface: "
+                                  "Invalid dns IP address, it should be the "
+                                  "value between 0.0.0.0 and 255.255.255.255")
+                        raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+            if (('gateway_addr' in network.keys()) and
+                (network['gateway_addr'] is not None)):
+                if not netaddr.valid_ipv4(
+                                    network['gateway_addr']):
+                    errmsg = ("API guest_create_network_interface: "
+                              "Invalid gateway IP address, it should be "
+                              "the value between 0.0.0.0 and 255.255.255.255")
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+            if (('cidr' in network.keys()) and
+                (network['cidr'] is not None)):
+                if not zvmutils.valid_cidr(network['cidr']):
+                    errmsg = ("API guest_create_network_interface: "
+                              "Invalid CIDR, format should be a.b.c.d/n, and "
+                              "a.b.c.d is IP address, n is the value "
+                              "between 0-32")
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+
     @check_guest_exist()
     def guest_create_network_interface(self, userid, os_version,
                                        guest_networks, active=False):
@@ -1762,68 +2296,18 @@ class SDKAPI(object):
         :returns: guest_networks list, including nic_vdev for each network
         :rtype: list
         """
-        if len(guest_networks) == 0:
-            errmsg = ("API guest_create_network_interface: "
-                      "Network information is required but not provided")
-            raise exception.SDKInvalidInputFormat(msg=errmsg)
+        self._check_guest_networks(guest_networks)
 
         for network in guest_networks:
-            vdev = nic_id = mac_addr = ip_addr = OSA = None
+            vdev = nic_id = mac_addr = OSA = None
             if 'nic_vdev' in network.keys():
                 vdev = network['nic_vdev']
             if 'osa_device' in network.keys():
                 OSA = network['osa_device']
             if 'nic_id' in network.keys():
                 nic_id = network['nic_id']
-
-            if (('mac_addr' in network.keys()) and
-                (network['mac_addr'] is not None)):
+            if 'mac_addr' in network.keys():
                 mac_addr = network['mac_addr']
-                if not zvmutils.valid_mac_addr(mac_addr):
-                    errmsg = ("API guest_create_network_interface: "
-                              "Invalid mac address, format should be "
-                              "xx:xx:xx:xx:xx:xx, and x is a hexadecimal "
-                              "digit")
-                    raise exception.SDKInvalidInputFormat(msg=errmsg)
-
-            if (('ip_addr' in network.keys()) and
-                (network['ip_addr'] is not None)):
-                ip_addr = network['ip_addr']
-                if not netaddr.valid_ipv4(ip_addr):
-                    errmsg = ("API guest_create_network_interface: "
-                              "Invalid management IP address, it should be "
-                              "the value between 0.0.0.0 and 255.255.255.255")
-                    raise exception.SDKInvalidInputFormat(msg=errmsg)
-
-            if (('dns_addr' in network.keys()) and
-                (network['dns_addr'] is not None)):
-                if not isinstance(network['dns_addr'], list):
-                    raise exception.SDKInvalidInputTypes(
-                        'guest_config_network',
-                        str(list), str(type(network['dns_addr'])))
-                for dns in network['dns_addr']:
-                    if not netaddr.valid_ipv4(dns):
-                        errmsg = ("API guest_create_network_interface: "
-                                  "Invalid dns IP address, it should be the "
-                                  "value between 0.0.0.0 and 255.255.255.255")
-                        raise exception.SDKInvalidInputFormat(msg=errmsg)
-
-            if (('gateway_addr' in network.keys()) and
-                (network['gateway_addr'] is not None)):
-                if not netaddr.valid_ipv4(
-                                    network['gateway_addr']):
-                    errmsg = ("API guest_create_network_interface: "
-                              "Invalid gateway IP address, it should be "
-                              "the value between 0.0.0.0 and 255.255.255.255")
-                    raise exception.SDKInvalidInputFormat(msg=errmsg)
-            if (('cidr' in network.keys()) and
-                (network['cidr'] is not None)):
-                if not zvmutils.valid_cidr(network['cidr']):
-                    errmsg = ("API guest_create_network_interface: "
-                              "Invalid CIDR, format should be a.b.c.d/n, and "
-                              "a.b.c.d is IP address, n is the value "
-                              "between 0-32")
-                    raise exception.SDKInvalidInputFormat(msg=errmsg)
 
             try:
                 if OSA is None:
@@ -1850,7 +2334,93 @@ class SDKAPI(object):
             raise
         return guest_networks
 
-    def guests_get_nic_info(self, userid=None, nic_id=None, vswitch=None):
+    def guest_create_network_interface_bulk(self, interfaces, active=False):
+        """ Create network interface(s) for many guests. The vswitch
+            grants and VLAN IDs needed by the guests are set per vswitch
+            first, then the nics of the guests are created, coupled to the
+            vswitches and their network configuration punched in parallel.
+
+        :param list interfaces: a list of dicts, one for each guest:
+               {'userid': (str) the user id of the guest,
+               'os_version': (str) operating system version of the guest,
+               'guest_networks': (list) the network info for the guest, in
+               the format of guest_networks of
+               guest_create_network_interface, each network can also have
+               the below keys:
+               'vswitch_name': (str) Optional. The vswitch to grant the
+               guest to and couple the nic to,
+               'vlan_id': (int) Optional. The VLAN ID of the nic on the
+               vswitch.}
+               A guest can only occur once in interfaces.
+        :param bool active: whether add the nics on active guest systems
+        :returns: a list of the results in the order of interfaces, each is
+               a dict like:
+               {'userid': (str) the user id of the guest,
+               'guest_networks': (list) guest_networks including nic_vdev
+               for each network,
+               'result': (str) 'success' or 'failed',
+               'errmsg': (str) the error message if failed}
+        :rtype: list
+        """
+        if len(interfaces) == 0:
+            errmsg = ("API guest_create_network_interface_bulk: "
+                      "Network interfaces are required but not provided")
+            raise exception.SDKInvalidInputFormat(msg=errmsg)
+
+        # work on copies, the userids are upper cased and the nic_vdev of
+        # the networks are filled in
+        interfaces = copy.deepcopy(interfaces)
+        errors = []
+        seen = set()
+        for interface in interfaces:
+            interface['userid'] = interface['userid'].upper()
+            errmsg = None
+            try:
+                if interface['userid'] in seen:
+                    errmsg = ("API guest_create_network_interface_bulk: "
+                              "Guest %s occurs more than once" %
+                              interface['userid'])
+                    raise exception.SDKInvalidInputFormat(msg=errmsg)
+                seen.add(interface['userid'])
+                self._check_guest_networks(interface['guest_networks'])
+            except exception.SDKBaseException as err:
+                errmsg = err.format_message()
+            errors.append(errmsg)
+
+        userids = [interface['userid'] for interface, errmsg
+                   in zip(interfaces, errors) if errmsg is None]
+        if userids:
+            try:
+                self._vmops.check_guests_exist_in_db(userids)
+            except exception.SDKBaseException:
+                # check the guests one by one to find out the failed ones
+                for i, interface in enumerate(interfaces):
+                    if errors[i] is not None:
+                        continue
+                    try:
+                        self._vmops.check_guests_exist_in_db(
+                            interface['userid'])
+                    except exception.SDKBaseException as err:
+                        errors[i] = err.format_message()
+
+        valid = [interface for interface, errmsg in zip(interfaces, errors)
+                 if errmsg is None]
+        results = iter(self._networkops.create_network_interfaces(
+            valid, active=active))
+        bulk_results = []
+        for interface, errmsg in zip(interfaces, errors):
+            if errmsg is None:
+                bulk_results.append(next(results))
+            else:
+                bulk_results.append({
+                    'userid': interface['userid'],
+                    'guest_networks': interface['guest_networks'],
+                    'result': 'failed',
+                    'errmsg': errmsg})
+        return bulk_results
+
+    def guests_get_nic_info(self, userid=None, nic_id=None, vswitch=None,
+                            limit=None, marker=None, fields=None):
         """ Retrieve nic information in the network database according to
             the requirements, the nic information will include the guest
             name, nic device number, vswitch name that the nic is coupled
@@ -1859,6 +2429,12 @@ class SDKAPI(object):
         :param str userid: the user id of the vm
         :param str nic_id: nic identifier
         :param str vswitch: the name of the vswitch
+        :param int limit: the max number of nics to return, the nics are
+               sorted by user id and nic device number when it is specified
+        :param str marker: 'userid:vdev' of the last nic of the previous
+               page, only the nics sorted after it are returned
+        :param list fields: the names of the fields to return for each nic,
+               all the fields are returned when it is not specified
 
         :returns: list describing nic information, format is
                   [
@@ -1871,10 +2447,24 @@ class SDKAPI(object):
                   ]
         :rtype: list
         """
+        self._check_paging_input(limit, fields)
+        if marker is not None:
+            parts = tuple(marker.split(':'))
+            if len(parts) != 2 or not all(parts):
+                errmsg = ("Invalid marker input %s, marker should be in the "
+                          "format of 'userid:vdev'." % marker)
+                LOG.error(errmsg)
+                raise exception.SDKInvalidInputFormat(msg=errmsg)
+            marker = (parts[0].upper(), parts[1])
+
         action = "get nic information"
         with zvmutils.log_and_reraise_sdkbase_error(action):
-            return self._networkops.get_nic_info(userid=userid, nic_id=nic_id,
-                                                 vswitch=vswitch)
+            nics = self._networkops.get_nic_info(userid=userid, nic_id=nic_id,
+                                                 vswitch=vswitch, limit=limit,
+                                                 marker=marker)
+        if fields is None:
+            return nics
+        return [zvmutils.select_fields(nic, fields) for nic in nics]
 
     def vswitch_query(self, vswitch_name):
         """Check the virtual switch status
@@ -1887,6 +2477,38 @@ class SDKAPI(object):
         with zvmutils.log_and_reraise_sdkbase_error(action):
             return self._networkops.vswitch_query(vswitch_name)
 
+    def vswitch_cache_refresh(self, vswitch_names=None):
+        """Reload the cached vswitch list, OSA devices and vswitch details
+           of the host, the vswitches are queried in parallel.
+
+        :param list vswitch_names: the names of the vswitches to load, all
+               the vswitches of the host are loaded if it is None
+        :returns: Dictionary of the vswitches failed to load and the error
+                  messages
+        :rtype: dict
+        """
+        action = "refresh virtual switch cache"
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            return self._networkops.refresh_vswitch_cache(
+                vswitch_names=vswitch_names)
+
+    def vswitch_cache_stats(self):
+        """Get the statistics of the vswitch cache
+
+        :returns: Dictionary like:
+                  {'interval': (int) the cache expiration interval,
+                  'vswitch_list_age': (int) age in seconds of the cached
+                  vswitch list, None if not cached,
+                  'osa_age': (int) age in seconds of the cached OSA devices,
+                  None if not cached,
+                  'vswitches': (dict) the cached vswitches and their ages,
+                  'hits': (int) number of the cache hits,
+                  'misses': (int) number of the cache misses,
+                  'invalidations': (int) number of the invalidated entries}
+        :rtype: dict
+        """
+        return self._networkops.get_vswitch_cache_stats()
+
     @check_guest_exist()
     def guest_delete_network_interface(self, userid, os_version,
                                        vdev, active=False):
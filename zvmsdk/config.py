@@ -141,6 +141,46 @@ new guest. A dollar sign ($) is not allowed in the name.
 Sample disk_pool values:
     ECKD:diskpo1
     FBA:testpool
+    '''),
+    Opt('inventory_refresh_interval',
+        section='zvm',
+        default=300,
+        opt_type='int',
+        help='''
+Guest inventory refresh interval in seconds.
+
+SDK keeps an index of all the guests defined in the directory of the z/VM
+host together with whether they are created by SDK or migrated to another
+host, so that listing the guests on the host does not need to query the
+directory manager for each call. The index is refreshed in background at this
+interval, and immediately after SDK creates or deletes a guest.
+When this value is below or equal to zero, the index is refreshed for each
+guest list call.
+    '''),
+    Opt('host_static_info_interval',
+        section='zvm',
+        default=3600,
+        opt_type='int',
+        help='''
+Cached static host information expiration interval in seconds.
+
+The host name, CP level, IPL time, LPAR CPU and memory totals and other
+information of the z/VM host which only changes when the host is
+reconfigured or IPLed are cached, so that getting the host information or
+the host name for a volume connector does not query the host each time.
+Set it to 0 to disable the cache.
+    '''),
+    Opt('host_dynamic_info_interval',
+        section='zvm',
+        default=30,
+        opt_type='int',
+        help='''
+Cached host usage information expiration interval in seconds.
+
+The CPU and memory in use of the z/VM host and the space of the disk pool
+are cached separately from the static host information, and are queried
+again when they are older than this interval. Set it to 0 to disable the
+cache.
     '''),
     Opt('user_profile',
         section='zvm',
@@ -258,6 +298,20 @@ netboot directory accordingly. Two kinds of image repository looks like:
 /var/lib/zvmsdk/images/netboot/<image_osversion>/<imagename>
 /var/lib/zvmsdk/images/staging/<image_osversion>/<imagename>
     '''),
+    Opt('catalog_refresh_interval',
+        section='image',
+        default=300,
+        opt_type='int',
+        help='''
+Cached image catalog refresh interval in seconds.
+
+The image records in image database, together with the repository path, the
+root disk size and the last access time of each image, are kept in an
+in-memory catalog so that image queries and deploys do not need to query the
+database and stat the image files every time. The catalog is rebuilt when an
+image is imported, captured or deleted through SDK, when the netboot
+repository directories are changed, or when it is older than this interval.
+'''),
     # file options
     Opt('file_repository',
         section='file',
@@ -279,6 +333,19 @@ IP address of the Linux machine which is running SDK on.
 Some remote copy operations need to be performed during guest creation,
 this option tell the SDK the host ip which can be used to perform copy
 from and copy to operations.
+    '''),
+    Opt('vswitch_cache_interval',
+        section='network',
+        default=60,
+        opt_type='int',
+        help='''
+Cached vswitch and OSA state expiration interval in seconds.
+
+The vswitch list, the details of each vswitch and the OSA devices of the
+host queried by SDK are cached. The cached state of a vswitch or of the OSA
+devices is dropped whenever SDK changes it, this interval only limits how
+long a change made outside of SDK may be invisible. Set it to 0 to disable
+the cache.
     '''),
     # guest options
     Opt('console_log_size',
@@ -323,6 +390,113 @@ The interval time between 2 retries, in seconds.
 This will take effect only when you set softstop_retries item.
 What's more, the value of softstop_timeout/softstop_interval is
 the times retried.
+    '''),
+    Opt('state_poll_interval',
+        section='guest',
+        default=5,
+        opt_type='int',
+        help='''
+The interval in seconds to poll the state of the guests being waited for.
+
+Waiting for guests to be started, reachable or stopped is served by one
+watcher thread, which polls the power state of all the waited guests with one
+query in each interval, and only checks the reachable state of the logged on
+guests through IUCV.
+    '''),
+    Opt('iucv_command_timeout',
+        section='guest',
+        default=0,
+        opt_type='int',
+        help='''
+Timeout in seconds of a command sent to a guest through IUCV.
+
+Commands sent to the same guest through IUCV are run one after another, so a
+hanging command also holds back the later ones for that guest. When this value
+is above zero, a command which does not finish in time is stopped and fails.
+Zero means no limit.
+    '''),
+    Opt('iucv_reachable_interval',
+        section='guest',
+        default=10,
+        opt_type='int',
+        help='''
+Interval in seconds to trust a recent IUCV reply of a guest.
+
+A guest which answered a command sent through IUCV within this interval is
+reported reachable without sending another command. Powering off, restarting
+or deleting the guest through SDK drops this state at once. Waiting for a guest
+to be up or down always sends commands. Set it to 0 to send a command for each
+reachable check.
+    '''),
+    Opt('max_concurrent_disk_format',
+        section='guest',
+        default=4,
+        opt_type='int',
+        help='''
+The maximum number of minidisks formatted concurrently for one guest.
+
+When several minidisks are added to a guest which is not logged on, the
+directory updates are done one by one, then the filesystems of the new
+minidisks are created in parallel by at most this number of threads.
+    '''),
+    Opt('max_concurrent_guest_create',
+        section='guest',
+        default=8,
+        opt_type='int',
+        help='''
+The maximum number of guests created concurrently by one bulk create.
+
+Each guest created sends its user directory and minidisk updates to the
+directory manager. This value limits how many of those requests a bulk create
+has in flight at the same time, so that a large bulk create does not flood
+the directory manager.
+    '''),
+    Opt('max_concurrent_guest_delete',
+        section='guest',
+        default=8,
+        opt_type='int',
+        help='''
+The maximum number of user directories deleted concurrently by one bulk delete.
+
+The guests of a bulk delete are forced off all together, but their user
+directories are deleted by at most this number of requests to the directory
+manager at the same time.
+    '''),
+    Opt('max_concurrent_live_migrate',
+        section='guest',
+        default=4,
+        opt_type='int',
+        help='''
+The maximum number of guests relocated concurrently to the same destination.
+
+The relocations of all the bulk live migrations to the same z/VM system of
+the SSI cluster share this limit, each relocation holds the channel-to-channel
+connections between the two systems for its whole duration.
+    '''),
+    Opt('live_migrate_status_interval',
+        section='guest',
+        default=30,
+        opt_type='int',
+        help='''
+Interval in seconds to log the progress of a bulk live migration.
+
+While the relocations of a bulk live migration are running, the status of the
+outgoing relocations of this system is queried and logged at this interval.
+A value of 0 or less disables the progress logging.
+    '''),
+    Opt('user_direct_cache_interval',
+        section='guest',
+        default=60,
+        opt_type='int',
+        help='''
+Cached user directory entry expiration interval in seconds.
+
+The directory entry of a guest read by SDK is cached so that one API call
+which needs the CPU, storage, NIC or minidisk definitions of a guest several
+times only queries the directory manager once. The cached entry of a guest is
+dropped whenever SDK changes the directory of that guest, this interval only
+limits how long a change made outside of SDK may be invisible. Set it to 0 to
+disable the cache.
     '''),
     # monitor options
     Opt('cache_interval',
@@ -390,6 +564,25 @@ file path that contains admin-token to access sdk http server.
 
 Admin-token in order to get a user-token from zvm sdk, and the user-token
 will be used to validate request before user-token expire.
+'''
+        ),
+    Opt('connection_type',
+        section='wsgi',
+        default='socket',
+        opt_type='str',
+        help='''
+How the REST API calls the SDK API.
+
+'socket' sends each call to the SDK server daemon through the socket
+configured by bind_addr and bind_port in the sdkserver section.
+'inprocess' calls the SDK API directly in the process of the REST API,
+which saves the JSON encoding and the socket round trip of each call. The
+calls are limited by max_worker_count in the sdkserver section in the same
+way as the SDK server workers. The SDK server daemon is not needed in this
+case, and the REST API must run on the host of the SDK server.
+
+Possible values:
+    'socket', 'inprocess'
 '''
         ),
     Opt('max_concurrent_deploy_capture',
@@ -477,6 +670,19 @@ running SDK is able to read write and execute the directory.
 volume fcp list.
 
 SDK will only use the fcp devices in the scope of this value.
+'''
+        ),
+    Opt('fcp_topology_refresh_interval',
+        section='volume',
+        default=600,
+        opt_type='int',
+        help='''
+The interval to refresh the FCP topology, in seconds.
+
+The FCP devices, their WWPNs, CHPIDs and statuses are discovered from
+z/VM and cached, the cache is refreshed when it is older than this
+interval or when CONF.volume.fcp_list is changed. Set it to 0 to
+discover the FCP devices on each volume request.
 '''
         ),
     Opt('refresh_bootmap_timeout',
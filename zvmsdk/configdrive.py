@@ -14,12 +14,12 @@
 
 
 import os
-import dist
-import tarfile
-import shutil
 import stat
+import tempfile
 
 from zvmsdk import config
+from zvmsdk import dist
+from zvmsdk import utils as zvmutils
 
 
 CONF = config.CONF
@@ -120,34 +120,22 @@ def create_config_drive(network_interface_info, os_version):
         broadcast_v4 - IPV4 broadcast address
         netmask_v4 - IPV4 netmask
     :param str os_version: operating system version of the guest
+    :returns: the path of the config drive file, the caller should remove
+        it when it is not needed any more
     """
-    temp_path = CONF.guest.temp_path
-    if not os.path.exists(temp_path):
-        os.mkdir(temp_path)
-    cfg_dir = os.path.join(temp_path, 'openstack')
-    if os.path.exists(cfg_dir):
-        shutil.rmtree(cfg_dir)
-    content_dir = os.path.join(cfg_dir, 'content')
-    latest_dir = os.path.join(cfg_dir, 'latest')
-    os.mkdir(cfg_dir)
-    os.mkdir(content_dir)
-    os.mkdir(latest_dir)
-
-    net_file = os.path.join(content_dir, '0000')
-    generate_net_file(network_interface_info, net_file, os_version)
-    znetconfig_file = os.path.join(content_dir, '0001')
-    generate_znetconfig_file(znetconfig_file, os_version)
-    meta_data_path = os.path.join(latest_dir, 'meta_data.json')
-    generate_meta_data(meta_data_path)
-    network_data_path = os.path.join(latest_dir, 'network_data.json')
-    generate_file('{}', network_data_path)
-    vendor_data_path = os.path.join(latest_dir, 'vendor_data.json')
-    generate_file('{}', vendor_data_path)
-
-    tar_path = os.path.join(temp_path, 'cfgdrive.tgz')
-    tar = tarfile.open(tar_path, "w:gz")
-    os.chdir(temp_path)
-    tar.add('openstack')
-    tar.close()
-
-    return tar_path
+    cfg_drive = zvmutils.TarBuilder(compress=True)
+    cfg_drive.add_dir('openstack')
+    cfg_drive.add_dir('openstack/content')
+    cfg_drive.add_file('openstack/content/0000',
+                       get_cfg_str(network_interface_info, os_version))
+    cfg_drive.add_file('openstack/content/0001',
+                       get_znetconfig_str(os_version))
+    cfg_drive.add_dir('openstack/latest')
+    cfg_drive.add_file('openstack/latest/meta_data.json',
+                       get_meta_data_str())
+    cfg_drive.add_file('openstack/latest/network_data.json', '{}')
+    cfg_drive.add_file('openstack/latest/vendor_data.json', '{}')
+
+    fd, tar_path = tempfile.mkstemp(prefix='cfgdrive', suffix='.tgz')
+    os.close(fd)
+    return cfg_drive.write(tar_path)
@@ -38,6 +38,11 @@ RINV_HOST_KEYWORDS = {
     "ipl_time": "IPL Time:",
     }
 
+RINV_HOST_USAGE_KEYWORDS = {
+    "lpar_cpu_used": "LPAR CPU Used:",
+    "lpar_memory_used": "LPAR Memory Used:",
+    }
+
 DISKPOOL_KEYWORDS = {
     "disk_total": "Total:",
     "disk_used": "Used:",
@@ -143,18 +143,11 @@ class NetworkDbOperator(object):
                 'primary key (userid, interface));'))
         with get_network_conn() as conn:
             conn.execute(create_table_sql)
-
-    def _get_switch_by_user_interface(self, userid, interface):
-        with get_network_conn() as conn:
-            res = conn.execute("SELECT * FROM switch "
-                               "WHERE userid=? and interface=?",
-                               (userid, interface))
-            switch_record = res.fetchall()
-
-        if len(switch_record) == 1:
-            return switch_record[0]
-        elif len(switch_record) == 0:
-            return None
+            # the lookups by userid use the primary key index
+            conn.execute("CREATE INDEX IF NOT EXISTS switch_switch_idx "
+                         "ON switch (switch)")
+            conn.execute("CREATE INDEX IF NOT EXISTS switch_port_idx "
+                         "ON switch (port)")
 
     def switch_delete_record_for_userid(self, userid):
         """Remove userid switch record from switch table."""
@@ -164,6 +157,21 @@ class NetworkDbOperator(object):
             LOG.debug("Switch record for user %s is removed from "
                       "switch table" % userid)
 
+    def switch_delete_record_for_userids(self, userids):
+        """Remove the switch records of the userids from switch table in
+        one transaction."""
+        with get_network_conn() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("DELETE FROM switch WHERE userid=?",
+                                 [(userid,) for userid in userids])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        LOG.debug("Switch records for users %s are removed from switch "
+                  "table" % ', '.join(userids))
+
     def switch_delete_record_for_nic(self, userid, interface):
         """Remove userid switch record from switch table."""
         with get_network_conn() as conn:
@@ -182,6 +190,25 @@ class NetworkDbOperator(object):
                       "nic %s, port %s" %
                       (userid, interface, port))
 
+    def switch_add_records(self, records):
+        """Add the records into switch table in one transaction.
+
+        :param records: list of dicts with the keys userid and interface,
+            and optionally port, switch and comments
+        """
+        with get_network_conn() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT INTO switch VALUES (?, ?, ?, ?, ?)",
+                                 [(r['userid'], r['interface'],
+                                   r.get('switch'), r.get('port'),
+                                   r.get('comments')) for r in records])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        LOG.debug("%d new records in the switch table" % len(records))
+
     def switch_add_record_migrated(self, userid, interface, switch,
                              port=None, comments=None):
         """Add userid and interfaces and switch into switch table."""
@@ -195,30 +222,19 @@ class NetworkDbOperator(object):
     def switch_update_record_with_switch(self, userid, interface,
                                          switch=None):
         """Update information in switch table."""
-        if not self._get_switch_by_user_interface(userid, interface):
+        with get_network_conn() as conn:
+            result = conn.execute("UPDATE switch SET switch=? "
+                                  "WHERE userid=? and interface=?",
+                                  (switch, userid, interface))
+        if result.rowcount == 0:
             msg = "User %s with nic %s does not exist in DB" % (userid,
                                                                 interface)
             LOG.error(msg)
             obj_desc = ('User %s with nic %s' % (userid, interface))
             raise exception.SDKObjectNotExistError(obj_desc,
                                                    modID=self._module_id)
-
-        if switch is not None:
-            with get_network_conn() as conn:
-                conn.execute("UPDATE switch SET switch=? "
-                             "WHERE userid=? and interface=?",
-                             (switch, userid, interface))
-                LOG.debug("Set switch to %s for user %s with nic %s "
-                          "in switch table" %
-                          (switch, userid, interface))
-        else:
-            with get_network_conn() as conn:
-                conn.execute("UPDATE switch SET switch=NULL "
-                             "WHERE userid=? and interface=?",
-                             (userid, interface))
-                LOG.debug("Set switch to None for user %s with nic %s "
-                          "in switch table" %
-                          (userid, interface))
+        LOG.debug("Set switch to %s for user %s with nic %s "
+                  "in switch table" % (switch, userid, interface))
 
     def _parse_switch_record(self, switch_list):
         # Map each switch record to be a dict, with the key is the field name
@@ -245,26 +261,40 @@ class NetworkDbOperator(object):
             switch_info = result.fetchall()
         return self._parse_switch_record(switch_info)
 
-    def switch_select_record(self, userid=None, nic_id=None, vswitch=None):
+    def switch_select_record(self, userid=None, nic_id=None, vswitch=None,
+                             limit=None, marker=None):
+        """Select the records matching all the given filters.
+
+        When limit is given, at most limit records sorted by userid and
+        interface are returned. marker is the (userid, interface) of the
+        last record of the previous page, only the records sorted after it
+        are returned.
+        """
         if ((userid is None) and
             (nic_id is None) and
-            (vswitch is None)):
+            (vswitch is None) and
+            (limit is None) and
+            (marker is None)):
             return self.switch_select_table()
 
-        sql_cmd = "SELECT * FROM switch WHERE"
+        conditions = []
         sql_var = []
-        if userid is not None:
-            sql_cmd += " userid=? and"
-            sql_var.append(userid)
-        if nic_id is not None:
-            sql_cmd += " port=? and"
-            sql_var.append(nic_id)
-        if vswitch is not None:
-            sql_cmd += " switch=?"
-            sql_var.append(vswitch)
-
-        # remove the tailing ' and'
-        sql_cmd = sql_cmd.strip(' and')
+        for column, value in (('userid', userid), ('port', nic_id),
+                              ('switch', vswitch)):
+            if value is not None:
+                conditions.append("%s=?" % column)
+                sql_var.append(value)
+        if marker is not None:
+            conditions.append("(userid>? or (userid=? and interface>?))")
+            sql_var.extend((marker[0], marker[0], marker[1]))
+
+        sql_cmd = "SELECT * FROM switch"
+        if conditions:
+            sql_cmd += " WHERE " + " and ".join(conditions)
+        sql_cmd += " ORDER BY userid, interface"
+        if limit is not None:
+            sql_cmd += " LIMIT ?"
+            sql_var.append(limit)
 
         with get_network_conn() as conn:
             result = conn.execute(sql_cmd, sql_var)
@@ -434,6 +464,37 @@ class FCPDbOperator(object):
             conn.execute("UPDATE fcp SET path=? WHERE "
                          "fcp_id=?", (path, fcp))
 
+    def sync_fcp_list(self, new_fcps, path_updates, orphan_fcps):
+        """Reconcile the fcp table with the FCP devices of the host in one
+        transaction.
+
+        :param new_fcps: list of (fcp, path) to be added
+        :param path_updates: list of (fcp, path) whose path is changed
+        :param orphan_fcps: list of fcp to be removed, the reserved ones
+            are kept
+        :returns: the list of orphan fcps removed
+        """
+        removed = []
+        with get_fcp_conn() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR IGNORE INTO fcp (fcp_id, "
+                                 "assigner_id, connections, reserved, path, "
+                                 "comment) VALUES (?, '', 0, 0, ?, '')",
+                                 new_fcps)
+                conn.executemany("UPDATE fcp SET path=? WHERE fcp_id=?",
+                                 [(path, fcp) for fcp, path in path_updates])
+                for fcp in orphan_fcps:
+                    result = conn.execute("DELETE FROM fcp WHERE fcp_id=? "
+                                          "AND reserved<>1", (fcp,))
+                    if result.rowcount:
+                        removed.append(fcp)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return removed
+
     def increase_usage(self, fcp):
         with get_fcp_conn() as conn:
             result = conn.execute("SELECT * FROM fcp WHERE "
@@ -817,6 +878,21 @@ class GuestDbOperator(object):
                 "INSERT INTO guests VALUES (?, ?, ?, ?, ?)",
                 (guest_id, userid, meta, net_set, comments))
 
+    def add_guests(self, userids, meta='', comments=''):
+        """Add the guests into guests table in one transaction."""
+        net_set = '0'
+        with get_guest_conn() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT INTO guests VALUES (?, ?, ?, ?, ?)",
+                                 [(str(uuid.uuid4()), userid, meta, net_set,
+                                   comments) for userid in userids])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        LOG.debug("%d new guests in the guests table" % len(userids))
+
     def delete_guest_by_id(self, guest_id):
         # First check whether the guest exist in db table
         guest = self._check_existence_by_id(guest_id, ignore=True)
@@ -836,6 +912,20 @@ class GuestDbOperator(object):
             conn.execute(
                 "DELETE FROM guests WHERE userid=?", (userid,))
 
+    def delete_guests_by_userid(self, userids):
+        """Remove the guests from guests table in one transaction."""
+        with get_guest_conn() as conn:
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("DELETE FROM guests WHERE userid=?",
+                                 [(userid,) for userid in userids])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        LOG.debug("%d guests are removed from the guests table" %
+                  len(userids))
+
     def get_guest_metadata_with_userid(self, userid):
         with get_guest_conn() as conn:
             res = conn.execute("SELECT metadata FROM guests "
@@ -913,6 +1003,12 @@ class GuestDbOperator(object):
         with get_guest_conn() as conn:
             conn.execute(sql_cmd, sql_var)
 
+    def get_changes_count(self):
+        """Return the number of rows changed in guests DB since it was
+        opened, used to detect changes of the guests table cheaply."""
+        with get_guest_conn() as conn:
+            return conn.total_changes
+
     def get_guest_list(self):
         with get_guest_conn() as conn:
             res = conn.execute("SELECT * FROM guests")
@@ -933,6 +1029,32 @@ class GuestDbOperator(object):
             guests = res.fetchall()
         return guests
 
+    def update_guests_comments(self, userids, changes):
+        """Update the comments of the guests with the changes in one
+        transaction.
+
+        :param changes: dict of the keys and values to set in the comments
+        """
+        with get_guest_conn() as conn:
+            conn.execute("BEGIN")
+            try:
+                for userid in userids:
+                    res = conn.execute("SELECT comments FROM guests "
+                                       "WHERE userid=?", (userid,))
+                    result = res.fetchall()
+                    comments = {}
+                    if result and result[0][0]:
+                        comments = json.loads(result[0][0])
+                    comments.update(changes)
+                    conn.execute("UPDATE guests SET comments=? "
+                                 "WHERE userid=?",
+                                 (json.dumps(comments), userid))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        LOG.debug("Comments of guests %s are updated" % ', '.join(userids))
+
     def get_comments_by_userid(self, userid):
         """ Get comments record.
         output should be like: {'k1': 'v1', 'k2': 'v2'}'
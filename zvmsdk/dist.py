@@ -17,7 +17,8 @@ import abc
 import netaddr
 import os
 import six
-from jinja2 import Environment, FileSystemLoader
+import threading
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from zvmsdk import config
 from zvmsdk import exception
@@ -28,6 +29,59 @@ from zvmsdk import smtclient
 CONF = config.CONF
 LOG = log.LOG
 
+# the modules which have templates under <module>/templates
+TEMPLATE_MODULES = ('vmactions', 'volumeops')
+# module -> the jinja2 environment of its templates, shared by the process
+_TEMPLATE_ENVS = {}
+_TEMPLATE_ENVS_LOCK = threading.Lock()
+_BYTECODE_CACHE = None
+
+
+def _get_bytecode_cache():
+    """Get the cache of the compiled templates shared by the processes,
+    None if it can not be created."""
+    global _BYTECODE_CACHE
+    if _BYTECODE_CACHE is None:
+        try:
+            _BYTECODE_CACHE = FileSystemBytecodeCache()
+        except Exception as err:
+            LOG.warning("Failed to create the template bytecode cache: %s",
+                        six.text_type(err))
+            _BYTECODE_CACHE = False
+    return _BYTECODE_CACHE or None
+
+
+def get_template_env(module):
+    """Get the jinja2 environment of the templates of module.
+
+    The environment is created once, and the templates are compiled once
+    when they are got the first time and kept in the environment.
+    """
+    with _TEMPLATE_ENVS_LOCK:
+        env = _TEMPLATE_ENVS.get(module)
+        if env is None:
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            template_path = os.path.join(base_path, module, "templates")
+            # the templates are shipped with SDK and never change while
+            # running, so keep all of them without checking for update
+            env = Environment(loader=FileSystemLoader(template_path),
+                              bytecode_cache=_get_bytecode_cache(),
+                              cache_size=-1, auto_reload=False)
+            _TEMPLATE_ENVS[module] = env
+    return env
+
+
+def warm_up_templates():
+    """Compile all the templates, called when the server starts."""
+    for module in TEMPLATE_MODULES:
+        env = get_template_env(module)
+        for template_name in env.list_templates(extensions=['j2']):
+            try:
+                env.get_template(template_name)
+            except Exception as err:
+                LOG.warning("Failed to compile template %s/%s: %s", module,
+                            template_name, six.text_type(err))
+
 
 @six.add_metaclass(abc.ABCMeta)
 class LinuxDist(object):
@@ -310,21 +364,21 @@ class LinuxDist(object):
         return lines
 
     def get_template(self, module, template_name):
-        relative_path = module + "/templates"
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        template_file_path = os.path.join(base_path, relative_path,
-                                          template_name)
-        template_file_directory = os.path.dirname(template_file_path)
-        template_loader = FileSystemLoader(searchpath=template_file_directory)
-        env = Environment(loader=template_loader)
-        template = env.get_template(template_name)
-        return template
+        return get_template_env(module).get_template(template_name)
 
     def get_extend_partition_cmds(self):
         template = self.get_template("vmactions", "grow_root_volume.j2")
         content = template.render()
         return content
 
+    def get_volume_batch_configuration_cmds(self, scripts, status_file):
+        """generate one punch script running the volume configuration
+        scripts one by one, the exit code of each script is written into
+        status_file"""
+        template = self.get_template("volumeops", "batch_volumes.j2")
+        content = template.render(scripts=scripts, status_file=status_file)
+        return content
+
 
 class rhel(LinuxDist):
     def _get_network_file_path(self):
@@ -12,9 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import bisect
+import copy
+import threading
+import time
 
 from zvmsdk import config
 from zvmsdk import constants as const
+from zvmsdk import database
 from zvmsdk import exception
 from zvmsdk import log
 from zvmsdk import smtclient
@@ -33,12 +38,167 @@ def get_hostops():
     return _HOSTOPS
 
 
+class GuestInventory(object):
+    """Index of the guests defined in the directory of the host.
+
+    Each guest in the index is described as:
+    {'userid': 'TEST0001', 'sdk_managed': True, 'migrated': False}
+    where sdk_managed means the guest is in the guests DB of SDK, and migrated
+    means it has been live migrated to another host.
+
+    The directory is queried again when the index expires or when SDK creates
+    or deletes a guest, a change of the guests DB only reloads the flags.
+    """
+
+    def __init__(self):
+        self._smtclient = smtclient.get_smtclient()
+        self._GuestDbOperator = database.GuestDbOperator()
+        self._lock = threading.RLock()
+        self._guests = {}
+        # sorted userids, used for paging
+        self._userids = []
+        self._expiration = 0
+        self._directory_stamp = None
+        self._db_stamp = None
+        self._refresh_thread = None
+
+    def _get_db_flags(self):
+        """Return a dict of userid and migrated flag of guests in DB."""
+        flags = {}
+        # db query return value in tuple
+        # (uuid, userid, metadata, net_set, comments)
+        for guest in self._GuestDbOperator.get_guest_list():
+            comments = guest[4] or ''
+            flags[guest[1].upper()] = '"migrated": 1' in comments
+        return flags
+
+    def _apply(self, userids, flags):
+        added = sorted(userids - set(self._guests))
+        removed = sorted(set(self._guests) - userids)
+        changed = []
+        for userid in userids:
+            guest = {'userid': userid,
+                     'sdk_managed': userid in flags,
+                     'migrated': flags.get(userid, False)}
+            old = self._guests.get(userid)
+            if old != guest:
+                if old is not None:
+                    changed.append(userid)
+                self._guests[userid] = guest
+        for userid in removed:
+            del self._guests[userid]
+        if added or removed:
+            self._userids = sorted(self._guests)
+        return {'added': added, 'removed': removed, 'changed': sorted(changed)}
+
+    def refresh(self, reload_directory=True):
+        """Refresh the index and return the differences in a dict like:
+        {'added': ['TEST0002'], 'removed': [], 'changed': ['TEST0001']}
+        """
+        with zvmutils.acquire_lock(self._lock):
+            # read the stamps first so that any change made during the
+            # refresh triggers another one
+            directory_stamp = self._smtclient.get_directory_generation()
+            db_stamp = self._GuestDbOperator.get_changes_count()
+            if reload_directory or self._directory_stamp is None:
+                guest_list = self._smtclient.get_all_user_direct()
+                with zvmutils.expect_invalid_resp_data(guest_list):
+                    userids = set(u.strip().upper() for u in guest_list
+                                  if u.strip())
+            else:
+                userids = set(self._guests)
+            diff = self._apply(userids, self._get_db_flags())
+            self._directory_stamp = directory_stamp
+            self._db_stamp = db_stamp
+            self._expiration = (time.time() +
+                                CONF.zvm.inventory_refresh_interval)
+
+        if diff['added'] or diff['removed'] or diff['changed']:
+            LOG.info("Guest inventory refreshed, added: %(added)s, "
+                     "removed: %(removed)s, changed: %(changed)s" % diff)
+        return diff
+
+    def _refresh_if_needed(self):
+        if (CONF.zvm.inventory_refresh_interval <= 0 or
+            time.time() > self._expiration or
+            self._directory_stamp !=
+                self._smtclient.get_directory_generation()):
+            self.refresh()
+        elif self._db_stamp != self._GuestDbOperator.get_changes_count():
+            self.refresh(reload_directory=False)
+
+    def list(self, limit=None, marker=None, sdk_managed=None,
+             migrated=None):
+        """Return the sorted userids of the guests after the marker userid,
+        at most limit userids are returned."""
+        with zvmutils.acquire_lock(self._lock):
+            self._refresh_if_needed()
+            start = 0
+            if marker:
+                start = bisect.bisect_right(self._userids, marker.upper())
+            userids = []
+            for idx in range(start, len(self._userids)):
+                guest = self._guests[self._userids[idx]]
+                if ((sdk_managed is not None and
+                     guest['sdk_managed'] != sdk_managed) or
+                    (migrated is not None and
+                     guest['migrated'] != migrated)):
+                    continue
+                userids.append(guest['userid'])
+                if limit and len(userids) >= limit:
+                    break
+            return userids
+
+    def get(self, userid):
+        with zvmutils.acquire_lock(self._lock):
+            self._refresh_if_needed()
+            guest = self._guests.get(userid.upper())
+            return dict(guest) if guest else None
+
+    def _refresh_loop(self):
+        while True:
+            interval = CONF.zvm.inventory_refresh_interval
+            if interval <= 0:
+                return
+            time.sleep(interval)
+            try:
+                self.refresh()
+            except Exception as err:
+                LOG.warning("Failed to refresh guest inventory: %s", err)
+
+    def start_refresh(self):
+        """Start the thread which refreshes the index periodically."""
+        with zvmutils.acquire_lock(self._lock):
+            if (self._refresh_thread is not None or
+                CONF.zvm.inventory_refresh_interval <= 0):
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop, name='GuestInventoryRefresh')
+            self._refresh_thread.daemon = True
+            self._refresh_thread.start()
+
+
 class HOSTOps(object):
     def __init__(self):
         self._smtclient = smtclient.get_smtclient()
         self._volume_infos = {}
+        self.guest_inventory = GuestInventory()
+        # The host facts are cached in two parts, the static facts which
+        # only change when the host is reconfigured or IPLed, and the
+        # dynamic facts of the CPU, memory and disk pool usage. Each part
+        # is {'info': {...}, 'time': load time} and has its own interval.
+        self._facts_lock = threading.Lock()
+        self._static_facts = None
+        self._dynamic_facts = None
 
-    def get_info(self):
+    @staticmethod
+    def _parse_usage(inv_info):
+        with zvmutils.expect_invalid_resp_data(inv_info):
+            return {'vcpus_used': int(inv_info['lpar_cpu_used']),
+                    'memory_mb_used': zvmutils.convert_to_mb(
+                        inv_info['lpar_memory_used'])}
+
+    def _load_static_facts(self):
         inv_info = self._smtclient.get_host_info()
         host_info = {}
 
@@ -46,34 +206,69 @@ class HOSTOps(object):
             host_info['zcc_userid'] = inv_info['zcc_userid']
             host_info['zvm_host'] = inv_info['zvm_host']
             host_info['vcpus'] = int(inv_info['lpar_cpu_total'])
-            host_info['vcpus_used'] = int(inv_info['lpar_cpu_used'])
-            host_info['cpu_info'] = {}
             host_info['cpu_info'] = {'architecture': const.ARCHITECTURE,
                                      'cec_model': inv_info['cec_model'], }
             mem_mb = zvmutils.convert_to_mb(inv_info['lpar_memory_total'])
             host_info['memory_mb'] = mem_mb
-            mem_mb_used = zvmutils.convert_to_mb(inv_info['lpar_memory_used'])
-            host_info['memory_mb_used'] = mem_mb_used
             host_info['hypervisor_type'] = const.HYPERVISOR_TYPE
             verl = inv_info['hypervisor_os'].split()[1].split('.')
             version = int(''.join(verl))
             host_info['hypervisor_version'] = version
             host_info['hypervisor_hostname'] = inv_info['hypervisor_name']
             host_info['ipl_time'] = inv_info['ipl_time']
+        # the general query has the usage too
+        return host_info, self._parse_usage(inv_info)
+
+    def _load_disk_pool_facts(self):
         disk_pool = CONF.zvm.disk_pool
         if disk_pool is None:
-            dp_info = {'disk_total': 0, 'disk_used': 0, 'disk_available': 0}
-        else:
-            diskpool_name = disk_pool.split(':')[1]
-            dp_info = self.diskpool_get_info(diskpool_name)
-        host_info.update(dp_info)
+            return {'disk_total': 0, 'disk_used': 0, 'disk_available': 0}
+        diskpool_name = disk_pool.split(':')[1]
+        return self.diskpool_get_info(diskpool_name)
+
+    @staticmethod
+    def _is_fresh(facts, interval):
+        return (facts is not None and interval > 0 and
+                time.time() - facts['time'] < interval)
+
+    def get_static_info(self, refresh=False):
+        """Return the static facts of the host, like zvm_host, which are
+        cached for CONF.zvm.host_static_info_interval seconds."""
+        with zvmutils.acquire_lock(self._facts_lock):
+            if refresh or not self._is_fresh(
+                    self._static_facts, CONF.zvm.host_static_info_interval):
+                static_info, usage = self._load_static_facts()
+                self._static_facts = {'info': static_info,
+                                      'time': time.time()}
+            return copy.deepcopy(self._static_facts['info'])
 
+    def get_info(self, refresh=False):
+        """Return the host facts. The static and dynamic facts are got
+        from cache unless they are expired or refresh is True."""
+        with zvmutils.acquire_lock(self._facts_lock):
+            now = time.time()
+            usage = None
+            if refresh or not self._is_fresh(
+                    self._static_facts, CONF.zvm.host_static_info_interval):
+                static_info, usage = self._load_static_facts()
+                self._static_facts = {'info': static_info, 'time': now}
+            if refresh or not self._is_fresh(
+                    self._dynamic_facts, CONF.zvm.host_dynamic_info_interval):
+                if usage is None:
+                    usage = self._parse_usage(
+                        self._smtclient.get_host_usage())
+                dynamic_info = dict(usage)
+                dynamic_info.update(self._load_disk_pool_facts())
+                self._dynamic_facts = {'info': dynamic_info, 'time': now}
+            host_info = copy.deepcopy(self._static_facts['info'])
+            host_info.update(self._dynamic_facts['info'])
         return host_info
 
-    def guest_list(self):
-        guest_list = self._smtclient.get_all_user_direct()
-        with zvmutils.expect_invalid_resp_data(guest_list):
-            return guest_list
+    def guest_list(self, limit=None, marker=None, sdk_managed=None,
+                   migrated=None):
+        return self.guest_inventory.list(limit=limit, marker=marker,
+                                         sdk_managed=sdk_managed,
+                                         migrated=migrated)
 
     def diskpool_get_volumes(self, pool_name):
         diskpool_volume_list = self._smtclient.get_diskpool_volumes(pool_name)
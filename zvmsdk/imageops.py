@@ -47,8 +47,10 @@ class ImageOps(object):
                                              image_meta,
                                              remote_host)
 
-    def image_query(self, imagename=None):
-        return self._smtclient.image_query(imagename)
+    def image_query(self, imagename=None, limit=None, marker=None,
+                    os_distro=None):
+        return self._smtclient.image_query(imagename, os_distro=os_distro,
+                                           limit=limit, marker=marker)
 
     def image_delete(self, image_name):
         return self._smtclient.image_delete(image_name)
@@ -13,15 +13,18 @@
 #    under the License.
 
 
+import collections
 import os
 import shutil
-import tarfile
+import six
 import yaml
 
 from zvmsdk import config
 from zvmsdk import dist
+from zvmsdk import exception
 from zvmsdk import log
 from zvmsdk import smtclient
+from zvmsdk import utils as zvmutils
 
 
 _NetworkOPS = None
@@ -170,19 +173,21 @@ class NetworkOPS(object):
         if len(net_cmd_file) > 0:
             path_contents.extend(net_cmd_file)
 
+        # the files are added into the doscript directly from the contents
+        doscript = zvmutils.TarBuilder()
         for (path, contents) in path_contents:
             key = "%04i" % len(content_dir)
             files_map.append({'target_path': path,
                         'source_file': "%s" % key})
             content_dir[key] = contents
-            file_name = os.path.join(network_file_path, key)
             if 'yaml' in path:
-                self._add_yaml_file(file_name, contents)
-            else:
-                self._add_file(file_name, contents)
+                contents = yaml.dump(contents)
+            doscript.add_file(key, contents)
 
-        self._create_invokeScript(network_file_path, clean_cmd, files_map)
-        network_doscript = self._create_network_doscript(network_file_path)
+        doscript.add_file('invokeScript.sh',
+                          self._create_invokeScript(clean_cmd, files_map))
+        network_doscript = self._create_network_doscript(network_file_path,
+                                                         doscript)
 
         # get command about zvmguestconfigure
         active_cmds = ''
@@ -195,10 +200,6 @@ class NetworkOPS(object):
         with open(file_name, "w") as f:
             f.write(data)
 
-    def _add_yaml_file(self, file_name, data):
-        with open(file_name, 'w') as stream:
-            yaml.dump(data, stream)
-
     def _create_znetconfig(self, commands, linuxdist, append_cmd,
                            active=False):
         LOG.debug('Creating znetconfig file')
@@ -222,18 +223,14 @@ class NetworkOPS(object):
 
         return net_cmd_file
 
-    def _create_invokeScript(self, network_file_path, commands,
-                             files_map):
+    def _create_invokeScript(self, commands, files_map):
         """invokeScript: Configure zLinux os network
 
         invokeScript is included in the network.doscript, it is used to put
         the network configuration file to the directory where it belongs and
         call znetconfig to configure the network
         """
-        LOG.debug('Creating invokeScript shell in the folder %s'
-                  % network_file_path)
-        invokeScript = "invokeScript.sh"
-
+        LOG.debug('Creating invokeScript shell')
         conf = "#!/bin/bash \n"
         command = commands
         for file in files_map:
@@ -247,12 +244,9 @@ class NetworkOPS(object):
         command += '/bin/bash /tmp/znetconfig.sh\n'
         command += 'rm -rf invokeScript.sh\n'
 
-        scriptfile = os.path.join(network_file_path, invokeScript)
-        with open(scriptfile, "w") as f:
-            f.write(conf)
-            f.write(command)
+        return conf + command
 
-    def _create_network_doscript(self, network_file_path):
+    def _create_network_doscript(self, network_file_path, doscript):
         """doscript: contains a invokeScript.sh which will do the special work
 
         The network.doscript contains network configuration files and it will
@@ -263,20 +257,30 @@ class NetworkOPS(object):
         LOG.debug('Creating network doscript in the folder %s'
                   % network_file_path)
         network_doscript = os.path.join(network_file_path, 'network.doscript')
-        tar = tarfile.open(network_doscript, "w")
-        for file in os.listdir(network_file_path):
-            file_name = os.path.join(network_file_path, file)
-            tar.add(file_name, arcname=file)
-        tar.close()
-        return network_doscript
-
-    def get_nic_info(self, userid=None, nic_id=None, vswitch=None):
+        return doscript.write(network_doscript)
+
+    def get_nic_info(self, userid=None, nic_id=None, vswitch=None,
+                     limit=None, marker=None):
         return self._smtclient.get_nic_info(userid=userid, nic_id=nic_id,
-                                             vswitch=vswitch)
+                                             vswitch=vswitch, limit=limit,
+                                             marker=marker)
 
     def vswitch_query(self, vswitch_name):
         return self._smtclient.query_vswitch(vswitch_name)
 
+    def refresh_vswitch_cache(self, vswitch_names=None):
+        errors = self._smtclient.refresh_vswitch_cache(
+            vswitch_names=vswitch_names)
+        for name, err in errors.items():
+            if isinstance(err, exception.SDKBaseException):
+                errors[name] = err.format_message()
+            else:
+                errors[name] = six.text_type(err)
+        return errors
+
+    def get_vswitch_cache_stats(self):
+        return self._smtclient.get_vswitch_cache_stats()
+
     def delete_network_configuration(self, userid, os_version, vdev,
                                      active=False):
         network_file_path = self._smtclient.get_guest_temp_path(userid)
@@ -306,3 +310,121 @@ class NetworkOPS(object):
     def dedicate_OSA(self, userid, OSA_device, vdev=None, active=False):
         return self._smtclient.dedicate_OSA(userid, OSA_device, vdev=vdev,
                                              active=active)
+
+    def _grant_users_to_vswitch(self, vswitch_name, users):
+        """Grant the users to one vswitch, users is an ordered dict of
+        userid -> set of the VLAN IDs.
+
+        A user with a VLAN ID is granted and its VLAN ID is set by one
+        SMAPI call. Returns a dict of userid -> error message for the users
+        failed to be granted.
+        """
+        errors = {}
+        for userid, vlan_ids in users.items():
+            if len(vlan_ids) > 1:
+                errors[userid] = ("Conflicting VLAN IDs %s of guest %s on "
+                                  "vswitch %s" %
+                                  (sorted(vlan_ids), userid, vswitch_name))
+                continue
+            try:
+                if vlan_ids:
+                    self._smtclient.set_vswitch_port_vlan_id(
+                        vswitch_name, userid, list(vlan_ids)[0])
+                else:
+                    self._smtclient.grant_user_to_vswitch(vswitch_name,
+                                                          userid)
+            except exception.SDKObjectNotExistError as err:
+                # the vswitch does not exist, no need to try the others
+                for user in users:
+                    errors.setdefault(user, err.format_message())
+                break
+            except exception.SDKBaseException as err:
+                errors[userid] = err.format_message()
+        return errors
+
+    def _create_network_interface(self, userid, os_version, guest_networks,
+                                  active=False):
+        """Create the nics of one guest, couple them to the vswitches
+        and punch the network configuration to the guest."""
+        for network in guest_networks:
+            if network.get('osa_device') is None:
+                vdev = self.create_nic(userid, vdev=network.get('nic_vdev'),
+                                       nic_id=network.get('nic_id'),
+                                       mac_addr=network.get('mac_addr'),
+                                       active=active)
+            else:
+                vdev = self.dedicate_OSA(userid, network['osa_device'],
+                                         vdev=network.get('nic_vdev'),
+                                         active=active)
+            network['nic_vdev'] = vdev
+            if network.get('vswitch_name'):
+                vlan_id = network.get('vlan_id')
+                self.couple_nic_to_vswitch(
+                    userid, vdev, network['vswitch_name'], active=active,
+                    vlan_id=-1 if vlan_id is None else vlan_id)
+        self.network_configuration(userid, os_version, guest_networks,
+                                   active=active)
+        return guest_networks
+
+    def create_network_interfaces(self, interfaces, active=False):
+        """Create the network interfaces of many guests.
+
+        interfaces is a list of dicts with the keys userid, os_version and
+        guest_networks, one for each guest. The vswitch grants of all the
+        guests are coalesced per vswitch first, then the nics of the guests
+        are created and their network configuration punched in parallel.
+        Returns the list of the results in the order of interfaces.
+        """
+        errors = [None] * len(interfaces)
+        # vswitch -> userid -> set of the VLAN IDs of the user
+        grants = collections.OrderedDict()
+        for interface in interfaces:
+            for network in interface['guest_networks']:
+                vswitch_name = network.get('vswitch_name')
+                if not vswitch_name:
+                    continue
+                users = grants.setdefault(vswitch_name.upper(),
+                                          collections.OrderedDict())
+                vlan_ids = users.setdefault(interface['userid'], set())
+                vlan_id = network.get('vlan_id')
+                if vlan_id is not None and vlan_id >= 0:
+                    vlan_ids.add(vlan_id)
+
+        grant_results = zvmutils.run_in_parallel(
+            self._grant_users_to_vswitch, list(grants.items()),
+            max_workers=CONF.sdkserver.max_worker_count)
+        grant_errors = {}
+        for (vswitch_name, users), (failed, err) in zip(grants.items(),
+                                                        grant_results):
+            if err is not None:
+                failed = dict.fromkeys(users, six.text_type(err))
+            for userid, errmsg in failed.items():
+                grant_errors.setdefault(userid, errmsg)
+        for index, interface in enumerate(interfaces):
+            errors[index] = grant_errors.get(interface['userid'])
+
+        to_create = [index for index, errmsg in enumerate(errors)
+                     if errmsg is None]
+        create_results = zvmutils.run_in_parallel(
+            self._create_network_interface,
+            [(interfaces[index]['userid'], interfaces[index]['os_version'],
+              interfaces[index]['guest_networks'], active)
+             for index in to_create],
+            max_workers=CONF.sdkserver.max_worker_count)
+        for index, (networks, err) in zip(to_create, create_results):
+            if err is None:
+                continue
+            LOG.error("Failed to create network interface for guest %s: %s"
+                      % (interfaces[index]['userid'], err))
+            if isinstance(err, exception.SDKBaseException):
+                errors[index] = err.format_message()
+            else:
+                errors[index] = six.text_type(err)
+
+        results = []
+        for interface, errmsg in zip(interfaces, errors):
+            results.append({'userid': interface['userid'],
+                            'guest_networks': interface['guest_networks'],
+                            'result': 'failed' if errmsg else 'success',
+                            'errmsg': errmsg or ''})
+        return results
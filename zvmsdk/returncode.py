@@ -172,7 +172,15 @@ errors = {
                14: ("Failed to deploy image to userid: '%(userid)s', %(msg)s"),
                15: ("Failed to live resize cpus of guest: '%(userid)s', "
                    "error: enable new defined cpus failed: '%(err)s'."),
-               16: ("Failed to start the guest: '%(userid)s', %(msg)s")
+               16: ("Failed to start the guest: '%(userid)s', %(msg)s"),
+               17: ("Timed out waiting for the guest '%(userid)s' to be "
+                    "%(state)s in %(timeout)d seconds"),
+               18: ("Failed to live resize guest: '%(userid)s', "
+                    "error: update user entry failed with "
+                    "smt error: '%(err)s'."),
+               19: ("Failed to live resize memory of guest: '%(userid)s', "
+                    "error: online new memory failed with "
+                    "smt error: '%(err)s'.")
               },
               "Operation on Guest failed"
               ],
@@ -267,6 +275,13 @@ errors = {
                  },
                 "REST API Request error"
                 ],
+# Invalid API name (Only used by sdkserver)
+# The called API does not exist in SDK API.
+    'API': [{'overallRC': 400, 'modID': ModRCs['sdkserver'], 'rc': 400},
+            {1: "Invalid API name, '%(msg)s'",
+             },
+            "Invalid API name"
+            ],
 # Object not exist
 # Used when the operated object does not exist.
 # 'modID' would be set to each module rc when raise the exception
@@ -22,9 +22,12 @@ import traceback
 
 from zvmsdk import api
 from zvmsdk import config
+from zvmsdk import dist
 from zvmsdk import exception
+from zvmsdk import hostops
 from zvmsdk import log
 from zvmsdk import returncode
+from zvmsdk import utils as zvmutils
 
 if six.PY3:
     import queue as Queue
@@ -35,6 +38,11 @@ else:
 CONF = config.CONF
 LOG = log.LOG
 
+_INPROCESS_SERVER = None
+_INPROCESS_SERVER_LOCK = threading.Lock()
+# the client address logged for the requests called in process
+_INPROCESS_ADDR = ('in-process', 0)
+
 
 class SDKServer(object):
     def __init__(self):
@@ -67,7 +75,7 @@ class SDKServer(object):
     def construct_internal_error(self, msg):
         self.log_error(msg)
         error = returncode.errors['internal']
-        results = error[0]
+        results = dict(error[0])
         results['modID'] = returncode.ModRCs['sdkserver']
         results.update({'rs': 1,
                         'errmsg': error[1][1] % {'msg': msg},
@@ -77,7 +85,7 @@ class SDKServer(object):
     def construct_api_name_error(self, msg):
         self.log_error(msg)
         error = returncode.errors['API']
-        results = error[0]
+        results = dict(error[0])
         results['modID'] = returncode.ModRCs['sdkserver']
         results.update({'rs': 1,
                         'errmsg': error[1][1] % {'msg': msg},
@@ -89,21 +97,18 @@ class SDKServer(object):
         {'overallRC': x, 'modID': x, 'rc': x, 'rs': x, 'errmsg': 'msg',
          'output': 'out'}
         """
-        json_results = json.dumps(results)
-        json_results = json_results.encode()
-
+        # Encode and send the results chunk by chunk, so that a large
+        # output is never held in memory as one encoded string and the
+        # client starts receiving before the whole output is encoded.
         sent = 0
-        total_len = len(json_results)
-        got_error = False
-        while (sent < total_len):
-            this_sent = client.send(json_results[sent:])
-            if this_sent == 0:
-                got_error = True
-                break
-            sent += this_sent
-        if got_error or sent != total_len:
-            self.log_error("(%s:%s) Failed to send back results to client, "
-                           "results: %s" % (addr[0], addr[1], json_results))
+        try:
+            for chunk in zvmutils.iter_json(results):
+                client.sendall(chunk)
+                sent += len(chunk)
+        except socket.error as err:
+            self.log_error("(%s:%s) Failed to send back results to client "
+                           "after %d bytes sent, error: %s" %
+                           (addr[0], addr[1], sent, six.text_type(err)))
         else:
             self.log_debug("(%s:%s) Results sent back to client successfully."
                            % (addr[0], addr[1]))
@@ -133,8 +138,36 @@ class SDKServer(object):
                 results = self.construct_internal_error(msg)
                 return
 
-            # Check called API is supported by SDK
             (func_name, api_args, api_kwargs) = api_data
+        except Exception as e:
+            self.log_error("(%s:%s) %s" % (addr[0], addr[1],
+                                           traceback.format_exc()))
+            msg = ("(%s:%s) SDK server got unexpected exception: "
+                   "%s" % (addr[0], addr[1], repr(e)))
+            results = self.construct_internal_error(msg)
+        else:
+            results = self.call_API(addr, func_name, api_args, api_kwargs)
+        # Send back the final results
+        try:
+            if results is not None:
+                self.send_results(client, addr, results)
+        except Exception as e:
+            # This should not happen in normal case.
+            # A special case is the server side socket is closed/removed
+            # before the send() action.
+            self.log_error("(%s:%s) %s" % (addr[0], addr[1], repr(e)))
+        finally:
+            # Close the connection to make sure the thread socket got
+            # closed even when it got unexpected exceptions.
+            self.log_debug("(%s:%s) Finish handling request, closing "
+                           "socket." % (addr[0], addr[1]))
+            client.close()
+
+    def call_API(self, addr, func_name, api_args, api_kwargs):
+        """Call the target SDK API and return its results in the json
+        format described in send_results."""
+        try:
+            # Check called API is supported by SDK
             self.log_debug("(%s:%s) Request func: %s, args: %s, kwargs: %s" %
                            (addr[0], addr[1], func_name, str(api_args),
                             str(api_kwargs)))
@@ -143,8 +176,7 @@ class SDKServer(object):
             except AttributeError:
                 msg = ("(%s:%s) SDK server got wrong API name: %s from"
                        "client." % (addr[0], addr[1], func_name))
-                results = self.construct_api_name_error(msg)
-                return
+                return self.construct_api_name_error(msg)
 
             # invoke target API function
             return_data = api_func(*api_args, **api_kwargs)
@@ -180,21 +212,7 @@ class SDKServer(object):
                        'rc': 0, 'rs': 0,
                        'errmsg': '',
                        'output': return_data}
-        # Send back the final results
-        try:
-            if results is not None:
-                self.send_results(client, addr, results)
-        except Exception as e:
-            # This should not happen in normal case.
-            # A special case is the server side socket is closed/removed
-            # before the send() action.
-            self.log_error("(%s:%s) %s" % (addr[0], addr[1], repr(e)))
-        finally:
-            # Close the connection to make sure the thread socket got
-            # closed even when it got unexpected exceptions.
-            self.log_debug("(%s:%s) Finish handling request, closing "
-                           "socket." % (addr[0], addr[1]))
-            client.close()
+        return results
 
     def worker_loop(self):
         # The worker thread would continuously fetch request from queue
@@ -242,6 +260,11 @@ class SDKServer(object):
         server_sock.listen(5)
         self.log_info("SDK server now listening")
 
+        # Keep the guest inventory of the host up to date in background
+        hostops.get_hostops().guest_inventory.start_refresh()
+        # Compile the guest script templates before the first request
+        dist.warm_up_templates()
+
     def run(self):
         # Keep running in a loop to handle client connections
         while True:
@@ -260,6 +283,34 @@ class SDKServer(object):
                 thread.start()
 
 
+class InProcessServer(SDKServer):
+    """Call SDK API in the process hosting the WSGI application, without
+    the JSON encoding and the socket hop to the SDK server. As the workers
+    of the SDK server, at most max_worker_count calls run at the same time.
+    """
+
+    def __init__(self):
+        self.sdkapi = api.SDKAPI()
+        self.workers = threading.BoundedSemaphore(
+            CONF.sdkserver.max_worker_count)
+        # This process serves the API in place of the SDK server daemon
+        hostops.get_hostops().guest_inventory.start_refresh()
+        dist.warm_up_templates()
+
+    def call(self, func_name, *api_args, **api_kwargs):
+        with self.workers:
+            return self.call_API(_INPROCESS_ADDR, func_name, api_args,
+                                 api_kwargs)
+
+
+def get_inprocess_server():
+    global _INPROCESS_SERVER
+    with _INPROCESS_SERVER_LOCK:
+        if _INPROCESS_SERVER is None:
+            _INPROCESS_SERVER = InProcessServer()
+    return _INPROCESS_SERVER
+
+
 def start_daemon():
     server = SDKServer()
     try:
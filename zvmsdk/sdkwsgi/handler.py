@@ -54,6 +54,31 @@ ROUTE_LIST = (
         'POST': volume.volume_attach,
         'DELETE': volume.volume_detach,
     }),
+    ('/guests/create/bulk', {
+        'POST': guest.guest_create_bulk,
+    }),
+    ('/guests/delete/bulk', {
+        'POST': guest.guest_delete_bulk,
+    }),
+    ('/guests/interface/bulk', {
+        'POST': guest.guest_create_network_interface_bulk,
+    }),
+    ('/guests/migrate/bulk', {
+        'POST': guest.guest_live_migrate_bulk,
+    }),
+    ('/guests/resize/bulk', {
+        'POST': guest.guest_live_resize_bulk,
+    }),
+    ('/guests/console/bulk', {
+        'POST': guest.guest_get_console_output_bulk,
+    }),
+    ('/guests/cmd/bulk', {
+        'POST': guest.guest_execute_cmd_bulk,
+    }),
+    ('/guests/volumes/bulk', {
+        'POST': volume.volume_attach_bulk,
+        'DELETE': volume.volume_detach_bulk,
+    }),
     ('/volumes/conn/{userid}', {
         'GET': volume.get_volume_connector,
     }),
@@ -100,6 +125,9 @@ ROUTE_LIST = (
     ('/guests/{userid}/power_state', {
         'GET': guest.guest_get_power_state,
     }),
+    ('/guests/{userid}/iucv_session', {
+        'GET': guest.guest_get_iucv_session_health,
+    }),
     ('/guests/{userid}/disks', {
         'POST': guest.guest_create_disks,
         'DELETE': guest.guest_delete_disks,
@@ -138,6 +166,10 @@ ROUTE_LIST = (
     ('/token', {
         'POST': tokens.create,
     }),
+    ('/vswitch_cache', {
+        'GET': vswitch.vswitch_cache_stats,
+        'PUT': vswitch.vswitch_cache_refresh,
+    }),
     ('/vswitches', {
         'GET': vswitch.vswitch_list,
         'POST': vswitch.vswitch_create,
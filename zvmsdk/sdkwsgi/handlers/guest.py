@@ -19,8 +19,8 @@ import six
 import threading
 import webob.exc
 
-from zvmconnector import connector
 from zvmsdk import config
+from zvmsdk import exception
 from zvmsdk import log
 from zvmsdk import returncode
 from zvmsdk.sdkwsgi.handlers import tokens
@@ -39,9 +39,7 @@ CONF = config.CONF
 
 class VMHandler(object):
     def __init__(self):
-        self.client = connector.ZVMConnector(connection_type='socket',
-                                             ip_addr=CONF.sdkserver.bind_addr,
-                                             port=CONF.sdkserver.bind_port)
+        self.client = util.get_sdk_connector()
 
     @validation.schema(guest.create)
     def create(self, body):
@@ -79,9 +77,34 @@ class VMHandler(object):
 
         return info
 
-    def list(self):
+    @validation.schema(guest.create_bulk)
+    def create_bulk(self, body):
+        info = self.client.send_request('guest_create_bulk', body['guests'])
+        return info
+
+    @validation.schema(guest.delete_bulk)
+    def delete_bulk(self, body):
+        userids = body['delete']['userid_list']
+        # the guests are sent in waves of the size of the worker pool, so
+        # that the results of a wave are returned before the next one
+        # is started
+        wave_size = CONF.sdkserver.max_worker_count
+        waves = [userids[i:i + wave_size]
+                 for i in range(0, len(userids), wave_size)]
+
+        def _delete(wave):
+            return wave, self.client.send_request('guest_delete_bulk', wave)
+
+        info = _delete(waves[0])[1]
+        return info, six.moves.map(_delete, waves[1:])
+
+    @validation.query_schema(guest.guest_list)
+    def list(self, req, limit=None, marker=None):
         # list all guest on the given host
-        info = self.client.send_request('guest_list')
+        if limit is not None:
+            limit = int(limit)
+        info = self.client.send_request('guest_list', limit=limit,
+                                        marker=marker)
         return info
 
     @validation.query_schema(guest.userid_list_query)
@@ -114,6 +137,12 @@ class VMHandler(object):
         info = self.client.send_request('guest_get_power_state', userid)
         return info
 
+    @validation.query_schema(guest.userid_list_query)
+    def get_iucv_session_health(self, req, userid):
+        info = self.client.send_request('guest_get_iucv_session_health',
+                                        userid)
+        return info
+
     def delete(self, userid):
         info = self.client.send_request('guest_delete', userid)
         return info
@@ -126,10 +155,16 @@ class VMHandler(object):
                                         active=active)
         return info
 
-    @validation.query_schema(guest.userid_list_array_query)
-    def inspect_stats(self, req, userid_list):
+    @validation.query_schema(guest.stats_query)
+    def inspect_stats(self, req, userid_list, limit=None, marker=None,
+                      fields=None):
+        if limit is not None:
+            limit = int(limit)
+        if fields is not None:
+            fields = fields.split(',')
         info = self.client.send_request('guest_inspect_stats',
-                                        userid_list)
+                                        userid_list, limit=limit,
+                                        marker=marker, fields=fields)
         return info
 
     @validation.query_schema(guest.userid_list_array_query)
@@ -141,9 +176,20 @@ class VMHandler(object):
     # @validation.query_schema(guest.nic_DB_info)
     # FIXME: the above validation will fail with "'dict' object has no
     # attribute 'dict_of_lists'"
-    def get_nic_DB_info(self, req, userid=None, nic_id=None, vswitch=None):
+    def get_nic_DB_info(self, req, userid=None, nic_id=None, vswitch=None,
+                        limit=None, marker=None, fields=None):
+        if limit is not None:
+            if not str(limit).isdigit() or int(limit) < 1:
+                detail = ("Invalid input for query parameters limit. "
+                          "Value: %s. It is not a positive integer." % limit)
+                raise exception.ValidationError(detail=detail)
+            limit = int(limit)
+        if fields is not None:
+            fields = fields.split(',')
         info = self.client.send_request('guests_get_nic_info', userid=userid,
-                                        nic_id=nic_id, vswitch=vswitch)
+                                        nic_id=nic_id, vswitch=vswitch,
+                                        limit=limit, marker=marker,
+                                        fields=fields)
         return info
 
     @validation.schema(guest.create_nic)
@@ -175,6 +221,71 @@ class VMHandler(object):
                                         active=active)
         return info
 
+    @validation.schema(guest.create_network_interface_bulk)
+    def create_network_interface_bulk(self, body=None):
+        interface = body['interface']
+        interfaces = interface['interfaces']
+        active = interface.get('active', False)
+        active = util.bool_from_string(active, strict=True)
+        info = self.client.send_request(
+            'guest_create_network_interface_bulk', interfaces,
+            active=active)
+        return info
+
+    @validation.schema(guest.live_migrate_bulk)
+    def live_migrate_bulk(self, body=None):
+        migrate = body['migrate']
+        kwargs = {}
+        if 'parms' in migrate:
+            kwargs['parms'] = migrate['parms']
+        if 'concurrency' in migrate:
+            kwargs['concurrency'] = int(migrate['concurrency'])
+        info = self.client.send_request('guest_live_migrate_bulk',
+                                        migrate['userid_list'],
+                                        migrate['dest_zcc_userid'],
+                                        migrate['destination'], **kwargs)
+        return info
+
+    @validation.schema(guest.live_resize_bulk)
+    def live_resize_bulk(self, body=None):
+        info = self.client.send_request('guest_live_resize_bulk',
+                                        body['resize']['resizes'])
+        return info
+
+    @validation.schema(guest.get_console_output_bulk)
+    def get_console_output_bulk(self, body=None):
+        console = body['console']
+        info = self.client.send_request('guest_get_console_output_bulk',
+                                        console['userid_list'],
+                                        cursors=console.get('cursors'))
+        return info
+
+    @validation.schema(guest.execute_cmd_bulk)
+    def execute_cmd_bulk(self, body=None):
+        execute = body['execute']
+        userids = execute['userid_list']
+        cmd = execute['cmd']
+        kwargs = {}
+        for param in ('concurrency', 'timeout'):
+            if param in execute:
+                kwargs[param] = int(execute[param])
+
+        # the guests are sent in waves of the size of the worker pool, so
+        # that the results of a wave are returned before the next one
+        # is started
+        wave_size = CONF.sdkserver.max_worker_count
+        if kwargs.get('concurrency'):
+            wave_size = min(kwargs['concurrency'], wave_size)
+        waves = [userids[i:i + wave_size]
+                 for i in range(0, len(userids), wave_size)]
+
+        def _execute(wave):
+            return wave, self.client.send_request('guest_execute_cmd_bulk',
+                                                  wave, cmd, **kwargs)
+
+        info = _execute(waves[0])[1]
+        return info, six.moves.map(_execute, waves[1:])
+
     @validation.schema(guest.delete_network_interface)
     def delete_network_interface(self, userid, body=None):
         interface = body['interface']
@@ -239,9 +350,7 @@ class VMHandler(object):
 class VMAction(object):
 
     def __init__(self):
-        self.client = connector.ZVMConnector(connection_type='socket',
-                                             ip_addr=CONF.sdkserver.bind_addr,
-                                             port=CONF.sdkserver.bind_port)
+        self.client = util.get_sdk_connector()
         self.dd_semaphore = threading.BoundedSemaphore(
             value=CONF.wsgi.max_concurrent_deploy_capture)
 
@@ -284,8 +393,10 @@ class VMAction(object):
 
         return info
 
+    @validation.schema(guest.reboot)
     def reboot(self, userid, body):
-        info = self.client.send_request('guest_reboot', userid)
+        timeout = body.get('timeout', 0)
+        info = self.client.send_request('guest_reboot', userid, timeout)
 
         return info
 
@@ -361,6 +472,14 @@ class VMAction(object):
 
         return info
 
+    @validation.schema(guest.live_resize)
+    def live_resize(self, userid, body):
+        info = self.client.send_request('guest_live_resize', userid,
+                                        cpu_cnt=body.get('cpu_cnt'),
+                                        memory=body.get('memory'))
+
+        return info
+
     @validation.schema(guest.grow_root_volume)
     def grow_root_volume(self, userid, body=None):
         info = self.client.send_request('guest_grow_root_volume', userid,
@@ -596,6 +715,25 @@ def guest_get_power_state(req):
     return req.response
 
 
+@util.SdkWsgify
+@tokens.validate
+def guest_get_iucv_session_health(req):
+
+    def _guest_get_iucv_session_health(req, userid):
+        action = get_handler()
+        return action.get_iucv_session_health(req, userid)
+
+    userid = util.wsgi_path_item(req.environ, 'userid')
+    info = _guest_get_iucv_session_health(req, userid)
+
+    info_json = json.dumps(info)
+    req.response.status = util.get_http_code_from_sdk_return(info,
+        additional_handler=util.handle_not_found)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
 @util.SdkWsgify
 @tokens.validate
 def guest_create(req):
@@ -618,16 +756,60 @@ def guest_create(req):
 
 @util.SdkWsgify
 @tokens.validate
-def guest_list(req):
-    def _guest_list():
+def guest_create_bulk(req):
+
+    def _guest_create_bulk(req):
         action = get_handler()
-        return action.list()
+        body = util.extract_json(req.body)
+
+        return action.create_bulk(body=body)
+
+    info = _guest_create_bulk(req)
 
-    info = _guest_list()
     info_json = json.dumps(info)
     req.response.body = utils.to_utf8(info_json)
+    req.response.status = util.get_http_code_from_sdk_return(info)
     req.response.content_type = 'application/json'
-    req.response.status = 200
+    return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def guest_delete_bulk(req):
+
+    def _guest_delete_bulk(req):
+        action = get_handler()
+        body = util.extract_json(req.body)
+
+        return action.delete_bulk(body=body)
+
+    info, more_waves = _guest_delete_bulk(req)
+
+    if info['overallRC'] == 0:
+        req.response.app_iter = _iter_bulk_results(info, more_waves,
+                                                   _failed_delete_result)
+    else:
+        req.response.body = utils.to_utf8(json.dumps(info))
+    req.response.status = util.get_http_code_from_sdk_return(info)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def guest_list(req):
+    def _guest_list(req, **kwargs):
+        action = get_handler()
+        return action.list(req, **kwargs)
+
+    kwargs = {}
+    for param in ('limit', 'marker'):
+        if param in req.GET:
+            kwargs[param] = req.GET[param]
+    info = _guest_list(req, **kwargs)
+    req.response.app_iter = utils.iter_json(info)
+    req.response.content_type = 'application/json'
+    req.response.status = util.get_http_code_from_sdk_return(info)
     return req.response
 
 
@@ -764,6 +946,142 @@ def guest_create_network_interface(req):
     return req.response
 
 
+@util.SdkWsgify
+@tokens.validate
+def guest_live_migrate_bulk(req):
+
+    def _guest_live_migrate_bulk(req):
+        action = get_handler()
+        body = util.extract_json(req.body)
+
+        return action.live_migrate_bulk(body=body)
+
+    info = _guest_live_migrate_bulk(req)
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.status = util.get_http_code_from_sdk_return(info,
+        additional_handler=util.handle_not_found_and_conflict)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def guest_live_resize_bulk(req):
+
+    def _guest_live_resize_bulk(req):
+        action = get_handler()
+        body = util.extract_json(req.body)
+
+        return action.live_resize_bulk(body=body)
+
+    info = _guest_live_resize_bulk(req)
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.status = util.get_http_code_from_sdk_return(info,
+        additional_handler=util.handle_not_found_and_conflict)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def guest_get_console_output_bulk(req):
+
+    def _guest_get_console_output_bulk(req):
+        action = get_handler()
+        body = util.extract_json(req.body)
+
+        return action.get_console_output_bulk(body=body)
+
+    info = _guest_get_console_output_bulk(req)
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.status = util.get_http_code_from_sdk_return(info)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
+def _iter_bulk_results(info, more_waves, failed_result):
+    """Yield the JSON of info with the results of the following waves
+    appended to its output as soon as each wave is done, failed_result
+    makes the result of a guest from its userid and the return of the
+    wave if the wave failed."""
+    head = dict(info)
+    results = head.pop('output')
+    yield utils.to_utf8(json.dumps(head)[:-1] + ', "output": [')
+    sep = ''
+    while True:
+        for result in results:
+            yield utils.to_utf8(sep + json.dumps(result))
+            sep = ', '
+        try:
+            wave, more = next(more_waves)
+        except StopIteration:
+            break
+        if more['overallRC'] == 0:
+            results = more['output']
+        else:
+            # the status is already sent, report the failure per guest
+            results = [failed_result(userid, more) for userid in wave]
+    yield b']}'
+
+
+def _failed_cmd_result(userid, info):
+    return {'userid': userid, 'overallRC': info['overallRC'],
+            'rc': info['rc'], 'rs': info['rs'], 'output': [],
+            'errmsg': info['errmsg'], 'duration': 0}
+
+
+def _failed_delete_result(userid, info):
+    return {'userid': userid, 'result': 'failed', 'errmsg': info['errmsg'],
+            'timings': {}}
+
+
+@util.SdkWsgify
+@tokens.validate
+def guest_execute_cmd_bulk(req):
+
+    def _guest_execute_cmd_bulk(req):
+        action = get_handler()
+        body = util.extract_json(req.body)
+
+        return action.execute_cmd_bulk(body=body)
+
+    info, more_waves = _guest_execute_cmd_bulk(req)
+
+    if info['overallRC'] == 0:
+        req.response.app_iter = _iter_bulk_results(info, more_waves,
+                                                   _failed_cmd_result)
+    else:
+        req.response.body = utils.to_utf8(json.dumps(info))
+    req.response.status = util.get_http_code_from_sdk_return(info)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def guest_create_network_interface_bulk(req):
+
+    def _guest_create_network_interface_bulk(req):
+        action = get_handler()
+        body = util.extract_json(req.body)
+
+        return action.create_network_interface_bulk(body=body)
+
+    info = _guest_create_network_interface_bulk(req)
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.status = util.get_http_code_from_sdk_return(info)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
 @util.SdkWsgify
 @tokens.validate
 def guest_delete_network_interface(req):
@@ -801,16 +1119,19 @@ def guest_get_stats(req):
 
     userid_list = _get_userid_list(req)
 
-    def _guest_get_stats(req, userid_list):
+    def _guest_get_stats(req, userid_list, **kwargs):
         action = get_handler()
-        return action.inspect_stats(req, userid_list)
+        return action.inspect_stats(req, userid_list, **kwargs)
 
-    info = _guest_get_stats(req, userid_list)
+    kwargs = {}
+    for param in ('limit', 'marker', 'fields'):
+        if param in req.GET:
+            kwargs[param] = req.GET[param]
+    info = _guest_get_stats(req, userid_list, **kwargs)
 
-    info_json = json.dumps(info)
     req.response.status = util.get_http_code_from_sdk_return(info,
         additional_handler=util.handle_not_found)
-    req.response.body = utils.to_utf8(info_json)
+    req.response.app_iter = utils.iter_json(info)
     req.response.content_type = 'application/json'
     return req.response
 
@@ -839,21 +1160,26 @@ def guest_get_interface_stats(req):
 @tokens.validate
 def guests_get_nic_info(req):
 
-    def _guests_get_nic_DB_info(req, userid=None, nic_id=None, vswitch=None):
+    def _guests_get_nic_DB_info(req, userid=None, nic_id=None, vswitch=None,
+                                limit=None, marker=None, fields=None):
         action = get_handler()
         return action.get_nic_DB_info(req, userid=userid, nic_id=nic_id,
-                                      vswitch=vswitch)
+                                      vswitch=vswitch, limit=limit,
+                                      marker=marker, fields=fields)
     userid = req.GET.get('userid', None)
     nic_id = req.GET.get('nic_id', None)
     vswitch = req.GET.get('vswitch', None)
+    limit = req.GET.get('limit', None)
+    marker = req.GET.get('marker', None)
+    fields = req.GET.get('fields', None)
 
     info = _guests_get_nic_DB_info(req, userid=userid, nic_id=nic_id,
-                                   vswitch=vswitch)
+                                   vswitch=vswitch, limit=limit,
+                                   marker=marker, fields=fields)
 
-    info_json = json.dumps(info)
     req.response.status = util.get_http_code_from_sdk_return(info,
         additional_handler=util.handle_not_found)
-    req.response.body = utils.to_utf8(info_json)
+    req.response.app_iter = utils.iter_json(info)
     req.response.content_type = 'application/json'
     return req.response
 
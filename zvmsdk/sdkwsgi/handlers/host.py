@@ -16,7 +16,6 @@
 
 import json
 
-from zvmconnector import connector
 from zvmsdk import config
 from zvmsdk import log
 from zvmsdk.sdkwsgi.handlers import tokens
@@ -35,16 +34,30 @@ LOG = log.LOG
 class HostAction(object):
 
     def __init__(self):
-        self.client = connector.ZVMConnector(connection_type='socket',
-                                             ip_addr=CONF.sdkserver.bind_addr,
-                                             port=CONF.sdkserver.bind_port)
-
-    def get_info(self):
-        info = self.client.send_request('host_get_info')
+        self.client = util.get_sdk_connector()
+
+    @validation.query_schema(host.get_info)
+    def get_info(self, req, refresh=None):
+        if refresh is not None:
+            refresh = util.bool_from_string(refresh)
+            info = self.client.send_request('host_get_info', refresh=refresh)
+        else:
+            info = self.client.send_request('host_get_info')
         return info
 
-    def get_guest_list(self):
-        info = self.client.send_request('host_get_guest_list')
+    @validation.query_schema(host.guest_list)
+    def get_guest_list(self, req, limit=None, marker=None, sdk_managed=None,
+                       migrated=None):
+        if limit is not None:
+            limit = int(limit)
+        if sdk_managed is not None:
+            sdk_managed = util.bool_from_string(sdk_managed)
+        if migrated is not None:
+            migrated = util.bool_from_string(migrated)
+        info = self.client.send_request('host_get_guest_list', limit=limit,
+                                        marker=marker,
+                                        sdk_managed=sdk_managed,
+                                        migrated=migrated)
         return info
 
     @validation.query_schema(image.diskpool)
@@ -77,11 +90,14 @@ def get_action():
 @tokens.validate
 def host_get_info(req):
 
-    def _host_get_info():
+    def _host_get_info(req, **kwargs):
         action = get_action()
-        return action.get_info()
+        return action.get_info(req, **kwargs)
 
-    info = _host_get_info()
+    kwargs = {}
+    if 'refresh' in req.GET:
+        kwargs['refresh'] = req.GET['refresh']
+    info = _host_get_info(req, **kwargs)
     info_json = json.dumps(info)
     req.response.status = util.get_http_code_from_sdk_return(info)
     req.response.body = utils.to_utf8(info_json)
@@ -93,13 +109,16 @@ def host_get_info(req):
 @tokens.validate
 def host_get_guest_list(req):
 
-    def _host_get_guest_list():
+    def _host_get_guest_list(req, **kwargs):
         action = get_action()
-        return action.get_guest_list()
-
-    info = _host_get_guest_list()
-    info_json = json.dumps(info)
-    req.response.body = utils.to_utf8(info_json)
+        return action.get_guest_list(req, **kwargs)
+
+    kwargs = {}
+    for param in ('limit', 'marker', 'sdk_managed', 'migrated'):
+        if param in req.GET:
+            kwargs[param] = req.GET[param]
+    info = _host_get_guest_list(req, **kwargs)
+    req.response.app_iter = utils.iter_json(info)
     req.response.content_type = 'application/json'
     req.response.status = util.get_http_code_from_sdk_return(info)
     return req.response
@@ -15,7 +15,6 @@
 """Handler for the image of the sdk API."""
 import json
 
-from zvmconnector import connector
 from zvmsdk import config
 from zvmsdk import log
 from zvmsdk import utils
@@ -33,9 +32,7 @@ LOG = log.LOG
 class ImageAction(object):
 
     def __init__(self):
-        self.client = connector.ZVMConnector(connection_type='socket',
-                                             ip_addr=CONF.sdkserver.bind_addr,
-                                             port=CONF.sdkserver.bind_port)
+        self.client = util.get_sdk_connector()
 
     @validation.schema(image.create)
     def create(self, body):
@@ -62,8 +59,15 @@ class ImageAction(object):
         return info
 
     @validation.query_schema(image.query)
-    def query(self, req, name):
-        info = self.client.send_request('image_query', name)
+    def query(self, req, name, limit=None, marker=None, fields=None,
+              os_distro=None):
+        if limit is not None:
+            limit = int(limit)
+        if fields is not None:
+            fields = fields.split(',')
+        info = self.client.send_request('image_query', name, limit=limit,
+                                        marker=marker, fields=fields,
+                                        os_distro=os_distro)
         return info
 
     @validation.schema(image.export)
@@ -162,17 +166,20 @@ def image_export(req):
 @tokens.validate
 def image_query(req):
 
-    def _image_query(imagename, req):
+    def _image_query(imagename, req, **kwargs):
         action = get_action()
-        return action.query(req, imagename)
+        return action.query(req, imagename, **kwargs)
 
     imagename = None
     if 'imagename' in req.GET:
         imagename = req.GET['imagename']
-    info = _image_query(imagename, req)
+    kwargs = {}
+    for param in ('limit', 'marker', 'fields', 'os_distro'):
+        if param in req.GET:
+            kwargs[param] = req.GET[param]
+    info = _image_query(imagename, req, **kwargs)
 
-    info_json = json.dumps(info)
-    req.response.body = utils.to_utf8(info_json)
+    req.response.app_iter = utils.iter_json(info)
     req.response.status = util.get_http_code_from_sdk_return(info,
         additional_handler = util.handle_not_found)
     req.response.content_type = 'application/json'
@@ -16,7 +16,6 @@
 
 import json
 
-from zvmconnector import connector
 from zvmsdk import config
 from zvmsdk import log
 from zvmsdk.sdkwsgi.handlers import tokens
@@ -33,9 +32,7 @@ LOG = log.LOG
 
 class VolumeAction(object):
     def __init__(self):
-        self.client = connector.ZVMConnector(connection_type='socket',
-                                             ip_addr=CONF.sdkserver.bind_addr,
-                                             port=CONF.sdkserver.bind_port)
+        self.client = util.get_sdk_connector()
 
     @validation.schema(volume.attach)
     def attach(self, body):
@@ -55,6 +52,22 @@ class VolumeAction(object):
 
         return info
 
+    @validation.schema(volume.attach_bulk)
+    def attach_bulk(self, body):
+        connections = body['info']['connections']
+
+        info = self.client.send_request('volume_attach_bulk', connections)
+
+        return info
+
+    @validation.schema(volume.detach_bulk)
+    def detach_bulk(self, body):
+        connections = body['info']['connections']
+
+        info = self.client.send_request('volume_detach_bulk', connections)
+
+        return info
+
     @validation.query_schema(volume.get_volume_connector)
     def get_volume_connector(self, req, userid, reserve):
         conn = self.client.send_request('get_volume_connector',
@@ -62,8 +75,11 @@ class VolumeAction(object):
         return conn
 
     @validation.query_schema(volume.get_all_fcp_usage)
-    def get_all_fcp_usage(self, req, userid):
-        return self.client.send_request('get_all_fcp_usage', userid)
+    def get_all_fcp_usage(self, req, userid, limit=None, marker=None):
+        if limit is not None:
+            limit = int(limit)
+        return self.client.send_request('get_all_fcp_usage', userid,
+                                        limit=limit, marker=marker)
 
     @validation.query_schema(volume.get_fcp_usage)
     def get_fcp_usage(self, req, fcp):
@@ -129,6 +145,42 @@ def volume_detach(req):
     return req.response
 
 
+@util.SdkWsgify
+@tokens.validate
+def volume_attach_bulk(req):
+
+    def _volume_attach_bulk(req):
+        action = get_action()
+        body = util.extract_json(req.body)
+        return action.attach_bulk(body=body)
+
+    info = _volume_attach_bulk(req)
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.content_type = 'application/json'
+    req.response.status = util.get_http_code_from_sdk_return(info, default=200)
+    return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def volume_detach_bulk(req):
+
+    def _volume_detach_bulk(req):
+        action = get_action()
+        body = util.extract_json(req.body)
+        return action.detach_bulk(body=body)
+
+    info = _volume_detach_bulk(req)
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.content_type = 'application/json'
+    req.response.status = util.get_http_code_from_sdk_return(info, default=200)
+    return req.response
+
+
 @util.SdkWsgify
 @tokens.validate
 def volume_refresh_bootmap(req):
@@ -209,19 +261,22 @@ def set_fcp_usage(req):
 @util.SdkWsgify
 @tokens.validate
 def get_all_fcp_usage(req):
-    def _get_all_fcp_usage(req, userid):
+    def _get_all_fcp_usage(req, userid, **kwargs):
         action = get_action()
-        return action.get_all_fcp_usage(req, userid)
+        return action.get_all_fcp_usage(req, userid, **kwargs)
 
     if 'userid' in req.GET.keys():
         userid = req.GET['userid']
     else:
         userid = None
-    ret = _get_all_fcp_usage(req, userid)
+    kwargs = {}
+    for param in ('limit', 'marker'):
+        if param in req.GET:
+            kwargs[param] = req.GET[param]
+    ret = _get_all_fcp_usage(req, userid, **kwargs)
 
-    ret_json = json.dumps(ret)
     req.response.status = util.get_http_code_from_sdk_return(ret,
                     additional_handler=util.handle_not_found)
     req.response.content_type = 'application/json'
-    req.response.body = utils.to_utf8(ret_json)
+    req.response.app_iter = utils.iter_json(ret)
     return req.response
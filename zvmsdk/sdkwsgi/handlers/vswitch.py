@@ -16,7 +16,6 @@
 
 import json
 
-from zvmconnector import connector
 from zvmsdk import config
 from zvmsdk import log
 from zvmsdk.sdkwsgi.handlers import tokens
@@ -33,9 +32,7 @@ LOG = log.LOG
 
 class VswitchAction(object):
     def __init__(self):
-        self.client = connector.ZVMConnector(connection_type='socket',
-                                             ip_addr=CONF.sdkserver.bind_addr,
-                                             port=CONF.sdkserver.bind_port)
+        self.client = util.get_sdk_connector()
 
     def list(self):
         return self.client.send_request('vswitch_get_list')
@@ -77,6 +74,15 @@ class VswitchAction(object):
         info = self.client.send_request('vswitch_query', name)
         return info
 
+    def cache_stats(self):
+        return self.client.send_request('vswitch_cache_stats')
+
+    @validation.schema(vswitch.cache_refresh)
+    def cache_refresh(self, body):
+        names = body['vswitch_cache'].get('vswitch_names', None)
+        return self.client.send_request('vswitch_cache_refresh',
+                                        vswitch_names=names)
+
     @validation.schema(vswitch.update)
     def update(self, name, body):
         vsw = body['vswitch']
@@ -203,3 +209,38 @@ def vswitch_query(req):
         additional_handler=util.handle_not_found)
     req.response.content_type = 'application/json'
     return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def vswitch_cache_stats(req):
+
+    def _vswitch_cache_stats():
+        action = get_action()
+        return action.cache_stats()
+
+    info = _vswitch_cache_stats()
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.status = util.get_http_code_from_sdk_return(info)
+    req.response.content_type = 'application/json'
+    return req.response
+
+
+@util.SdkWsgify
+@tokens.validate
+def vswitch_cache_refresh(req):
+
+    def _vswitch_cache_refresh(req):
+        body = util.extract_json(req.body)
+        action = get_action()
+        return action.cache_refresh(body=body)
+
+    info = _vswitch_cache_refresh(req)
+
+    info_json = json.dumps(info)
+    req.response.body = utils.to_utf8(info_json)
+    req.response.status = util.get_http_code_from_sdk_return(info)
+    req.response.content_type = 'application/json'
+    return req.response
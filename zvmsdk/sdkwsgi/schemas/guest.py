@@ -46,6 +46,61 @@ create = {
     'additionalProperties': False,
 }
 
+create_bulk = {
+    'type': 'object',
+    'properties': {
+        'guests': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'userid': parameter_types.userid,
+                    'vcpus': parameter_types.positive_integer,
+                    'memory': parameter_types.positive_integer,
+                    'user_profile': parameter_types.userid_or_None,
+                    'disk_list': parameter_types.disk_list,
+                    'max_cpu': parameter_types.max_cpu,
+                    'max_mem': parameter_types.max_mem,
+                    'ipl_from': parameter_types.ipl_from,
+                    'ipl_param': parameter_types.ipl_param,
+                    'ipl_loadparam': parameter_types.ipl_loadparam,
+                    'dedicate_vdevs': parameter_types.dedicate_vdevs,
+                    'loaddev': parameter_types.loaddev,
+                    'account': parameter_types.account,
+                    'comment_list': parameter_types.comment_list
+                },
+                'required': ['userid', 'vcpus', 'memory'],
+                'additionalProperties': False,
+            },
+            'minItems': 1,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['guests'],
+    'additionalProperties': False,
+}
+
+delete_bulk = {
+    'type': 'object',
+    'properties': {
+        'delete': {
+            'type': 'object',
+            'properties': {
+                'userid_list': {
+                    'type': 'array',
+                    'items': parameter_types.userid,
+                    'minItems': 1,
+                },
+            },
+            'required': ['userid_list'],
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['delete'],
+    'additionalProperties': False,
+}
+
 live_migrate_vm = {
     'type': 'object',
     'properties': {
@@ -98,6 +153,108 @@ create_network_interface = {
 }
 
 
+create_network_interface_bulk = {
+    'type': 'object',
+    'properties': {
+        'interface': {
+            'type': 'object',
+            'properties': {
+                'interfaces': {
+                    'type': 'array',
+                    'items': parameter_types.bulk_network_interface,
+                    'minItems': 1,
+                },
+                'active': parameter_types.boolean,
+            },
+            'required': ['interfaces'],
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['interface'],
+    'additionalProperties': False,
+}
+
+
+execute_cmd_bulk = {
+    'type': 'object',
+    'properties': {
+        'execute': {
+            'type': 'object',
+            'properties': {
+                'userid_list': {
+                    'type': 'array',
+                    'items': parameter_types.userid,
+                    'minItems': 1,
+                },
+                'cmd': {'type': 'string', 'minLength': 1},
+                'concurrency': parameter_types.positive_integer,
+                'timeout': parameter_types.non_negative_integer,
+            },
+            'required': ['userid_list', 'cmd'],
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['execute'],
+    'additionalProperties': False,
+}
+
+
+live_migrate_bulk = {
+    'type': 'object',
+    'properties': {
+        'migrate': {
+            'type': 'object',
+            'properties': {
+                'userid_list': {
+                    'type': 'array',
+                    'items': parameter_types.userid,
+                    'minItems': 1,
+                },
+                'dest_zcc_userid': parameter_types.userid,
+                'destination': parameter_types.userid,
+                'parms': parameter_types.live_migrate_parms,
+                'concurrency': parameter_types.positive_integer,
+            },
+            'required': ['userid_list', 'dest_zcc_userid', 'destination'],
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['migrate'],
+    'additionalProperties': False,
+}
+
+
+get_console_output_bulk = {
+    'type': 'object',
+    'properties': {
+        'console': {
+            'type': 'object',
+            'properties': {
+                'userid_list': {
+                    'type': 'array',
+                    'items': parameter_types.userid,
+                    'minItems': 1,
+                },
+                'cursors': {
+                    'type': 'object',
+                    'additionalProperties': {
+                        'type': 'integer', 'minimum': 0,
+                    },
+                },
+            },
+            'required': ['userid_list'],
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['console'],
+    'additionalProperties': False,
+}
+
+
 delete_network_interface = {
     'type': 'object',
     'properties': {
@@ -248,6 +405,49 @@ resize_mem = {
 }
 
 
+live_resize = {
+    'type': 'object',
+    'properties': {
+        'cpu_cnt': parameter_types.max_cpu,
+        'memory': parameter_types.max_mem,
+    },
+    'minProperties': 1,
+    'additionalProperties': False,
+}
+
+
+live_resize_bulk = {
+    'type': 'object',
+    'properties': {
+        'resize': {
+            'type': 'object',
+            'properties': {
+                'resizes': {
+                    'type': 'array',
+                    'items': {
+                        'type': 'object',
+                        'properties': {
+                            'userid': parameter_types.userid,
+                            'cpu_cnt': parameter_types.max_cpu,
+                            'memory': parameter_types.max_mem,
+                        },
+                        'required': ['userid'],
+                        'minProperties': 2,
+                        'additionalProperties': False,
+                    },
+                    'minItems': 1,
+                },
+            },
+            'required': ['resizes'],
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['resize'],
+    'additionalProperties': False,
+}
+
+
 userid_list_query = {
     'type': 'object',
     'properties': {
@@ -283,12 +483,35 @@ userid_list_array_query = {
     'additionalProperties': False
 }
 
+guest_list = {
+    'type': 'object',
+    'properties': {
+        'limit': parameter_types.positive_integer_list,
+        'marker': parameter_types.userid_marker_list,
+    },
+    'additionalProperties': False
+}
+
+stats_query = {
+    'type': 'object',
+    'properties': {
+        'userid': parameter_types.userid_list_array,
+        'limit': parameter_types.positive_integer_list,
+        'marker': parameter_types.userid_marker_list,
+        'fields': parameter_types.fields_list,
+    },
+    'additionalProperties': False
+}
+
 nic_DB_info = {
     'type': 'object',
     'properties': {
         'userid': parameter_types.userid,
         'nic_id': parameter_types.nic_id,
         'vswitch': parameter_types.vswitch_name,
+        'limit': parameter_types.positive_integer,
+        'marker': {'type': 'string', 'pattern': '^\\w{1,8}:\\w{1,4}$'},
+        'fields': {'type': 'string', 'pattern': '^\\w+(,\\w+)*$'},
     },
     'additionalProperties': False,
 }
@@ -302,6 +525,15 @@ start = {
     'additionalProperties': False,
 }
 
+reboot = {
+    'type': 'object',
+    'properties': {
+        'userid': parameter_types.userid,
+        'timeout': parameter_types.non_negative_integer,
+    },
+    'additionalProperties': False,
+}
+
 stop = {
     'type': 'object',
     'properties': {
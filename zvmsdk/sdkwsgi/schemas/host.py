@@ -15,6 +15,27 @@
 from zvmsdk.sdkwsgi.validation import parameter_types
 
 
+get_info = {
+    'type': 'object',
+    'properties': {
+        'refresh': parameter_types.boolean_list
+    },
+    'additionalProperties': False
+}
+
+
+guest_list = {
+    'type': 'object',
+    'properties': {
+        'limit': parameter_types.positive_integer_list,
+        'marker': parameter_types.userid_marker_list,
+        'sdk_managed': parameter_types.boolean_list,
+        'migrated': parameter_types.boolean_list
+    },
+    'additionalProperties': False
+}
+
+
 volume = {
     'type': 'object',
     'properties': {
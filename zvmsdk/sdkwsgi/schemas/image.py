@@ -58,7 +58,11 @@ export = {
 query = {
     'type': 'object',
     'properties': {
-        'imagename': parameter_types.image_list
+        'imagename': parameter_types.image_list,
+        'limit': parameter_types.positive_integer_list,
+        'marker': parameter_types.image_list,
+        'fields': parameter_types.fields_list,
+        'os_distro': parameter_types.os_version_list,
     },
     'additionalProperties': True
 }
@@ -51,6 +51,31 @@ detach = {
 }
 
 
+attach_bulk = {
+    'type': 'object',
+    'properties': {
+        'info': {
+            'type': 'object',
+            'properties': {
+                'connections': {
+                    'type': 'array',
+                    'items': parameter_types.connection_info,
+                    'minItems': 1,
+                },
+            },
+            'required': ['connections'],
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['info'],
+    'additionalProperties': False,
+}
+
+
+detach_bulk = attach_bulk
+
+
 get_fcp_usage = {
     'type': 'object',
     'properties': {
@@ -65,6 +90,8 @@ get_all_fcp_usage = {
     'type': 'object',
     'properties': {
         'userid': parameter_types.userid_list_array,
+        'limit': parameter_types.positive_integer_list,
+        'marker': parameter_types.fcp_id_list,
     },
     'additionalProperties': False,
 }
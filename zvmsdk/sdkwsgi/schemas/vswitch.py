@@ -49,6 +49,26 @@ create = {
 }
 
 
+cache_refresh = {
+    'type': 'object',
+    'properties': {
+        'vswitch_cache': {
+            'type': 'object',
+            'properties': {
+                'vswitch_names': {
+                    'type': 'array',
+                    'items': parameter_types.vswitch_name,
+                },
+            },
+            'additionalProperties': False,
+        },
+        'additionalProperties': False,
+    },
+    'required': ['vswitch_cache'],
+    'additionalProperties': False,
+}
+
+
 update = {
     'type': 'object',
     'properties': {
@@ -18,9 +18,12 @@ import six
 import webob
 from webob.dec import wsgify
 
+from zvmconnector import connector
+from zvmsdk import config
 from zvmsdk import log
 
 
+CONF = config.CONF
 LOG = log.LOG
 SDKWSGI_MODID = 120
 
@@ -92,6 +95,17 @@ def bool_from_string(subject, strict=False, default=False):
         return default
 
 
+def get_sdk_connector():
+    """Return the connector used by the handlers to call SDK API, either
+    through the SDK server socket or directly in this process."""
+    if CONF.wsgi.connection_type == connector.CONN_TYPE_INPROCESS:
+        return connector.ZVMConnector(
+            connection_type=connector.CONN_TYPE_INPROCESS)
+    return connector.ZVMConnector(connection_type=connector.CONN_TYPE_SOCKET,
+                                  ip_addr=CONF.sdkserver.bind_addr,
+                                  port=CONF.sdkserver.bind_port)
+
+
 def get_request_uri(environ):
     name = environ.get('SCRIPT_NAME', '')
     info = environ.get('PATH_INFO', '')
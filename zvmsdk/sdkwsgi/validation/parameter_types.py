@@ -301,6 +301,39 @@ userid_list = {
     'pattern': '^(\s*\w{1,8}\s*)(,\s*\w{1,8}\s*){0,}$'
 }
 
+positive_integer_list = {
+    'maxItems': 1,
+    'items': {
+        'type': 'string',
+        'pattern': '^[0-9]*[1-9][0-9]*$'
+    },
+    'type': 'array'
+}
+
+userid_marker_list = {
+    'maxItems': 1,
+    'items': {
+        'type': 'string',
+        'pattern': '^\w{1,8}$'
+    },
+    'type': 'array'
+}
+
+fields_list = {
+    'maxItems': 1,
+    'items': {
+        'type': 'string',
+        'pattern': '^\w+(,\w+)*$'
+    },
+    'type': 'array'
+}
+
+boolean_list = {
+    'maxItems': 1,
+    'items': boolean,
+    'type': 'array'
+}
+
 userid_list_array = {
     'items': {
         'type': ['string'],
@@ -425,6 +458,12 @@ os_version = {
 ]
 }
 
+os_version_list = {
+    'maxItems': 1,
+    'items': os_version,
+    'type': 'array'
+}
+
 disk_type = {
     'type': 'string',
     'enum': ['DASD', 'dasd', 'SCSI', 'scsi']
@@ -517,6 +556,12 @@ fcp_id = {
     'pattern': '^[0-9a-fA-F]{4}$'
 }
 
+fcp_id_list = {
+    'maxItems': 1,
+    'items': fcp_id,
+    'type': 'array'
+}
+
 wwpn = {
     'type': 'array',
     'items': {
@@ -608,3 +653,26 @@ vlan_id_or_minus_1 = {
     'minimum': -1,
     'maximum': 4094,
 }
+
+bulk_network_interface = {
+    'type': 'object',
+    'properties': {
+        'userid': userid,
+        'os_version': os_version,
+        'guest_networks': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': dict(network_list['items']['properties'],
+                                   vswitch_name=vswitch_name,
+                                   vlan_id=vlan_id_or_minus_1),
+                'dependencies': {
+                    'ip_addr': ['cidr']
+                }
+            },
+            'minItems': 1,
+        },
+    },
+    'required': ['userid', 'os_version', 'guest_networks'],
+    'additionalProperties': False,
+}
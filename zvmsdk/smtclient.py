@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import copy
 import functools
 import hashlib
 import math
@@ -29,13 +31,16 @@ import requests
 import threading
 import os
 import re
+import shlex
 import six
 import string
 import subprocess
 import tempfile
 import time
 
+from smtLayer import ReqHandle
 from smtLayer import smt
+from smtLayer import vmUtils
 
 from zvmsdk import config
 from zvmsdk import constants as const
@@ -51,6 +56,9 @@ LOG = log.LOG
 
 _LOCK = threading.Lock()
 CHUNKSIZE = 4096
+# separates the outputs of the commands reading the state of a guest to live
+# resize
+_RESIZE_STATE_SEPARATOR = '==== zvmsdk live resize ===='
 
 _SMT_CLIENT = None
 
@@ -75,6 +83,61 @@ class SMTClient(object):
         self._NetDbOperator = database.NetworkDbOperator()
         self._GuestDbOperator = database.GuestDbOperator()
         self._ImageDbOperator = database.ImageDbOperator()
+        self._image_catalog = ImageCatalog(self._ImageDbOperator)
+        self._user_direct_locks = {}
+        self._user_direct_locks_lock = threading.Lock()
+        # vmur allows only one instance on the reader at a time
+        self._reader_lock = threading.Lock()
+        self._user_direct_cache = UserDirectCache()
+        self._vswitch_cache = VswitchCache()
+        # increased when a guest is created or deleted in the directory
+        self._directory_generation = 0
+
+    def _invalidate_user_direct_cache(self, requestData):
+        """Drop the cached directory entry of the userid whose directory
+        may be changed by requestData."""
+        fields = requestData.split()
+        if len(fields) < 3:
+            return
+        func = fields[0].lower()
+        if func in ('makevm', 'deletevm'):
+            with self._user_direct_locks_lock:
+                self._directory_generation += 1
+        if ((func in ('makevm', 'deletevm')) or
+            (func == 'changevm' and fields[2].lower() not in
+             ('punchfile', 'purgerdr', 'aemod', 'formatdisk')) or
+            (func == 'smapi' and len(fields) > 3 and
+             fields[3].endswith('_DM'))):
+            self._user_direct_cache.invalidate(fields[1])
+
+    def _invalidate_vswitch_cache(self, requestData):
+        """Drop the cached vswitch or OSA state which may be changed by
+        requestData."""
+        fields = requestData.split()
+        if len(fields) < 4 or fields[0].lower() != 'smapi':
+            return
+        api_name = fields[3]
+        switch = re.search(r'switch_name=(\S+)', requestData)
+        if api_name in ('Virtual_Network_Vswitch_Create_Extended',
+                        'Virtual_Network_Vswitch_Delete_Extended'):
+            self._vswitch_cache.invalidate(VswitchCache.LIST)
+            self._vswitch_cache.invalidate(VswitchCache.OSA)
+            if switch:
+                self._vswitch_cache.invalidate(switch.group(1))
+        elif api_name == 'Virtual_Network_Vswitch_Set_Extended':
+            if 'real_device_address' in requestData:
+                self._vswitch_cache.invalidate(VswitchCache.OSA)
+            if switch:
+                self._vswitch_cache.invalidate(switch.group(1))
+        elif api_name == 'Virtual_Network_Adapter_Connect_Vswitch':
+            switch = re.search(r'-n (\S+)', requestData)
+            if switch:
+                self._vswitch_cache.invalidate(switch.group(1))
+        elif api_name == 'Virtual_Network_Adapter_Disconnect':
+            # the vswitch of the nic is not in the request
+            self._vswitch_cache.invalidate_vswitches()
+        elif api_name in ('Image_Device_Dedicate', 'Image_Device_Undedicate'):
+            self._vswitch_cache.invalidate(VswitchCache.OSA)
 
     def _request(self, requestData):
         try:
@@ -82,6 +145,9 @@ class SMTClient(object):
         except Exception as err:
             LOG.error('SMT internal parse encounter error')
             raise exception.SDKInternalError(msg=err, modID='smt')
+        finally:
+            self._invalidate_user_direct_cache(str(requestData))
+            self._invalidate_vswitch_cache(str(requestData))
 
         def _is_smt_internal_error(results):
             internal_error_list = returncode.SMT_INTERNAL_ERROR
@@ -185,15 +251,15 @@ class SMTClient(object):
                 raise exception.SDKGuestOperationError(rs=2, msg=msg)
 
         for idx, disk in enumerate(disk_list):
-            if 'vdev' in disk:
-                # this means user want to create their own device number
-                vdev = disk['vdev']
-            else:
-                vdev = self.generate_disk_vdev(start_vdev=start_vdev,
-                                               offset=idx)
-            self._add_mdisk(userid, disk, vdev)
-            disk['vdev'] = vdev
+            # if vdev is specified, this means user want to create their
+            # own device number
+            if 'vdev' not in disk:
+                disk['vdev'] = self.generate_disk_vdev(start_vdev=start_vdev,
+                                                       offset=idx)
+
+        self._provision_mdisks(userid, disk_list)
 
+        for disk in disk_list:
             sizeUpper = disk.get('size').strip().upper()
             sizeUnit = sizeUpper[-1]
             if sizeUnit != 'G' and sizeUnit != 'M':
@@ -216,6 +282,85 @@ class SMTClient(object):
 
         return disk_list
 
+    def _provision_mdisks(self, userid, disk_list):
+        """Create the minidisks in disk_list for userid.
+
+        The directory updates of one userid are serialized. When more than
+        one minidisk is added to a guest which is not logged on, all the
+        minidisks are added to the directory first and their filesystems are
+        created in parallel afterwards, otherwise each minidisk is added
+        together with its filesystem so it is formatted before being added
+        to the active configuration. If any minidisk fails, the minidisks
+        created by this call are removed again.
+        """
+        created = []
+        failures = {}
+        with zvmutils.acquire_lock(self._get_user_direct_lock(userid)):
+            parallel_format = (len(disk_list) > 1 and
+                               self.get_power_state(userid) == 'off')
+            for disk in disk_list:
+                try:
+                    self._add_mdisk(userid, disk, disk['vdev'],
+                                    with_filesystem=not parallel_format)
+                except Exception as err:
+                    failures[disk['vdev']] = err
+                    break
+                created.append(disk['vdev'])
+
+        if parallel_format and not failures:
+            format_disks = [disk for disk in disk_list
+                            if self._get_mdisk_filesystem(disk)]
+            format_results = zvmutils.run_in_parallel(
+                self._format_mdisk,
+                [(userid, disk) for disk in format_disks],
+                max_workers=CONF.guest.max_concurrent_disk_format)
+            for disk, (result, err) in zip(format_disks, format_results):
+                if err is not None:
+                    failures[disk['vdev']] = err
+
+        if not failures:
+            return
+
+        disk_results = []
+        for disk in disk_list:
+            vdev = disk['vdev']
+            if vdev in failures:
+                status = 'failed'
+            elif vdev in created:
+                status = 'rolled back'
+            else:
+                status = 'not created'
+            disk_results.append('%s: %s' % (vdev, status))
+        LOG.error("Failed to add mdisks to userid '%s', results: %s, "
+                  "begin to remove the created mdisks %s" %
+                  (userid, ', '.join(disk_results), created))
+        self._rollback_mdisks(userid, created)
+
+        err = [failures[disk['vdev']] for disk in disk_list
+               if disk['vdev'] in failures][0]
+        if isinstance(err, exception.SDKSMTRequestFailed):
+            msg = ("%s Results of mdisks: %s" %
+                   (err.format_message(), ', '.join(disk_results)))
+            raise exception.SDKSMTRequestFailed(err.results, msg)
+        raise err
+
+    def _rollback_mdisks(self, userid, vdev_list):
+        with zvmutils.acquire_lock(self._get_user_direct_lock(userid)):
+            for vdev in vdev_list:
+                try:
+                    self._remove_mdisk(userid, vdev)
+                except exception.SDKBaseException as err:
+                    LOG.error("Failed to remove mdisk '%s' of userid '%s' "
+                              "in rollback, error: %s" %
+                              (vdev, userid, err.format_message()))
+
+    def _get_user_direct_lock(self, userid):
+        """Return the lock used to serialize the directory updates of
+        userid."""
+        with zvmutils.acquire_lock(self._user_direct_locks_lock):
+            return self._user_direct_locks.setdefault(userid.upper(),
+                                                      threading.RLock())
+
     def remove_mdisks(self, userid, vdev_list):
         for vdev in vdev_list:
             self._remove_mdisk(userid, vdev)
@@ -254,8 +399,8 @@ class SMTClient(object):
         return results
 
     def _get_fcp_info_by_status(self, userid, status):
-        action = 'fcpinfo'
-        rd = ' '.join(['getvm', userid, action, status])
+        rd = ReqHandle.SMTRequest('getvm', 'fcpinfo', userid,
+                                  {'status': status})
         action = "query fcp info of '%s'" % userid
         with zvmutils.log_and_reraise_smt_request_failed(action):
             results = self._request(rd)
@@ -439,7 +584,7 @@ class SMTClient(object):
     def get_power_state(self, userid):
         """Get power status of a z/VM instance."""
         LOG.debug('Querying power stat of %s' % userid)
-        requestData = "PowerVM " + userid + " status"
+        requestData = ReqHandle.SMTRequest('powervm', 'status', userid)
         action = "query power state of '%s'" % userid
         with zvmutils.log_and_reraise_smt_request_failed(action):
             results = self._request(requestData)
@@ -478,7 +623,14 @@ class SMTClient(object):
 
     def guest_softstop(self, userid, **kwargs):
         """Power off VM gracefully, it will call shutdown os then
-            deactivate vm"""
+            deactivate vm. Specify wait=False to return once the deactivate
+            is issued, without waiting for the vm to be logged off."""
+        if kwargs.get('wait') is False:
+            requestData = "PowerVM " + userid + " softoff"
+            with zvmutils.log_and_reraise_smt_request_failed():
+                self._request(requestData)
+            return
+
         requestData = "PowerVM " + userid + " softoff --wait"
         if 'timeout' in kwargs.keys() and kwargs['timeout']:
             requestData += ' --maxwait ' + str(kwargs['timeout'])
@@ -524,9 +676,9 @@ class SMTClient(object):
               {'uid': userid, 'dest': destination})
 
         if 'maxtotal' in parms:
-            rd += ('--maxtotal ' + str(parms['maxTotal']))
+            rd += ('--maxtotal ' + str(parms['maxtotal']))
         if 'maxquiesce' in parms:
-            rd += ('--maxquiesce ' + str(parms['maxquiesce']))
+            rd += (' --maxquiesce ' + str(parms['maxquiesce']))
         if 'immediate' in parms:
             rd += " --immediate"
         if 'forcearch' in parms:
@@ -566,6 +718,26 @@ class SMTClient(object):
             LOG.error(msg)
             raise exception.SDKSMTRequestFailed(err.results, msg)
 
+    def live_migrate_status(self, userid=None):
+        """Get the status of the relocation of the virtual machine, or of
+        all the outgoing relocations of this system if userid is None.
+
+        :returns: the lines of the VMRELOCATE status, an empty list if no
+                  relocation is in progress.
+        """
+        if userid is None:
+            rd = 'migratevm %s status --outgoing' % zvmutils.get_smt_userid()
+        else:
+            rd = 'migratevm %s status' % userid
+        try:
+            results = self._request(rd)
+        except exception.SDKSMTRequestFailed as err:
+            if err.results['rs'] == 419:
+                # no relocation in progress
+                return []
+            raise
+        return results['response']
+
     def _get_ipl_param(self, ipl_from):
         if len(ipl_from) > 0:
             ipl_param = ipl_from
@@ -578,6 +750,102 @@ class SMTClient(object):
                   max_cpu, max_mem, ipl_from, ipl_param, ipl_loadparam,
                   dedicate_vdevs, loaddev, account, comment_list):
         """ Create VM and add disks if specified. """
+        vdisk = self._make_vm(userid, cpu, memory, disk_list, profile,
+                              max_cpu, max_mem, ipl_from, ipl_param,
+                              ipl_loadparam, dedicate_vdevs, loaddev, account,
+                              comment_list)
+
+        # Add the guest to db immediately after user created
+        action = "add guest '%s' to database" % userid
+        with zvmutils.log_and_reraise_sdkbase_error(action):
+            self._GuestDbOperator.add_guest(userid)
+
+        return self._create_vm_disks(userid, disk_list, vdisk)
+
+    def create_vms(self, guests):
+        """Create many VMs in three steps: the user directories are
+        created in parallel, then the VMs created are added to database in
+        one transaction, then the disks of them are added in parallel. At
+        most CONF.guest.max_concurrent_guest_create VMs are handled at the
+        same time in each parallel step. If the transaction fails, the VMs
+        are added to database one by one, so that only the VMs that can
+        not be added fail.
+
+        :param guests: a list of dicts, each has the parameters of create_vm
+               as the keys
+        :returns: a list of the results in the order of guests, each is a
+               tuple (disk_list, error, timings), the error is None if the VM
+               is created, the timings is a dict of the seconds taken by the
+               steps 'directory', 'database' and 'disks' for the VM
+        """
+        workers = CONF.guest.max_concurrent_guest_create
+        results = [[None, None, {}] for guest in guests]
+
+        def _timed(index, step, func, *args):
+            start = time.time()
+            try:
+                return func(*args)
+            finally:
+                results[index][2][step] = round(time.time() - start, 3)
+
+        made = []
+        make_results = zvmutils.run_in_parallel(
+            _timed,
+            [(index, 'directory', self._make_vm, guest['userid'],
+              guest['cpu'], guest['memory'], guest['disk_list'],
+              guest['profile'], guest['max_cpu'], guest['max_mem'],
+              guest['ipl_from'], guest['ipl_param'], guest['ipl_loadparam'],
+              guest['dedicate_vdevs'], guest['loaddev'], guest['account'],
+              guest['comment_list'])
+             for index, guest in enumerate(guests)],
+            max_workers=workers)
+        for index, (vdisk, err) in enumerate(make_results):
+            if err is None:
+                made.append((index, vdisk))
+            else:
+                results[index][1] = err
+        if not made:
+            return [tuple(result) for result in results]
+
+        userids = [guests[index]['userid'] for index, vdisk in made]
+        start = time.time()
+        try:
+            self._GuestDbOperator.add_guests(userids)
+        except exception.SDKBaseException as err:
+            LOG.warning("Failed to add guests %s to database in one "
+                        "transaction, adding them one by one: %s" %
+                        (', '.join(userids), err.format_message()))
+            for index, vdisk in made:
+                userid = guests[index]['userid']
+                try:
+                    self._GuestDbOperator.add_guest(userid)
+                except exception.SDKBaseException as err:
+                    LOG.error("Failed to add guest %s to database: %s" %
+                              (userid, err.format_message()))
+                    results[index][1] = err
+        spent = round(time.time() - start, 3)
+        for index, vdisk in made:
+            results[index][2]['database'] = spent
+        made = [(index, vdisk) for index, vdisk in made
+                if results[index][1] is None]
+        if not made:
+            return [tuple(result) for result in results]
+
+        disk_results = zvmutils.run_in_parallel(
+            _timed,
+            [(index, 'disks', self._create_vm_disks, guests[index]['userid'],
+              guests[index]['disk_list'], vdisk) for index, vdisk in made],
+            max_workers=workers)
+        for (index, vdisk), (disk_list, err) in zip(made, disk_results):
+            results[index][0] = disk_list
+            results[index][1] = err
+        return [tuple(result) for result in results]
+
+    def _make_vm(self, userid, cpu, memory, disk_list, profile,
+                 max_cpu, max_mem, ipl_from, ipl_param, ipl_loadparam,
+                 dedicate_vdevs, loaddev, account, comment_list):
+        """Create the user directory of VM, return the swap disk if it is
+        defined as vdisk in the user directory, otherwise None."""
         rd = ('makevm %(uid)s directory LBYONLY %(mem)im %(pri)s '
               '--cpus %(cpu)i --profile %(prof)s --maxCPU %(max_cpu)i '
               '--maxMemSize %(max_mem)s --setReservedMem' %
@@ -684,12 +952,9 @@ class SMTClient(object):
                 msg += "SMT error: %s" % err.format_message()
                 LOG.error(msg)
                 raise exception.SDKSMTRequestFailed(err.results, msg)
+        return vdisk
 
-        # Add the guest to db immediately after user created
-        action = "add guest '%s' to database" % userid
-        with zvmutils.log_and_reraise_sdkbase_error(action):
-            self._GuestDbOperator.add_guest(userid)
-
+    def _create_vm_disks(self, userid, disk_list, vdisk):
         # Continue to add disk, if vdisk is None, it means
         # it's not vdisk routine and we need add disks
         if vdisk is None and disk_list:
@@ -702,7 +967,15 @@ class SMTClient(object):
         # handle other remaining jobs
         return disk_list
 
-    def _add_mdisk(self, userid, disk, vdev):
+    def _get_mdisk_filesystem(self, disk):
+        """Return the filesystem to create on disk, None if no filesystem
+        is needed."""
+        fmt = disk.get('format', 'ext4')
+        if fmt and fmt != 'none':
+            return fmt.lower()
+        return None
+
+    def _add_mdisk(self, userid, disk, vdev, with_filesystem=True):
         """Create one disk for userid
 
         NOTE: No read, write and multi password specified, and
@@ -710,7 +983,6 @@ class SMTClient(object):
 
         """
         size = disk['size']
-        fmt = disk.get('format', 'ext4')
         disk_pool = disk.get('disk_pool') or CONF.zvm.disk_pool
         # Check disk_pool, if it's None, report error
         if disk_pool is None:
@@ -726,13 +998,30 @@ class SMTClient(object):
 
         rd = ' '.join(['changevm', userid, action, diskpool_name,
                        vdev, size, '--mode MR'])
-        if fmt and fmt != 'none':
-            rd += (' --filesystem %s' % fmt.lower())
+        fmt = self._get_mdisk_filesystem(disk)
+        if with_filesystem and fmt:
+            rd += (' --filesystem %s' % fmt)
 
         action = "add mdisk to userid '%s'" % userid
         with zvmutils.log_and_reraise_smt_request_failed(action):
             self._request(rd)
 
+    def _format_mdisk(self, userid, disk):
+        """Create the filesystem on a disk which is already added to the
+        directory of userid."""
+        disk_pool = disk.get('disk_pool') or CONF.zvm.disk_pool
+        if disk_pool.split(':')[0].upper() == 'ECKD':
+            disk_type = '3390'
+        else:
+            disk_type = '9336'
+
+        rd = ' '.join(['changevm', userid, 'formatdisk', disk['vdev'],
+                       disk_type, self._get_mdisk_filesystem(disk),
+                       '--mode MR'])
+        action = "format mdisk '%s' of userid '%s'" % (disk['vdev'], userid)
+        with zvmutils.log_and_reraise_smt_request_failed(action):
+            self._request(rd)
+
     def get_vm_list(self):
         """Get the list of guests that are created by SDK
         return userid list"""
@@ -883,6 +1172,7 @@ class SMTClient(object):
                 raise exception.SDKGuestOperationError(rs=3, userid=userid,
                                                        unpack_rc=rc,
                                                        err=err_output)
+            self._image_catalog.update_access_time(image_name)
 
         # Purge guest reader to clean dirty data
         rd = ("changevm %s purgerdr" % userid)
@@ -1074,7 +1364,7 @@ class SMTClient(object):
 
         # self._check_power_state(userid, 'capture')
         restart_flag = False
-        reachable = self.get_guest_connection_status(userid)
+        reachable = self.get_guest_connection_status(userid, cached=False)
         if reachable:
             # Make sure iucv channel is ready for communication on source vm
             try:
@@ -1143,11 +1433,8 @@ class SMTClient(object):
                 if capture_device_assign:
                     capture_devices = [str(capture_device_assign)]
                 else:
-                    direct_info = self.get_user_direct(userid)
-                    disk_info =\
-                        [x for x in direct_info if x.startswith('MDISK')]
-                    capture_devices = \
-                        [x.split(' ')[1].strip(' ') for x in disk_info]
+                    direct_info = self.get_user_direct_info(userid)
+                    capture_devices = list(direct_info['MDISK'].keys())
             if not capture_devices:
                 msg = ('Error happened when getting the devices for '
                        'get vm disk information on source vm %(vm)s '
@@ -1227,6 +1514,7 @@ class SMTClient(object):
         self._ImageDbOperator.image_add_record(image_name, os_version,
             real_md5sum, disk_size_units, image_size,
             capture_type)
+        self._image_catalog.invalidate()
         if restart_flag:
             LOG.info('Try start %s for capture completed successfully.'
                      % userid)
@@ -1576,21 +1864,42 @@ class SMTClient(object):
 
     def get_host_info(self):
         with zvmutils.log_and_reraise_smt_request_failed():
-            results = self._request("getHost general")
+            results = self._request(
+                ReqHandle.SMTRequest('gethost', 'general'))
         host_info = zvmutils.translate_response_to_dict(
             '\n'.join(results['response']), const.RINV_HOST_KEYWORDS)
 
         return host_info
 
+    def get_host_usage(self):
+        """Get the CPU and memory usage of the host, which is the part of
+        get_host_info that changes while the host is running."""
+        with zvmutils.log_and_reraise_smt_request_failed():
+            results = self._request(
+                ReqHandle.SMTRequest('gethost', 'usage'))
+        return zvmutils.translate_response_to_dict(
+            '\n'.join(results['response']), const.RINV_HOST_USAGE_KEYWORDS)
+
     def get_diskpool_info(self, pool):
         with zvmutils.log_and_reraise_smt_request_failed():
-            results = self._request("getHost diskpoolspace %s" % pool)
+            results = self._request(ReqHandle.SMTRequest(
+                'gethost', 'diskpoolspace', parms={'poolName': pool}))
         dp_info = zvmutils.translate_response_to_dict(
             '\n'.join(results['response']), const.DISKPOOL_KEYWORDS)
 
         return dp_info
 
     def get_vswitch_list(self):
+        vswitches = self._vswitch_cache.get(VswitchCache.LIST)
+        if vswitches is not None:
+            return vswitches
+
+        generation = self._vswitch_cache.get_generation(VswitchCache.LIST)
+        vswitches = self._query_vswitch_list()
+        self._vswitch_cache.set(VswitchCache.LIST, vswitches, generation)
+        return vswitches
+
+    def _query_vswitch_list(self):
         smt_userid = zvmutils.get_smt_userid()
         rd = ' '.join((
             "SMAPI %s API Virtual_Network_Vswitch_Query" % smt_userid,
@@ -1876,26 +2185,65 @@ class SMTClient(object):
                 % {'vdev': vdev, 'vm': userid})
         LOG.info(msg)
 
-    def get_user_direct(self, userid):
+    def get_user_direct(self, userid, cached=True):
+        """Return the directory statements of userid. Set cached to
+        False to read them from the directory even if they are cached,
+        this is needed to build a new entry to replace the current one."""
+        if cached:
+            entry = self._user_direct_cache.get(userid)
+            if entry is not None:
+                return list(entry['data'])
+
+        generation = self._user_direct_cache.get_generation(userid)
         with zvmutils.log_and_reraise_smt_request_failed():
-            results = self._request("getvm %s directory" % userid)
-        return results.get('response', [])
+            results = self._request(
+                ReqHandle.SMTRequest('getvm', 'directory', userid))
+        user_direct = results.get('response', [])
+        self._user_direct_cache.set(userid, user_direct, generation)
+        return user_direct
+
+    def get_user_direct_info(self, userid):
+        """Return the parsed directory entry of userid, see
+        parse_user_direct for the format."""
+        cached = self._user_direct_cache.get(userid)
+        if cached is not None:
+            return copy.deepcopy(cached['info'])
+        return parse_user_direct(self.get_user_direct(userid))
+
+    def prefetch_user_direct(self, userid_list):
+        """Load the directory entries of the userids into cache in
+        parallel, return a dict of the userids failed to load and the
+        errors."""
+        userids = set(u.upper() for u in userid_list)
+        userids = [u for u in userids
+                   if self._user_direct_cache.get(u) is None]
+        results = zvmutils.run_in_parallel(
+            self.get_user_direct, [(u,) for u in userids],
+            max_workers=CONF.sdkserver.max_worker_count)
+        return dict((u, err) for u, (result, err) in zip(userids, results)
+                    if err is not None)
+
+    def get_directory_generation(self):
+        return self._directory_generation
 
     def get_all_user_direct(self):
         with zvmutils.log_and_reraise_smt_request_failed():
-            results = self._request("getvm alldirectory")
+            results = self._request(
+                ReqHandle.SMTRequest('getvm', 'alldirectory'))
         return results.get('response', [])
 
     def get_diskpool_volumes(self, pool):
         with zvmutils.log_and_reraise_smt_request_failed():
-            results = self._request("gethost diskpoolvolumes %s" % pool)
+            results = self._request(ReqHandle.SMTRequest(
+                'gethost', 'diskpoolvolumes', parms={'poolName': pool}))
         diskpool_volumes = zvmutils.translate_response_to_dict(
             '\n'.join(results['response']), const.DISKPOOL_VOLUME_KEYWORDS)
         return diskpool_volumes
 
     def get_volume_info(self):
         with zvmutils.log_and_reraise_smt_request_failed():
-            results = self._request("gethost volumeinfo")
+            results = self._request(
+                ReqHandle.SMTRequest('gethost', 'volumeinfo'))
         with zvmutils.expect_invalid_resp_data(results):
             volume_info = zvmutils.translate_response_data_to_expect_dict(
                 results['response'], 3)
@@ -2157,7 +2505,7 @@ class SMTClient(object):
                    'vlan_id': vlan_id})
         LOG.info(msg)
 
-        user_direct = self.get_user_direct(userid)
+        user_direct = self.get_user_direct(userid, cached=False)
         new_user_direct = []
         nicdef = "NICDEF %s" % nic_vdev
         for ent in user_direct:
@@ -2330,9 +2678,7 @@ class SMTClient(object):
             msg = "SMT error: %s" % err.format_message()
             raise exception.SDKSMTRequestFailed(err.results, msg)
 
-    def delete_vm(self, userid):
-        self.delete_userid(userid)
-
+    def _revoke_deleted_vm(self, userid):
         # remove userid from smapi namelist
         self.namelist_remove(zvmutils.get_namelist(), userid)
 
@@ -2349,6 +2695,10 @@ class SMTClient(object):
                 if item is not None:
                     self.revoke_user_from_vswitch(item, userid)
 
+    def delete_vm(self, userid):
+        self.delete_userid(userid)
+        self._revoke_deleted_vm(userid)
+
         # cleanup db record from network table
         action = "delete network record for user %s" % userid
         with zvmutils.log_and_reraise_sdkbase_error(action):
@@ -2365,9 +2715,86 @@ class SMTClient(object):
         with zvmutils.log_and_reraise_sdkbase_error(action):
             self._GuestDbOperator.delete_guest_by_userid(userid)
 
+    def delete_vms(self, userids):
+        """Delete many VMs in four steps: the VMs logged on are forced off
+        in parallel, then the user directories are deleted in parallel by
+        at most CONF.guest.max_concurrent_guest_delete at the same time,
+        then the VMs deleted are removed from the namelist and revoked from
+        the vswitches in parallel, at last the database records of them are
+        removed in one transaction for each table.
+
+        :returns: a list of the results in the order of userids, each is a
+               tuple (error, timings), the error is None if the VM is
+               deleted, the timings is a dict of the seconds taken by the
+               steps 'logoff', 'directory', 'revoke' and 'database' for
+               the VM, the VMs not logged on have no 'logoff' step.
+        """
+        if not userids:
+            return []
+        workers = CONF.sdkserver.max_worker_count
+        results = [[None, {}] for userid in userids]
+
+        def _timed(index, step, func, *args):
+            start = time.time()
+            try:
+                return func(*args)
+            finally:
+                results[index][1][step] = round(time.time() - start, 3)
+
+        def _run_step(indexes, step, func, max_workers):
+            step_results = zvmutils.run_in_parallel(
+                _timed, [(index, step, func, userids[index])
+                         for index in indexes],
+                max_workers=max_workers)
+            done = []
+            for index, (ret, err) in zip(indexes, step_results):
+                if err is None:
+                    done.append(index)
+                else:
+                    results[index][0] = err
+            return done
+
+        logged_on = zvmutils.get_logged_on_users()
+        to_stop = [index for index, userid in enumerate(userids)
+                   if userid in logged_on]
+        stopped = _run_step(to_stop, 'logoff', self.guest_stop, workers)
+        for index in set(to_stop) - set(stopped):
+            # deletevm deactivates the VM again, so go on with it
+            LOG.warning("Failed to force off guest %s before deleting it: "
+                        "%s" % (userids[index], results[index][0]))
+            results[index][0] = None
+
+        deleted = _run_step(range(len(userids)), 'directory',
+                            self.delete_userid,
+                            CONF.guest.max_concurrent_guest_delete)
+        revoked = _run_step(deleted, 'revoke', self._revoke_deleted_vm,
+                            workers)
+        if not revoked:
+            return [tuple(result) for result in results]
+
+        revoked_userids = [userids[index] for index in revoked]
+        start = time.time()
+        try:
+            self._NetDbOperator.switch_delete_record_for_userids(
+                revoked_userids)
+            for userid in revoked_userids:
+                # cleanup persistent folder for guest
+                self._pathutils.remove_guest_path(userid)
+            self._GuestDbOperator.delete_guests_by_userid(revoked_userids)
+        except exception.SDKBaseException as err:
+            LOG.error("Failed to delete guests %s from database: %s" %
+                      (', '.join(revoked_userids), err.format_message()))
+            for index in revoked:
+                results[index][0] = err
+        spent = round(time.time() - start, 3)
+        for index in revoked:
+            results[index][1]['database'] = spent
+        return [tuple(result) for result in results]
+
     def execute_cmd(self, userid, cmdStr):
         """"cmdVM."""
-        requestData = 'cmdVM ' + userid + ' CMD \'' + cmdStr + '\''
+        requestData = ReqHandle.SMTRequest('cmdvm', 'cmd', userid,
+                                           {'cmd': cmdStr})
         with zvmutils.log_and_reraise_smt_request_failed(action='execute '
         'command on vm via iucv channel'):
             results = self._request(requestData)
@@ -2375,9 +2802,17 @@ class SMTClient(object):
         ret = results['response']
         return ret
 
-    def execute_cmd_direct(self, userid, cmdStr):
-        """"cmdVM."""
-        requestData = 'cmdVM ' + userid + ' CMD \'' + cmdStr + '\''
+    def execute_cmd_direct(self, userid, cmdStr, timeout=None):
+        """"cmdVM.
+
+        :param timeout: seconds to wait for the command, the
+               iucv_command_timeout option of the guest section is used
+               when it is None, 0 means no limit.
+        """
+        parms = {'cmd': cmdStr}
+        if timeout is not None:
+            parms['timeout'] = timeout
+        requestData = ReqHandle.SMTRequest('cmdvm', 'cmd', userid, parms)
         results = self._smt.request(requestData)
         return results
 
@@ -2482,6 +2917,7 @@ class SMTClient(object):
                                                    image_size,
                                                    image_type,
                                                    comments=comments)
+            self._image_catalog.invalidate()
             LOG.info("Image %s is import successfully" % image_name)
         except Exception:
             # Cleanup the image from image repository
@@ -2631,19 +3067,13 @@ class SMTClient(object):
         return size
 
     def _get_image_path_by_name(self, image_name):
-        try:
-            target_info = self._ImageDbOperator.image_query_record(image_name)
-        except exception.SDKObjectNotExistError:
+        # TODO: (nafei) Handle multiple disks image deploy
+        image_path = self._image_catalog.get_image_path(image_name)
+        if image_path is None:
             msg = ("The image %s does not exist in image repository"
                    % image_name)
             LOG.error(msg)
             raise exception.SDKImageOperationError(rs=20, img=image_name)
-
-        # TODO: (nafei) Handle multiple disks image deploy
-        image_path = '/'.join([CONF.image.sdk_image_repository,
-                               const.IMAGE_TYPE['DEPLOY'],
-                               target_info[0]['imageosdistro'],
-                               image_name])
         return image_path
 
     def _scheme2backend(self, scheme):
@@ -2694,6 +3124,7 @@ class SMTClient(object):
             self._delete_image_file(image_name)
             # Delete image record from db
             self._ImageDbOperator.image_delete_record(image_name)
+            self._image_catalog.invalidate()
         except exception.SDKImageOperationError as err:
             results = err.results
             if ((results['rc'] == 300) and (results['rs'] == 20)):
@@ -2725,36 +3156,32 @@ class SMTClient(object):
         atime = os.path.getatime(image_file)
         return atime
 
-    def image_query(self, image_name=None):
-        image_info = self._ImageDbOperator.image_query_record(image_name)
-        if not image_info:
-            # because database maybe None, so return nothing here
-            return []
-
-        # if image_name is not None, means there is only one record
+    def image_query(self, image_name=None, os_distro=None, limit=None,
+                    marker=None):
+        """Query the image info from image catalog, if image_name is
+        specified only that image is returned, otherwise all images or the
+        images of the specified os_distro are returned, at most limit
+        images after the marker image name when they are specified."""
         if image_name:
-            last_access_time = self._get_image_last_access_time(
-                                   image_name, raise_exception=False)
-            image_info[0]['last_access_time'] = last_access_time
-        else:
-            for item in image_info:
-                image_name = item['imagename']
-                # set raise_exception to false because one failed
-                # may stop processing all the items in the list
-                last_access_time = self._get_image_last_access_time(
-                                       image_name, raise_exception=False)
-                item['last_access_time'] = last_access_time
-        return image_info
+            image_info = self._image_catalog.get(image_name)
+            if image_info is None:
+                obj_desc = "Image with name: %s" % image_name
+                raise exception.SDKObjectNotExistError(obj_desc=obj_desc,
+                                                       modID='image')
+            return [image_info]
+        return self._image_catalog.list(os_distro=os_distro, limit=limit,
+                                        marker=marker)
 
     def image_get_root_disk_size(self, image_name):
         """Return the root disk units of the specified image
         image_name: the unique image name in db
         Return the disk units in format like 3339:CYL or 467200:BLK
         """
-        image_info = self.image_query(image_name)
-        if not image_info:
-            raise exception.SDKImageOperationError(rs=20, img=image_name)
-        disk_size_units = image_info[0]['disk_size_units'].split(':')[0]
+        disk_size_units = self._image_catalog.get_root_disk_size(image_name)
+        if disk_size_units is None:
+            obj_desc = "Image with name: %s" % image_name
+            raise exception.SDKObjectNotExistError(obj_desc=obj_desc,
+                                                   modID='image')
         return disk_size_units
 
     def image_get_os_distro(self, image_name):
@@ -2796,15 +3223,28 @@ class SMTClient(object):
         finally:
             os.remove(fn)
 
-    def get_guest_connection_status(self, userid):
-        '''Get guest vm connection status.'''
-        rd = ' '.join(('getvm', userid, 'isreachable'))
+    def get_guest_connection_status(self, userid, cached=True):
+        '''Get guest vm connection status. Set cached to False to not
+        trust a recent reply of the guest, e.g. before it is stopped.'''
+        parms = None
+        if not cached:
+            parms = {'noCache': True}
+        rd = ReqHandle.SMTRequest('getvm', 'isreachable', userid, parms)
         results = self._request(rd)
         if results['rs'] == 1:
             return True
         else:
             return False
 
+    def get_iucv_session_health(self, userid):
+        '''Get the health of the IUCV session to the guest, a guest that
+        no command has been sent to has a new session.'''
+        userid = userid.upper()
+        health = vmUtils.getIUCVSessionHealth(userid).get(userid)
+        if health is None:
+            health = vmUtils.IUCVSession(userid).getHealth()
+        return health
+
     def _generate_disk_parmline(self, vdev, fmt, mntdir):
         parms = [
                 'action=' + 'addMdisk',
@@ -2816,10 +3256,18 @@ class SMTClient(object):
         parmstr = "'" + parmline + "'"
         return parmstr
 
+    def reader_batch(self, userid):
+        '''Return a batch to punch many configuration files into the reader
+        of the vm in one file.
+        '''
+        return ReaderBatch(self, userid)
+
     def process_additional_minidisks(self, userid, disk_info):
         '''Generate and punch the scripts used to process additional disk into
-        target vm's reader.
+        target vm's reader, the scripts of all the disks are punched in one
+        file.
         '''
+        batch = self.reader_batch(userid)
         for idx, disk in enumerate(disk_info):
             vdev = disk.get('vdev') or self.generate_disk_vdev(
                                                     offset = (idx + 1))
@@ -2831,7 +3279,8 @@ class SMTClient(object):
                 mount_dir = "swap"
             disk_parms = self._generate_disk_parmline(vdev, fmt, mount_dir)
             func_name = '/var/lib/zvmsdk/setupDisk'
-            self.aemod_handler(userid, func_name, disk_parms)
+            batch.add_aemod(func_name, disk_parms)
+        batch.punch()
 
         # trigger do-script
         if self.get_power_state(userid) == 'on':
@@ -2845,8 +3294,12 @@ class SMTClient(object):
             self._request(rd)
 
     def get_user_console_output(self, userid):
+        with self._reader_lock:
+            return self._get_user_console_output(userid)
+
+    def _get_user_console_output(self, userid):
         # get console into reader
-        rd = 'getvm %s consoleoutput' % userid
+        rd = ReqHandle.SMTRequest('getvm', 'consoleoutput', userid)
         action = 'get console log reader file list for guest vm: %s' % userid
         with zvmutils.log_and_reraise_smt_request_failed(action):
             resp = self._request(rd)
@@ -2859,16 +3312,118 @@ class SMTClient(object):
         #     'sudo /sbin/cio_ignore -r 000c; sudo /sbin/chccwdev -e 000c'
         #     'which udevadm &> /dev/null && udevadm settle || udevsettle'
 
+        console_log, err = self._receive_console_files(userid, rf_list)
+        if err is not None:
+            LOG.warning(err.format_message())
+        return console_log
+
+    def _receive_console_files(self, userid, rf_list):
+        """Receive the console spool files of the guest from the reader.
+
+        Return the console output and the error of the first spool file
+        failed to receive or None, the files after it are still received.
+        """
         logs = []
+        err = None
         for rf in rf_list:
             cmd = 'sudo /usr/sbin/vmur re -t -O %s' % rf
             rc, output = zvmutils.execute(cmd)
             if rc == 0:
                 logs.append(output)
+            elif err is None:
+                msg = ("Failed to receive console spool file %s of guest "
+                       "%s, rc: %d, output: %s" % (rf, userid, rc, output))
+                err = exception.SDKInternalError(msg=msg)
+        return ''.join(logs), err
+
+    def _transfer_console(self, userid):
+        rd = ReqHandle.SMTRequest('smapi', 'api', userid,
+                                  {'apiName': 'Image_Console_Get'})
+        action = 'transfer the console of guest %s to reader' % userid
+        with zvmutils.log_and_reraise_smt_request_failed(action):
+            self._request(rd)
+
+    def get_users_console_output(self, userid_list):
+        """Get the console output of the guests since the last call.
 
-        return ''.join(logs)
+        The consoles are transferred to the reader in parallel, then the
+        console spool files of all the guests are listed with one getvm
+        consoleoutput request and received one by one, as vmur allows only
+        one instance on the reader at a time.
+
+        Return a dict of userid -> (console output, error), error is the
+        exception raised when getting the console of the guest or None.
+        The console output got before an error is still returned.
+        """
+        results = {}
+        transfers = zvmutils.run_in_parallel(
+            self._transfer_console, [(userid,) for userid in userid_list],
+            max_workers=CONF.sdkserver.max_worker_count)
+        for userid, (ret, err) in zip(userid_list, transfers):
+            if err is not None:
+                results[userid] = ('', err)
+        transferred = [userid for userid in userid_list
+                       if userid not in results]
+        if not transferred:
+            return results
+
+        with self._reader_lock:
+            rd = ReqHandle.SMTRequest(
+                'getvm', 'consoleoutput', transferred[0],
+                {'noTransfer': True, 'userids': ','.join(transferred)})
+            try:
+                resp = self._request(rd)
+            except exception.SDKSMTRequestFailed as err:
+                LOG.error("Failed to list the console spool files of "
+                          "guests %s: %s", ', '.join(transferred),
+                          err.format_message())
+                for userid in transferred:
+                    results[userid] = ('', err)
+                return results
+
+            # one line for each guest, like:
+            # List of spool files containing console logs from U1: 0001 0002
+            spool_files = {}
+            with zvmutils.expect_invalid_resp_data(resp):
+                for line in resp['response']:
+                    head, _sep, rf_list = line.rpartition(':')
+                    spool_files[head.split()[-1]] = rf_list.split()
+            for userid in transferred:
+                results[userid] = self._receive_console_files(
+                    userid, spool_files.get(userid.upper(), []))
+        return results
 
     def query_vswitch(self, switch_name):
+        vsw_info = self._vswitch_cache.get(switch_name)
+        if vsw_info is not None:
+            return vsw_info
+
+        generation = self._vswitch_cache.get_generation(switch_name)
+        vsw_info = self._query_vswitch(switch_name)
+        self._vswitch_cache.set(switch_name, vsw_info, generation)
+        return vsw_info
+
+    def refresh_vswitch_cache(self, vswitch_names=None):
+        """Reload the vswitch name list, the OSA info and the info of the
+        vswitches into cache, the vswitches are queried in parallel. All
+        vswitches are loaded if vswitch_names is None.
+
+        Return a dict of the vswitches failed to load and the errors.
+        """
+        self._vswitch_cache.clear()
+        self._query_OSA()
+        if vswitch_names is None:
+            vswitch_names = self.get_vswitch_list()
+        results = zvmutils.run_in_parallel(
+            self.query_vswitch, [(name,) for name in vswitch_names],
+            max_workers=CONF.sdkserver.max_worker_count)
+        return dict((name, err) for name, (result, err)
+                    in zip(vswitch_names, results) if err is not None)
+
+    def get_vswitch_cache_stats(self):
+        return self._vswitch_cache.stats()
+
+    def _query_vswitch(self, switch_name):
         smt_userid = zvmutils.get_smt_userid()
         rd = ' '.join((
             "SMAPI %s API Virtual_Network_Vswitch_Query_Extended" %
@@ -3028,9 +3583,11 @@ class SMTClient(object):
 
         return vsw_info
 
-    def get_nic_info(self, userid=None, nic_id=None, vswitch=None):
+    def get_nic_info(self, userid=None, nic_id=None, vswitch=None,
+                     limit=None, marker=None):
         nic_info = self._NetDbOperator.switch_select_record(userid=userid,
-                                            nic_id=nic_id, vswitch=vswitch)
+                                            nic_id=nic_id, vswitch=vswitch,
+                                            limit=limit, marker=marker)
         return nic_info
 
     def is_first_network_config(self, userid):
@@ -3048,24 +3605,32 @@ class SMTClient(object):
         with zvmutils.log_and_reraise_sdkbase_error(action):
             self._GuestDbOperator.update_guest_by_userid(userid, net_set='1')
 
+    def _get_OSA_devices(self, OSA_device):
+        """Return the three device numbers used by the OSA device."""
+        return [str(hex(int(OSA_device, 16) + i))[2:].zfill(4).upper()
+                for i in range(3)]
+
     def _is_OSA_free(self, OSA_device):
-        osa_info = self._query_OSA()
-        if 'OSA' not in osa_info.keys():
-            return False
-        elif len(osa_info['OSA']['FREE']) == 0:
+        devices = self._get_OSA_devices(OSA_device)
+
+        def _is_free(osa_info):
+            free = set(osa_info.get('OSA', {}).get('FREE', []))
+            return all(dev in free for dev in devices)
+
+        osa_info = self._vswitch_cache.get(VswitchCache.OSA)
+        if osa_info is not None and not _is_free(osa_info):
             return False
-        else:
-            dev1 = str(OSA_device).zfill(4).upper()
-            dev2 = str(str(hex(int(OSA_device, 16) + 1))[2:]).zfill(4).upper()
-            dev3 = str(str(hex(int(OSA_device, 16) + 2))[2:]).zfill(4).upper()
-            if ((dev1 in osa_info['OSA']['FREE']) and
-                (dev2 in osa_info['OSA']['FREE']) and
-                (dev3 in osa_info['OSA']['FREE'])):
-                return True
-            else:
-                return False
+        # the devices may have been taken out of SDK since they were cached,
+        # so they are queried again before being dedicated
+        return _is_free(self._query_OSA())
 
     def _query_OSA(self):
+        generation = self._vswitch_cache.get_generation(VswitchCache.OSA)
+        OSA_info = self._do_query_OSA()
+        self._vswitch_cache.set(VswitchCache.OSA, OSA_info, generation)
+        return OSA_info
+
+    def _do_query_OSA(self):
         smt_userid = zvmutils.get_smt_userid()
         rd = "SMAPI %s API Virtual_Network_OSA_Query" % smt_userid
         OSA_info = {}
@@ -3124,11 +3689,9 @@ class SMTClient(object):
         return OSA_info
 
     def _get_available_vdev(self, userid, vdev=None):
-        ports_info = self._NetDbOperator.switch_select_table()
-        vdev_info = []
-        for p in ports_info:
-            if p['userid'] == userid.upper():
-                vdev_info.append(p['interface'])
+        ports_info = self._NetDbOperator.switch_select_record_for_userid(
+            userid.upper())
+        vdev_info = [p['interface'] for p in ports_info]
 
         if len(vdev_info) == 0:
             # no nic defined for the guest
@@ -3170,6 +3733,7 @@ class SMTClient(object):
                   {'vdev': nic_vdev,
                    'osa': OSA_device})
         self._dedicate_OSA(userid, OSA_device, nic_vdev, active=active)
+        self._vswitch_cache.claim_osa(self._get_OSA_devices(OSA_device))
         return nic_vdev
 
     def _dedicate_OSA_inactive_exception(self, error, userid, vdev,
@@ -3448,15 +4012,11 @@ class SMTClient(object):
         self._request_with_error_ignored(rd)
 
     def _get_defined_cpu_addrs(self, userid):
-        user_direct = self.get_user_direct(userid)
-        defined_addrs = []
+        direct_info = self.get_user_direct_info(userid)
+        defined_addrs = direct_info['CPU']
         max_cpus = 0
-        for ent in user_direct:
-            if ent.startswith("CPU"):
-                cpu_addr = ent.split()[1].strip().upper()
-                defined_addrs.append(cpu_addr)
-            if ent.startswith("MACHINE ESA"):
-                max_cpus = int(ent.split()[2].strip())
+        if direct_info['MACHINE'].get('mode') == 'ESA':
+            max_cpus = direct_info['MACHINE'].get('max_cpus', 0)
 
         return (max_cpus, defined_addrs)
 
@@ -3477,11 +4037,14 @@ class SMTClient(object):
         # # Address
         # 0
         # 1
-        active_addrs = []
         active_cpus = self.execute_cmd(userid, "lscpu --parse=ADDRESS")
-        for c in active_cpus:
+        return self._parse_active_cpu_addrs(active_cpus)
+
+    def _parse_active_cpu_addrs(self, output):
+        active_addrs = []
+        for c in output:
             # Skip the comment lines at beginning
-            if c.startswith("# "):
+            if c.startswith("# ") or not c.strip():
                 continue
             addr = hex(int(c.strip()))[2:].rjust(2, '0').upper()
             active_addrs.append(addr)
@@ -3678,7 +4241,7 @@ class SMTClient(object):
                  % userid)
 
     def _get_defined_memory(self, userid):
-        user_direct = self.get_user_direct(userid)
+        user_direct = self.get_user_direct(userid, cached=False)
         defined_mem = max_mem = reserved_mem = -1
         for ent in user_direct:
             # u'USER userid password storage max privclass'
@@ -3743,6 +4306,19 @@ class SMTClient(object):
         finally:
             self._pathutils.clean_temp_folder(tmp_folder)
 
+    def _unlock_user_direct(self, userid):
+        rd = ("SMAPI %s API Image_Unlock_DM " % userid)
+        try:
+            self._request(rd)
+        except exception.SDKSMTRequestFailed as err:
+            # ignore 'not locked' error
+            if ((err.results['rc'] == 400) and (err.results['rs'] == 24)):
+                LOG.debug("Guest '%s' unlocked successfully." % userid)
+            else:
+                # just print error and ignore this unlock error
+                LOG.error("Unlock definition of guest '%s' failed with SMT "
+                          "error: %s" % (userid, err.format_message()))
+
     def _lock_user_direct(self, userid):
         rd = ("SMAPI %s API Image_Lock_DM " % userid)
         try:
@@ -3869,6 +4445,9 @@ class SMTClient(object):
     def _get_active_memory(self, userid):
         # Return an integer value representing the active memory size in mb
         output = self.execute_cmd(userid, "lsmem")
+        return self._parse_active_memory(userid, output)
+
+    def _parse_active_memory(self, userid, output):
         active_mem = 0
         for e in output:
             # cmd output contains line starts with "Total online memory",
@@ -3992,19 +4571,759 @@ class SMTClient(object):
         LOG.info("Live resize memory for guest: '%s' finished successfully."
                  % userid)
 
+    def _get_live_state(self, userid):
+        # Get the active cpu addrs, the online memory size in mb and whether
+        # the guest runs ubuntu by one command through IUCV
+        separator = "echo '%s'" % _RESIZE_STATE_SEPARATOR
+        output = self.execute_cmd(userid, '; '.join((
+            'lscpu --parse=ADDRESS', separator, 'lsmem', separator,
+            'uname -a')))
+        sections = [[]]
+        for line in output:
+            if line.strip() == _RESIZE_STATE_SEPARATOR:
+                sections.append([])
+            else:
+                sections[-1].append(line)
+        if len(sections) != 3:
+            errmsg = ("Failed to get active cpus and memory of guest: %s"
+                      % userid)
+            LOG.error(errmsg + " from output: %s" % output)
+            raise exception.SDKInternalError(msg=errmsg)
+        distro = sections[2][0] if sections[2] else ''
+        return {'cpus': self._parse_active_cpu_addrs(sections[0]),
+                'memory': self._parse_active_memory(userid, sections[1]),
+                'ubuntu': 'ubuntu' in distro.lower()}
+
+    def _plan_cpus(self, userid, count, direct_info, active_addrs):
+        active_count = len(active_addrs)
+        if active_count > count:
+            LOG.error("Failed to live resize cpus of guest: %(uid)s, "
+                      "current active cpu count: %(cur)i is greater than "
+                      "the requested count: %(req)i." %
+                      {'uid': userid, 'cur': active_count,
+                       'req': count})
+            raise exception.SDKConflictError(modID='guest', rs=2,
+                                             userid=userid,
+                                             active=active_count,
+                                             req=count)
+        max_cpus = 0
+        if direct_info['MACHINE'].get('mode') == 'ESA':
+            max_cpus = direct_info['MACHINE'].get('max_cpus', 0)
+        if max_cpus == 0:
+            LOG.error("Resize for guest '%s' cann't be done. The maximum "
+                      "number of cpus is not defined in user directory." %
+                      userid)
+            raise exception.SDKConflictError(modID='guest', rs=3,
+                                             userid=userid)
+        if count > max_cpus:
+            LOG.error("Resize for guest '%s' cann't be done. The "
+                      "requested number of cpus: '%i' exceeds the maximum "
+                      "number of cpus allowed: '%i'." %
+                      (userid, count, max_cpus))
+            raise exception.SDKConflictError(modID='guest', rs=4,
+                                             userid=userid,
+                                             req=count, max=max_cpus)
+
+        defined_addrs = sorted(direct_info['CPU'])
+        define = undefine = []
+        if len(defined_addrs) < count:
+            define = sorted(self._get_available_cpu_addrs(
+                defined_addrs, max_cpus))[:count - len(defined_addrs)]
+        elif len(defined_addrs) > count:
+            undefine = defined_addrs[count:]
+        activate = sorted(self._get_available_cpu_addrs(
+            active_addrs, max_cpus))[:count - active_count]
+        return {'define': define, 'undefine': undefine, 'activate': activate}
+
+    def _plan_memory(self, userid, memory, direct_info, active_size):
+        size = int(zvmutils.convert_to_mb(memory))
+        if active_size > size:
+            LOG.error("Failed to live resize memory of guest: %(uid)s, "
+                      "current active memory size: %(cur)im is greater than "
+                      "the requested size: %(req)im." %
+                      {'uid': userid, 'cur': active_size,
+                       'req': size})
+            raise exception.SDKConflictError(modID='guest', rs=18,
+                                             userid=userid,
+                                             active=active_size,
+                                             req=size)
+        MAX_STOR_RESERVED = int(zvmutils.convert_to_mb(
+                        CONF.zvm.user_default_max_reserved_memory))
+        increase_size = size - active_size
+        if increase_size > MAX_STOR_RESERVED:
+            LOG.error("Live memory resize for guest '%s' cann't be done. "
+                      "The memory size to be increased: '%im' is greater "
+                      " than the maximum reserved memory size: '%im'." %
+                      (userid, increase_size, MAX_STOR_RESERVED))
+            raise exception.SDKConflictError(modID='guest', rs=21,
+                                             userid=userid,
+                                             inc=increase_size,
+                                             max=MAX_STOR_RESERVED)
+        storage = direct_info['STORAGE']
+        if 'max' not in storage or 'reserved' not in storage:
+            LOG.error("Memory resize for guest '%s' cann't be done."
+                      "Failed to get the defined/max/reserved memory size "
+                      "from user directory." % userid)
+            raise exception.SDKConflictError(modID='guest', rs=19,
+                                             userid=userid)
+        max_mem = int(zvmutils.convert_to_mb(storage['max']))
+        if size > max_mem:
+            LOG.error("Memory resize for guest '%s' cann't be done. The "
+                      "requested memory size: '%im' exceeds the maximum "
+                      "size allowed: '%im'." %
+                      (userid, size, max_mem))
+            raise exception.SDKConflictError(modID='guest', rs=20,
+                                             userid=userid,
+                                             req=size, max=max_mem)
+        return {'size': size,
+                'defined': int(zvmutils.convert_to_mb(storage['defined'])),
+                'reserved': min(max_mem - size, MAX_STOR_RESERVED),
+                'increase': increase_size}
+
+    def _build_resized_direct(self, user_direct, cpu=None, memory=None):
+        # Return the user direct statements with the cpu and memory changes
+        # of a resize plan applied
+        new_direct = []
+        cpu_pos = None
+        for ent in user_direct:
+            if ent == '':
+                # Image_Replace_DM returns syntax error for empty lines
+                continue
+            fields = ent.split()
+            statement = fields[0].upper()
+            if statement == 'CPU' and len(fields) > 1:
+                if cpu is None or fields[1].upper() not in cpu['undefine']:
+                    new_direct.append(ent)
+                cpu_pos = len(new_direct)
+            elif statement == 'MACHINE':
+                new_direct.append(ent)
+                cpu_pos = cpu_pos or len(new_direct)
+            elif (memory is not None and statement == 'USER' and
+                  len(fields) == 6):
+                fields[3] = '%iM' % memory['size']
+                new_direct.append(' '.join(fields))
+            elif (memory is not None and
+                  ent.startswith("COMMAND DEF STOR RESERVED")):
+                new_direct.append("COMMAND DEF STOR RESERVED %iM" %
+                                  memory['reserved'])
+            else:
+                new_direct.append(ent)
+        if cpu is not None and cpu['define']:
+            if cpu_pos is None:
+                cpu_pos = len(new_direct)
+            new_direct[cpu_pos:cpu_pos] = ['CPU %s' % addr
+                                           for addr in cpu['define']]
+        return new_direct
+
+    def plan_live_resize(self, userid, cpu_cnt=None, memory=None):
+        """Compute the changes to live resize the cpus and the memory of
+        the guest. The user directory and the active state of the guest
+        are read once, and the two reads are done in parallel.
+
+        Return the plan, a dict like:
+        {'userid': (str) the guest,
+         'user_direct': (list) the current user directory statements,
+         'new_direct': (list) the user directory statements to replace
+                       with, None if the user directory is not changed,
+         'cpu': {'define': (list) the cpu addrs to add to the directory,
+                 'undefine': (list) the cpu addrs to remove from the
+                             directory,
+                 'activate': (list) the cpu addrs to define to active},
+         'memory': {'size': (int) the requested size in mb,
+                    'defined': (int) the defined size in mb,
+                    'reserved': (int) the new reserved size in mb,
+                    'increase': (int) the size in mb to add to active},
+         'ubuntu': (bool) whether the guest runs ubuntu,
+         'timings': (dict) the seconds taken by each step}
+        cpu or memory is None if it is not resized.
+        """
+        timings = {}
+
+        def _timed(step, func, *args):
+            start = time.time()
+            try:
+                return func(*args)
+            finally:
+                timings[step] = round(time.time() - start, 3)
+
+        reads = zvmutils.run_in_parallel(
+            _timed, [('read_directory', self.get_user_direct, userid),
+                     ('read_active', self._get_live_state, userid)],
+            max_workers=2)
+        for ret, err in reads:
+            if err is not None:
+                raise err
+        user_direct = reads[0][0]
+        state = reads[1][0]
+        direct_info = parse_user_direct(user_direct)
+
+        plan = {'userid': userid, 'user_direct': user_direct,
+                'new_direct': None, 'cpu': None, 'memory': None,
+                'ubuntu': state['ubuntu'], 'timings': timings}
+        if cpu_cnt is not None:
+            plan['cpu'] = self._plan_cpus(userid, cpu_cnt, direct_info,
+                                          state['cpus'])
+        if memory is not None:
+            plan['memory'] = self._plan_memory(userid, memory, direct_info,
+                                               state['memory'])
+        cpu = plan['cpu']
+        mem = plan['memory']
+        if ((cpu and (cpu['define'] or cpu['undefine'])) or
+                (mem and mem['size'] != mem['defined'])):
+            plan['new_direct'] = self._build_resized_direct(user_direct,
+                                                            cpu, mem)
+        return plan
+
+    def apply_live_resize(self, plan):
+        """Apply a plan of plan_live_resize. The user directory is
+        replaced once for both the cpu and the memory changes, then the new
+        cpus and memory are defined to active and put online. The user
+        directory is reverted if they fail to be defined to active.
+
+        The new user directory is built again from a read done after the
+        directory is locked, so a change made since the plan is kept.
+        """
+        userid = plan['userid']
+        timings = plan['timings']
+        cpu = plan['cpu']
+        memory = plan['memory']
+
+        def _run(step, cmd_str):
+            start = time.time()
+            try:
+                return self.execute_cmd(userid, cmd_str)
+            finally:
+                timings[step] = round(time.time() - start, 3)
+
+        def _revert(keep_cpu):
+            if plan['new_direct'] is None:
+                return
+            LOG.debug("Start to revert user definition of guest '%s'."
+                      % userid)
+            user_entry = plan['user_direct']
+            if keep_cpu:
+                user_entry = self._build_resized_direct(user_entry, cpu=cpu)
+            self._revert_user_direct(userid, user_entry)
+
+        if plan['new_direct'] is not None:
+            start = time.time()
+            try:
+                try:
+                    self._lock_user_direct(userid)
+                except exception.SDKSMTRequestFailed as e:
+                    raise exception.SDKGuestOperationError(
+                        rs=9, userid=userid, err=e.format_message())
+                try:
+                    user_direct = self.get_user_direct(userid, cached=False)
+                except exception.SDKSMTRequestFailed as e:
+                    self._unlock_user_direct(userid)
+                    raise exception.SDKGuestOperationError(
+                        rs=18, userid=userid, err=e.format_message())
+                plan['user_direct'] = user_direct
+                plan['new_direct'] = self._build_resized_direct(
+                    user_direct, cpu, memory)
+                try:
+                    self._replace_user_direct(userid, plan['new_direct'])
+                except exception.SDKSMTRequestFailed as e:
+                    raise exception.SDKGuestOperationError(
+                        rs=18, userid=userid, err=e.format_message())
+            finally:
+                timings['update_directory'] = round(time.time() - start, 3)
+
+        if cpu and cpu['activate']:
+            try:
+                _run('define_cpus',
+                     "vmcp def cpu " + ' '.join(cpu['activate']))
+            except exception.SDKSMTRequestFailed as err:
+                LOG.error("Define cpu of guest: '%s' to active failed with "
+                          "error: %s." % (userid, err.format_message()))
+                _revert(keep_cpu=False)
+                raise exception.SDKGuestOperationError(
+                    rs=7, userid=userid, err=err.format_message())
+            # ubuntu needs chcpu -e <cpu-list> to make the cpus online
+            cmds = ["chcpu -r"]
+            if plan['ubuntu']:
+                cmds.append("chcpu -e " + ','.join(cpu['activate']))
+            try:
+                _run('online_cpus', ' && '.join(cmds))
+            except exception.SDKSMTRequestFailed as err:
+                msg = err.format_message()
+                LOG.error("Rescan cpus to hot-plug new defined cpus for "
+                          "guest: '%s' failed with error: %s. No rollback is "
+                          "done and you may need to check the status and "
+                          "restart the guest to make the defined cpus "
+                          "online." % (userid, msg))
+                raise exception.SDKGuestOperationError(rs=8, userid=userid,
+                                                       err=msg)
+
+        if memory and memory['increase'] > 0:
+            try:
+                _run('define_memory',
+                     "vmcp def storage standby %iM" % memory['increase'])
+            except exception.SDKSMTRequestFailed as err:
+                LOG.error("Define standby memory of guest: '%s' failed with "
+                          "error: %s." % (userid, err.format_message()))
+                _revert(keep_cpu=True)
+                raise exception.SDKGuestOperationError(
+                    rs=11, userid=userid, err=err.format_message())
+            try:
+                _run('online_memory', "chmem -e %iM" % memory['increase'])
+            except exception.SDKSMTRequestFailed as err1:
+                LOG.error("Online memory of guest: '%s' failed with "
+                          "error: %s." % (userid, err1.format_message()))
+                try:
+                    self.execute_cmd(userid, "vmcp def storage standby 0M")
+                except exception.SDKSMTRequestFailed as err2:
+                    LOG.error("Revert standby memory of guest: '%s' failed "
+                              "with error: %s." %
+                              (userid, err2.format_message()))
+                _revert(keep_cpu=True)
+                raise exception.SDKGuestOperationError(
+                    rs=19, userid=userid, err=err1.format_message())
+
+    def live_resize(self, userid, cpu_cnt=None, memory=None):
+        """Live resize the cpus and the memory of the guest by one plan,
+        return the seconds taken by each step."""
+        start = time.time()
+        plan = self.plan_live_resize(userid, cpu_cnt=cpu_cnt, memory=memory)
+        self.apply_live_resize(plan)
+        timings = plan['timings']
+        timings['total'] = round(time.time() - start, 3)
+        LOG.info("Live resize for guest: '%s' finished successfully, step "
+                 "timings: %s" % (userid, timings))
+        return timings
+
     def is_rhcos(self, os_version):
         return os_version.lower().startswith('rhcos')
 
     def _get_wwpn_lun(self, userid):
-        user_direct = self.get_user_direct(userid)
-        wwpn = None
-        lun = None
-        for ent in user_direct:
-            if ent.upper().startswith("LOADDEV PORT"):
-                wwpn = ent.split()[2].strip()
-            elif ent.upper().startswith("LOADDEV LUN"):
-                lun = ent.split()[2].strip()
-        return (wwpn, lun)
+        loaddev = self.get_user_direct_info(userid)['LOADDEV']
+        return (loaddev.get('PORTNAME'), loaddev.get('LUN'))
+
+
+def parse_user_direct(user_direct):
+    """Parse the statements of a user directory entry into a dict.
+
+    The returned dict looks like:
+    {'USER': {'userid': 'TESTUSER', 'storage': '1G', 'max_storage': '4G',
+              'privilege': 'G'},
+     'STORAGE': {'defined': '1G', 'max': '4G', 'reserved': '2048M'},
+     'MACHINE': {'mode': 'ESA', 'max_cpus': 32},
+     'CPU': ['00', '01'],
+     'NICDEF': {'1000': {'type': 'QDIO', 'vswitch': 'VSW1',
+                         'mac': '0A0B0C', 'vid': '100'}},
+     'MDISK': {'0100': {'type': '3390', 'start': '0001', 'size': '3338',
+                        'volume': 'VOL01', 'mode': 'MR'}},
+     'LOADDEV': {'PORTNAME': '5005076802400c1b', 'LUN': '0000000000000000'}}
+    NICDEF and MDISK are ordered by their position in the directory entry.
+    """
+    info = {'USER': {}, 'STORAGE': {}, 'MACHINE': {}, 'CPU': [],
+            'NICDEF': collections.OrderedDict(),
+            'MDISK': collections.OrderedDict(), 'LOADDEV': {}}
+    for ent in user_direct:
+        fields = ent.split()
+        if not fields:
+            continue
+        statement = fields[0].upper()
+        if statement == 'USER' and len(fields) == 6:
+            # u'USER userid password storage max privclass'
+            info['USER'] = {'userid': fields[1], 'storage': fields[3],
+                            'max_storage': fields[4],
+                            'privilege': fields[5]}
+            info['STORAGE']['defined'] = fields[3]
+            info['STORAGE']['max'] = fields[4]
+        elif ent.startswith("COMMAND DEF STOR RESERVED") and len(fields) > 4:
+            info['STORAGE']['reserved'] = fields[4]
+        elif statement == 'MACHINE' and len(fields) > 1:
+            info['MACHINE']['mode'] = fields[1]
+            if len(fields) > 2:
+                info['MACHINE']['max_cpus'] = int(fields[2])
+        elif statement == 'CPU' and len(fields) > 1:
+            info['CPU'].append(fields[1].upper())
+        elif statement == 'NICDEF' and len(fields) > 1:
+            nic = info['NICDEF'].setdefault(fields[1].upper(), {})
+            idx = 2
+            while idx < len(fields):
+                keyword = fields[idx].upper()
+                if keyword == 'TYPE' and idx + 1 < len(fields):
+                    nic['type'] = fields[idx + 1]
+                    idx += 2
+                elif keyword == 'LAN' and idx + 2 < len(fields):
+                    nic['vswitch'] = fields[idx + 2]
+                    idx += 3
+                elif keyword == 'MACID' and idx + 1 < len(fields):
+                    nic['mac'] = fields[idx + 1]
+                    idx += 2
+                elif keyword == 'VLAN' and idx + 1 < len(fields):
+                    nic['vid'] = fields[idx + 1]
+                    idx += 2
+                else:
+                    idx += 1
+        elif statement == 'MDISK' and len(fields) > 1:
+            info['MDISK'][fields[1].upper()] = dict(
+                zip(('type', 'start', 'size', 'volume', 'mode'), fields[2:]))
+        elif statement == 'LOADDEV' and len(fields) > 2:
+            keyword = fields[1].upper()
+            # PORTNAME can be abbreviated down to PORT
+            if keyword.startswith('PORT'):
+                keyword = 'PORTNAME'
+            info['LOADDEV'][keyword] = fields[2]
+    return info
+
+
+class ReaderBatch(object):
+    """Accumulate the activation engine modifier scripts for the reader of a
+    guest, and punch them into the reader as one doscript file.
+
+    Each script added is put into its own directory of the doscript punched
+    together with an invokeScript.sh that runs it. The invokeScript.sh of the
+    doscript runs the invokeScript.sh of each directory, in the order added.
+    """
+
+    def __init__(self, smtclient, userid):
+        self._smtclient = smtclient
+        self._userid = userid
+        self._parts = []
+
+    def __len__(self):
+        return len(self._parts)
+
+    def add_aemod(self, script, parms):
+        """Add an activation engine modifier script to be run with
+        parms, the same as the aemod of changevm. parms is quoted as the
+        --invparms of changevm, the quotes are removed the same way."""
+        with open(script, 'rb') as f:
+            content = f.read()
+        name = os.path.basename(script)
+        invoke = "#!/bin/bash \n/bin/bash %s %s \n" % (
+            name, ' '.join(shlex.split(parms)))
+        self._parts.append({name: content, 'invokeScript.sh': invoke})
+
+    def punch(self):
+        """Punch the scripts added as one doscript file, nothing is
+        punched if no script is added."""
+        if not self._parts:
+            return
+        doscript = zvmutils.TarBuilder()
+        part_dirs = []
+        invoke = ['#!/bin/bash']
+        for files in self._parts:
+            part_dir = 'part%04i' % len(part_dirs)
+            part_dirs.append(part_dir)
+            doscript.add_dir(part_dir)
+            for name in sorted(files):
+                doscript.add_file('%s/%s' % (part_dir, name), files[name])
+            invoke.append('(cd %s && /bin/bash invokeScript.sh)' % part_dir)
+        invoke.append('rm -rf %s' % ' '.join(part_dirs))
+        doscript.add_file('invokeScript.sh', '\n'.join(invoke) + '\n')
+
+        temp_path = self._smtclient.get_guest_temp_path(self._userid)
+        try:
+            # punch_file removes the file punched
+            self._smtclient.punch_file(
+                self._userid,
+                doscript.write(os.path.join(temp_path, 'batch.doscript')),
+                'X')
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        LOG.debug("Punched %d aemod scripts to the reader of guest %s"
+                  % (len(self._parts), self._userid))
+        self._parts = []
+
+
+class UserDirectCache(object):
+    """Cache for user directory entries, keyed by userid.
+
+    Every cached entry keeps both the raw statements and the parsed
+    statements of the directory entry. A generation number is kept for each
+    userid and increased when the entry is invalidated, so that an entry read
+    while the directory was being changed is not put into the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cache = {}
+        self._generations = {}
+
+    def get_generation(self, userid):
+        with zvmutils.acquire_lock(self._lock):
+            return self._generations.get(userid.upper(), 0)
+
+    def get(self, userid):
+        with zvmutils.acquire_lock(self._lock):
+            entry = self._cache.get(userid.upper())
+            if entry is None or time.time() > entry['expiration']:
+                return None
+            return entry
+
+    def set(self, userid, user_direct, generation):
+        interval = CONF.guest.user_direct_cache_interval
+        if interval <= 0:
+            return
+        with zvmutils.acquire_lock(self._lock):
+            if self.get_generation(userid) != generation:
+                # the directory is changed while it was being read
+                return
+            self._cache[userid.upper()] = {
+                'expiration': time.time() + interval,
+                'data': list(user_direct),
+                'info': parse_user_direct(user_direct)}
+
+    def invalidate(self, userid):
+        with zvmutils.acquire_lock(self._lock):
+            userid = userid.upper()
+            self._cache.pop(userid, None)
+            self._generations[userid] = self._generations.get(userid, 0) + 1
+
+    def clear(self):
+        with zvmutils.acquire_lock(self._lock):
+            for userid in list(self._cache.keys()):
+                self.invalidate(userid)
+
+
+class VswitchCache(object):
+    """Cache for the parsed vswitch and OSA state of the host.
+
+    The vswitch name list, the query result of each vswitch and the OSA
+    query result are cached separately, so a change of one vswitch only
+    drops the entry of that vswitch. As UserDirectCache, a generation
+    number is kept for each entry to not cache a result read while the
+    entry was being invalidated.
+    """
+
+    LIST = '__list__'
+    OSA = '__osa__'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._cache = {}
+        self._generations = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _key(self, name):
+        return name if name in (self.LIST, self.OSA) else name.upper()
+
+    def get_generation(self, name):
+        with zvmutils.acquire_lock(self._lock):
+            return self._generations.get(self._key(name), 0)
+
+    def get(self, name):
+        with zvmutils.acquire_lock(self._lock):
+            entry = self._cache.get(self._key(name))
+            if entry is None or time.time() > entry['expiration']:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return copy.deepcopy(entry['data'])
+
+    def set(self, name, data, generation):
+        interval = CONF.network.vswitch_cache_interval
+        if interval <= 0:
+            return
+        with zvmutils.acquire_lock(self._lock):
+            if self.get_generation(name) != generation:
+                return
+            self._cache[self._key(name)] = {
+                'expiration': time.time() + interval,
+                'time': time.time(),
+                'data': copy.deepcopy(data)}
+
+    def invalidate(self, name):
+        with zvmutils.acquire_lock(self._lock):
+            key = self._key(name)
+            if self._cache.pop(key, None) is not None:
+                self._invalidations += 1
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def invalidate_vswitches(self):
+        """Drop the entries of all the vswitches, not the name list."""
+        with zvmutils.acquire_lock(self._lock):
+            for key in list(self._cache.keys()):
+                if key not in (self.LIST, self.OSA):
+                    self.invalidate(key)
+
+    def clear(self):
+        with zvmutils.acquire_lock(self._lock):
+            for key in list(self._cache.keys()):
+                self.invalidate(key)
+
+    def claim_osa(self, devices):
+        """Mark the OSA devices as not free in the cached OSA info."""
+        with zvmutils.acquire_lock(self._lock):
+            entry = self._cache.get(self.OSA)
+            if entry is None:
+                return
+            for osa_info in entry['data'].values():
+                osa_info['FREE'] = [dev for dev in osa_info['FREE']
+                                    if dev not in devices]
+
+    def stats(self):
+        with zvmutils.acquire_lock(self._lock):
+            now = time.time()
+            entries = dict((key, entry) for key, entry in self._cache.items()
+                           if now <= entry['expiration'])
+
+            def _age(key):
+                if key in entries:
+                    return int(now - entries[key]['time'])
+                return None
+
+            return {'interval': CONF.network.vswitch_cache_interval,
+                    'vswitch_list_age': _age(self.LIST),
+                    'osa_age': _age(self.OSA),
+                    'vswitches': dict(
+                        (key, _age(key)) for key in sorted(entries)
+                        if key not in (self.LIST, self.OSA)),
+                    'hits': self._hits,
+                    'misses': self._misses,
+                    'invalidations': self._invalidations}
+
+
+class ImageCatalog(object):
+    """In-memory catalog of the images in SDK image repository.
+
+    All image records are loaded from image database with one query and
+    kept in a dict keyed by image name, together with an index by os
+    distro and the precomputed repository path, root disk size and last
+    access time of each image. The catalog is rebuilt lazily when it is
+    invalidated by image import/capture/delete, when the netboot repository
+    directories are changed, or when it expires.
+    """
+
+    def __init__(self, db_operator):
+        self._db_operator = db_operator
+        self._lock = threading.RLock()
+        self._images = {}
+        self._os_distro_index = {}
+        self._expiration = 0
+        self._repository_stamp = None
+
+    def _get_deploy_root(self):
+        return '/'.join([CONF.image.sdk_image_repository,
+                         const.IMAGE_TYPE['DEPLOY']])
+
+    def _get_repository_stamp(self):
+        """Return the modify time of the netboot repository and each os
+        distro folder under it, an image folder being added or removed
+        changes the stamp."""
+        deploy_root = self._get_deploy_root()
+        try:
+            stamp = [('', os.stat(deploy_root).st_mtime)]
+            for os_distro in os.listdir(deploy_root):
+                distro_path = os.path.join(deploy_root, os_distro)
+                stamp.append((os_distro, os.stat(distro_path).st_mtime))
+        except OSError:
+            return None
+        return tuple(sorted(stamp))
+
+    def _get_access_time(self, image_path):
+        image_file = os.path.join(image_path, CONF.zvm.user_root_vdev)
+        try:
+            return os.path.getatime(image_file)
+        except OSError:
+            # An invalid timestamp
+            return -1
+
+    def _make_entry(self, record):
+        image_path = '/'.join([self._get_deploy_root(),
+                               record['imageosdistro'],
+                               record['imagename']])
+        disk_size_units = record['disk_size_units'] or ''
+        return {'record': record,
+                'image_path': image_path,
+                'root_disk_size': disk_size_units.split(':')[0],
+                'last_access_time': self._get_access_time(image_path)}
+
+    def _load(self):
+        repository_stamp = self._get_repository_stamp()
+        image_list = self._db_operator.image_query_record() or []
+        images = {}
+        os_distro_index = {}
+        for record in image_list:
+            key = record['imagename']
+            images[key] = self._make_entry(record)
+            os_distro = (record['imageosdistro'] or '').lower()
+            os_distro_index.setdefault(os_distro, set()).add(key)
+        self._images = images
+        self._os_distro_index = os_distro_index
+        self._repository_stamp = repository_stamp
+        self._expiration = (time.time() +
+                            float(CONF.image.catalog_refresh_interval))
+        LOG.debug("Image catalog refreshed with %d images" % len(images))
+
+    def _refresh_if_needed(self):
+        """Reload the catalog if it is expired or the repository changed,
+        return True if a reload happened."""
+        if (time.time() > self._expiration or
+            self._get_repository_stamp() != self._repository_stamp):
+            self._load()
+            return True
+        return False
+
+    def _get_entry(self, image_name):
+        with zvmutils.acquire_lock(self._lock):
+            refreshed = self._refresh_if_needed()
+            entry = self._images.get(image_name)
+            if entry is None and not refreshed:
+                # The image may be added by another SDK process, reload
+                # once before reporting it as not exist
+                self._load()
+                entry = self._images.get(image_name)
+            return entry
+
+    def _to_image_info(self, entry):
+        image_info = dict(entry['record'])
+        image_info['last_access_time'] = entry['last_access_time']
+        return image_info
+
+    def invalidate(self):
+        with zvmutils.acquire_lock(self._lock):
+            self._expiration = 0
+
+    def get(self, image_name):
+        """Return the image info of specified image, None if not exist."""
+        entry = self._get_entry(image_name)
+        if entry is None:
+            return None
+        return self._to_image_info(entry)
+
+    def list(self, os_distro=None, limit=None, marker=None):
+        """Return the image info of all images, or only the images of
+        specified os distro. When limit or marker is specified, the images
+        are sorted by name and only at most limit images whose name sorts
+        after the marker are returned."""
+        with zvmutils.acquire_lock(self._lock):
+            self._refresh_if_needed()
+            if os_distro is None:
+                keys = self._images.keys()
+            else:
+                keys = self._os_distro_index.get(os_distro.lower(), set())
+            if limit is not None or marker is not None:
+                keys = zvmutils.paginate(keys, limit=limit, marker=marker)
+            return [self._to_image_info(self._images[key]) for key in keys]
+
+    def get_image_path(self, image_name):
+        entry = self._get_entry(image_name)
+        if entry is None:
+            return None
+        return entry['image_path']
+
+    def get_root_disk_size(self, image_name):
+        entry = self._get_entry(image_name)
+        if entry is None:
+            return None
+        return entry['root_disk_size']
+
+    def update_access_time(self, image_name):
+        """Update the last access time of an image after it is used,
+        nothing is done if the image is not loaded in the catalog."""
+        with zvmutils.acquire_lock(self._lock):
+            entry = self._images.get(image_name)
+            if entry is not None:
+                entry['last_access_time'] = self._get_access_time(
+                                                    entry['image_path'])
 
 
 class FilesystemBackend(object):
@@ -0,0 +1,179 @@
+# Copyright 2021 IBM Corp.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+import threading
+import time
+
+from zvmsdk import config
+from zvmsdk import exception
+from zvmsdk import log
+from zvmsdk import smtclient
+from zvmsdk import utils as zvmutils
+
+
+_STATE_WATCHER = None
+CONF = config.CONF
+LOG = log.LOG
+
+# the states a guest can be waited for
+STATE_ON = 'on'
+STATE_OFF = 'off'
+STATE_REACHABLE = 'reachable'
+STATE_UNREACHABLE = 'unreachable'
+_STATES = (STATE_ON, STATE_OFF, STATE_REACHABLE, STATE_UNREACHABLE)
+
+
+def get_state_watcher():
+    global _STATE_WATCHER
+    if _STATE_WATCHER is None:
+        _STATE_WATCHER = GuestStateWatcher()
+    return _STATE_WATCHER
+
+
+class GuestStateWatcher(object):
+    """Watch the state of guests on behalf of the waiting requests.
+
+    Only one thread polls, and only while there are waiters. In each poll the
+    power state of all the watched guests is got from one query of the logged
+    on users, then the guests waited for reachable or unreachable that are
+    logged on are checked through IUCV. Waiters sleep on a condition which is
+    notified after each poll.
+    """
+
+    def __init__(self):
+        self._smtclient = smtclient.get_smtclient()
+        self._cond = threading.Condition()
+        # userid -> {state: number of waiters}
+        self._waiters = {}
+        # userid -> {'on': bool, 'reachable': bool or None, 'time': float}
+        self._states = {}
+        self._thread = None
+
+    def _add_waiter(self, userid, state):
+        states = self._waiters.setdefault(userid, {})
+        states[state] = states.get(state, 0) + 1
+
+    def _remove_waiter(self, userid, state):
+        states = self._waiters[userid]
+        states[state] -= 1
+        if states[state] == 0:
+            del states[state]
+        if not states:
+            del self._waiters[userid]
+            self._states.pop(userid, None)
+
+    def _in_state(self, userid, state, since):
+        observed = self._states.get(userid)
+        # only trust the states polled after the wait started
+        if observed is None or observed['time'] < since:
+            return False
+        if state == STATE_ON:
+            return observed['on']
+        elif state == STATE_OFF:
+            return not observed['on']
+        elif state == STATE_REACHABLE:
+            return observed['reachable'] is True
+        else:
+            return observed['reachable'] is False
+
+    def _is_reachable(self, userid):
+        try:
+            # the guests are being started or stopped, so a reply got
+            # before that does not count
+            return self._smtclient.get_guest_connection_status(
+                userid, cached=False)
+        except Exception as err:
+            LOG.debug("Failed to check whether guest %s is reachable: %s",
+                      userid, err)
+            return False
+
+    def _poll(self):
+        with self._cond:
+            watched = dict((userid, set(states))
+                           for userid, states in self._waiters.items())
+        if not watched:
+            return
+
+        poll_time = time.time()
+        try:
+            logged_on = zvmutils.get_logged_on_users()
+        except Exception as err:
+            LOG.warning("Failed to poll the state of guests %s: %s",
+                        ', '.join(sorted(watched)), err)
+            return
+
+        states = {}
+        to_ping = []
+        for userid, waited in watched.items():
+            states[userid] = {'on': userid in logged_on, 'reachable': None,
+                              'time': poll_time}
+            if waited & set((STATE_REACHABLE, STATE_UNREACHABLE)):
+                if userid in logged_on:
+                    to_ping.append(userid)
+                else:
+                    states[userid]['reachable'] = False
+        results = zvmutils.run_in_parallel(
+            self._is_reachable, [(userid,) for userid in to_ping],
+            max_workers=CONF.sdkserver.max_worker_count)
+        for userid, (reachable, err) in zip(to_ping, results):
+            states[userid]['reachable'] = bool(reachable)
+
+        with self._cond:
+            for userid, state in states.items():
+                if userid in self._waiters:
+                    self._states[userid] = state
+            self._cond.notify_all()
+
+    def _watch_loop(self):
+        while True:
+            self._poll()
+            with self._cond:
+                if not self._waiters:
+                    self._thread = None
+                    return
+            time.sleep(CONF.guest.state_poll_interval)
+
+    def wait_for(self, userid, state, timeout):
+        """Wait until the guest is in the state, which is one of 'on', 'off',
+        'reachable' and 'unreachable'.
+
+        :returns: True if the guest is in the state, False if timed out.
+        """
+        if state not in _STATES:
+            msg = ("Invalid state %s to wait for, it should be one of %s" %
+                   (state, ', '.join(_STATES)))
+            raise exception.SDKInvalidInputFormat(msg=msg)
+
+        userid = userid.upper()
+        since = time.time()
+        expiration = since + timeout
+        with self._cond:
+            self._add_waiter(userid, state)
+            try:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._watch_loop, name='GuestStateWatcher')
+                    self._thread.daemon = True
+                    self._thread.start()
+                while not self._in_state(userid, state, since):
+                    remaining = expiration - time.time()
+                    if remaining <= 0:
+                        LOG.debug("Timed out waiting for guest %s to be %s",
+                                  userid, state)
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._remove_waiter(userid, state)
@@ -11,9 +11,11 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import base64
 import json
 import mock
 import requests
+import time
 import unittest
 
 
@@ -49,7 +51,60 @@ class RESTClientTestCase(unittest.TestCase):
         token = '1234567890'
         return token
 
-    @mock.patch.object(requests, 'request')
+    def _jwt_token(self, exp):
+        payload = base64.urlsafe_b64encode(
+            json.dumps({'exp': exp}).encode('utf-8')).decode('ascii')
+        return 'header.%s.signature' % payload.rstrip('=')
+
+    def test_get_token_expiration(self):
+        self.assertEqual(restclient.get_token_expiration(
+            self._jwt_token(1600000000)), 1600000000)
+        self.assertIsNone(restclient.get_token_expiration(
+            'server-auth-closed'))
+
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_token_cached(self, get_token, request):
+        client = restclient.RESTClient(token_path='/tmp/token')
+        request.return_value = mock.Mock(status_code=200)
+        get_token.return_value = self._jwt_token(time.time() + 3600)
+        client.api_request('http://127.0.0.1:8888/guests', 'GET',
+                           headers=self.headers)
+        client.api_request('http://127.0.0.1:8888/guests', 'GET',
+                           headers=self.headers)
+        get_token.assert_called_once_with()
+        self.assertEqual(request.call_count, 2)
+
+        # token is refreshed when it is about to expire
+        client._token_expiration = time.time() + 10
+        client.api_request('http://127.0.0.1:8888/guests', 'GET',
+                           headers=self.headers)
+        self.assertEqual(get_token.call_count, 2)
+
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_token_refreshed_on_401(self, get_token, request):
+        client = restclient.RESTClient(token_path='/tmp/token')
+        get_token.side_effect = ['token1', 'token2']
+        request.side_effect = [mock.Mock(status_code=401),
+                               mock.Mock(status_code=200)]
+        response = client.api_request('http://127.0.0.1:8888/guests', 'GET',
+                                      headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_token.call_count, 2)
+        headers = dict(self.headers)
+        headers['X-Auth-Token'] = 'token2'
+        request.assert_called_with('GET', 'http://127.0.0.1:8888/guests',
+                                   data=None, headers=headers,
+                                   verify=False)
+
+    def test_session_pool(self):
+        client = restclient.RESTClient(pool_size=20, keep_alive=False)
+        adapter = client._session.get_adapter('http://127.0.0.1:8888')
+        self.assertEqual(adapter._pool_maxsize, 20)
+        self.assertEqual(client._session.headers['Connection'], 'close')
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_create(self, get_token, request):
         # method = 'POST'
@@ -74,7 +129,7 @@ class RESTClientTestCase(unittest.TestCase):
         #                             data=body, headers=header,
         #                             verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_list(self, get_token, request):
         method = 'GET'
@@ -90,7 +145,13 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+        full_uri = self.base_url + '/guests?limit=10&marker=TEST0001'
+        self.client.call("guest_list", limit=10, marker='TEST0001')
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_inspect_stats(self, get_token, request):
         method = 'GET'
@@ -114,7 +175,16 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+        url = ('/guests/stats?userid=%s&limit=2&fields=guest_cpus,'
+               'used_mem_kb' % self.fake_userid)
+        full_uri = self.base_url + url
+        self.client.call("guest_inspect_stats", self.fake_userid, limit=2,
+                         fields=['guest_cpus', 'used_mem_kb'])
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_inspect_vnics(self, get_token, request):
         method = 'GET'
@@ -138,7 +208,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guests_get_nic_info(self, get_token, request):
         method = 'GET'
@@ -158,7 +228,24 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guests_get_nic_info_paging(self, get_token, request):
+        method = 'GET'
+        url = '/guests/nics?limit=2&marker=%s:1000' % self.fake_userid
+        body = None
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guests_get_nic_info", limit=2,
+                         marker='%s:1000' % self.fake_userid)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_delete(self, get_token, request):
         method = 'DELETE'
@@ -174,7 +261,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_get_definition_info(self, get_token, request):
         method = 'GET'
@@ -190,7 +277,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_start(self, get_token, request):
         method = 'POST'
@@ -207,7 +294,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_stop(self, get_token, request):
         method = 'POST'
@@ -224,7 +311,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_softstop(self, get_token, request):
         method = 'POST'
@@ -241,7 +328,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_softstop_parameter_set_zero(self, get_token, request):
         method = 'POST'
@@ -259,7 +346,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_pause(self, get_token, request):
         method = 'POST'
@@ -276,7 +363,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_unpause(self, get_token, request):
         method = 'POST'
@@ -293,7 +380,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_reboot(self, get_token, request):
         method = 'POST'
@@ -310,7 +397,13 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+        body = json.dumps({'action': 'reboot', 'timeout': 300})
+        self.client.call("guest_reboot", self.fake_userid, timeout=300)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_reset(self, get_token, request):
         method = 'POST'
@@ -327,7 +420,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_get_console_output(self, get_token, request):
         method = 'POST'
@@ -344,7 +437,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_capture(self, get_token, request):
         method = 'POST'
@@ -363,7 +456,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_deploy(self, get_token, request):
         method = 'POST'
@@ -382,7 +475,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_get_info(self, get_token, request):
         method = 'GET'
@@ -398,7 +491,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_get_user_direct(self, get_token, request):
         method = 'GET'
@@ -414,7 +507,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_get_info_ssl(self, get_token, request):
         method = 'GET'
@@ -430,7 +523,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_create_nic(self, get_token, request):
         # method = 'POST'
@@ -453,7 +546,7 @@ class RESTClientTestCase(unittest.TestCase):
         #                            data=body, headers=header,
         #                            verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_delete_nic(self, get_token, request):
         method = 'DELETE'
@@ -471,7 +564,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_nic_couple_to_vswitch(self, get_token, request):
         method = 'PUT'
@@ -491,7 +584,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_nic_couple_to_vswitch_vlan_id(self, get_token, request):
         method = 'PUT'
@@ -512,7 +605,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_nic_uncouple_from_vswitch(self, get_token, request):
         method = 'PUT'
@@ -531,7 +624,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_create_network_interface(self, get_token, request):
         method = 'POST'
@@ -552,7 +645,100 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guest_create_bulk(self, get_token, request):
+        method = 'POST'
+        url = '/guests/create/bulk'
+        guests = [{'userid': 'USER1', 'vcpus': 1, 'memory': 1024},
+                  {'userid': 'USER2', 'vcpus': 2, 'memory': 2048}]
+        body = json.dumps({'guests': guests})
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guest_create_bulk", guests)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guest_live_migrate_bulk(self, get_token, request):
+        method = 'POST'
+        url = '/guests/migrate/bulk'
+        body = json.dumps({'migrate': {'userid_list': ['USER1', 'USER2'],
+                                       'dest_zcc_userid': 'ZCC2',
+                                       'destination': 'SSI2',
+                                       'concurrency': 2}})
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guest_live_migrate_bulk", ['USER1', 'USER2'],
+                         'ZCC2', 'SSI2', concurrency=2)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guest_delete_bulk(self, get_token, request):
+        method = 'POST'
+        url = '/guests/delete/bulk'
+        body = json.dumps({'delete': {'userid_list': ['USER1', 'USER2']}})
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guest_delete_bulk", ['USER1', 'USER2'])
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guest_get_console_output_bulk(self, get_token, request):
+        method = 'POST'
+        url = '/guests/console/bulk'
+        body = {'console': {'userid_list': ['USER1', 'USER2'],
+                            'cursors': {'USER1': 100}}}
+        body = json.dumps(body)
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guest_get_console_output_bulk", ['USER1', 'USER2'],
+                         cursors={'USER1': 100})
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guest_execute_cmd_bulk(self, get_token, request):
+        method = 'POST'
+        url = '/guests/cmd/bulk'
+        body = {'execute': {'userid_list': ['USER1', 'USER2'],
+                            'cmd': 'uname -r',
+                            'concurrency': 10}}
+        body = json.dumps(body)
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guest_execute_cmd_bulk", ['USER1', 'USER2'],
+                         'uname -r', concurrency=10)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_delete_network_interface(self, get_token, request):
         method = 'DELETE'
@@ -572,7 +758,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_get_power_state(self, get_token, request):
         method = 'GET'
@@ -588,7 +774,23 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guest_get_iucv_session_health(self, get_token, request):
+        method = 'GET'
+        url = '/guests/%s/iucv_session' % self.fake_userid
+        body = None
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guest_get_iucv_session_health", self.fake_userid)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_create_disks(self, get_token, request):
         method = 'POST'
@@ -606,7 +808,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_delete_disks(self, get_token, request):
         method = 'DELETE'
@@ -624,7 +826,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_config_minidisks(self, get_token, request):
         method = 'PUT'
@@ -642,7 +844,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_host_get_guest_list(self, get_token, request):
         method = 'GET'
@@ -658,7 +860,16 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+        url = '/host/guests?limit=10&marker=%s&sdk_managed=True' % (
+            self.fake_userid)
+        full_uri = self.base_url + url
+        self.client.call("host_get_guest_list", limit=10,
+                         marker=self.fake_userid, sdk_managed=True)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_get_power_state_real(self, get_token, request):
         method = 'GET'
@@ -674,7 +885,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_host_get_info(self, get_token, request):
         method = 'GET'
@@ -690,13 +901,19 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+        full_uri = self.base_url + '/host?refresh=True'
+        self.client.call("host_get_info", refresh=True)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_host_diskpool_get_info(self, get_token, request):
         # wait host_diskpool_get_info bug fixed
         pass
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_image_import(self, get_token, request):
         method = 'POST'
@@ -718,7 +935,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_image_delete(self, get_token, request):
         method = 'DELETE'
@@ -734,7 +951,25 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_image_query_paged(self, get_token, request):
+        method = 'GET'
+        url = ('/images?os_distro=rhel7&limit=2&marker=100.img'
+               '&fields=imagename,md5sum')
+        body = None
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("image_query", limit=2, marker='100.img',
+                         fields=['imagename', 'md5sum'], os_distro='rhel7')
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_image_export(self, get_token, request):
         method = 'PUT'
@@ -753,7 +988,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_image_get_root_disk_size(self, get_token, request):
         method = 'GET'
@@ -769,7 +1004,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_token_create(self, get_token, request):
         method = 'POST'
@@ -785,7 +1020,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_vswitch_get_list(self, get_token, request):
         method = 'GET'
@@ -801,7 +1036,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_vswitch_create(self, get_token, request):
         method = 'POST'
@@ -818,7 +1053,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_vswitch_delete(self, get_token, request):
         method = 'DELETE'
@@ -834,7 +1069,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_vswitch_grant_user(self, get_token, request):
         method = 'PUT'
@@ -851,7 +1086,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_vswitch_revoke_user(self, get_token, request):
         method = 'PUT'
@@ -868,7 +1103,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_vswitch_set_vlan_id_for_user(self, get_token, request):
         method = 'PUT'
@@ -887,7 +1122,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_resize_mem(self, get_token, request):
         method = 'POST'
@@ -906,7 +1141,7 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_live_resize_mem(self, get_token, request):
         method = 'POST'
@@ -925,7 +1160,25 @@ class RESTClientTestCase(unittest.TestCase):
                                    data=body, headers=header,
                                    verify=False)
 
-    @mock.patch.object(requests, 'request')
+    @mock.patch.object(requests.Session, 'request')
+    @mock.patch('zvmconnector.restclient.RESTClient._get_token')
+    def test_guest_live_resize(self, get_token, request):
+        method = 'POST'
+        url = '/guests/%s/action' % self.fake_userid
+        body = {'action': 'live_resize',
+                'cpu_cnt': 4}
+        body = json.dumps(body)
+        header = self.headers
+        full_uri = self.base_url + url
+        request.return_value = self.response
+        get_token.return_value = self._tmp_token()
+
+        self.client.call("guest_live_resize", self.fake_userid, cpu_cnt=4)
+        request.assert_called_with(method, full_uri,
+                                   data=body, headers=header,
+                                   verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
     @mock.patch('zvmconnector.restclient.RESTClient._get_token')
     def test_guest_grow_root_volume(self, get_token, request):
         method = 'POST'
@@ -13,10 +13,12 @@
 #    under the License.
 
 import datetime
+import json
 import jwt
 import mock
 import unittest
 import webob.exc
+import webob.multidict
 
 from zvmsdk import exception
 from zvmsdk.sdkwsgi.handlers import guest
@@ -35,6 +37,9 @@ class FakeReqGet(object):
     def keys(self):
         return ['userid']
 
+    def __contains__(self, name):
+        return name in self.keys()
+
     def values(self):
         return FAKE_USERID_LIST
 
@@ -348,6 +353,17 @@ class GuestActionsTest(SDKWSGITest):
         mock_action.assert_called_once_with('guest_live_resize_mem',
                                             FAKE_USERID, "4G")
 
+    @mock.patch.object(util, 'wsgi_path_item')
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_live_resize(self, mock_action, mock_userid):
+        self.req.body = '{"action": "live_resize", "cpu_cnt": 4}'
+        mock_action.return_value = ''
+        mock_userid.return_value = FAKE_USERID
+
+        guest.guest_action(self.req)
+        mock_action.assert_called_once_with('guest_live_resize', FAKE_USERID,
+                                            cpu_cnt=4, memory=None)
+
     @mock.patch.object(util, 'wsgi_path_item')
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
     def test_guest_grow_root_volume(self, mock_action, mock_userid):
@@ -669,8 +685,19 @@ class HandlersGuestTest(SDKWSGITest):
     def test_guest_list(self, mock_list):
         mock_list.return_value = ''
 
+        self.req.GET = {}
+
+        guest.guest_list(self.req)
+        mock_list.assert_called_once_with(self.req)
+
+    @mock.patch.object(guest.VMHandler, 'list')
+    def test_guest_list_paged(self, mock_list):
+        mock_list.return_value = ''
+        self.req.GET = {'limit': '10', 'marker': 'TEST0001'}
+
         guest.guest_list(self.req)
-        mock_list.assert_called_once_with()
+        mock_list.assert_called_once_with(self.req, limit='10',
+                                          marker='TEST0001')
 
     @mock.patch.object(util, 'wsgi_path_item')
     @mock.patch.object(guest.VMHandler, 'get_power_state_real')
@@ -707,6 +734,15 @@ class HandlersGuestTest(SDKWSGITest):
         guest.guest_get_power_state(self.req)
         mock_get.assert_called_once_with(self.req, FAKE_USERID)
 
+    @mock.patch.object(util, 'wsgi_path_item')
+    @mock.patch.object(guest.VMHandler, 'get_iucv_session_health')
+    def test_guest_get_iucv_session_health(self, mock_get, mock_userid):
+        mock_get.return_value = ''
+        mock_userid.return_value = FAKE_USERID
+
+        guest.guest_get_iucv_session_health(self.req)
+        mock_get.assert_called_once_with(self.req, FAKE_USERID)
+
     @mock.patch.object(util, 'wsgi_path_item')
     @mock.patch.object(guest.VMHandler, 'delete')
     def test_guest_delete(self, mock_delete, mock_userid):
@@ -720,8 +756,12 @@ class HandlersGuestTest(SDKWSGITest):
     def test_list(self, mock_interface):
         mock_interface.return_value = ''
 
+        self.req.environ['wsgiorg.routing_args'] = ((), {})
+        self.req.GET = webob.multidict.MultiDict()
+
         guest.guest_list(self.req)
-        mock_interface.assert_called_once_with('guest_list')
+        mock_interface.assert_called_once_with('guest_list', limit=None,
+                                               marker=None)
 
     @mock.patch.object(util, 'wsgi_path_item')
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
@@ -842,6 +882,168 @@ class HandlersGuestTest(SDKWSGITest):
             guest_networks=guest_networks,
             active=False)
 
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_create_network_interface_bulk(self, mock_interface):
+        interfaces = [{'userid': 'USER1', 'os_version': 'rhel7',
+                       'guest_networks': [{'ip_addr': '192.168.12.34',
+                                           'cidr': '192.168.95.0/24',
+                                           'vswitch_name': 'VSW1',
+                                           'vlan_id': 10}]},
+                      {'userid': 'USER2', 'os_version': 'rhel7',
+                       'guest_networks': [{'nic_vdev': '1000'}]}]
+        self.req.body = json.dumps({'interface': {'interfaces': interfaces,
+                                                  'active': True}})
+        mock_interface.return_value = {'overallRC': 0, 'output': []}
+
+        guest.guest_create_network_interface_bulk(self.req)
+        mock_interface.assert_called_once_with(
+            'guest_create_network_interface_bulk', interfaces, active=True)
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_create_bulk(self, mock_create):
+        guests = [{'userid': 'USER1', 'vcpus': 1, 'memory': 1024},
+                  {'userid': 'USER2', 'vcpus': 2, 'memory': 2048,
+                   'disk_list': [{'size': '1g', 'is_boot_disk': True}],
+                   'comment_list': ['comment1']}]
+        self.req.body = json.dumps({'guests': guests})
+        mock_create.return_value = {'overallRC': 0, 'output': []}
+
+        guest.guest_create_bulk(self.req)
+        mock_create.assert_called_once_with('guest_create_bulk', guests)
+
+    def test_guest_create_bulk_invalid(self):
+        self.req.body = json.dumps({'guests': [
+            {'userid': 'USER1', 'vcpus': 1}]})
+        self.assertRaises(exception.ValidationError,
+                          guest.guest_create_bulk, self.req)
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_delete_bulk(self, mock_delete):
+        def _result(userid):
+            return {'userid': userid, 'result': 'success', 'errmsg': '',
+                    'timings': {'directory': 1.0}}
+
+        self.req.body = json.dumps({'delete': {
+            'userid_list': ['USER1', 'USER2', 'USER3']}})
+        mock_delete.side_effect = [
+            {'overallRC': 0, 'rc': 0, 'rs': 0, 'errmsg': '', 'modID': None,
+             'output': [_result('USER1'), _result('USER2')]},
+            {'overallRC': 1, 'rc': 1, 'rs': 0, 'errmsg': 'fake error',
+             'modID': None, 'output': ''}]
+
+        guest.CONF['sdkserver']['max_worker_count'] = 2
+        try:
+            guest.guest_delete_bulk(self.req)
+        finally:
+            guest.CONF['sdkserver']['max_worker_count'] = 64
+        mock_delete.assert_called_once_with('guest_delete_bulk',
+                                            ['USER1', 'USER2'])
+        body = b''.join(self.req.response.app_iter)
+        mock_delete.assert_called_with('guest_delete_bulk', ['USER3'])
+        info = json.loads(body.decode('utf-8'))
+        self.assertEqual(['success', 'success', 'failed'],
+                         [r['result'] for r in info['output']])
+        self.assertEqual('fake error', info['output'][2]['errmsg'])
+
+    def test_guest_delete_bulk_invalid(self):
+        self.req.body = json.dumps({'delete': {'userid_list': []}})
+        self.assertRaises(exception.ValidationError,
+                          guest.guest_delete_bulk, self.req)
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_live_migrate_bulk(self, mock_migrate):
+        self.req.body = json.dumps({'migrate': {
+            'userid_list': ['USER1', 'USER2'], 'dest_zcc_userid': 'ZCC2',
+            'destination': 'SSI2', 'parms': {'maxtotal': 100},
+            'concurrency': '2'}})
+        mock_migrate.return_value = {'overallRC': 0, 'output': {}}
+
+        guest.guest_live_migrate_bulk(self.req)
+        mock_migrate.assert_called_once_with(
+            'guest_live_migrate_bulk', ['USER1', 'USER2'], 'ZCC2', 'SSI2',
+            parms={'maxtotal': 100}, concurrency=2)
+
+    def test_guest_live_migrate_bulk_invalid(self):
+        self.req.body = json.dumps({'migrate': {
+            'userid_list': ['USER1'], 'destination': 'SSI2'}})
+        self.assertRaises(exception.ValidationError,
+                          guest.guest_live_migrate_bulk, self.req)
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_live_resize_bulk(self, mock_resize):
+        resizes = [{'userid': 'USER1', 'cpu_cnt': 2},
+                   {'userid': 'USER2', 'cpu_cnt': 4, 'memory': '4G'}]
+        self.req.body = json.dumps({'resize': {'resizes': resizes}})
+        mock_resize.return_value = {'overallRC': 0, 'output': []}
+
+        guest.guest_live_resize_bulk(self.req)
+        mock_resize.assert_called_once_with('guest_live_resize_bulk',
+                                            resizes)
+
+    def test_guest_live_resize_bulk_invalid(self):
+        self.req.body = json.dumps({'resize': {'resizes': [
+            {'userid': 'USER1'}]}})
+        self.assertRaises(exception.ValidationError,
+                          guest.guest_live_resize_bulk, self.req)
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_get_console_output_bulk(self, mock_get):
+        self.req.body = json.dumps({'console': {
+            'userid_list': ['USER1', 'USER2'], 'cursors': {'USER1': 100}}})
+        mock_get.return_value = {'overallRC': 0, 'output': {}}
+
+        guest.guest_get_console_output_bulk(self.req)
+        mock_get.assert_called_once_with(
+            'guest_get_console_output_bulk', ['USER1', 'USER2'],
+            cursors={'USER1': 100})
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guest_execute_cmd_bulk(self, mock_execute):
+        def _result(userid):
+            return {'userid': userid, 'overallRC': 0, 'rc': 0, 'rs': 0,
+                    'output': ['4.18.0'], 'errmsg': '', 'duration': 0.1}
+
+        self.req.body = json.dumps({'execute': {
+            'userid_list': ['USER1', 'USER2', 'USER3'], 'cmd': 'uname -r',
+            'concurrency': 2, 'timeout': '30'}})
+        mock_execute.side_effect = [
+            {'overallRC': 0, 'rc': 0, 'rs': 0, 'errmsg': '', 'modID': None,
+             'output': [_result('USER1'), _result('USER2')]},
+            {'overallRC': 1, 'rc': 1, 'rs': 0, 'errmsg': 'fake error',
+             'modID': None, 'output': ''}]
+
+        guest.guest_execute_cmd_bulk(self.req)
+        # the first wave is done before the response status is set
+        mock_execute.assert_called_once_with(
+            'guest_execute_cmd_bulk', ['USER1', 'USER2'], 'uname -r',
+            concurrency=2, timeout=30)
+        body = b''.join(self.req.response.app_iter)
+        mock_execute.assert_called_with(
+            'guest_execute_cmd_bulk', ['USER3'], 'uname -r',
+            concurrency=2, timeout=30)
+        info = json.loads(body.decode('utf-8'))
+        self.assertEqual(0, info['overallRC'])
+        self.assertEqual(['USER1', 'USER2', 'USER3'],
+                         [r['userid'] for r in info['output']])
+        self.assertEqual(['4.18.0'], info['output'][1]['output'])
+        self.assertEqual('fake error', info['output'][2]['errmsg'])
+
+    def test_guest_execute_cmd_bulk_invalid(self):
+        self.req.body = json.dumps({'execute': {'userid_list': [],
+                                                'cmd': 'uname -r'}})
+        self.assertRaises(exception.ValidationError,
+                          guest.guest_execute_cmd_bulk, self.req)
+
+    def test_guest_create_network_interface_bulk_invalid(self):
+        interfaces = [{'userid': 'USER1', 'os_version': 'rhel7',
+                       'guest_networks': [{'nic_vdev': '1000',
+                                           'vlan_id': 5000}]}]
+        self.req.body = json.dumps({'interface': {'interfaces': interfaces}})
+
+        self.assertRaises(exception.ValidationError,
+                          guest.guest_create_network_interface_bulk,
+                          self.req)
+
     @mock.patch.object(util, 'wsgi_path_item')
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
     def test_guest_delete_network_interface(self, mock_interface, mock_userid):
@@ -1113,7 +1315,8 @@ class HandlersGuestTest(SDKWSGITest):
         guest.guests_get_nic_info(self.req)
         mock_interface.assert_called_once_with(
             'guests_get_nic_info',
-            userid=None, nic_id=None, vswitch=None)
+            userid=None, nic_id=None, vswitch=None,
+            limit=None, marker=None, fields=None)
 
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
     def test_guests_get_nic_info_all(self, mock_interface):
@@ -1130,7 +1333,8 @@ class HandlersGuestTest(SDKWSGITest):
         guest.guests_get_nic_info(self.req)
         mock_interface.assert_called_once_with(
             'guests_get_nic_info',
-            userid=userid, nic_id=nic_id, vswitch=vswitch)
+            userid=userid, nic_id=nic_id, vswitch=vswitch,
+            limit=None, marker=None, fields=None)
 
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
     def test_guests_get_nic_info_with_userid(self, mock_interface):
@@ -1143,7 +1347,8 @@ class HandlersGuestTest(SDKWSGITest):
         guest.guests_get_nic_info(self.req)
         mock_interface.assert_called_once_with(
             'guests_get_nic_info',
-            userid=userid, nic_id=None, vswitch=None)
+            userid=userid, nic_id=None, vswitch=None,
+            limit=None, marker=None, fields=None)
 
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
     def test_guests_get_nic_info_with_nicid(self, mock_interface):
@@ -1156,7 +1361,8 @@ class HandlersGuestTest(SDKWSGITest):
         guest.guests_get_nic_info(self.req)
         mock_interface.assert_called_once_with(
             'guests_get_nic_info',
-            userid=None, nic_id=nic_id, vswitch=None)
+            userid=None, nic_id=nic_id, vswitch=None,
+            limit=None, marker=None, fields=None)
 
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
     def test_guests_get_nic_info_with_vswitch(self, mock_interface):
@@ -1169,7 +1375,31 @@ class HandlersGuestTest(SDKWSGITest):
         guest.guests_get_nic_info(self.req)
         mock_interface.assert_called_once_with(
             'guests_get_nic_info',
-            userid=None, nic_id=None, vswitch=vswitch)
+            userid=None, nic_id=None, vswitch=vswitch,
+            limit=None, marker=None, fields=None)
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guests_get_nic_info_with_paging(self, mock_interface):
+        self.req.GET = {}
+        self.req.GET['limit'] = '2'
+        self.req.GET['marker'] = 'fakeid:1000'
+        self.req.GET['fields'] = 'userid,switch'
+
+        mock_interface.return_value = ''
+
+        guest.guests_get_nic_info(self.req)
+        mock_interface.assert_called_once_with(
+            'guests_get_nic_info',
+            userid=None, nic_id=None, vswitch=None,
+            limit=2, marker='fakeid:1000', fields=['userid', 'switch'])
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_guests_get_nic_info_invalid_limit(self, mock_interface):
+        for limit in ('abc', '0', '-1'):
+            self.req.GET = {'limit': limit}
+            self.assertRaises(exception.ValidationError,
+                              guest.guests_get_nic_info, self.req)
+        mock_interface.assert_not_called()
 
     # TODO: move this test to sdk layer instead of API layer
     # or we can use validation to validate cidr
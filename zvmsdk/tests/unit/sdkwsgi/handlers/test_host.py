@@ -49,16 +49,36 @@ class HandlersHostTest(unittest.TestCase):
     @mock.patch.object(host.HostAction, 'get_guest_list')
     def test_host_get_guest_list(self, mock_get_guest_list):
         mock_get_guest_list.return_value = ''
+        self.req.GET = {}
+
+        host.host_get_guest_list(self.req)
+        mock_get_guest_list.assert_called_once_with(self.req)
+
+    @mock.patch.object(host.HostAction, 'get_guest_list')
+    def test_host_get_guest_list_paged(self, mock_get_guest_list):
+        mock_get_guest_list.return_value = ''
+        self.req.GET = {'limit': '10', 'marker': 'TEST0001',
+                        'migrated': 'false'}
 
         host.host_get_guest_list(self.req)
-        mock_get_guest_list.assert_called_once_with()
+        mock_get_guest_list.assert_called_once_with(self.req, limit='10',
+                                                    marker='TEST0001',
+                                                    migrated='false')
 
     @mock.patch.object(host.HostAction, 'get_info')
     def test_host_get_info(self, mock_get_info):
 
         mock_get_info.return_value = ''
+        self.req.GET = {}
+        host.host_get_info(self.req)
+        mock_get_info.assert_called_once_with(self.req)
+
+    @mock.patch.object(host.HostAction, 'get_info')
+    def test_host_get_info_refresh(self, mock_get_info):
+        mock_get_info.return_value = ''
+        self.req.GET = {'refresh': 'true'}
         host.host_get_info(self.req)
-        self.assertTrue(mock_get_info.called)
+        mock_get_info.assert_called_once_with(self.req, refresh='true')
 
     @mock.patch.object(host.HostAction, 'diskpool_get_info')
     def test_host_get_disk_info(self, mock_get_disk_info):
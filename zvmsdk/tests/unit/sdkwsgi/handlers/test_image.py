@@ -228,6 +228,14 @@ class HandlersImageTest(unittest.TestCase):
         image.image_query(self.req)
         mock_query.assert_called_once_with(self.req, 'image1')
 
+    @mock.patch.object(image.ImageAction, 'query')
+    def test_image_query_os_distro(self, mock_query):
+        mock_query.return_value = '[]'
+        self.req.GET = {'os_distro': 'rhel7.2', 'limit': '10'}
+        image.image_query(self.req)
+        mock_query.assert_called_once_with(self.req, None,
+                                           os_distro='rhel7.2', limit='10')
+
     @mock.patch.object(util, 'wsgi_path_item')
     @mock.patch.object(image.ImageAction, 'export')
     def test_image_export(self, mock_export, mock_get):
@@ -19,6 +19,7 @@ import mock
 import unittest
 
 from zvmsdk import config
+from zvmsdk import exception
 from zvmsdk.sdkwsgi.handlers import volume
 
 
@@ -90,6 +91,46 @@ class HandlersVolumeTest(unittest.TestCase):
             'volume_detach',
             connection_info)
 
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_volume_attach_bulk(self, mock_attach):
+        mock_attach.return_value = {'overallRC': 0}
+        connection_info = {"assigner_id": "username", "zvm_fcp": ["1fc5"],
+                           "target_wwpn": ["0x5005076801401234"],
+                           "target_lun": "0x0026000000000000",
+                           "os_version": "rhel7.2",
+                           "multipath": "true", "mount_point": ""}
+        body_str = {"info": {"connections": [connection_info,
+                                             connection_info]}}
+        self.req.body = json.dumps(body_str)
+
+        volume.volume_attach_bulk(self.req)
+        mock_attach.assert_called_once_with(
+            'volume_attach_bulk',
+            [connection_info, connection_info])
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_volume_detach_bulk(self, mock_detach):
+        mock_detach.return_value = {'overallRC': 0}
+        connection_info = {"assigner_id": "username", "zvm_fcp": ["1fc5"],
+                           "target_wwpn": ["0x5005076801401234"],
+                           "target_lun": "0x0026000000000000",
+                           "os_version": "rhel7.2",
+                           "multipath": "true", "mount_point": ""}
+        body_str = {"info": {"connections": [connection_info]}}
+        self.req.body = json.dumps(body_str)
+
+        volume.volume_detach_bulk(self.req)
+        mock_detach.assert_called_once_with(
+            'volume_detach_bulk',
+            [connection_info])
+
+    def test_volume_attach_bulk_empty(self):
+        body_str = {"info": {"connections": []}}
+        self.req.body = json.dumps(body_str)
+
+        self.assertRaises(exception.ValidationError,
+                          volume.volume_attach_bulk, self.req)
+
     @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
     def test_refresh_volume_bootmap(self, mock_detach):
         mock_detach.return_value = {'overallRC': 0}
@@ -124,6 +124,28 @@ class HandlersGuestTest(unittest.TestCase):
         vswitch.vswitch_query(self.req)
         mock_query.assert_called_once_with('vsw1')
 
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_vswitch_cache_stats(self, mock_send):
+        mock_send.return_value = {'overallRC': 0, 'output': {}}
+
+        vswitch.vswitch_cache_stats(self.req)
+        mock_send.assert_called_once_with('vswitch_cache_stats')
+
+    @mock.patch('zvmconnector.connector.ZVMConnector.send_request')
+    def test_vswitch_cache_refresh(self, mock_send):
+        mock_send.return_value = {'overallRC': 0, 'output': {}}
+        self.req.body = '{"vswitch_cache": {"vswitch_names": ["vsw1"]}}'
+
+        vswitch.vswitch_cache_refresh(self.req)
+        mock_send.assert_called_once_with('vswitch_cache_refresh',
+                                          vswitch_names=['vsw1'])
+
+    def test_vswitch_cache_refresh_invalid_name(self):
+        self.req.body = '{"vswitch_cache": {"vswitch_names": [""]}}'
+
+        self.assertRaises(exception.ValidationError,
+                          vswitch.vswitch_cache_refresh, self.req)
+
     def test_vswitch_create_invalid_connection(self):
         body_str = """{"vswitch": {"name": "name1",
                                    "rdev": "1234",
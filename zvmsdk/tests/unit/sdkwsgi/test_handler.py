@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import mock
 import testtools
 import unittest
@@ -347,7 +348,9 @@ class GuestHandlerTest(unittest.TestCase):
             get_info.return_value = {'overallRC': 0}
             h(self.env, dummy)
 
-            get_info.assert_called_once_with('guest_inspect_stats', [])
+            get_info.assert_called_once_with('guest_inspect_stats', [],
+                                             limit=None, marker=None,
+                                             fields=None)
 
     @mock.patch.object(tokens, 'validate')
     def test_guest_get_stats_userid_list(self, mock_validate):
@@ -362,7 +365,27 @@ class GuestHandlerTest(unittest.TestCase):
             h(self.env, dummy)
 
             get_info.assert_called_once_with('guest_inspect_stats',
-                                             ['l1', 'l2'])
+                                             ['l1', 'l2'], limit=None,
+                                             marker=None, fields=None)
+
+    @mock.patch.object(tokens, 'validate')
+    def test_guest_get_stats_paged_fields(self, mock_validate):
+        self.env['wsgiorg.routing_args'] = ()
+        self.env['PATH_INFO'] = '/guests/stats'
+        self.env['REQUEST_METHOD'] = 'GET'
+        self.env['QUERY_STRING'] = ('userid=l1,l2&limit=1&marker=l1&'
+                                    'fields=guest_cpus,used_mem_kb')
+        h = handler.SdkHandler()
+        func = 'zvmconnector.connector.ZVMConnector.send_request'
+        with mock.patch(func) as get_info:
+            get_info.return_value = {'overallRC': 0}
+            h(self.env, dummy)
+
+            get_info.assert_called_once_with('guest_inspect_stats',
+                                             ['l1', 'l2'], limit=1,
+                                             marker='l1',
+                                             fields=['guest_cpus',
+                                                     'used_mem_kb'])
 
     @mock.patch.object(tokens, 'validate')
     def test_guest_get_stats_invalid(self, mock_validate):
@@ -427,7 +450,8 @@ class GuestHandlerTest(unittest.TestCase):
             h(self.env, dummy)
 
             guests_get_nic_info.assert_called_once_with('guests_get_nic_info',
-                                      userid=None, nic_id=None, vswitch=None)
+                                      userid=None, nic_id=None, vswitch=None,
+                                      limit=None, marker=None, fields=None)
 
     @mock.patch.object(tokens, 'validate')
     def test_guests_get_nic_info_with_userid(self, mock_validate):
@@ -442,7 +466,8 @@ class GuestHandlerTest(unittest.TestCase):
             h(self.env, dummy)
 
             guests_get_nic_info.assert_called_once_with('guests_get_nic_info',
-                                    userid='test', nic_id=None, vswitch=None)
+                                    userid='test', nic_id=None, vswitch=None,
+                                    limit=None, marker=None, fields=None)
 
     @testtools.skip('temply disable because of volume not support now')
     @mock.patch('zvmsdk.sdkwsgi.util.extract_json')
@@ -583,7 +608,31 @@ class ImageHandlerTest(unittest.TestCase):
             query.return_value = {'overallRC': 0}
             h(self.env, dummy)
 
-            query.assert_called_once_with('image_query', None)
+            query.assert_called_once_with('image_query', None, limit=None,
+                                          marker=None, fields=None,
+                                          os_distro=None)
+
+    @mock.patch.object(tokens, 'validate')
+    def test_image_query_paged_streamed(self, mock_validate):
+        self.env['PATH_INFO'] = '/images'
+        self.env['REQUEST_METHOD'] = 'GET'
+        self.env['QUERY_STRING'] = ('limit=2&marker=img1&fields=imagename'
+                                    '&os_distro=rhel7')
+        self.addCleanup(self.env.__setitem__, 'QUERY_STRING', '')
+        h = handler.SdkHandler()
+        func = 'zvmconnector.connector.ZVMConnector.send_request'
+        results = {'overallRC': 0, 'modID': None, 'rc': 0, 'rs': 0,
+                   'errmsg': '', 'output': [{'imagename': 'img2'},
+                                            {'imagename': 'img3'}]}
+        with mock.patch(func) as query:
+            query.return_value = results
+            body = b''.join(h(self.env, dummy))
+
+            query.assert_called_once_with('image_query', None, limit=2,
+                                          marker='img1',
+                                          fields=['imagename'],
+                                          os_distro='rhel7')
+            self.assertEqual(results, json.loads(body.decode('utf-8')))
 
 
 class HostHandlerNegativeTest(unittest.TestCase):
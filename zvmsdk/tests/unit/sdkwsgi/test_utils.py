@@ -12,9 +12,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import mock
 import unittest
 
+from zvmconnector import connector
 from zvmsdk.sdkwsgi import util
+from zvmsdk.tests.unit import base
 
 
 class SDKWsgiUtilsTestCase(unittest.TestCase):
@@ -57,3 +60,16 @@ class SDKWsgiUtilsTestCase(unittest.TestCase):
         ret = util.get_http_code_from_sdk_return(msg,
             additional_handler=util.handle_already_exists)
         self.assertEqual(500, ret)
+
+    def test_get_sdk_connector(self):
+        client = util.get_sdk_connector()
+        self.assertIsInstance(client.conn, connector.socketConnection)
+
+        base.set_conf('wsgi', 'connection_type', 'inprocess')
+        try:
+            with mock.patch('zvmsdk.sdkserver.get_inprocess_server') as get:
+                client = util.get_sdk_connector()
+                get.assert_called_once_with()
+            self.assertIsInstance(client.conn, connector.inprocessConnection)
+        finally:
+            base.set_conf('wsgi', 'connection_type', 'socket')
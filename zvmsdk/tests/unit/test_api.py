@@ -58,6 +58,11 @@ class SDKAPITestCase(base.SDKTestCase):
         chk_uid.assert_called_once_with(self.userid)
         gstate.assert_not_called()
 
+    @mock.patch("zvmsdk.vmops.VMOps.get_iucv_session_health")
+    def test_guest_get_iucv_session_health(self, health):
+        self.api.guest_get_iucv_session_health(self.userid)
+        health.assert_called_once_with(self.userid)
+
     @mock.patch("zvmsdk.vmops.VMOps.get_info")
     def test_guest_get_info(self, ginfo):
         self.api.guest_get_info(self.userid)
@@ -257,7 +262,22 @@ class SDKAPITestCase(base.SDKTestCase):
     def test_image_query(self, image_query):
         imagekeyword = 'eae09a9f_7958_4024_a58c_83d3b2fc0aab'
         self.api.image_query(imagekeyword)
-        image_query.assert_called_once_with(imagekeyword)
+        image_query.assert_called_once_with(imagekeyword, limit=None,
+                                            marker=None, os_distro=None)
+
+    @mock.patch("zvmsdk.imageops.ImageOps.image_query")
+    def test_image_query_paged_fields(self, image_query):
+        image_query.return_value = [{'imagename': 'img1',
+                                     'imageosdistro': 'rhel7.2',
+                                     'md5sum': 'fake'}]
+        result = self.api.image_query(limit=1, marker='img0',
+                                      fields=['imagename', 'md5sum'],
+                                      os_distro='rhel7.2')
+        image_query.assert_called_once_with(None, limit=1, marker='img0',
+                                            os_distro='rhel7.2')
+        self.assertEqual([{'imagename': 'img1', 'md5sum': 'fake'}], result)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.image_query, fields='imagename')
 
     @mock.patch("zvmsdk.vmops.VMOps.delete_vm")
     @mock.patch("zvmsdk.vmops.VMOps.check_guests_exist_in_db")
@@ -456,10 +476,218 @@ class SDKAPITestCase(base.SDKTestCase):
         self.api.volume_detach(connection_info)
         mock_detach.assert_called_once_with(connection_info)
 
+    @mock.patch("zvmsdk.volumeop.VolumeOperatorAPI."
+                "attach_volumes_to_instances")
+    def test_volume_attach_bulk(self, mock_attach):
+        connection_infos = [{'os_version': 'rhel7',
+                             'multipath': 'false',
+                             'target_wwpn': ['1111'],
+                             'target_lun': lun,
+                             'zvm_fcp': ['b83c'],
+                             'mount_point': '/dev/sdb',
+                             'assigner_id': 'user1'}
+                            for lun in ('2222', '3333')]
+        mock_attach.return_value = ['fake_results']
+        ret = self.api.volume_attach_bulk(connection_infos)
+        self.assertEqual(['fake_results'], ret)
+        mock_attach.assert_called_once_with(connection_infos)
+
+    @mock.patch("zvmsdk.volumeop.VolumeOperatorAPI."
+                "detach_volumes_from_instances")
+    def test_volume_detach_bulk(self, mock_detach):
+        connection_infos = [{'os_version': 'rhel7',
+                             'multipath': 'false',
+                             'target_wwpn': ['1111'],
+                             'target_lun': lun,
+                             'zvm_fcp': ['b83c'],
+                             'mount_point': '/dev/sdb',
+                             'assigner_id': 'user1'}
+                            for lun in ('2222', '3333')]
+        self.api.volume_detach_bulk(connection_infos)
+        mock_detach.assert_called_once_with(connection_infos)
+
+    @mock.patch("zvmsdk.vmops.VMOps.live_resize")
+    def test_guest_live_resize(self, live_resize):
+        live_resize.return_value = {'total': 1.0}
+        ret = self.api.guest_live_resize('user1', cpu_cnt=2, memory='2G')
+        live_resize.assert_called_once_with('USER1', cpu_cnt=2, memory='2G')
+        self.assertEqual({'total': 1.0}, ret)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_live_resize, 'user1')
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_live_resize, 'user1', cpu_cnt=65)
+
+    @mock.patch("zvmsdk.vmops.VMOps.check_guests_exist_in_db")
+    @mock.patch("zvmsdk.vmops.VMOps.live_resize_bulk")
+    def test_guest_live_resize_bulk(self, live_resize, check):
+        live_resize.return_value = ['fake_result']
+        resizes = [{'userid': 'user1', 'cpu_cnt': 2},
+                   {'userid': 'user2', 'memory': '2G'}]
+        ret = self.api.guest_live_resize_bulk(resizes)
+        check.assert_called_once_with(['USER1', 'USER2'])
+        live_resize.assert_called_once_with(
+            [{'userid': 'USER1', 'cpu_cnt': 2},
+             {'userid': 'USER2', 'memory': '2G'}])
+        self.assertEqual(['fake_result'], ret)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_live_resize_bulk,
+                          [{'userid': 'user1', 'cpu_cnt': 2},
+                           {'userid': 'USER1', 'cpu_cnt': 4}])
+
+    @mock.patch("zvmsdk.vmops.VMOps.check_guests_exist_in_db")
+    @mock.patch("zvmsdk.vmops.VMOps.live_migrate_bulk")
+    def test_guest_live_migrate_bulk(self, migrate, check):
+        migrate.return_value = {'moved': 2}
+        ret = self.api.guest_live_migrate_bulk(['user1', 'user2'], 'ZCC2',
+                                               'SSI2', concurrency=2)
+        check.assert_called_once_with(['USER1', 'USER2'])
+        migrate.assert_called_once_with(['USER1', 'USER2'], 'ZCC2', 'SSI2',
+                                        {}, concurrency=2)
+        self.assertEqual({'moved': 2}, ret)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_live_migrate_bulk, ['user1'], '',
+                          'SSI2')
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_live_migrate_bulk, ['user1'],
+                          'ZCC2', 'SSI2', concurrency=0)
+
+    @mock.patch("zvmsdk.vmops.VMOps.delete_vm_bulk")
+    def test_guest_delete_bulk(self, delete_bulk):
+        delete_bulk.return_value = ['fake_result']
+        ret = self.api.guest_delete_bulk(['user1', 'USER2', 'User1'])
+        delete_bulk.assert_called_once_with(['USER1', 'USER2'])
+        self.assertEqual(['fake_result'], ret)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_delete_bulk, [])
+
+    @mock.patch("zvmsdk.vmops.VMOps.create_vm_bulk")
+    def test_guest_create_bulk(self, create_bulk):
+        create_bulk.return_value = ['fake_result']
+        ret = self.api.guest_create_bulk([
+            {'userid': 'user1', 'vcpus': 1, 'memory': 1024},
+            {'userid': 'user2', 'vcpus': 2, 'memory': 2048,
+             'user_profile': 'prof2', 'max_cpu': 8,
+             'disk_list': [{'size': '1g', 'is_boot_disk': True,
+                            'disk_pool': 'ECKD:pool1'}]}])
+        self.assertEqual(['fake_result'], ret)
+        guests = create_bulk.call_args[0][0]
+        self.assertEqual(['USER1', 'USER2'], [g['userid'] for g in guests])
+        self.assertEqual(api.CONF.zvm.user_profile, guests[0]['profile'])
+        self.assertEqual([], guests[0]['disk_list'])
+        self.assertEqual(api.CONF.zvm.user_default_max_cpu,
+                         guests[0]['max_cpu'])
+        self.assertEqual('prof2', guests[1]['profile'])
+        self.assertEqual(8, guests[1]['max_cpu'])
+        self.assertEqual(2, guests[1]['cpu'])
+
+    def test_guest_create_bulk_invalid_input(self):
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_create_bulk, [])
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_create_bulk,
+                          [{'userid': 'user1', 'vcpus': 1}])
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_create_bulk,
+                          [{'userid': 'user1', 'vcpus': 1, 'memory': 1024},
+                           {'userid': 'USER1', 'vcpus': 1, 'memory': 1024}])
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_create_bulk,
+                          [{'userid': 'user1', 'vcpus': 1, 'memory': 1024,
+                            'disk_list': [{'format': 'ext3'}]}])
+
+    @mock.patch("zvmsdk.vmops.VMOps.get_console_output_bulk")
+    def test_guest_get_console_output_bulk(self, get_output):
+        get_output.return_value = {'USER1': 'fake_result'}
+        ret = self.api.guest_get_console_output_bulk(['user1', 'user2'],
+                                                     cursors={'user1': 10})
+        get_output.assert_called_once_with(['USER1', 'USER2'],
+                                           {'USER1': 10})
+        self.assertEqual({'USER1': 'fake_result'}, ret)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_get_console_output_bulk, ['user1'],
+                          cursors={'user1': -1})
+
+    @mock.patch("zvmsdk.vmops.VMOps.execute_cmd_bulk")
+    def test_guest_execute_cmd_bulk(self, execute):
+        execute.return_value = ['fake_result']
+        ret = self.api.guest_execute_cmd_bulk(['user1', 'user2'], 'uname -r',
+                                              concurrency=10, timeout=30)
+        execute.assert_called_once_with(['USER1', 'USER2'], 'uname -r',
+                                        concurrency=10, timeout=30)
+        self.assertEqual(['fake_result'], ret)
+
+    @mock.patch("zvmsdk.vmops.VMOps.execute_cmd_bulk")
+    def test_guest_execute_cmd_bulk_invalid(self, execute):
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_execute_cmd_bulk, [], 'uname -r')
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_execute_cmd_bulk, ['user1'], '')
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_execute_cmd_bulk, ['user1'],
+                          'uname -r', concurrency=0)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_execute_cmd_bulk, ['user1'],
+                          'uname -r', timeout=-1)
+        self.assertFalse(execute.called)
+
+    @mock.patch("zvmsdk.vmops.VMOps.check_guests_exist_in_db")
+    @mock.patch("zvmsdk.networkops.NetworkOPS.create_network_interfaces")
+    def test_guest_create_network_interface_bulk(self, create, check):
+        networks = [{'ip_addr': '192.168.95.10',
+                     'cidr': '192.168.95.0/24',
+                     'vswitch_name': 'VSW1'}]
+        interfaces = [{'userid': 'user1', 'os_version': 'rhel7',
+                       'guest_networks': networks},
+                      {'userid': 'user2', 'os_version': 'rhel7',
+                       'guest_networks': [{'ip_addr': '192.168.95.300',
+                                           'cidr': '192.168.95.0/24'}]},
+                      {'userid': 'USER1', 'os_version': 'rhel7',
+                       'guest_networks': networks},
+                      {'userid': 'user3', 'os_version': 'rhel7',
+                       'guest_networks': networks}]
+        not_exist = exception.SDKObjectNotExistError(
+            obj_desc="Guest 'USER3'", modID='guest')
+        check.side_effect = [not_exist, None, not_exist]
+        create.return_value = ['fake_result']
+
+        ret = self.api.guest_create_network_interface_bulk(interfaces,
+                                                           active=True)
+        check.assert_has_calls([mock.call(['USER1', 'USER3']),
+                                mock.call('USER1'), mock.call('USER3')])
+        create.assert_called_once_with(
+            [dict(interfaces[0], userid='USER1')], active=True)
+        # the interfaces of the caller are not changed
+        self.assertEqual('user1', interfaces[0]['userid'])
+        self.assertEqual('fake_result', ret[0])
+        self.assertEqual(['USER2', 'USER1', 'USER3'],
+                         [r['userid'] for r in ret[1:]])
+        for result in ret[1:]:
+            self.assertEqual('failed', result['result'])
+        self.assertIn('Invalid management IP address', ret[1]['errmsg'])
+        self.assertIn('more than once', ret[2]['errmsg'])
+        self.assertIn('USER3', ret[3]['errmsg'])
+
+    @mock.patch("zvmsdk.vmops.VMOps.check_guests_exist_in_db")
+    @mock.patch("zvmsdk.networkops.NetworkOPS.create_network_interfaces")
+    def test_guest_create_network_interface_bulk_check_once(self, create,
+                                                            check):
+        networks = [{'ip_addr': '192.168.95.10',
+                     'cidr': '192.168.95.0/24'}]
+        interfaces = [{'userid': 'user%d' % i, 'os_version': 'rhel7',
+                       'guest_networks': networks} for i in range(3)]
+        create.return_value = ['fake_result'] * 3
+
+        self.api.guest_create_network_interface_bulk(interfaces)
+        check.assert_called_once_with(['USER0', 'USER1', 'USER2'])
+
+    def test_guest_create_network_interface_bulk_empty(self):
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_create_network_interface_bulk, [])
+
     @mock.patch("zvmsdk.utils.check_userid_exist")
     @mock.patch("zvmsdk.smtclient.SMTClient.get_adapters_info")
     @mock.patch("zvmsdk.database.GuestDbOperator.add_guest_registered")
-    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_record")
+    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_records")
     def test_guest_register(self, networkdb_add, guestdb_reg,
                               get_adapters_info, chk_usr):
         networkdb_add.return_value = ''
@@ -481,10 +709,10 @@ class SDKAPITestCase(base.SDKTestCase):
                     }
 
         self.api.guest_register(self.userid, meta_data, net_set, port_macs)
-        networkdb_add.assert_called_once_with(self.userid, '1000',
-                                              '6e2ecc4f-14a2-4f33-9f12'
-                                              '-5ac4a42f97e7',
-                                              'VSC11590')
+        networkdb_add.assert_called_once_with(
+            [{'userid': self.userid, 'interface': '1000',
+              'port': '6e2ecc4f-14a2-4f33-9f12-5ac4a42f97e7',
+              'switch': 'VSC11590'}])
         guestdb_reg.assert_called_once_with(self.userid, 'rhel7', '1')
         get_adapters_info.assert_called_once_with(self.userid)
         chk_usr.assert_called_once_with(self.userid)
@@ -492,7 +720,7 @@ class SDKAPITestCase(base.SDKTestCase):
     @mock.patch("zvmsdk.utils.check_userid_exist")
     @mock.patch("zvmsdk.smtclient.SMTClient.get_adapters_info")
     @mock.patch("zvmsdk.database.GuestDbOperator.add_guest_registered")
-    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_record")
+    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_records")
     def test_guest_register_invalid_portmacs(self, networkdb_add, guestdb_reg,
                               get_adapters_info, chk_usr):
         networkdb_add.return_value = ''
@@ -518,7 +746,7 @@ class SDKAPITestCase(base.SDKTestCase):
     @mock.patch("zvmsdk.utils.check_userid_exist")
     @mock.patch("zvmsdk.smtclient.SMTClient.get_adapters_info")
     @mock.patch("zvmsdk.database.GuestDbOperator.add_guest_registered")
-    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_record")
+    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_records")
     def test_guest_register_no_port_macs(self, networkdb_add, guestdb_reg,
                               get_adapters_info, chk_usr):
         networkdb_add.return_value = ''
@@ -537,9 +765,9 @@ class SDKAPITestCase(base.SDKTestCase):
         net_set = '1'
 
         self.api.guest_register(self.userid, meta_data, net_set)
-        networkdb_add.assert_called_once_with(self.userid, '1000',
-                                              None,
-                                              'VSC11590')
+        networkdb_add.assert_called_once_with(
+            [{'userid': self.userid, 'interface': '1000', 'port': None,
+              'switch': 'VSC11590'}])
         guestdb_reg.assert_called_once_with(self.userid, 'rhel7', '1')
         get_adapters_info.assert_called_once_with(self.userid)
         chk_usr.assert_called_once_with(self.userid)
@@ -547,7 +775,7 @@ class SDKAPITestCase(base.SDKTestCase):
     @mock.patch("zvmsdk.utils.check_userid_exist")
     @mock.patch("zvmsdk.smtclient.SMTClient.get_adapters_info")
     @mock.patch("zvmsdk.database.GuestDbOperator.add_guest_registered")
-    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_record")
+    @mock.patch("zvmsdk.database.NetworkDbOperator.switch_add_records")
     @mock.patch("zvmsdk.database.GuestDbOperator.update_guest_by_userid")
     @mock.patch("zvmsdk.database.GuestDbOperator.get_comments_by_userid")
     @mock.patch("zvmsdk.database.GuestDbOperator.get_migrated_guest_list")
@@ -610,7 +838,74 @@ class SDKAPITestCase(base.SDKTestCase):
     @mock.patch("zvmsdk.hostops.HOSTOps.guest_list")
     def test_host_get_guest_list(self, guest_list):
         self.api.host_get_guest_list()
-        guest_list.assert_called_once_with()
+        guest_list.assert_called_once_with(limit=None, marker=None,
+                                           sdk_managed=None, migrated=None)
+
+    @mock.patch("zvmsdk.hostops.HOSTOps.get_info")
+    def test_host_get_info(self, get_info):
+        self.api.host_get_info()
+        get_info.assert_called_once_with(refresh=False)
+        self.api.host_get_info(refresh=True)
+        get_info.assert_called_with(refresh=True)
+
+    @mock.patch("zvmsdk.hostops.HOSTOps.guest_list")
+    def test_host_get_guest_list_paged(self, guest_list):
+        self.api.host_get_guest_list(limit=10, marker='TEST0001',
+                                     sdk_managed=True)
+        guest_list.assert_called_once_with(limit=10, marker='TEST0001',
+                                           sdk_managed=True, migrated=None)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.host_get_guest_list, limit=0)
+
+    @mock.patch("zvmsdk.networkops.NetworkOPS.get_nic_info")
+    def test_guests_get_nic_info_paged(self, get_nic_info):
+        self.api.guests_get_nic_info(vswitch='VSW1', limit=2,
+                                     marker='TEST0001:1000')
+        get_nic_info.assert_called_once_with(userid=None, nic_id=None,
+                                             vswitch='VSW1', limit=2,
+                                             marker=('TEST0001', '1000'))
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guests_get_nic_info, limit=True)
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guests_get_nic_info, marker='TEST0001')
+
+    @mock.patch("zvmsdk.networkops.NetworkOPS.get_nic_info")
+    def test_guests_get_nic_info_fields(self, get_nic_info):
+        get_nic_info.return_value = [{'userid': 'ID01', 'interface': '1000',
+                                      'switch': 'VSW1', 'port': None,
+                                      'comments': None}]
+        result = self.api.guests_get_nic_info(fields=['userid', 'switch'])
+        self.assertEqual([{'userid': 'ID01', 'switch': 'VSW1'}], result)
+
+    @mock.patch("zvmsdk.vmops.VMOps.guest_list")
+    def test_guest_list_paged(self, guest_list):
+        guest_list.return_value = ['ID03', 'ID01', 'ID02']
+        self.assertEqual(['ID03', 'ID01', 'ID02'], self.api.guest_list())
+        self.assertEqual(['ID02', 'ID03'],
+                         self.api.guest_list(marker='id01'))
+        self.assertEqual(['ID01'], self.api.guest_list(limit=1))
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self.api.guest_list, limit='1')
+
+    @mock.patch("zvmsdk.volumeop.VolumeOperatorAPI.get_all_fcp_usage")
+    def test_get_all_fcp_usage_paged(self, get_usage):
+        get_usage.return_value = {'1a11': ('ID01', 0, 1),
+                                  '1b11': ('ID01', 1, 3),
+                                  '1c11': ('ID02', 1, 2)}
+        self.assertEqual({'1b11': ('ID01', 1, 3)},
+                         self.api.get_all_fcp_usage(limit=1, marker='1A11'))
+
+    @mock.patch("zvmsdk.monitor.ZVMMonitor.inspect_stats")
+    @mock.patch("zvmsdk.vmops.VMOps.check_guests_exist_in_db")
+    def test_guest_inspect_stats_paged_fields(self, check_exist,
+                                              inspect_stats):
+        inspect_stats.return_value = {'ID02': {'guest_cpus': 2,
+                                               'used_mem_kb': 1024}}
+        result = self.api.guest_inspect_stats(['id03', 'id02', 'id01'],
+                                              limit=1, marker='id01',
+                                              fields=['guest_cpus'])
+        inspect_stats.assert_called_once_with(['ID02'])
+        self.assertEqual({'ID02': {'guest_cpus': 2}}, result)
 
     @mock.patch("zvmsdk.hostops.HOSTOps.diskpool_get_volumes")
     def test_host_get_diskpool_volumes(self, diskpool_vols):
@@ -0,0 +1,49 @@
+# Copyright 2021 IBM Corp.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import tarfile
+
+from zvmsdk import configdrive
+from zvmsdk.tests.unit import base
+
+
+class ConfigDriveTestCase(base.SDKTestCase):
+
+    def test_create_config_drive(self):
+        network_interface_info = {'ip_addr': '192.168.95.10',
+                                  'nic_vdev': '1000',
+                                  'gateway_v4': '192.168.95.1',
+                                  'broadcast_v4': '192.168.95.255',
+                                  'netmask_v4': '255.255.255.0'}
+        cwd = os.getcwd()
+        tar_path = configdrive.create_config_drive(network_interface_info,
+                                                   'rhel7.2')
+        try:
+            # the working directory is not changed
+            self.assertEqual(cwd, os.getcwd())
+            with tarfile.open(tar_path, 'r:gz') as tar:
+                self.assertEqual(['openstack',
+                                  'openstack/content',
+                                  'openstack/content/0000',
+                                  'openstack/content/0001',
+                                  'openstack/latest',
+                                  'openstack/latest/meta_data.json',
+                                  'openstack/latest/network_data.json',
+                                  'openstack/latest/vendor_data.json'],
+                                 tar.getnames())
+                cfg_str = tar.extractfile('openstack/content/0000').read()
+                self.assertIn(b'IPADDR=192.168.95.10\n', cfg_str)
+        finally:
+            os.remove(tar_path)
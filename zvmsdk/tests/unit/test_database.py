@@ -95,10 +95,42 @@ class NetworkDbOperatorTestCase(base.SDKTestCase):
         # clean test switch
         self.db_op.switch_delete_record_for_userid(self.userid)
 
-    @mock.patch.object(database.NetworkDbOperator,
-                       '_get_switch_by_user_interface')
-    def test_switch_update_record_with_switch_fail(self, get_record):
-        get_record.return_value = None
+    def test_switch_table_indexes(self):
+        with database.get_network_conn() as conn:
+            res = conn.execute("SELECT name FROM sqlite_master "
+                               "WHERE type='index' AND tbl_name='switch'")
+            indexes = [row[0] for row in res.fetchall()]
+        self.assertIn('switch_switch_idx', indexes)
+        self.assertIn('switch_port_idx', indexes)
+
+    def test_switch_add_records(self):
+        records = [{'userid': 'ID01', 'interface': '1000',
+                    'switch': 'switch01', 'port': 'port_id01'},
+                   {'userid': 'ID01', 'interface': '2000'}]
+        self.db_op.switch_add_records(records)
+        self.addCleanup(self.db_op.switch_delete_record_for_userid, 'ID01')
+
+        switch_record = self.db_op.switch_select_table()
+        expected = [{'userid': 'ID01', 'interface': '1000',
+                     'switch': 'switch01', 'port': 'port_id01',
+                     'comments': None},
+                    {'userid': 'ID01', 'interface': '2000',
+                     'switch': None, 'port': None, 'comments': None}]
+        self.assertEqual(expected, switch_record)
+
+    def test_switch_add_records_rollback(self):
+        self.db_op.switch_add_record('ID01', '1000')
+        self.addCleanup(self.db_op.switch_delete_record_for_userid, 'ID01')
+        records = [{'userid': 'ID02', 'interface': '1000'},
+                   {'userid': 'ID01', 'interface': '1000'}]
+
+        self.assertRaises(exception.SDKNetworkOperationError,
+                          self.db_op.switch_add_records, records)
+        # the record added before the failure is rolled back
+        self.assertEqual([], self.db_op.switch_select_record_for_userid(
+            'ID02'))
+
+    def test_switch_update_record_with_switch_fail(self):
         interface = '1000'
         switch = 'testswitch'
 
@@ -168,6 +200,16 @@ class NetworkDbOperatorTestCase(base.SDKTestCase):
                      'switch': None, 'port': 'port_id03', 'comments': None}]
         self.assertEqual(expected, switch_record)
 
+    def test_switch_delete_record_for_userids(self):
+        for (userid, interface, port) in self.rec_list:
+            self.db_op.switch_add_record(userid, interface, port)
+            self.addCleanup(self.db_op.switch_delete_record_for_userid, userid)
+
+        self.db_op.switch_delete_record_for_userids(['ID01', 'ID03'])
+        for userid, count in (('ID01', 0), ('ID02', 1), ('ID03', 0)):
+            records = self.db_op.switch_select_record_for_userid(userid)
+            self.assertEqual(count, len(records))
+
     def test_switch_delete_record_for_nic(self):
         # insert multiple records
         for (userid, interface, port) in self.rec_list:
@@ -294,6 +336,22 @@ class NetworkDbOperatorTestCase(base.SDKTestCase):
                                                         vswitch='switch02')
         self.assertEqual([record[2]], switch_record)
 
+        # paging sorted by userid and interface
+        switch_record = self.db_op.switch_select_record(limit=3)
+        self.assertEqual(record[:3], switch_record)
+
+        switch_record = self.db_op.switch_select_record(
+            marker=('ID01', '1000'))
+        self.assertEqual(record[1:], switch_record)
+
+        switch_record = self.db_op.switch_select_record(
+            limit=1, marker=('ID01', '2000'))
+        self.assertEqual([record[2]], switch_record)
+
+        switch_record = self.db_op.switch_select_record(
+            vswitch='switch02', marker=('ID02', '1000'))
+        self.assertEqual([record[3]], switch_record)
+
         # clean test switch
         self.db_op.switch_delete_record_for_userid('ID01')
         self.db_op.switch_delete_record_for_userid('ID02')
@@ -589,6 +647,38 @@ class FCPDbOperatorTestCase(base.SDKTestCase):
         finally:
             self.db_op.delete('2222')
 
+    def test_sync_fcp_list(self):
+        self.db_op.new('1111', 0)
+        self.db_op.new('2222', 0)
+        self.db_op.new('3333', 0)
+        self.db_op.reserve('3333')
+        try:
+            removed = self.db_op.sync_fcp_list([('4444', 1)], [('1111', 1)],
+                                               ['2222', '3333'])
+            # the reserved fcp is kept
+            self.assertEqual(['2222'], removed)
+            fcp_list = sorted(self.db_op.get_all())
+            self.assertEqual(['1111', '3333', '4444'],
+                             [fcp[0] for fcp in fcp_list])
+            self.assertEqual(1, fcp_list[0][4])
+            self.assertEqual((u'4444', u'', 0, 0, 1, u''), fcp_list[2])
+        finally:
+            for fcp in ('1111', '2222', '3333', '4444'):
+                self.db_op.delete(fcp)
+
+    def test_sync_fcp_list_rollback(self):
+        self.db_op.new('1111', 0)
+        try:
+            self.assertRaises(exception.SDKGuestOperationError,
+                              self.db_op.sync_fcp_list,
+                              [('2222', 0)], [('1111', None, 1)], [])
+            # nothing is changed
+            self.assertEqual([], self.db_op.get_from_fcp('2222'))
+            self.assertEqual(0, self.db_op.get_from_fcp('1111')[0][4])
+        finally:
+            self.db_op.delete('1111')
+            self.db_op.delete('2222')
+
 
 class GuestDbOperatorTestCase(base.SDKTestCase):
     @classmethod
@@ -616,6 +706,39 @@ class GuestDbOperatorTestCase(base.SDKTestCase):
                                u'')], guests)
         self.db_op.delete_guest_by_id('ad8f352e-4c9e-4335-aafa-4f4eb2fcc77c')
 
+    def test_update_guests_comments(self):
+        self.db_op.add_guests(['FAKEUSR1', 'FAKEUSR2'])
+        self.addCleanup(self.db_op.delete_guests_by_userid,
+                        ['FAKEUSR1', 'FAKEUSR2'])
+        self.db_op.update_guest_by_userid('FAKEUSR1', comments={'k': 'v'})
+        self.db_op.update_guests_comments(['FAKEUSR1', 'FAKEUSR2'],
+                                          {'migrated': 1})
+        self.assertEqual({'k': 'v', 'migrated': 1},
+                         self.db_op.get_comments_by_userid('FAKEUSR1'))
+        self.assertEqual({'migrated': 1},
+                         self.db_op.get_comments_by_userid('FAKEUSR2'))
+
+    def test_delete_guests_by_userid(self):
+        self.db_op.add_guests(['FAKEUSR1', 'FAKEUSR2', 'FAKEUSR3'])
+        self.addCleanup(self.db_op.delete_guest_by_userid, 'FAKEUSR2')
+        self.db_op.delete_guests_by_userid(['FAKEUSR1', 'FAKEUSR3'])
+        self.assertEqual(['FAKEUSR2'],
+                         [g[1] for g in self.db_op.get_guest_list()])
+
+    def test_add_guests(self):
+        self.db_op.add_guests(['FAKEUSR1', 'FAKEUSR2'])
+        try:
+            guests = self.db_op.get_guest_list()
+            self.assertEqual(['FAKEUSR1', 'FAKEUSR2'],
+                             sorted(g[1] for g in guests))
+            # no guest is added if one of them fails
+            self.assertRaises(exception.SDKGuestOperationError,
+                              self.db_op.add_guests, ['FAKEUSR3', 'FAKEUSR1'])
+            self.assertEqual(2, len(self.db_op.get_guest_list()))
+        finally:
+            self.db_op.delete_guest_by_userid('FAKEUSR1')
+            self.db_op.delete_guest_by_userid('FAKEUSR2')
+
     @mock.patch.object(uuid, 'uuid4')
     def test_add_guest_registered(self, get_uuid):
         meta = 'fakemeta=1, fakemeta2=True'
@@ -52,6 +52,16 @@ class RHEL7TestCase(base.SDKTestCase):
         self.assertEqual('DNS1="9.0.2.1"', cfg_str[11])
         self.assertEqual('DNS2="9.0.3.1"', cfg_str[12])
 
+    def test_get_volume_batch_configuration_cmds(self):
+        scripts = ['echo volume0\nexit 1', 'echo volume1']
+        content = self.linux_dist.get_volume_batch_configuration_cmds(
+            scripts, '/tmp/fake.status')
+        self.assertIn('status_file="/tmp/fake.status"', content)
+        self.assertIn('configure_volume_0() (\necho volume0\nexit 1\n)',
+                      content)
+        self.assertIn('configure_volume_1() (\necho volume1\n)', content)
+        self.assertIn('echo "1 $rc" >> $status_file', content)
+
     @mock.patch('jinja2.Template.render')
     @mock.patch('zvmsdk.dist.LinuxDist.get_template')
     def test_get_volume_attach_configuration_cmds(self, get_template,
@@ -479,3 +489,41 @@ class UBUNTU20TestCase(base.SDKTestCase):
                                                 lun_id='0x0100000000000000',
                                                 target_filename='sdz',
                                                 is_last_volume=1)
+
+
+class TemplateTestCase(base.SDKTestCase):
+
+    def test_get_template_env_shared(self):
+        env = dist.get_template_env('volumeops')
+        self.assertIs(env, dist.get_template_env('volumeops'))
+        self.assertIsNot(env, dist.get_template_env('vmactions'))
+        self.assertFalse(env.auto_reload)
+
+    def test_get_template_compiled_once(self):
+        linux_dist = dist.LinuxDistManager().get_linux_dist('rhel7')()
+        template = linux_dist.get_template('volumeops',
+                                           'rhel7_attach_volume.j2')
+        self.assertIs(template,
+                      linux_dist.get_template('volumeops',
+                                              'rhel7_attach_volume.j2'))
+
+    @mock.patch('jinja2.Environment.get_template')
+    def test_warm_up_templates(self, get_template):
+        dist.warm_up_templates()
+        compiled = [c[0][0] for c in get_template.call_args_list]
+        self.assertIn('grow_root_volume.j2', compiled)
+        self.assertIn('batch_volumes.j2', compiled)
+        self.assertIn('ubuntu_detach_volume.j2', compiled)
+
+    @mock.patch('zvmsdk.dist.FileSystemBytecodeCache')
+    def test_get_bytecode_cache_failed(self, bytecode_cache):
+        bytecode_cache.side_effect = RuntimeError('no cache dir')
+        old_cache = dist._BYTECODE_CACHE
+        dist._BYTECODE_CACHE = None
+        try:
+            self.assertIsNone(dist._get_bytecode_cache())
+            # do not try again
+            self.assertIsNone(dist._get_bytecode_cache())
+            bytecode_cache.assert_called_once_with()
+        finally:
+            dist._BYTECODE_CACHE = old_cache
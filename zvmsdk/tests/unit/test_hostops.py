@@ -27,15 +27,74 @@ class SDKHostOpsTestCase(base.SDKTestCase):
     def setUp(self):
         self._hostops = hostops.get_hostops()
 
+    @mock.patch("zvmsdk.hostops.GuestInventory.list")
+    def test_guest_list(self, inventory_list):
+        self._hostops.guest_list(limit=2, marker='TEST0001')
+        inventory_list.assert_called_once_with(limit=2, marker='TEST0001',
+                                               sdk_managed=None,
+                                               migrated=None)
+
+    @mock.patch("zvmsdk.database.GuestDbOperator.get_changes_count")
+    @mock.patch("zvmsdk.database.GuestDbOperator.get_guest_list")
     @mock.patch("zvmsdk.smtclient.SMTClient.get_all_user_direct")
-    def test_guest_list(self, get_all_user_direct):
-        self._hostops.guest_list()
+    def test_guest_inventory_list(self, get_all_user_direct, db_list,
+                                  db_changes):
+        get_all_user_direct.return_value = ['TEST0003', 'test0001',
+                                            'TEST0002', 'TEST0004', '']
+        db_list.return_value = [
+            ('uuid1', 'TEST0001', '', 0, ''),
+            ('uuid2', 'TEST0002', '', 0, '{"migrated": 1}'),
+            ('uuid5', 'TEST0005', '', 0, '')]
+        db_changes.return_value = 1
+        inventory = hostops.GuestInventory()
+        self.assertEqual(inventory.list(),
+                         ['TEST0001', 'TEST0002', 'TEST0003', 'TEST0004'])
+        self.assertEqual(inventory.list(limit=2, marker='test0001'),
+                         ['TEST0002', 'TEST0003'])
+        self.assertEqual(inventory.list(sdk_managed=True),
+                         ['TEST0001', 'TEST0002'])
+        self.assertEqual(inventory.list(sdk_managed=True, migrated=False),
+                         ['TEST0001'])
+        self.assertEqual(inventory.list(marker='TEST0004'), [])
+        self.assertEqual(inventory.get('test0003'),
+                         {'userid': 'TEST0003', 'sdk_managed': False,
+                          'migrated': False})
         get_all_user_direct.assert_called_once_with()
+        db_list.assert_called_once_with()
 
-    @mock.patch("zvmsdk.hostops.HOSTOps.diskpool_get_info")
-    @mock.patch("zvmsdk.smtclient.SMTClient.get_host_info")
-    def test_get_host_info(self, get_host_info, diskpool_get_info):
-        get_host_info.return_value = {
+    @mock.patch("zvmsdk.smtclient.SMTClient.get_directory_generation")
+    @mock.patch("zvmsdk.database.GuestDbOperator.get_changes_count")
+    @mock.patch("zvmsdk.database.GuestDbOperator.get_guest_list")
+    @mock.patch("zvmsdk.smtclient.SMTClient.get_all_user_direct")
+    def test_guest_inventory_refresh(self, get_all_user_direct, db_list,
+                                     db_changes, dir_generation):
+        get_all_user_direct.return_value = ['TEST0001', 'TEST0002']
+        db_list.return_value = [('uuid1', 'TEST0001', '', 0, '')]
+        db_changes.return_value = 1
+        dir_generation.return_value = 1
+        inventory = hostops.GuestInventory()
+        diff = inventory.refresh()
+        self.assertEqual(diff, {'added': ['TEST0001', 'TEST0002'],
+                                'removed': [], 'changed': []})
+
+        # guests DB changed, only the flags are reloaded
+        db_list.return_value = [('uuid1', 'TEST0001', '', 0, ''),
+                                ('uuid2', 'TEST0002', '', 0, '')]
+        db_changes.return_value = 2
+        self.assertEqual(inventory.list(sdk_managed=False), [])
+        get_all_user_direct.assert_called_once_with()
+        self.assertEqual(db_list.call_count, 2)
+
+        # guest created by SDK, the directory is reloaded
+        get_all_user_direct.return_value = ['TEST0002', 'TEST0003']
+        dir_generation.return_value = 2
+        self.assertEqual(inventory.list(), ['TEST0002', 'TEST0003'])
+        self.assertEqual(get_all_user_direct.call_count, 2)
+        self.assertEqual(inventory.refresh(),
+                         {'added': [], 'removed': [], 'changed': []})
+
+    def _fake_host_info(self):
+        return {
             "zcc_userid": "FAKEUSER",
             "zvm_host": "FAKENODE",
             "zhcp": "fakehcp.fake.com",
@@ -51,27 +110,74 @@ class SDKHostOpsTestCase(base.SDKTestCase):
             "lpar_memory_offline": "0",
             "ipl_time": "IPL at 03/13/14 21:43:12 EDT",
             }
+
+    @mock.patch("zvmsdk.hostops.HOSTOps.diskpool_get_info")
+    @mock.patch("zvmsdk.smtclient.SMTClient.get_host_info")
+    def test_get_host_info(self, get_host_info, diskpool_get_info):
+        get_host_info.return_value = self._fake_host_info()
         diskpool_get_info.return_value = {
             "disk_total": 406105,
             "disk_used": 367263,
             "disk_available": 38843,
             }
-        host_info = self._hostops.get_info()
+        hostops_obj = hostops.HOSTOps()
+        host_info = hostops_obj.get_info()
         get_host_info.assert_called_once_with()
         base.set_conf('zvm', 'disk_pool', 'ECKD:TESTPOOL')
         diskpool = CONF.zvm.disk_pool.split(':')[1]
         diskpool_get_info.assert_called_once_with(diskpool)
         self.assertEqual(host_info['vcpus'], 10)
+        self.assertEqual(host_info['vcpus_used'], 10)
         self.assertEqual(host_info['hypervisor_version'], 610)
         self.assertEqual(host_info['disk_total'], 406105)
 
         # Test disk_pool is None
         base.set_conf('zvm', 'disk_pool', None)
-        host_info = self._hostops.get_info()
+        try:
+            host_info = hostops_obj.get_info(refresh=True)
+        finally:
+            base.set_conf('zvm', 'disk_pool', 'ECKD:TESTPOOL')
         self.assertEqual(host_info['disk_total'], 0)
         self.assertEqual(host_info['disk_used'], 0)
         self.assertEqual(host_info['disk_available'], 0)
 
+    @mock.patch("zvmsdk.hostops.HOSTOps.diskpool_get_info")
+    @mock.patch("zvmsdk.smtclient.SMTClient.get_host_usage")
+    @mock.patch("zvmsdk.smtclient.SMTClient.get_host_info")
+    def test_get_host_info_cached(self, get_host_info, get_host_usage,
+                                  diskpool_get_info):
+        get_host_info.return_value = self._fake_host_info()
+        get_host_usage.return_value = {"lpar_cpu_used": "8",
+                                       "lpar_memory_used": "8G"}
+        diskpool_get_info.return_value = {"disk_total": 10, "disk_used": 5,
+                                          "disk_available": 5}
+        hostops_obj = hostops.HOSTOps()
+        hostops_obj.get_info()
+        host_info = hostops_obj.get_info()
+        self.assertEqual(host_info['memory_mb_used'], 16384)
+        self.assertEqual(hostops_obj.get_static_info()['zvm_host'],
+                         'FAKENODE')
+        get_host_info.assert_called_once_with()
+        get_host_usage.assert_not_called()
+        diskpool_get_info.assert_called_once_with('TESTPOOL')
+
+        # the usage expires alone
+        base.set_conf('zvm', 'host_dynamic_info_interval', 0)
+        try:
+            host_info = hostops_obj.get_info()
+        finally:
+            base.set_conf('zvm', 'host_dynamic_info_interval', 30)
+        get_host_info.assert_called_once_with()
+        get_host_usage.assert_called_once_with()
+        self.assertEqual(host_info['vcpus_used'], 8)
+        self.assertEqual(host_info['memory_mb_used'], 8192)
+        self.assertEqual(diskpool_get_info.call_count, 2)
+
+        # refresh queries all the facts again
+        hostops_obj.get_info(refresh=True)
+        self.assertEqual(get_host_info.call_count, 2)
+        self.assertEqual(diskpool_get_info.call_count, 3)
+
     @mock.patch("zvmsdk.smtclient.SMTClient.get_diskpool_info")
     def test_get_diskpool_info(self, get_diskpool_info):
         get_diskpool_info.return_value = {
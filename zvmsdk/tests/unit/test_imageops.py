@@ -47,7 +47,9 @@ class SDKImageOpsTestCase(base.SDKTestCase):
     def test_image_query(self, image_query):
         imagekeyword = 'eae09a9f_7958_4024_a58c_83d3b2fc0aab'
         self._image_ops.image_query(imagekeyword)
-        image_query.assert_called_once_with(imagekeyword)
+        image_query.assert_called_once_with(imagekeyword, os_distro=None,
+                                            limit=None,
+                                            marker=None)
 
     @mock.patch("zvmsdk.smtclient.SMTClient.image_delete")
     def test_image_delete(self, image_delete):
@@ -12,11 +12,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import mock
+import os
 import shutil
+import tarfile
+import tempfile
 
 from zvmsdk.tests.unit import base
 from zvmsdk import dist
+from zvmsdk import exception
 from zvmsdk import networkops
 
 
@@ -111,7 +116,8 @@ class SDKNetworkOpsTestCase(base.SDKTestCase):
     def test_get_nic_info(self, get_nic_info):
         self.networkops.get_nic_info(userid='testid', vswitch='VSWITCH')
         get_nic_info.assert_called_with(userid='testid', nic_id=None,
-                                        vswitch='VSWITCH')
+                                        vswitch='VSWITCH', limit=None,
+                                        marker=None)
 
     @mock.patch.object(shutil, 'rmtree')
     @mock.patch('zvmsdk.smtclient.SMTClient.execute_cmd')
@@ -147,12 +153,11 @@ class SDKNetworkOpsTestCase(base.SDKTestCase):
     @mock.patch('zvmsdk.dist.LinuxDistManager.get_linux_dist')
     @mock.patch.object(dist.rhel7, 'create_network_configuration_files')
     @mock.patch('zvmsdk.networkops.NetworkOPS._create_znetconfig')
-    @mock.patch('zvmsdk.networkops.NetworkOPS._add_file')
     @mock.patch('zvmsdk.networkops.NetworkOPS._create_invokeScript')
-    @mock.patch('zvmsdk.networkops.NetworkOPS._create_network_doscript')
-    def test_generate_network_doscript_not_active(self, doscript, invokeScript,
-                                    add_file, znetconfig, config, linux_dist):
-        net_conf_files = [('target1', 'content1')]
+    def test_generate_network_doscript_not_active(self, invokeScript,
+                                    znetconfig, config, linux_dist):
+        net_conf_files = [('target1', 'content1'),
+                          ('/etc/netplan/target.yaml', {'key': 'value'})]
         net_cmd_file = [('target2', 'content2')]
         net_conf_cmds = ''
         clean_cmd = ''
@@ -161,42 +166,56 @@ class SDKNetworkOpsTestCase(base.SDKTestCase):
         os_version = 'rhel7.2'
         network_info = []
         first = False
-        network_file_path = '/tmp'
+        network_file_path = tempfile.mkdtemp()
         files_and_cmds = net_conf_files, net_conf_cmds, clean_cmd, net_enable
         files_map = []
         files_map.append({'target_path': 'target1',
                         'source_file': "0000"})
-        files_map.append({'target_path': 'target2',
+        files_map.append({'target_path': '/etc/netplan/target.yaml',
                         'source_file': "0001"})
+        files_map.append({'target_path': 'target2',
+                        'source_file': "0002"})
         linux_dist.return_value = dist.rhel7
         config.return_value = files_and_cmds
         znetconfig.return_value = net_cmd_file
-        add_file.return_value = None
-        invokeScript.return_value = None
-        doscript.return_value = 'result1'
-
-        r1, r2 = self.networkops._generate_network_doscript(userid,
-                                    os_version, network_info,
-                                    network_file_path, first, active=False)
-        linux_dist.assert_called_with(os_version)
-        config.assert_called_with(network_file_path, network_info,
-                                  first, active=False)
-        invokeScript.assert_called_with(network_file_path, clean_cmd,
-                                        files_map)
-        doscript.assert_called_with(network_file_path)
-
-        self.assertEqual(r1, 'result1')
-        self.assertEqual(r2, '')
+        invokeScript.return_value = 'invoke script'
+
+        try:
+            r1, r2 = self.networkops._generate_network_doscript(userid,
+                                        os_version, network_info,
+                                        network_file_path, first,
+                                        active=False)
+            linux_dist.assert_called_with(os_version)
+            config.assert_called_with(network_file_path, network_info,
+                                      first, active=False)
+            invokeScript.assert_called_with(clean_cmd, files_map)
+
+            self.assertEqual(os.path.join(network_file_path,
+                                          'network.doscript'), r1)
+            self.assertEqual(r2, '')
+            # only the doscript is written into the folder
+            self.assertEqual(['network.doscript'],
+                             os.listdir(network_file_path))
+            with tarfile.open(r1) as tar:
+                self.assertEqual(['0000', '0001', '0002', 'invokeScript.sh'],
+                                 tar.getnames())
+                self.assertEqual(b'content1',
+                                 tar.extractfile('0000').read())
+                self.assertEqual(b'key: value\n',
+                                 tar.extractfile('0001').read())
+                self.assertEqual(b'invoke script',
+                                 tar.extractfile('invokeScript.sh').read())
+        finally:
+            shutil.rmtree(network_file_path)
 
     @mock.patch('zvmsdk.dist.LinuxDistManager.get_linux_dist')
     @mock.patch.object(dist.rhel7, 'create_network_configuration_files')
     @mock.patch.object(dist.rhel7, 'create_active_net_interf_cmd')
     @mock.patch('zvmsdk.networkops.NetworkOPS._create_znetconfig')
-    @mock.patch('zvmsdk.networkops.NetworkOPS._add_file')
     @mock.patch('zvmsdk.networkops.NetworkOPS._create_invokeScript')
     @mock.patch('zvmsdk.networkops.NetworkOPS._create_network_doscript')
     def test_generate_network_doscript_active(self, doscript, invokeScript,
-                                    add_file, znetconfig, active_cmd,
+                                    znetconfig, active_cmd,
                                     config, linux_dist):
         net_conf_files = [('target1', 'content1')]
         net_cmd_file = [('target2', 'content2')]
@@ -219,8 +238,7 @@ class SDKNetworkOpsTestCase(base.SDKTestCase):
         config.return_value = files_and_cmds
         active_cmd.return_value = active_net_cmd
         znetconfig.return_value = net_cmd_file
-        add_file.return_value = None
-        invokeScript.return_value = None
+        invokeScript.return_value = 'invoke script'
         doscript.return_value = 'result1'
 
         r1, r2 = self.networkops._generate_network_doscript(userid,
@@ -229,13 +247,19 @@ class SDKNetworkOpsTestCase(base.SDKTestCase):
         linux_dist.assert_called_with(os_version)
         config.assert_called_with(network_file_path, network_info,
                                   first, active=True)
-        invokeScript.assert_called_with(network_file_path, clean_cmd,
-                                        files_map)
-        doscript.assert_called_with(network_file_path)
+        invokeScript.assert_called_with(clean_cmd, files_map)
+        doscript.assert_called_with(network_file_path, mock.ANY)
 
         self.assertEqual(r1, 'result1')
         self.assertEqual(r2, active_net_cmd)
 
+    def test_create_invokeScript(self):
+        files_map = [{'target_path': '/etc/target1', 'source_file': '0000'}]
+        script = self.networkops._create_invokeScript('clean\n', files_map)
+        self.assertEqual('#!/bin/bash \nclean\ncat 0000 > /etc/target1\n'
+                         'sleep 2\n/bin/bash /tmp/znetconfig.sh\n'
+                         'rm -rf invokeScript.sh\n', script)
+
     @mock.patch('zvmsdk.smtclient.SMTClient.query_vswitch')
     def test_vswitch_query(self, query_vswitch):
         self.networkops.vswitch_query("vswitch_name")
@@ -290,3 +314,103 @@ class SDKNetworkOpsTestCase(base.SDKTestCase):
                                      active=True)
         dedicate_OSA.assert_called_with("fakeid", 'F000', vdev='1000',
                                         active=True)
+
+    @mock.patch('zvmsdk.smtclient.SMTClient.grant_user_to_vswitch')
+    @mock.patch('zvmsdk.smtclient.SMTClient.set_vswitch_port_vlan_id')
+    def test_grant_users_to_vswitch(self, set_vlan, grant):
+        users = collections.OrderedDict([('USER1', set()),
+                                         ('USER2', set([10])),
+                                         ('USER3', set([10, 20])),
+                                         ('USER4', set())])
+        grant.side_effect = [None, exception.SDKConflictError(
+            modID='network', rs=5, vsw='VSW1', msg='fake error')]
+
+        errors = self.networkops._grant_users_to_vswitch('VSW1', users)
+        grant.assert_has_calls([mock.call('VSW1', 'USER1'),
+                                mock.call('VSW1', 'USER4')])
+        set_vlan.assert_called_once_with('VSW1', 'USER2', 10)
+        self.assertEqual(['USER3', 'USER4'], sorted(errors))
+        self.assertIn('Conflicting VLAN IDs', errors['USER3'])
+
+    @mock.patch('zvmsdk.smtclient.SMTClient.grant_user_to_vswitch')
+    def test_grant_users_to_vswitch_not_exist(self, grant):
+        users = collections.OrderedDict([('USER1', set()),
+                                         ('USER2', set())])
+        grant.side_effect = exception.SDKObjectNotExistError(
+            obj_desc='Vswitch VSW1', modID='network')
+
+        errors = self.networkops._grant_users_to_vswitch('VSW1', users)
+        grant.assert_called_once_with('VSW1', 'USER1')
+        self.assertEqual(['USER1', 'USER2'], sorted(errors))
+
+    @mock.patch.object(networkops.NetworkOPS, 'network_configuration')
+    @mock.patch('zvmsdk.smtclient.SMTClient.couple_nic_to_vswitch')
+    @mock.patch('zvmsdk.smtclient.SMTClient.dedicate_OSA')
+    @mock.patch('zvmsdk.smtclient.SMTClient.create_nic')
+    def test_create_network_interface(self, create_nic, dedicate_OSA,
+                                      couple, net_config):
+        networks = [{'nic_vdev': '1000', 'vswitch_name': 'VSW1',
+                     'vlan_id': 10},
+                    {'osa_device': 'AABB'},
+                    {'vswitch_name': 'VSW2'}]
+        create_nic.side_effect = ['1000', '1003']
+        dedicate_OSA.return_value = '1006'
+
+        ret = self.networkops._create_network_interface('USER1', 'rhel7',
+                                                        networks)
+        self.assertEqual(['1000', '1006', '1003'],
+                         [n['nic_vdev'] for n in ret])
+        dedicate_OSA.assert_called_once_with('USER1', 'AABB', vdev=None,
+                                             active=False)
+        couple.assert_has_calls([
+            mock.call('USER1', '1000', 'VSW1', active=False, vlan_id=10),
+            mock.call('USER1', '1003', 'VSW2', active=False, vlan_id=-1)])
+        net_config.assert_called_once_with('USER1', 'rhel7', networks,
+                                           active=False)
+
+    @mock.patch.object(networkops.NetworkOPS, '_create_network_interface')
+    @mock.patch.object(networkops.NetworkOPS, '_grant_users_to_vswitch')
+    def test_create_network_interfaces(self, grant, create):
+        interfaces = [{'userid': 'USER%s' % i, 'os_version': 'rhel7',
+                       'guest_networks': [{'vswitch_name': 'vsw1',
+                                           'vlan_id': 10},
+                                          {'vswitch_name': 'VSW1',
+                                           'vlan_id': 10},
+                                          {'vswitch_name': 'VSW2'}]}
+                      for i in range(3)]
+        grant.side_effect = lambda vsw, users: (
+            {'USER1': 'grant error'} if vsw == 'VSW2' else {})
+
+        def _create(userid, os_version, guest_networks, active):
+            if userid == 'USER2':
+                raise exception.SDKSMTRequestFailed(
+                    {'overallRC': 1, 'rc': 1, 'rs': 1}, 'create error')
+            return guest_networks
+        create.side_effect = _create
+
+        ret = self.networkops.create_network_interfaces(interfaces,
+                                                        active=True)
+        self.assertEqual(2, grant.call_count)
+        vswitch_users = dict((c[0][0], c[0][1]) for c in grant.call_args_list)
+        self.assertEqual({'USER0': set([10]), 'USER1': set([10]),
+                          'USER2': set([10])},
+                         dict(vswitch_users['VSW1']))
+        self.assertEqual({'USER0': set(), 'USER1': set(), 'USER2': set()},
+                         dict(vswitch_users['VSW2']))
+        self.assertEqual(2, create.call_count)
+        create.assert_any_call('USER0', 'rhel7',
+                               interfaces[0]['guest_networks'], True)
+        self.assertEqual(['success', 'failed', 'failed'],
+                         [r['result'] for r in ret])
+        self.assertEqual('grant error', ret[1]['errmsg'])
+        self.assertIn('create error', ret[2]['errmsg'])
+
+    @mock.patch('zvmsdk.smtclient.SMTClient.refresh_vswitch_cache')
+    def test_refresh_vswitch_cache(self, refresh):
+        refresh.return_value = {
+            'VSW2': exception.SDKObjectNotExistError(obj_desc='Vswitch VSW2',
+                                                     modID='network')}
+        errors = self.networkops.refresh_vswitch_cache(['VSW1', 'VSW2'])
+        refresh.assert_called_once_with(vswitch_names=['VSW1', 'VSW2'])
+        self.assertEqual(['VSW2'], list(errors.keys()))
+        self.assertIn('Vswitch VSW2', errors['VSW2'])
@@ -0,0 +1,118 @@
+# Copyright 2021 IBM Corp.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import mock
+import threading
+
+from zvmconnector import connector
+from zvmsdk import api
+from zvmsdk import exception
+from zvmsdk import sdkserver
+from zvmsdk.tests.unit import base
+
+
+class SDKServerTestCase(base.SDKTestCase):
+    def setUp(self):
+        super(SDKServerTestCase, self).setUp()
+        self._server = sdkserver.SDKServer()
+
+    @mock.patch.object(api.SDKAPI, 'guest_list')
+    def test_call_API(self, guest_list):
+        guest_list.return_value = ['TEST0001']
+        results = self._server.call_API(('fake', 0), 'guest_list', [],
+                                        {'limit': 1})
+        guest_list.assert_called_once_with(limit=1)
+        self.assertEqual({'overallRC': 0, 'modID': None, 'rc': 0, 'rs': 0,
+                          'errmsg': '', 'output': ['TEST0001']}, results)
+
+    @mock.patch.object(api.SDKAPI, 'guest_list')
+    def test_call_API_sdk_error(self, guest_list):
+        guest_list.side_effect = exception.SDKInvalidInputFormat(msg='bad')
+        results = self._server.call_API(('fake', 0), 'guest_list', [], {})
+        self.assertEqual(100, results['overallRC'])
+        self.assertIn('bad', results['errmsg'])
+
+    def test_call_API_wrong_name(self):
+        results = self._server.call_API(('fake', 0), 'no_such_api', [], {})
+        self.assertEqual(400, results['overallRC'])
+        # the shared error definition is not modified
+        results['rs'] = 100
+        results = self._server.call_API(('fake', 0), 'no_such_api', [], {})
+        self.assertEqual(1, results['rs'])
+
+    @mock.patch.object(api.SDKAPI, 'guest_list')
+    def test_serve_API(self, guest_list):
+        guest_list.return_value = ['TEST0001']
+        client = mock.Mock()
+        client.recv.return_value = json.dumps(
+            ['guest_list', [], {}]).encode()
+        self._server.serve_API(client, ('fake', 0))
+        sent = b''.join(c[0][0] for c in client.sendall.call_args_list)
+        self.assertEqual(['TEST0001'],
+                         json.loads(sent.decode('utf-8'))['output'])
+        client.close.assert_called_once_with()
+
+
+class InProcessServerTestCase(base.SDKTestCase):
+    @mock.patch('zvmsdk.dist.warm_up_templates')
+    @mock.patch('zvmsdk.hostops.GuestInventory.start_refresh')
+    def setUp(self, start_refresh, warm_up):
+        super(InProcessServerTestCase, self).setUp()
+        base.set_conf('sdkserver', 'max_worker_count', 1)
+        try:
+            self._server = sdkserver.InProcessServer()
+        finally:
+            base.set_conf('sdkserver', 'max_worker_count', 64)
+        start_refresh.assert_called_once_with()
+        warm_up.assert_called_once_with()
+
+    @mock.patch.object(api.SDKAPI, 'guest_list')
+    def test_call(self, guest_list):
+        guest_list.return_value = ('TEST0001',)
+        results = self._server.call('guest_list', limit=1)
+        guest_list.assert_called_once_with(limit=1)
+        self.assertEqual(0, results['overallRC'])
+        self.assertEqual(('TEST0001',), results['output'])
+
+    @mock.patch.object(api.SDKAPI, 'guest_list')
+    def test_call_concurrency_limited(self, guest_list):
+        started = threading.Event()
+        release = threading.Event()
+
+        def _slow_list():
+            started.set()
+            release.wait(10)
+            return []
+
+        guest_list.side_effect = _slow_list
+        worker = threading.Thread(target=self._server.call,
+                                  args=('guest_list',))
+        worker.start()
+        self.assertTrue(started.wait(10))
+        # the only worker slot is taken by the running call
+        self.assertFalse(self._server.workers.acquire(False))
+        release.set()
+        worker.join()
+        self.assertTrue(self._server.workers.acquire(False))
+        self._server.workers.release()
+
+    @mock.patch.object(sdkserver, 'get_inprocess_server')
+    def test_inprocess_connector(self, get_server):
+        get_server.return_value = self._server
+        with mock.patch.object(api.SDKAPI, 'guest_list') as guest_list:
+            guest_list.return_value = ['TEST0001']
+            client = connector.ZVMConnector(connection_type='inprocess')
+            results = client.send_request('guest_list')
+        self.assertEqual(['TEST0001'], results['output'])
@@ -15,11 +15,15 @@
 
 import os
 import mock
+import shutil
+import tarfile
 import tempfile
 import time
 import subprocess
 
+from smtLayer import ReqHandle
 from smtLayer import smt
+from smtLayer import vmUtils
 
 from zvmsdk import config
 from zvmsdk import database
@@ -105,6 +109,12 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                                         poll_interval=10)
         request.assert_called_once_with(requestData)
 
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_guest_softstop_no_wait(self, request):
+        request.return_value = {'overallRC': 0}
+        self._smtclient.guest_softstop('FakeID', wait=False)
+        request.assert_called_once_with("PowerVM FakeID softoff")
+
     @mock.patch.object(smtclient.SMTClient, 'get_power_state')
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_guest_pause(self, request, power_state):
@@ -128,7 +138,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_get_power_state(self, request):
         fake_userid = 'FakeID'
-        requestData = "PowerVM FakeID status"
+        requestData = ReqHandle.SMTRequest('PowerVM', 'status', 'FakeID')
         request.return_value = {'overallRC': 0,
                                 'response': [fake_userid + ': on']}
         status = self._smtclient.get_power_state(fake_userid)
@@ -162,6 +172,84 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         add_mdisks.assert_called_with(user_id, disk_list)
         add_guest.assert_called_with(user_id)
 
+    @mock.patch.object(smtclient.SMTClient, 'add_mdisks')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    @mock.patch.object(database.GuestDbOperator, 'add_guests')
+    def test_create_vms(self, add_guests, request, add_mdisks):
+        base.set_conf('zvm', 'default_admin_userid', None)
+        disk_list = [{'size': '1g', 'is_boot_disk': True}]
+        guests = []
+        for userid in ('USER1', 'USER2', 'USER3'):
+            guests.append({'userid': userid, 'cpu': 2, 'memory': 1024,
+                           'disk_list': [dict(disk_list[0])],
+                           'profile': 'osdflt', 'max_cpu': 10,
+                           'max_mem': '4G', 'ipl_from': '', 'ipl_param': '',
+                           'ipl_loadparam': '', 'dedicate_vdevs': [],
+                           'loaddev': {}, 'account': '', 'comment_list': []})
+
+        def _request(rd):
+            if rd.startswith('makevm USER2 '):
+                raise exception.SDKSMTRequestFailed(
+                    {'rc': 400, 'rs': 8, 'overallRC': 8}, 'fake error')
+
+        def _add_mdisks(userid, disks):
+            if userid == 'USER3':
+                raise exception.SDKGuestOperationError(rs=2, msg='no pool')
+            return [{'vdev': '0100'}]
+
+        request.side_effect = _request
+        add_mdisks.side_effect = _add_mdisks
+        base.set_conf('guest', 'max_concurrent_guest_create', 2)
+        try:
+            results = self._smtclient.create_vms(guests)
+        finally:
+            base.set_conf('guest', 'max_concurrent_guest_create', 8)
+        self.assertEqual(3, request.call_count)
+        # only the guests with user directory created are added to db
+        add_guests.assert_called_once_with(['USER1', 'USER3'])
+        self.assertEqual(2, add_mdisks.call_count)
+        self.assertEqual([{'vdev': '0100'}], results[0][0])
+        self.assertIsNone(results[0][1])
+        self.assertEqual(['directory', 'database', 'disks'],
+                         [step for step in ('directory', 'database', 'disks')
+                          if step in results[0][2]])
+        self.assertIsInstance(results[1][1], exception.SDKSMTRequestFailed)
+        self.assertEqual(['directory'], list(results[1][2]))
+        self.assertIsInstance(results[2][1],
+                              exception.SDKGuestOperationError)
+
+    @mock.patch.object(smtclient.SMTClient, 'add_mdisks')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_create_vms_db_failed(self, request, add_mdisks):
+        base.set_conf('zvm', 'default_admin_userid', None)
+        guests = [{'userid': userid, 'cpu': 2, 'memory': 1024,
+                   'disk_list': [{'size': '1g', 'is_boot_disk': True}],
+                   'profile': 'osdflt', 'max_cpu': 10, 'max_mem': '4G',
+                   'ipl_from': '', 'ipl_param': '', 'ipl_loadparam': '',
+                   'dedicate_vdevs': [], 'loaddev': {}, 'account': '',
+                   'comment_list': []}
+                  for userid in ('USER1', 'USER2', 'USER3')]
+        add_mdisks.return_value = [{'vdev': '0100'}]
+        db_op = database.GuestDbOperator()
+        # a stale record of USER2 fails the transaction of all the guests
+        db_op.add_guest('USER2')
+        try:
+            results = self._smtclient.create_vms(guests)
+            self.assertEqual(['USER1', 'USER2', 'USER3'],
+                             sorted(g[1] for g in db_op.get_guest_list()))
+        finally:
+            for userid in ('USER1', 'USER2', 'USER3'):
+                db_op.delete_guest_by_userid(userid)
+        self.assertIsNone(results[0][1])
+        self.assertIsInstance(results[1][1],
+                              exception.SDKGuestOperationError)
+        self.assertEqual(['database', 'directory'], sorted(results[1][2]))
+        self.assertIsNone(results[2][1])
+        # only the guests added to database get their disks
+        self.assertEqual([mock.call('USER1', guests[0]['disk_list']),
+                          mock.call('USER3', guests[2]['disk_list'])],
+                         sorted(add_mdisks.call_args_list))
+
     @mock.patch.object(smtclient.SMTClient, 'add_mdisks')
     @mock.patch.object(smtclient.SMTClient, '_request')
     @mock.patch.object(database.GuestDbOperator, 'add_guest')
@@ -1454,7 +1542,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                                 'overallRC': 0, 'logEntries': [], 'rc': 0,
                                 'response': resp}
         expect = ['vm1', 'vm2', 'vm3']
-        rd = 'getvm alldirectory'
+        rd = ReqHandle.SMTRequest('getvm', 'alldirectory')
         guest_list = self._smtclient.get_all_user_direct()
         smt_req.assert_called_once_with(rd)
         self.assertEqual(guest_list, expect)
@@ -1493,9 +1581,21 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                   'zvm_host': 'OPNSTK2'}
         host_info = self._smtclient.get_host_info()
 
-        smt_req.assert_called_once_with('getHost general')
+        smt_req.assert_called_once_with(
+            ReqHandle.SMTRequest('getHost', 'general'))
         self.assertDictEqual(host_info, expect)
 
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_host_usage(self, smt_req):
+        smt_req.return_value = {'overallRC': 0, 'rc': 0, 'rs': 0,
+                                'response': ['LPAR CPU Used: 6',
+                                             'LPAR Memory Used: 36.5G']}
+        usage = self._smtclient.get_host_usage()
+        smt_req.assert_called_once_with(
+            ReqHandle.SMTRequest('gethost', 'usage'))
+        self.assertEqual({'lpar_cpu_used': '6',
+                          'lpar_memory_used': '36.5G'}, usage)
+
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_get_diskpool_info(self, smt_req):
         resp = ['XCATECKD Total: 3623.0G',
@@ -1509,7 +1609,8 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                   'disk_used': '397.4G'}
         dp_info = self._smtclient.get_diskpool_info('pool')
 
-        smt_req.assert_called_once_with('getHost diskpoolspace pool')
+        smt_req.assert_called_once_with(ReqHandle.SMTRequest(
+            'getHost', 'diskpoolspace', parms={'poolName': 'pool'}))
         self.assertDictEqual(dp_info, expect)
 
     @mock.patch.object(smtclient.SMTClient, '_request')
@@ -1521,7 +1622,8 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         expect = {'diskpool_volumes': 'IAS100 IAS200'}
         diskpool_vols = self._smtclient.get_diskpool_volumes('fakepool')
 
-        smt_req.assert_called_once_with('gethost diskpoolvolumes fakepool')
+        smt_req.assert_called_once_with(ReqHandle.SMTRequest(
+            'gethost', 'diskpoolvolumes', parms={'poolName': 'fakepool'}))
         self.assertDictEqual(diskpool_vols, expect)
 
     @mock.patch.object(smtclient.SMTClient, '_request')
@@ -1539,7 +1641,8 @@ class SDKSMTClientTestCases(base.SDKTestCase):
             'volume_size': '60102'}}
         volume_info = self._smtclient.get_volume_info()
 
-        smt_req.assert_called_once_with('gethost volumeinfo')
+        smt_req.assert_called_once_with(
+            ReqHandle.SMTRequest('gethost', 'volumeinfo'))
         self.assertDictEqual(volume_info, expect)
 
     @mock.patch.object(zvmutils, 'get_smt_userid')
@@ -1559,6 +1662,32 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         request.assert_called_once_with(rd)
         self.assertEqual(list, expect)
 
+    @mock.patch.object(zvmutils, 'get_smt_userid')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_vswitch_list_cached(self, request, get_smt_userid):
+        get_smt_userid.return_value = "SMTUSER"
+        request.return_value = {'overallRC': 0,
+            'response': ['VSWITCH:  Name: VSTEST1']}
+
+        self.assertEqual(['VSTEST1'], self._smtclient.get_vswitch_list())
+        self.assertEqual(['VSTEST1'], self._smtclient.get_vswitch_list())
+        self.assertEqual(1, request.call_count)
+
+        self._smtclient._invalidate_vswitch_cache(
+            'SMAPI SMTUSER API Virtual_Network_Vswitch_Create_Extended '
+            '--operands -k switch_name=VSTEST2')
+        self._smtclient.get_vswitch_list()
+        self.assertEqual(2, request.call_count)
+
+        base.set_conf('network', 'vswitch_cache_interval', 0)
+        try:
+            self._smtclient._vswitch_cache.clear()
+            self._smtclient.get_vswitch_list()
+            self._smtclient.get_vswitch_list()
+            self.assertEqual(4, request.call_count)
+        finally:
+            base.set_conf('network', 'vswitch_cache_interval', 60)
+
     @mock.patch.object(zvmutils, 'get_smt_userid')
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_set_vswitch_port_vlan_id(self, request, get_smt_userid):
@@ -1707,31 +1836,34 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         self._smtclient.delete_vswitch(switch_name, True)
         request.assert_called_once_with(rd)
 
-    @mock.patch.object(database.NetworkDbOperator, 'switch_select_table')
-    def test_get_available_vdev(self, switch_select_table):
-        switch_select_table.return_value = [
-                    {'userid': 'fake_id', 'interface': '1003',
+    @mock.patch.object(database.NetworkDbOperator,
+                       'switch_select_record_for_userid')
+    def test_get_available_vdev(self, switch_select):
+        switch_select.return_value = [
+                    {'userid': 'FAKE_ID', 'interface': '1003',
                      'switch': None, 'port': None, 'comments': None},
-                    {'userid': 'fake_id', 'interface': '1006',
+                    {'userid': 'FAKE_ID', 'interface': '1006',
                      'switch': None, 'port': None, 'comments': None}]
         result = self._smtclient._get_available_vdev('fake_id', vdev='1009')
-        switch_select_table.assert_called_with()
+        switch_select.assert_called_with('FAKE_ID')
         self.assertEqual(result, '1009')
 
-    @mock.patch.object(database.NetworkDbOperator, 'switch_select_table')
-    def test_get_available_vdev_without_vdev(self, switch_select_table):
-        switch_select_table.return_value = [
+    @mock.patch.object(database.NetworkDbOperator,
+                       'switch_select_record_for_userid')
+    def test_get_available_vdev_without_vdev(self, switch_select):
+        switch_select.return_value = [
                     {'userid': 'FAKE_ID', 'interface': '1003',
                      'switch': None, 'port': None, 'comments': None},
                     {'userid': 'FAKE_ID', 'interface': '2003',
                      'switch': None, 'port': None, 'comments': None}]
         result = self._smtclient._get_available_vdev('fake_id', vdev=None)
-        switch_select_table.assert_called_with()
+        switch_select.assert_called_with('FAKE_ID')
         self.assertEqual(result, '2006')
 
-    @mock.patch.object(database.NetworkDbOperator, 'switch_select_table')
-    def test_get_available_vdev_with_used_vdev(self, switch_select_table):
-        switch_select_table.return_value = [
+    @mock.patch.object(database.NetworkDbOperator,
+                       'switch_select_record_for_userid')
+    def test_get_available_vdev_with_used_vdev(self, switch_select):
+        switch_select.return_value = [
                     {'userid': 'FAKE_ID', 'interface': '1003',
                      'switch': None, 'port': None, 'comments': None},
                     {'userid': 'FAKE_ID', 'interface': '1006',
@@ -1833,9 +1965,115 @@ class SDKSMTClientTestCases(base.SDKTestCase):
     def test_get_user_direct(self, req):
         req.return_value = {'response': 'OK'}
         resp = self._smtclient.get_user_direct('user1')
-        req.assert_called_once_with('getvm user1 directory')
+        req.assert_called_once_with(
+            ReqHandle.SMTRequest('getvm', 'directory', 'user1'))
         self.assertEqual(resp, 'OK')
 
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_user_direct_cached(self, req):
+        req.return_value = {'response': ['USER USER1 LBYONLY 1G 2G G',
+                                         'CPU 00 BASE']}
+        self._smtclient.get_user_direct('user1')
+        resp = self._smtclient.get_user_direct('USER1')
+        req.assert_called_once_with(
+            ReqHandle.SMTRequest('getvm', 'directory', 'user1'))
+        self.assertEqual(resp, ['USER USER1 LBYONLY 1G 2G G',
+                                'CPU 00 BASE'])
+
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_user_direct_uncached(self, req):
+        req.return_value = {'response': ['CPU 00 BASE']}
+        self._smtclient.get_user_direct('user1')
+        req.return_value = {'response': ['CPU 00 BASE', 'CPU 01']}
+        resp = self._smtclient.get_user_direct('user1', cached=False)
+        self.assertEqual(req.call_count, 2)
+        self.assertEqual(resp, ['CPU 00 BASE', 'CPU 01'])
+        # the fresh read refreshes the cache
+        resp = self._smtclient.get_user_direct('user1')
+        self.assertEqual(req.call_count, 2)
+        self.assertEqual(resp, ['CPU 00 BASE', 'CPU 01'])
+
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_user_direct_cache_disabled(self, req):
+        base.set_conf('guest', 'user_direct_cache_interval', 0)
+        req.return_value = {'response': ['CPU 00 BASE']}
+        self._smtclient.get_user_direct('user1')
+        self._smtclient.get_user_direct('user1')
+        self.assertEqual(req.call_count, 2)
+        base.set_conf('guest', 'user_direct_cache_interval', 60)
+
+    @mock.patch.object(smt.SMT, 'request')
+    def test_get_user_direct_invalidated_by_change(self, smt_req):
+        smt_req.return_value = {'overallRC': 0,
+                                'response': ['CPU 00 BASE']}
+        self._smtclient.get_user_direct('user1')
+        # not changing the directory, the cache is kept
+        self._smtclient._request('changevm USER1 punchfile /tmp/f')
+        self._smtclient.get_user_direct('user1')
+        self.assertEqual(smt_req.call_count, 2)
+        self._smtclient._request('changevm USER1 add3390 POOL1 0101 1g')
+        self._smtclient.get_user_direct('user1')
+        self._smtclient._request('SMAPI USER1 API '
+                                 'Image_Definition_Update_DM --operands')
+        self._smtclient.get_user_direct('user1')
+        self.assertEqual(smt_req.call_count, 6)
+
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_user_direct_changed_while_reading(self, req):
+        def _getvm(rd):
+            self._smtclient._user_direct_cache.invalidate('user1')
+            return {'response': ['CPU 00 BASE']}
+        req.side_effect = _getvm
+        self._smtclient.get_user_direct('user1')
+        self.assertIsNone(self._smtclient._user_direct_cache.get('user1'))
+
+    def test_parse_user_direct(self):
+        user_direct = ['USER USER1 LBYONLY 1G 4G G',
+                       'COMMAND DEF STOR RESERVED 2048M',
+                       'CPU 00 BASE',
+                       'CPU 0A',
+                       'MACHINE ESA 32',
+                       'NICDEF 1000 TYPE QDIO LAN SYSTEM VSW1 MACID 0A0B0C',
+                       'NICDEF 2000 TYPE QDIO LAN SYSTEM VSW2 VLAN 100',
+                       'MDISK 0100 3390 0001 3338 VOL01 MR',
+                       'LOADDEV PORTNAME 5005076802400c1b',
+                       'LOADDEV LUN 0000000000000000']
+        info = smtclient.parse_user_direct(user_direct)
+        self.assertEqual(info['USER']['privilege'], 'G')
+        self.assertEqual(info['STORAGE'], {'defined': '1G', 'max': '4G',
+                                           'reserved': '2048M'})
+        self.assertEqual(info['MACHINE'], {'mode': 'ESA', 'max_cpus': 32})
+        self.assertEqual(info['CPU'], ['00', '0A'])
+        self.assertEqual(list(info['NICDEF'].keys()), ['1000', '2000'])
+        self.assertEqual(info['NICDEF']['1000'],
+                         {'type': 'QDIO', 'vswitch': 'VSW1',
+                          'mac': '0A0B0C'})
+        self.assertEqual(info['NICDEF']['2000']['vid'], '100')
+        self.assertEqual(info['MDISK']['0100'],
+                         {'type': '3390', 'start': '0001', 'size': '3338',
+                          'volume': 'VOL01', 'mode': 'MR'})
+        self.assertEqual(info['LOADDEV'],
+                         {'PORTNAME': '5005076802400c1b',
+                          'LUN': '0000000000000000'})
+        info = smtclient.parse_user_direct(
+            ['LOADDEV PORT 5005076802400c1b'])
+        self.assertEqual(info['LOADDEV'], {'PORTNAME': '5005076802400c1b'})
+
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_prefetch_user_direct(self, req):
+        def _getvm(rd):
+            if rd.userid == 'USER2':
+                raise exception.SDKSMTRequestFailed({'rc': 4, 'rs': 0},
+                                                    'failed')
+            return {'response': ['CPU 00 BASE']}
+        req.side_effect = _getvm
+        failed = self._smtclient.prefetch_user_direct(['user1', 'USER2',
+                                                       'USER1'])
+        self.assertEqual(list(failed.keys()), ['USER2'])
+        self.assertEqual(req.call_count, 2)
+        self._smtclient.get_user_direct_info('user1')
+        self.assertEqual(req.call_count, 2)
+
     @mock.patch.object(database.NetworkDbOperator,
                        'switch_delete_record_for_nic')
     @mock.patch.object(smtclient.SMTClient, '_request')
@@ -1887,6 +2125,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                                                "1000",
                                                "VS1",
                                                active=True)
+        get_user.assert_called_once_with("fake_userid", cached=False)
         lock.assert_called_with("fake_userid")
         replace.assert_called_with("fake_userid", replace_data)
         couple_nic.assert_called_with("fake_userid",
@@ -2038,10 +2277,20 @@ class SDKSMTClientTestCases(base.SDKTestCase):
 
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_execute_cmd(self, request):
-        rd = 'cmdVM fuser1 CMD \'ls\''
+        rd = ReqHandle.SMTRequest('cmdVM', 'CMD', 'fuser1', {'cmd': 'ls'})
         self._smtclient.execute_cmd('fuser1', 'ls')
         request.assert_called_once_with(rd)
 
+    def test_execute_cmd_direct_timeout(self):
+        rd = ReqHandle.SMTRequest('cmdVM', 'CMD', 'fuser1',
+                                  {'cmd': 'ls', 'timeout': 30})
+        with mock.patch.object(self._smtclient._smt, 'request') as request:
+            request.return_value = {'overallRC': 0}
+            ret = self._smtclient.execute_cmd_direct('fuser1', 'ls',
+                                                     timeout=30)
+        request.assert_called_once_with(rd)
+        self.assertEqual({'overallRC': 0}, ret)
+
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_delete_userid_not_exist(self, request):
         rd = 'deletevm fuser1 directory'
@@ -2079,6 +2328,135 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                           self._smtclient.delete_userid, 'fuser1')
         request.assert_called_once_with(rd)
 
+    @mock.patch.object(smtclient.SMTClient, 'get_guest_temp_path')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_reader_batch_punch(self, request, temp_path):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        temp_path.return_value = os.path.join(work_dir, 'tmp')
+        os.mkdir(temp_path.return_value)
+        script = os.path.join(work_dir, 'setupDisk')
+        with open(script, 'w') as f:
+            f.write('echo setup')
+
+        punched = {}
+
+        def _request(rd):
+            fn = rd.split()[3]
+            with tarfile.open(fn) as tar:
+                for member in tar.getmembers():
+                    if member.isfile():
+                        punched[member.name] = tar.extractfile(
+                            member).read().decode()
+
+        request.side_effect = _request
+        batch = self._smtclient.reader_batch('fuser1')
+        batch.add_aemod(script, "'action=addMdisk vaddr=0101'")
+        batch.add_aemod(script, "'action=addMdisk vaddr=0102'")
+        self.assertEqual(2, len(batch))
+        batch.punch()
+
+        # one punch for all the parts
+        request.assert_called_once_with(
+            'changevm fuser1 punchfile %s/batch.doscript --class X' %
+            temp_path.return_value)
+        self.assertFalse(os.path.exists(temp_path.return_value))
+        self.assertEqual('echo setup', punched['part0001/setupDisk'])
+        # the same invokeScript.sh as changevm aemod generates
+        self.assertEqual("#!/bin/bash \n"
+                         "/bin/bash setupDisk action=addMdisk vaddr=0101 \n",
+                         punched['part0000/invokeScript.sh'])
+        self.assertEqual("#!/bin/bash \n"
+                         "/bin/bash setupDisk action=addMdisk vaddr=0102 \n",
+                         punched['part0001/invokeScript.sh'])
+        self.assertEqual(['#!/bin/bash',
+                          '(cd part0000 && /bin/bash invokeScript.sh)',
+                          '(cd part0001 && /bin/bash invokeScript.sh)',
+                          'rm -rf part0000 part0001'],
+                         punched['invokeScript.sh'].splitlines())
+        # nothing is left to punch
+        batch.punch()
+        self.assertEqual(1, request.call_count)
+
+    @mock.patch.object(smtclient.SMTClient, 'get_power_state')
+    @mock.patch.object(smtclient.ReaderBatch, 'punch')
+    @mock.patch.object(smtclient.ReaderBatch, 'add_aemod')
+    def test_process_additional_minidisks(self, add_aemod, punch,
+                                          power_state):
+        power_state.return_value = 'off'
+        self._smtclient.process_additional_minidisks(
+            'fuser1', [{'vdev': '0101', 'format': 'ext3'},
+                       {'vdev': '0102', 'format': 'swap'}])
+        add_aemod.assert_any_call('/var/lib/zvmsdk/setupDisk',
+                                  "'action=addMdisk vaddr=0101 "
+                                  "filesys=ext3 mntdir=/mnt/ephemeral0101'")
+        add_aemod.assert_any_call('/var/lib/zvmsdk/setupDisk',
+                                  "'action=addMdisk vaddr=0102 "
+                                  "filesys=swap mntdir=swap'")
+        punch.assert_called_once_with()
+
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_live_migrate_move_parms(self, request):
+        self._smtclient.live_migrate_move('fuser1', 'SSI2',
+                                          {'maxtotal': 100,
+                                           'maxquiesce': 10,
+                                           'immediate': 'yes'})
+        rd = request.call_args[0][0]
+        self.assertEqual(['migratevm', 'fuser1', 'move', '--destination',
+                          'SSI2', '--maxtotal', '100', '--maxquiesce', '10',
+                          '--immediate'], rd.split())
+
+    @mock.patch.object(zvmutils, 'get_smt_userid')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_live_migrate_status(self, request, smt_userid):
+        smt_userid.return_value = 'SMTUSER'
+        request.return_value = {'response': ['USER1 relocating']}
+        self.assertEqual(['USER1 relocating'],
+                         self._smtclient.live_migrate_status())
+        request.assert_called_once_with('migratevm SMTUSER status --outgoing')
+        request.side_effect = exception.SDKSMTRequestFailed(
+            {'overallRC': 99, 'rc': 99, 'rs': 419}, 'not in progress')
+        self.assertEqual([], self._smtclient.live_migrate_status('USER1'))
+        request.assert_called_with('migratevm USER1 status')
+
+    @mock.patch.object(database.GuestDbOperator, 'delete_guests_by_userid')
+    @mock.patch.object(database.NetworkDbOperator,
+                       'switch_delete_record_for_userids')
+    @mock.patch.object(zvmutils.PathUtils, 'remove_guest_path')
+    @mock.patch.object(smtclient.SMTClient, '_revoke_deleted_vm')
+    @mock.patch.object(smtclient.SMTClient, 'delete_userid')
+    @mock.patch.object(smtclient.SMTClient, 'guest_stop')
+    @mock.patch.object(zvmutils, 'get_logged_on_users')
+    def test_delete_vms(self, logged_on, guest_stop, delete_userid, revoke,
+                        remove_path, delete_switch, delete_guests):
+        logged_on.return_value = set(['USER1', 'USER2'])
+        guest_stop.side_effect = exception.SDKSMTRequestFailed(
+            {'rc': 200, 'rs': 8, 'overallRC': 8}, 'fake stop error')
+
+        def _delete_userid(userid):
+            if userid == 'USER3':
+                raise exception.SDKSMTRequestFailed(
+                    {'rc': 400, 'rs': 104, 'overallRC': 8}, 'fake error')
+
+        delete_userid.side_effect = _delete_userid
+        base.set_conf('guest', 'max_concurrent_guest_delete', 2)
+        try:
+            results = self._smtclient.delete_vms(['USER1', 'USER2', 'USER3'])
+        finally:
+            base.set_conf('guest', 'max_concurrent_guest_delete', 8)
+        self.assertEqual(2, guest_stop.call_count)
+        self.assertEqual(3, delete_userid.call_count)
+        self.assertEqual(2, revoke.call_count)
+        delete_switch.assert_called_once_with(['USER1', 'USER2'])
+        delete_guests.assert_called_once_with(['USER1', 'USER2'])
+        self.assertEqual(2, remove_path.call_count)
+        # the failed force off does not fail the delete
+        self.assertIsNone(results[0][0])
+        self.assertEqual(['database', 'directory', 'logoff', 'revoke'],
+                         sorted(results[0][1]))
+        self.assertIsInstance(results[2][0], exception.SDKSMTRequestFailed)
+        self.assertEqual(['directory'], list(results[2][1]))
+
     @mock.patch.object(subprocess, 'check_output')
     def test_get_disk_size_units_rhcos(self, check):
         image_path = 'test_path'
@@ -2242,35 +2620,41 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                   self._smtclient.image_import,
                   image_name, url, image_meta)
 
-    @mock.patch.object(smtclient.SMTClient, '_get_image_last_access_time')
+    @mock.patch.object(os.path, 'getatime')
     @mock.patch.object(database.ImageDbOperator, 'image_query_record')
     def test_image_query(self, image_query, access_time):
         image_name = "testimage"
         fake_access_time = 1581910539.3330014
         access_time.return_value = fake_access_time
-        image_query.return_value = [{'imagename': 'testimage'}]
+        image_query.return_value = [{'imagename': 'testimage',
+                                     'imageosdistro': 'rhel7',
+                                     'disk_size_units': '3339:CYL'}]
         image_info = self._smtclient.image_query(image_name)
-        image_query.assert_called_once_with(image_name)
+        image_query.assert_called_once_with()
+        access_time.assert_called_once_with(
+            '/tmp//netboot/rhel7/testimage/0100')
         self.assertEqual(image_info[0]['last_access_time'],
                          fake_access_time)
+        # The second query is served from image catalog
+        self._smtclient.image_query(image_name)
+        image_query.assert_called_once_with()
+        access_time.assert_called_once_with(
+            '/tmp//netboot/rhel7/testimage/0100')
 
-    @mock.patch.object(smtclient.SMTClient, '_get_image_last_access_time')
     @mock.patch.object(database.ImageDbOperator, 'image_query_record')
-    def test_image_query_image_not_exist(self, image_query, access_time):
+    def test_image_query_image_not_exist(self, image_query):
         image_name = "testimage"
-        fake_access_time = 1581910539.3330014
-        access_time.return_value = fake_access_time
         image_query.return_value = None
-        image_info = self._smtclient.image_query(image_name)
-        self.assertEqual(image_info, [])
+        self.assertRaises(exception.SDKObjectNotExistError,
+                          self._smtclient.image_query, image_name)
+        self.assertEqual(self._smtclient.image_query(), [])
 
-    @mock.patch.object(smtclient.SMTClient, '_get_image_last_access_time')
+    @mock.patch.object(os.path, 'getatime')
     @mock.patch.object(database.ImageDbOperator, 'image_query_record')
     def test_image_query_none_imagename(self, image_query, access_time):
         image_name = None
         fake_access_time = 1581910539.3330014
         image_query.return_value = [{u'image_size_in_bytes': u'719045489',
-                                     u'last_access_time': 1581910539.3330014,
                                      u'disk_size_units': u'3339:CYL',
                                      u'md5sum': u'157e2a2c3be1d49ef6e69324',
                                      u'comments': None,
@@ -2279,9 +2663,108 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                                      u'type': u'rootonly'}]
         access_time.return_value = fake_access_time
         image_info = self._smtclient.image_query(image_name)
-        image_query.assert_called_once_with(image_name)
+        image_query.assert_called_once_with()
         self.assertEqual(image_info[0]['last_access_time'],
                          fake_access_time)
+        self.assertEqual(image_info[0]['md5sum'],
+                         u'157e2a2c3be1d49ef6e69324')
+
+    @mock.patch.object(os.path, 'getatime')
+    @mock.patch.object(database.ImageDbOperator, 'image_query_record')
+    def test_image_query_by_os_distro(self, image_query, access_time):
+        access_time.return_value = 1581910539.3330014
+        image_query.return_value = [{'imagename': 'img1',
+                                     'imageosdistro': 'rhel7',
+                                     'disk_size_units': '3339:CYL'},
+                                    {'imagename': 'img2',
+                                     'imageosdistro': 'sles12',
+                                     'disk_size_units': '3339:CYL'},
+                                    {'imagename': 'img3',
+                                     'imageosdistro': 'rhel7',
+                                     'disk_size_units': '3339:CYL'}]
+        image_info = self._smtclient.image_query(os_distro='RHEL7')
+        self.assertEqual(sorted([i['imagename'] for i in image_info]),
+                         ['img1', 'img3'])
+        self.assertEqual(self._smtclient.image_query(os_distro='ubuntu16'),
+                         [])
+        self.assertEqual(len(self._smtclient.image_query()), 3)
+        image_query.assert_called_once_with()
+
+    @mock.patch.object(os.path, 'getatime')
+    @mock.patch.object(database.ImageDbOperator, 'image_query_record')
+    def test_image_query_paged(self, image_query, access_time):
+        access_time.return_value = 1581910539.3330014
+        image_query.return_value = [{'imagename': name,
+                                     'imageosdistro': 'rhel7',
+                                     'disk_size_units': '3339:CYL'}
+                                    for name in ('img3', 'img1', 'img2')]
+        image_info = self._smtclient.image_query(limit=2)
+        self.assertEqual(['img1', 'img2'],
+                         [i['imagename'] for i in image_info])
+        image_info = self._smtclient.image_query(os_distro='rhel7',
+                                                 marker='img1')
+        self.assertEqual(['img2', 'img3'],
+                         [i['imagename'] for i in image_info])
+
+    @mock.patch.object(os.path, 'getatime')
+    @mock.patch.object(database.ImageDbOperator, 'image_query_record')
+    def test_image_query_name_case_sensitive(self, image_query, access_time):
+        access_time.return_value = 1581910539.3330014
+        image_query.return_value = [{'imagename': name,
+                                     'imageosdistro': 'rhel7',
+                                     'disk_size_units': size}
+                                    for name, size in (('img1', '3339:CYL'),
+                                                       ('IMG1', '1000:CYL'))]
+        self.assertEqual(2, len(self._smtclient.image_query()))
+        self.assertEqual('3339',
+                         self._smtclient.image_get_root_disk_size('img1'))
+        self.assertEqual('1000',
+                         self._smtclient.image_get_root_disk_size('IMG1'))
+        self.assertRaises(exception.SDKObjectNotExistError,
+                          self._smtclient.image_query, 'Img1')
+
+    @mock.patch.object(os.path, 'getatime')
+    @mock.patch.object(database.ImageDbOperator, 'image_query_record')
+    def test_image_catalog_invalidate(self, image_query, access_time):
+        access_time.return_value = 1581910539.3330014
+        image_query.return_value = [{'imagename': 'img1',
+                                     'imageosdistro': 'rhel7',
+                                     'disk_size_units': '3339:CYL'}]
+        self.assertEqual(self._smtclient.image_get_root_disk_size('img1'),
+                         '3339')
+        self.assertEqual(self._smtclient._get_image_path_by_name('img1'),
+                         '/tmp//netboot/rhel7/img1')
+        self.assertEqual(image_query.call_count, 1)
+        self._smtclient._image_catalog.invalidate()
+        self._smtclient.image_query('img1')
+        self.assertEqual(image_query.call_count, 2)
+
+    @mock.patch.object(smtclient.ImageCatalog, '_get_repository_stamp')
+    @mock.patch.object(os.path, 'getatime')
+    @mock.patch.object(database.ImageDbOperator, 'image_query_record')
+    def test_image_catalog_repository_changed(self, image_query,
+                                              access_time, get_stamp):
+        access_time.return_value = 1581910539.3330014
+        get_stamp.return_value = (('', 1.0),)
+        image_query.return_value = [{'imagename': 'img1',
+                                     'imageosdistro': 'rhel7',
+                                     'disk_size_units': '3339:CYL'}]
+        self._smtclient.image_query()
+        self._smtclient.image_query()
+        self.assertEqual(image_query.call_count, 1)
+        get_stamp.return_value = (('', 1.0), ('rhel7', 2.0))
+        self._smtclient.image_query()
+        self.assertEqual(image_query.call_count, 2)
+
+    @mock.patch.object(database.ImageDbOperator, 'image_query_record')
+    def test_get_image_path_by_name_not_exist(self, image_query):
+        image_query.return_value = []
+        self.assertEqual(self._smtclient.image_query(), [])
+        self.assertRaises(exception.SDKImageOperationError,
+                          self._smtclient._get_image_path_by_name,
+                          'img1')
+        # A miss reloads the catalog once before reporting not exist
+        self.assertEqual(image_query.call_count, 2)
 
     @mock.patch.object(database.ImageDbOperator, 'image_delete_record')
     @mock.patch.object(smtclient.SMTClient, '_delete_image_file')
@@ -2339,8 +2822,10 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                           self._smtclient._generate_increasing_nic_id,
                           'FFFF')
 
+    @mock.patch.object(smtclient.SMTClient, 'get_power_state')
     @mock.patch.object(smtclient.SMTClient, '_add_mdisk')
-    def test_add_mdisks(self, add_mdisk):
+    def test_add_mdisks(self, add_mdisk, power_state):
+        power_state.return_value = 'on'
         userid = 'fakeuser'
         disk_list = [{'size': '1g',
                       'is_boot_disk': True,
@@ -2349,8 +2834,10 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                       'disk_pool': 'FBA:fbapool1',
                       'format': 'ext3'}]
         self._smtclient.add_mdisks(userid, disk_list)
-        add_mdisk.assert_any_call(userid, disk_list[0], '0100')
-        add_mdisk.assert_any_call(userid, disk_list[1], '0101')
+        add_mdisk.assert_any_call(userid, disk_list[0], '0100',
+                                    with_filesystem=True)
+        add_mdisk.assert_any_call(userid, disk_list[1], '0101',
+                                    with_filesystem=True)
 
     def test_add_mdisks_no_disk_pool(self):
         disk_list = [{'size': '1g',
@@ -2361,8 +2848,10 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         self.assertRaises(exception.SDKGuestOperationError,
                           self._smtclient.add_mdisks, 'fakeuser', disk_list)
 
+    @mock.patch.object(smtclient.SMTClient, 'get_power_state')
     @mock.patch.object(smtclient.SMTClient, '_add_mdisk')
-    def test_add_mdisks_with_1dev(self, add_mdisk):
+    def test_add_mdisks_with_1dev(self, add_mdisk, power_state):
+        power_state.return_value = 'on'
         userid = 'fakeuser'
         disk_list = [{'size': '1g',
                       'is_boot_disk': True,
@@ -2372,11 +2861,15 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                       'format': 'ext3',
                       'vdev': '0200'}]
         self._smtclient.add_mdisks(userid, disk_list)
-        add_mdisk.assert_any_call(userid, disk_list[0], '0100')
-        add_mdisk.assert_any_call(userid, disk_list[1], '0200')
+        add_mdisk.assert_any_call(userid, disk_list[0], '0100',
+                                    with_filesystem=True)
+        add_mdisk.assert_any_call(userid, disk_list[1], '0200',
+                                    with_filesystem=True)
 
+    @mock.patch.object(smtclient.SMTClient, 'get_power_state')
     @mock.patch.object(smtclient.SMTClient, '_add_mdisk')
-    def test_add_mdisks_with_2dev(self, add_mdisk):
+    def test_add_mdisks_with_2dev(self, add_mdisk, power_state):
+        power_state.return_value = 'on'
         userid = 'fakeuser'
         disk_list = [{'size': '1g',
                       'is_boot_disk': True,
@@ -2387,8 +2880,90 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                       'format': 'ext3',
                       'vdev': '0300'}]
         self._smtclient.add_mdisks(userid, disk_list)
-        add_mdisk.assert_any_call(userid, disk_list[0], '0200')
-        add_mdisk.assert_any_call(userid, disk_list[1], '0300')
+        add_mdisk.assert_any_call(userid, disk_list[0], '0200',
+                                    with_filesystem=True)
+        add_mdisk.assert_any_call(userid, disk_list[1], '0300',
+                                    with_filesystem=True)
+
+    @mock.patch.object(smtclient.SMTClient, 'get_power_state')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_add_mdisks_parallel_format(self, request, power_state):
+        userid = 'fakeuser'
+        power_state.return_value = 'off'
+        disk_list = [{'size': '1g',
+                      'is_boot_disk': True,
+                      'disk_pool': 'ECKD:eckdpool1',
+                      'format': 'none'},
+                     {'size': '200000',
+                      'disk_pool': 'FBA:fbapool1',
+                      'format': 'ext3'},
+                     {'size': '2g',
+                      'disk_pool': 'ECKD:eckdpool1',
+                      'format': 'xfs'}]
+        self._smtclient.add_mdisks(userid, disk_list)
+        add_calls = [
+            mock.call('changevm fakeuser add3390 eckdpool1 0100 1g '
+                      '--mode MR'),
+            mock.call('changevm fakeuser add9336 fbapool1 0101 200000 '
+                      '--mode MR'),
+            mock.call('changevm fakeuser add3390 eckdpool1 0102 2g '
+                      '--mode MR')]
+        self.assertEqual(request.call_args_list[:3], add_calls)
+        request.assert_any_call('changevm fakeuser formatdisk 0101 9336 '
+                                'ext3 --mode MR')
+        request.assert_any_call('changevm fakeuser formatdisk 0102 3390 '
+                                'xfs --mode MR')
+        self.assertEqual(request.call_count, 5)
+        self.assertEqual(disk_list[1]['size'], '97.7M')
+
+    @mock.patch.object(smtclient.SMTClient, '_remove_mdisk')
+    @mock.patch.object(smtclient.SMTClient, '_format_mdisk')
+    @mock.patch.object(smtclient.SMTClient, '_add_mdisk')
+    @mock.patch.object(smtclient.SMTClient, 'get_power_state')
+    def test_add_mdisks_format_failed_rollback(self, power_state, add_mdisk,
+                                               format_mdisk, remove_mdisk):
+        userid = 'fakeuser'
+        power_state.return_value = 'off'
+        disk_list = [{'size': '1g',
+                      'disk_pool': 'ECKD:eckdpool1',
+                      'format': 'ext4'},
+                     {'size': '1g',
+                      'disk_pool': 'ECKD:eckdpool1',
+                      'format': 'ext4'}]
+        results = {'overallRC': 1, 'rc': 1, 'rs': 1, 'errno': 0,
+                   'strError': '', 'response': ['fake error']}
+
+        def fake_format(userid, disk):
+            if disk['vdev'] == '0101':
+                raise exception.SDKSMTRequestFailed(results, 'fake error')
+
+        format_mdisk.side_effect = fake_format
+        self.assertRaises(exception.SDKSMTRequestFailed,
+                          self._smtclient.add_mdisks, userid, disk_list)
+        self.assertEqual(format_mdisk.call_count, 2)
+        remove_mdisk.assert_has_calls([mock.call(userid, '0100'),
+                                       mock.call(userid, '0101')])
+
+    @mock.patch.object(smtclient.SMTClient, '_remove_mdisk')
+    @mock.patch.object(smtclient.SMTClient, '_format_mdisk')
+    @mock.patch.object(smtclient.SMTClient, '_add_mdisk')
+    @mock.patch.object(smtclient.SMTClient, 'get_power_state')
+    def test_add_mdisks_add_failed_rollback(self, power_state, add_mdisk,
+                                            format_mdisk, remove_mdisk):
+        userid = 'fakeuser'
+        power_state.return_value = 'off'
+        disk_list = [{'size': '1g', 'disk_pool': 'ECKD:eckdpool1'},
+                     {'size': '1g', 'disk_pool': 'ECKD:eckdpool1'},
+                     {'size': '1g', 'disk_pool': 'ECKD:eckdpool1'}]
+        results = {'overallRC': 1, 'rc': 1, 'rs': 1, 'errno': 0,
+                   'strError': '', 'response': ['fake error']}
+        add_mdisk.side_effect = [
+            None, exception.SDKSMTRequestFailed(results, 'fake error')]
+        self.assertRaises(exception.SDKSMTRequestFailed,
+                          self._smtclient.add_mdisks, userid, disk_list)
+        self.assertEqual(add_mdisk.call_count, 2)
+        format_mdisk.assert_not_called()
+        remove_mdisk.assert_called_once_with(userid, '0100')
 
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_dedicate_device(self, request):
@@ -2456,11 +3031,66 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         execu.side_effect = [(0, 'first line\n'), (0, 'second line\n')]
 
         cons_log = self._smtclient.get_user_console_output('fakeuser')
-        req.assert_called_once_with('getvm fakeuser consoleoutput')
+        req.assert_called_once_with(
+            ReqHandle.SMTRequest('getvm', 'consoleoutput', 'fakeuser'))
         execu.assert_any_call('sudo /usr/sbin/vmur re -t -O 0001')
         execu.assert_any_call('sudo /usr/sbin/vmur re -t -O 0002')
         self.assertEqual(cons_log, 'first line\nsecond line\n')
 
+    @mock.patch.object(zvmutils, 'execute')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_users_console_output(self, req, execu):
+        def _request(rd):
+            if rd.userid == 'USER3':
+                raise exception.SDKSMTRequestFailed({}, 'not logged on')
+            if rd.function == 'GETVM':
+                prefix = 'List of spool files containing console logs from'
+                return self._generate_results(response=[
+                    '%s USER1: 0001 0003' % prefix,
+                    '%s USER2: 0002 0005' % prefix,
+                    '%s USER4: ' % prefix])
+            return self._generate_results()
+
+        req.side_effect = _request
+        execu.side_effect = [(0, 'first\n'), (0, 'second\n'),
+                             (0, 'other\n'), (1, 'vmur: file not found')]
+
+        outputs = self._smtclient.get_users_console_output(
+            ['USER1', 'USER2', 'USER3', 'USER4'])
+        req.assert_any_call(ReqHandle.SMTRequest(
+            'smapi', 'api', 'USER1', {'apiName': 'Image_Console_Get'}))
+        # one request lists the spool files of all the transferred guests
+        req.assert_any_call(ReqHandle.SMTRequest(
+            'getvm', 'consoleoutput', 'USER1',
+            {'noTransfer': True, 'userids': 'USER1,USER2,USER4'}))
+        self.assertEqual(('first\nsecond\n', None), outputs['USER1'])
+        # the output received before the failure is kept
+        self.assertEqual('other\n', outputs['USER2'][0])
+        self.assertIn('0005', str(outputs['USER2'][1]))
+        self.assertEqual('', outputs['USER3'][0])
+        self.assertIsInstance(outputs['USER3'][1],
+                              exception.SDKSMTRequestFailed)
+        self.assertEqual(('', None), outputs['USER4'])
+        self.assertEqual(['sudo /usr/sbin/vmur re -t -O 0001',
+                          'sudo /usr/sbin/vmur re -t -O 0003',
+                          'sudo /usr/sbin/vmur re -t -O 0002',
+                          'sudo /usr/sbin/vmur re -t -O 0005'],
+                         [c[0][0] for c in execu.call_args_list])
+
+    @mock.patch.object(zvmutils, 'execute')
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_users_console_output_list_failed(self, req, execu):
+        def _request(rd):
+            if rd.function == 'GETVM':
+                raise exception.SDKSMTRequestFailed(
+                    {}, 'Reader not online')
+            return self._generate_results()
+
+        req.side_effect = _request
+        outputs = self._smtclient.get_users_console_output(['USER1'])
+        self.assertIn('Reader not online', str(outputs['USER1'][1]))
+        execu.assert_not_called()
+
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_get_user_console_output_request_failed(self, req):
         req.side_effect = exception.SDKSMTRequestFailed({}, 'err')
@@ -2485,13 +3115,40 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         req.return_value = result
 
         is_reachable = self._smtclient.get_guest_connection_status('testuid')
+        req.assert_called_once_with(
+            ReqHandle.SMTRequest('getvm', 'isreachable', 'testuid'))
         self.assertTrue(is_reachable)
 
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    def test_get_guest_connection_status_uncached(self, req):
+        req.return_value = self._generate_results(
+            rs=0, response=['testuid: unreachable'])
+
+        is_reachable = self._smtclient.get_guest_connection_status(
+            'testuid', cached=False)
+        req.assert_called_once_with(
+            ReqHandle.SMTRequest('getvm', 'isreachable', 'testuid',
+                                 {'noCache': True}))
+        self.assertFalse(is_reachable)
+
+    def test_get_iucv_session_health(self):
+        self.addCleanup(vmUtils.resetIUCVSession, 'testuid')
+        health = self._smtclient.get_iucv_session_health('testuid')
+        self.assertEqual({'userid': 'TESTUID', 'commands': 0, 'pending': 0,
+                          'failures': 0, 'last_reply': 0,
+                          'last_failure': 0}, health)
+        session = vmUtils.getIUCVSession('testuid')
+        session.commands = 2
+        session.lastReply = 100.0
+        health = self._smtclient.get_iucv_session_health('TESTUID')
+        self.assertEqual(2, health['commands'])
+        self.assertEqual(100.0, health['last_reply'])
+
     @mock.patch.object(database.NetworkDbOperator, 'switch_select_record')
     def test_get_nic_info(self, select):
         self._smtclient.get_nic_info(userid='testid', nic_id='fake_nic')
         select.assert_called_with(userid='testid', nic_id='fake_nic',
-                                  vswitch=None)
+                                  vswitch=None, limit=None, marker=None)
 
     @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
     def test_guest_capture_get_capture_devices_rh7(self, execcmd):
@@ -2649,7 +3306,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
 
         self._smtclient.guest_capture(userid, image_name)
 
-        guest_connection_status.assert_called_with(userid)
+        guest_connection_status.assert_called_with(userid, cached=False)
         execcmd.assert_not_called()
         get_os_version.assert_not_called()
         get_capture_devices.assert_not_called()
@@ -2725,7 +3382,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         get_os_mock.return_value = 'UNKNOWN'
         self._smtclient.guest_capture(userid, image_name)
 
-        guest_connection_status.assert_called_with(userid)
+        guest_connection_status.assert_called_with(userid, cached=False)
         execcmd.assert_not_called()
         get_os_version.assert_not_called()
         get_capture_devices.assert_not_called()
@@ -2807,7 +3464,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         get_os_mock.return_value = 'RHEL8.3'
         self._smtclient.guest_capture(userid, image_name)
 
-        guest_connection_status.assert_called_with(userid)
+        guest_connection_status.assert_called_with(userid, cached=False)
         execcmd.assert_not_called()
         get_os_version.assert_not_called()
         get_capture_devices.assert_not_called()
@@ -2895,7 +3552,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         get_os_mock.return_value = 'UNKNOWN'
         self._smtclient.guest_capture(userid, image_name)
 
-        guest_connection_status.assert_called_with(userid)
+        guest_connection_status.assert_called_with(userid, cached=False)
         execcmd.assert_not_called()
         get_os_version.assert_not_called()
         get_capture_devices.assert_not_called()
@@ -2981,7 +3638,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         self._smtclient.guest_capture(userid,
                                       image_name,
                                       capture_device_assign='0100')
-        guest_connection_status.assert_called_with(userid)
+        guest_connection_status.assert_called_with(userid, cached=False)
         execcmd.assert_not_called()
         get_os_version.assert_not_called()
         get_capture_devices.assert_not_called()
@@ -3052,7 +3709,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         guest_connection_status.return_value = True
         self._smtclient.guest_capture(userid, image_name)
 
-        guest_connection_status.assert_called_with(userid)
+        guest_connection_status.assert_called_with(userid, cached=False)
         execcmd.assert_called_once_with(userid, 'pwd')
         get_os_version.assert_called_once_with(userid)
         get_capture_devices.assert_called_once_with(userid, 'rootonly')
@@ -3092,7 +3749,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         self.assertRaises(exception.SDKGuestOperationError,
                           self._smtclient.guest_capture, userid,
                           image_name)
-        guest_connection_status.assert_called_with(userid)
+        guest_connection_status.assert_called_with(userid, cached=False)
         execcmd.assert_called_once_with(userid, 'pwd')
         get_os_version.assert_not_called()
         get_os_mock.assert_not_called()
@@ -3139,6 +3796,89 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         self.assertRaises(exception.SDKSMTRequestFailed,
                           self._smtclient.query_vswitch, 'testvs')
 
+    @mock.patch.object(smtclient.SMTClient, '_query_vswitch')
+    def test_query_vswitch_cached(self, query):
+        query.side_effect = lambda name: {'switch_name': name}
+        self.assertEqual({'switch_name': 'VSW1'},
+                         self._smtclient.query_vswitch('VSW1'))
+        self._smtclient.query_vswitch('vsw1')['switch_name'] = 'changed'
+        self._smtclient.query_vswitch('VSW2')
+        self.assertEqual({'switch_name': 'VSW1'},
+                         self._smtclient.query_vswitch('VSW1'))
+        self.assertEqual(2, query.call_count)
+
+        # only the vswitch changed is queried again
+        self._smtclient._invalidate_vswitch_cache(
+            'SMAPI SMTUSER API Virtual_Network_Vswitch_Set_Extended '
+            '--operands -k grant_userid=USER1 -k switch_name=vsw1 '
+            '-k persist=YES')
+        self._smtclient.query_vswitch('VSW1')
+        self._smtclient.query_vswitch('VSW2')
+        self.assertEqual(3, query.call_count)
+
+        self._smtclient._invalidate_vswitch_cache(
+            'SMAPI USER1 API Virtual_Network_Adapter_Disconnect '
+            '--operands -v 1000')
+        self._smtclient.query_vswitch('VSW1')
+        self._smtclient.query_vswitch('VSW2')
+        self.assertEqual(5, query.call_count)
+
+        stats = self._smtclient.get_vswitch_cache_stats()
+        self.assertEqual(['VSW1', 'VSW2'], sorted(stats['vswitches']))
+        self.assertEqual(5, stats['misses'])
+        self.assertEqual(3, stats['hits'])
+        self.assertEqual(3, stats['invalidations'])
+
+    @mock.patch.object(smtclient.SMTClient, '_do_query_OSA')
+    def test_is_OSA_free_cached(self, query_osa):
+        query_osa.return_value = {'OSA': {'FREE': ['0AA0', '0AA1', '0AA2',
+                                                   '0AA3', '0AA4', '0AA5']}}
+        # free in the cache, the OSA devices are queried again
+        self.assertTrue(self._smtclient._is_OSA_free('AA0'))
+        self.assertTrue(self._smtclient._is_OSA_free('AA3'))
+        self.assertEqual(2, query_osa.call_count)
+
+        # not free in the cache, no query is needed
+        self._smtclient._vswitch_cache.claim_osa(['0AA3', '0AA4', '0AA5'])
+        self.assertFalse(self._smtclient._is_OSA_free('AA3'))
+        self.assertEqual(2, query_osa.call_count)
+
+        self._smtclient._invalidate_vswitch_cache(
+            'SMAPI USER1 API Image_Device_Dedicate --operands '
+            '-v 1000 -r AA0')
+        self.assertTrue(self._smtclient._is_OSA_free('AA3'))
+        self.assertEqual(3, query_osa.call_count)
+
+    @mock.patch.object(smtclient.SMTClient, '_do_query_OSA')
+    @mock.patch.object(smtclient.SMTClient, '_query_vswitch')
+    @mock.patch.object(smtclient.SMTClient, '_query_vswitch_list')
+    def test_refresh_vswitch_cache(self, query_list, query_vswitch,
+                                   query_osa):
+        query_list.return_value = ['VSW1', 'VSW2']
+        query_osa.return_value = {}
+        error = exception.SDKObjectNotExistError(obj_desc='Vswitch VSW2',
+                                                 modID='network')
+
+        def _query(name):
+            if name == 'VSW2':
+                raise error
+            return {'switch_name': name}
+        query_vswitch.side_effect = _query
+
+        self.assertEqual({'VSW2': error},
+                         self._smtclient.refresh_vswitch_cache())
+        self._smtclient.get_vswitch_list()
+        self._smtclient.query_vswitch('VSW1')
+        self._smtclient._is_OSA_free('AA0')
+        self.assertEqual(1, query_list.call_count)
+        self.assertEqual(2, query_vswitch.call_count)
+        # no OSA is free in the cache, so it is not queried again
+        self.assertEqual(1, query_osa.call_count)
+
+        self._smtclient.refresh_vswitch_cache(['VSW1'])
+        self.assertEqual(1, query_list.call_count)
+        self.assertEqual(3, query_vswitch.call_count)
+
     @mock.patch.object(zvmutils, 'get_smt_userid')
     @mock.patch.object(smtclient.SMTClient, '_request')
     def test_query_OSA_RequestFailed(self, req, get_id):
@@ -3240,13 +3980,20 @@ class SDKSMTClientTestCases(base.SDKTestCase):
     def test_dedicate_OSA(self, attach_osa, OSA_free, get_vdev):
         OSA_free.return_value = True
         get_vdev.return_value = '1000'
-        result = self._smtclient.dedicate_OSA('userid', 'OSA_device',
+        self._smtclient._vswitch_cache.set(
+            smtclient.VswitchCache.OSA,
+            {'OSA': {'FREE': ['0AA0', '0AA1', '0AA2', '0AA3']}}, 0)
+        result = self._smtclient.dedicate_OSA('userid', 'AA0',
                              vdev='nic_vdev', active=True)
         get_vdev.assert_called_once_with('userid', vdev='nic_vdev')
-        OSA_free.assert_called_once_with('OSA_device')
-        attach_osa.assert_called_once_with('userid', 'OSA_device',
+        OSA_free.assert_called_once_with('AA0')
+        attach_osa.assert_called_once_with('userid', 'AA0',
                                            '1000', active=True)
         self.assertEqual(result, '1000')
+        # the dedicated devices are not free in the cache any more
+        self.assertEqual({'OSA': {'FREE': ['0AA3']}},
+                         self._smtclient._vswitch_cache.get(
+                             smtclient.VswitchCache.OSA))
 
     @mock.patch.object(smtclient.SMTClient, '_get_available_vdev')
     @mock.patch.object(smtclient.SMTClient, '_is_OSA_free')
@@ -4178,6 +4925,7 @@ class SDKSMTClientTestCases(base.SDKTestCase):
         self.assertEqual(max_mem, 65536)
         self.assertEqual(reserved_mem, 61440)
         self.assertListEqual(user_direct, sample_definition)
+        get_user_direct.assert_called_once_with(userid, cached=False)
 
     @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
     def test_get_defined_memory_reserved_not_defined(self, get_user_direct):
@@ -4417,6 +5165,182 @@ class SDKSMTClientTestCases(base.SDKTestCase):
                           req_mem)
         resize_mem.assert_not_called()
 
+    def _fake_live_state(self, cpus, memory, uname):
+        separator = smtclient._RESIZE_STATE_SEPARATOR
+        return (['# Address'] + [str(c) for c in cpus] + [separator] +
+                ['Total online memory : %d MB' % memory, separator, uname])
+
+    @mock.patch.object(smtclient.SMTClient, '_replace_user_direct')
+    @mock.patch.object(smtclient.SMTClient, '_lock_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
+    def test_live_resize(self, exec_cmd, get_direct, lock, replace):
+        get_direct.return_value = [u'USER TESTUID LBYONLY 1024M 8G G',
+                                   u'INCLUDE OSDFLT',
+                                   u'COMMAND DEF STOR RESERVED 7168M',
+                                   u'CPU 00 BASE',
+                                   u'CPU 01',
+                                   u'MACHINE ESA 32',
+                                   u'MDISK 0100 3390 5501 5500 OMB1BA MR',
+                                   u'']
+
+        def _execute(userid, cmd_str):
+            if cmd_str.startswith('lscpu'):
+                return self._fake_live_state([0, 1], 1024,
+                                             'Linux ubuntu 5.4.0 s390x')
+            return []
+
+        exec_cmd.side_effect = _execute
+        timings = self._smtclient.live_resize('testuid', cpu_cnt=4,
+                                              memory='2G')
+        lock.assert_called_once_with('testuid')
+        get_direct.assert_called_with('testuid', cached=False)
+        replace.assert_called_once_with('testuid', [
+            u'USER TESTUID LBYONLY 2048M 8G G',
+            u'INCLUDE OSDFLT',
+            u'COMMAND DEF STOR RESERVED 6144M',
+            u'CPU 00 BASE',
+            u'CPU 01',
+            u'CPU 02',
+            u'CPU 03',
+            u'MACHINE ESA 32',
+            u'MDISK 0100 3390 5501 5500 OMB1BA MR'])
+        self.assertEqual(['vmcp def cpu 02 03',
+                          'chcpu -r && chcpu -e 02,03',
+                          'vmcp def storage standby 1024M',
+                          'chmem -e 1024M'],
+                         [c[0][1] for c in exec_cmd.call_args_list[1:]])
+        self.assertEqual(set(['read_directory', 'read_active',
+                              'update_directory', 'define_cpus',
+                              'online_cpus', 'define_memory',
+                              'online_memory', 'total']), set(timings))
+
+    @mock.patch.object(smtclient.SMTClient, '_replace_user_direct')
+    @mock.patch.object(smtclient.SMTClient, '_lock_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
+    def test_live_resize_active_only(self, exec_cmd, get_direct, lock,
+                                     replace):
+        get_direct.return_value = [u'USER TESTUID LBYONLY 1024M 8G G',
+                                   u'CPU 00 BASE',
+                                   u'CPU 01',
+                                   u'MACHINE ESA 4']
+        exec_cmd.return_value = self._fake_live_state([0], 1024, 'Linux')
+        timings = self._smtclient.live_resize('testuid', cpu_cnt=2)
+        lock.assert_not_called()
+        replace.assert_not_called()
+        exec_cmd.assert_any_call('testuid', 'vmcp def cpu 01')
+        exec_cmd.assert_called_with('testuid', 'chcpu -r')
+        self.assertNotIn('update_directory', timings)
+
+    @mock.patch.object(smtclient.SMTClient, '_revert_user_direct')
+    @mock.patch.object(smtclient.SMTClient, '_replace_user_direct')
+    @mock.patch.object(smtclient.SMTClient, '_lock_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
+    def test_live_resize_define_memory_failed(self, exec_cmd, get_direct,
+                                              lock, replace, revert):
+        user_direct = [u'USER TESTUID LBYONLY 1024M 8G G',
+                       u'COMMAND DEF STOR RESERVED 7168M',
+                       u'CPU 00 BASE',
+                       u'MACHINE ESA 4']
+        get_direct.return_value = user_direct
+
+        def _execute(userid, cmd_str):
+            if cmd_str.startswith('lscpu'):
+                return self._fake_live_state([0], 1024, 'Linux')
+            if cmd_str.startswith('vmcp def storage'):
+                raise exception.SDKSMTRequestFailed({}, 'fake error')
+            return []
+
+        exec_cmd.side_effect = _execute
+        self.assertRaises(exception.SDKGuestOperationError,
+                          self._smtclient.live_resize, 'testuid',
+                          cpu_cnt=2, memory='2G')
+        # the cpu change is kept as the new cpu is active
+        revert.assert_called_once_with('testuid', [
+            u'USER TESTUID LBYONLY 1024M 8G G',
+            u'COMMAND DEF STOR RESERVED 7168M',
+            u'CPU 00 BASE',
+            u'CPU 01',
+            u'MACHINE ESA 4'])
+
+    @mock.patch.object(smtclient.SMTClient, '_replace_user_direct')
+    @mock.patch.object(smtclient.SMTClient, '_lock_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
+    def test_live_resize_directory_changed(self, exec_cmd, get_direct,
+                                           lock, replace):
+        user_direct = [u'USER TESTUID LBYONLY 1024M 8G G',
+                       u'COMMAND DEF STOR RESERVED 7168M',
+                       u'CPU 00 BASE',
+                       u'MACHINE ESA 4']
+        # a disk is added after the plan is made
+        get_direct.side_effect = [
+            user_direct,
+            user_direct + [u'MDISK 0101 3390 5501 100 OMB1BA MR']]
+        exec_cmd.return_value = self._fake_live_state([0], 1024, 'Linux')
+        self._smtclient.live_resize('testuid', memory='2G')
+        get_direct.assert_called_with('testuid', cached=False)
+        replace.assert_called_once_with('testuid', [
+            u'USER TESTUID LBYONLY 2048M 8G G',
+            u'COMMAND DEF STOR RESERVED 6144M',
+            u'CPU 00 BASE',
+            u'MACHINE ESA 4',
+            u'MDISK 0101 3390 5501 100 OMB1BA MR'])
+
+    @mock.patch.object(smtclient.SMTClient, '_replace_user_direct')
+    @mock.patch.object(smtclient.SMTClient, '_lock_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
+    def test_live_resize_lock_failed(self, exec_cmd, get_direct, lock,
+                                     replace):
+        get_direct.return_value = [u'USER TESTUID LBYONLY 1024M 8G G',
+                                   u'COMMAND DEF STOR RESERVED 7168M',
+                                   u'CPU 00 BASE',
+                                   u'MACHINE ESA 4']
+        exec_cmd.return_value = self._fake_live_state([0], 1024, 'Linux')
+        lock.side_effect = exception.SDKSMTRequestFailed({}, 'fake error')
+        with self.assertRaises(exception.SDKGuestOperationError) as cm:
+            self._smtclient.live_resize('testuid', memory='2G')
+        self.assertEqual(cm.exception.results['rs'], 9)
+        replace.assert_not_called()
+
+    @mock.patch.object(smtclient.SMTClient, '_request')
+    @mock.patch.object(smtclient.SMTClient, '_lock_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
+    def test_live_resize_read_locked_directory_failed(self, exec_cmd,
+                                                      get_direct, lock,
+                                                      request):
+        user_direct = [u'USER TESTUID LBYONLY 1024M 8G G',
+                       u'COMMAND DEF STOR RESERVED 7168M',
+                       u'CPU 00 BASE',
+                       u'MACHINE ESA 4']
+        get_direct.side_effect = [
+            user_direct, exception.SDKSMTRequestFailed({}, 'fake error')]
+        exec_cmd.return_value = self._fake_live_state([0], 1024, 'Linux')
+        with self.assertRaises(exception.SDKGuestOperationError) as cm:
+            self._smtclient.live_resize('testuid', memory='2G')
+        self.assertEqual(cm.exception.results['rs'], 18)
+        request.assert_called_once_with(
+            "SMAPI testuid API Image_Unlock_DM ")
+
+    @mock.patch.object(smtclient.SMTClient, '_lock_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'get_user_direct')
+    @mock.patch.object(smtclient.SMTClient, 'execute_cmd')
+    def test_live_resize_conflict(self, exec_cmd, get_direct, lock):
+        get_direct.return_value = [u'USER TESTUID LBYONLY 1024M 8G G',
+                                   u'CPU 00 BASE',
+                                   u'CPU 01',
+                                   u'MACHINE ESA 4']
+        exec_cmd.return_value = self._fake_live_state([0, 1], 1024, 'Linux')
+        self.assertRaises(exception.SDKConflictError,
+                          self._smtclient.live_resize, 'testuid', cpu_cnt=1)
+        self.assertRaises(exception.SDKConflictError,
+                          self._smtclient.live_resize, 'testuid', cpu_cnt=8)
+        lock.assert_not_called()
+
     def test_guest_deploy_rhcos_no_ignition(self):
         userid = 'testuid'
         image_name = "test_image"
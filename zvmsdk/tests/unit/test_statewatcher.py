@@ -0,0 +1,86 @@
+# Copyright 2021 IBM Corp.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import threading
+import time
+
+from zvmsdk import exception
+from zvmsdk import statewatcher
+from zvmsdk.tests.unit import base
+
+
+class SDKStateWatcherTestCase(base.SDKTestCase):
+    def setUp(self):
+        super(SDKStateWatcherTestCase, self).setUp()
+        base.set_conf('guest', 'state_poll_interval', 0)
+        self._watcher = statewatcher.GuestStateWatcher()
+
+    def tearDown(self):
+        base.set_conf('guest', 'state_poll_interval', 5)
+        super(SDKStateWatcherTestCase, self).tearDown()
+
+    @mock.patch("zvmsdk.smtclient.SMTClient.get_guest_connection_status")
+    @mock.patch("zvmsdk.utils.get_logged_on_users")
+    def test_wait_for_on_and_reachable(self, logged_on, reachable):
+        logged_on.side_effect = [set(), set(['TEST0001']),
+                                 set(['TEST0001'])] + [set(['TEST0001'])] * 5
+        reachable.side_effect = [False, True]
+        self.assertTrue(self._watcher.wait_for('test0001', 'reachable', 10))
+        self.assertEqual(reachable.call_count, 2)
+        self.assertTrue(self._watcher.wait_for('test0001', 'on', 10))
+        reachable.assert_has_calls([mock.call('TEST0001', cached=False)] * 2)
+
+    @mock.patch("zvmsdk.utils.get_logged_on_users")
+    def test_wait_for_timeout(self, logged_on):
+        logged_on.return_value = set(['TEST0001'])
+        self.assertFalse(self._watcher.wait_for('test0001', 'off', 0.2))
+        self.assertEqual(self._watcher._waiters, {})
+
+    @mock.patch("zvmsdk.utils.get_logged_on_users")
+    def test_wait_for_shares_poll(self, logged_on):
+        base.set_conf('guest', 'state_poll_interval', 0.2)
+        started = threading.Event()
+        release = threading.Event()
+
+        def _logged_on():
+            started.set()
+            release.wait(5)
+            return set()
+        logged_on.side_effect = _logged_on
+
+        results = {}
+
+        def _wait(userid):
+            results[userid] = self._watcher.wait_for(userid, 'off', 5)
+        waiters = [threading.Thread(target=_wait, args=('TEST000%d' % i,))
+                   for i in range(5)]
+        # block the first poll until all the waiters are registered
+        waiters[0].start()
+        started.wait(5)
+        for waiter in waiters[1:]:
+            waiter.start()
+        while len(self._watcher._waiters) < 5:
+            time.sleep(0.01)
+        release.set()
+        for waiter in waiters:
+            waiter.join(5)
+        self.assertEqual(results, dict(('TEST000%d' % i, True)
+                                       for i in range(5)))
+        # one poll for the first waiter, one more shared by the others
+        self.assertEqual(logged_on.call_count, 2)
+
+    def test_wait_for_invalid_state(self):
+        self.assertRaises(exception.SDKInvalidInputFormat,
+                          self._watcher.wait_for, 'test0001', 'paused', 1)
@@ -12,7 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import mock
+import os
+import tarfile
+import tempfile
 
 import zvmsdk.utils as zvmutils
 from zvmsdk.tests.unit import base
@@ -36,3 +40,68 @@ class ZVMUtilsTestCases(base.SDKTestCase):
         gsu.return_value = 'TESTUSER'
         self.assertEqual('NLSTUSER', zvmutils.get_namelist())
         base.set_conf('zvm', 'namelist', 'TSTNLIST')
+
+    @mock.patch.object(zvmutils, 'execute')
+    def test_get_logged_on_users(self, execute):
+        execute.return_value = (0, "OPERATOR - SYSC    , TCPIP    - DSC\n"
+                                   "test0001 - DSC     , TEST0002 - SSI\n"
+                                   "VSM     - TCPIP\n")
+        self.assertEqual(zvmutils.get_logged_on_users(),
+                         set(['OPERATOR', 'TCPIP', 'TEST0001', 'TEST0002']))
+        execute.assert_called_once_with(
+            'sudo /sbin/vmcp --buffer=1M q names')
+
+    def test_run_in_parallel(self):
+        def fake_func(value):
+            if value == 2:
+                raise ValueError('fake error')
+            return value * 10
+
+        results = zvmutils.run_in_parallel(fake_func, [(1,), (2,), (3,)],
+                                           max_workers=2)
+        self.assertEqual(results[0], (10, None))
+        self.assertIsNone(results[1][0])
+        self.assertIsInstance(results[1][1], ValueError)
+        self.assertEqual(results[2], (30, None))
+        self.assertEqual(zvmutils.run_in_parallel(fake_func, []), [])
+
+    def test_paginate(self):
+        keys = ['c', 'a', 'd', 'b']
+        self.assertEqual(['a', 'b', 'c', 'd'], zvmutils.paginate(keys))
+        self.assertEqual(['a', 'b'], zvmutils.paginate(keys, limit=2))
+        self.assertEqual(['c', 'd'], zvmutils.paginate(keys, marker='b'))
+        self.assertEqual(['c'], zvmutils.paginate(keys, limit=1,
+                                                  marker='bb'))
+
+    def test_select_fields(self):
+        record = {'a': 1, 'b': 2, 'c': 3}
+        self.assertEqual(record, zvmutils.select_fields(record))
+        self.assertEqual({'a': 1, 'c': 3},
+                         zvmutils.select_fields(record, ['a', 'c', 'x']))
+
+    def test_iter_json(self):
+        data = {'output': [{'userid': 'ID%04d' % i} for i in range(100)],
+                'errmsg': u'\u00e9'}
+        chunks = list(zvmutils.iter_json(data, chunk_size=64))
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(data, json.loads(b''.join(chunks).decode('utf-8')))
+
+    def test_tar_builder(self):
+        tar_file = tempfile.NamedTemporaryFile(delete=False)
+        tar_file.close()
+        try:
+            builder = zvmutils.TarBuilder(compress=True, max_size=16)
+            builder.add_dir('cfg')
+            builder.add_file('cfg/0000', u'content\n')
+            builder.add_file('cfg/run.sh', b'#!/bin/bash\n', mode=0o755)
+            self.assertEqual(tar_file.name, builder.write(tar_file.name))
+
+            with tarfile.open(tar_file.name, 'r:gz') as tar:
+                self.assertEqual(['cfg', 'cfg/0000', 'cfg/run.sh'],
+                                 tar.getnames())
+                self.assertTrue(tar.getmember('cfg').isdir())
+                self.assertEqual(0o755, tar.getmember('cfg/run.sh').mode)
+                self.assertEqual(b'content\n',
+                                 tar.extractfile('cfg/0000').read())
+        finally:
+            os.remove(tar_file.name)
@@ -14,10 +14,14 @@
 
 
 import mock
+import shutil
+import six
 import tempfile
+import time
 
 from zvmsdk import dist
 from zvmsdk import exception
+from zvmsdk import utils as zvmutils
 from zvmsdk import vmops
 from zvmsdk.tests.unit import base
 
@@ -44,17 +48,38 @@ class SDKVMOpsTestCase(base.SDKTestCase):
         self.vmops.guest_start('cbi00063')
         guest_start.assert_called_once_with('cbi00063')
 
-    @mock.patch('zvmsdk.vmops.VMOps.is_reachable')
     @mock.patch('zvmsdk.vmops.VMOps.wait_for_reachable')
     @mock.patch("zvmsdk.smtclient.SMTClient.guest_start")
-    def test_guest_start_timeout(self, guest_start, wait, is_up):
-        is_up.return_value = False
+    def test_guest_start_timeout(self, guest_start, wait):
+        wait.return_value = False
         timeout = 10
         self.assertRaises(exception.SDKGuestOperationError,
                           self.vmops.guest_start, 'cbi00063', timeout)
         guest_start.assert_called_once_with('cbi00063')
         wait.assert_called_once_with('cbi00063', timeout)
-        is_up.assert_called_once_with('cbi00063')
+
+    @mock.patch("zvmsdk.statewatcher.GuestStateWatcher.wait_for")
+    def test_wait_for_reachable(self, wait_for):
+        wait_for.return_value = True
+        self.assertTrue(self.vmops.wait_for_reachable('cbi00063', 30))
+        wait_for.assert_called_once_with('cbi00063', 'reachable', 30)
+
+    @mock.patch("zvmsdk.statewatcher.GuestStateWatcher.wait_for")
+    @mock.patch("zvmsdk.smtclient.SMTClient.guest_softstop")
+    def test_guest_softstop(self, softstop, wait_for):
+        wait_for.return_value = True
+        self.vmops.guest_softstop('cbi00063', timeout=300, poll_interval=10)
+        softstop.assert_called_once_with('cbi00063', wait=False)
+        wait_for.assert_called_once_with('cbi00063', 'off', 300)
+
+    @mock.patch("zvmsdk.statewatcher.GuestStateWatcher.wait_for")
+    @mock.patch("zvmsdk.smtclient.SMTClient.guest_softstop")
+    def test_guest_softstop_timeout(self, softstop, wait_for):
+        base.set_conf('guest', 'softstop_timeout', 120)
+        wait_for.return_value = False
+        self.assertRaises(exception.SDKGuestOperationError,
+                          self.vmops.guest_softstop, 'cbi00063')
+        wait_for.assert_called_once_with('cbi00063', 'off', 120)
 
     @mock.patch("zvmsdk.smtclient.SMTClient.guest_pause")
     def test_guest_pause(self, guest_pause):
@@ -89,6 +114,108 @@ class SDKVMOpsTestCase(base.SDKTestCase):
                                           comment_list)
         namelistadd.assert_called_once_with('TSTNLIST', userid)
 
+    @mock.patch("zvmsdk.database.GuestDbOperator.update_guests_comments")
+    @mock.patch("zvmsdk.smtclient.SMTClient.live_migrate_move")
+    @mock.patch("zvmsdk.smtclient.SMTClient.execute_cmd")
+    @mock.patch("zvmsdk.smtclient.SMTClient.live_migrate_test")
+    @mock.patch("zvmsdk.utils.get_logged_on_users")
+    def test_live_migrate_bulk(self, logged_on, migrate_test, execute_cmd,
+                               migrate_move, update_comments):
+        logged_on.return_value = set(['USER1', 'USER2', 'USER3'])
+
+        def _test(userid, destination):
+            if userid == 'USER2':
+                raise exception.SDKSMTRequestFailed(
+                    {'rc': 8, 'rs': 3000, 'overallRC': 8}, 'not eligible')
+
+        migrate_test.side_effect = _test
+        results = self.vmops.live_migrate_bulk(
+            ['USER1', 'USER2', 'USER3', 'USER4'], 'ZCC2', 'SSI2',
+            {'maxtotal': 100}, concurrency=1)
+        self.assertEqual(3, migrate_test.call_count)
+        self.assertEqual(2, execute_cmd.call_count)
+        migrate_move.assert_any_call('USER1', 'SSI2', {'maxtotal': 100})
+        migrate_move.assert_any_call('USER3', 'SSI2', {'maxtotal': 100})
+        update_comments.assert_called_once_with(['USER1', 'USER3'],
+                                                {'migrated': 1})
+        self.assertEqual(2, results['moved'])
+        self.assertEqual(2, results['failed'])
+        self.assertEqual(['success', 'failed', 'success', 'failed'],
+                         [r['result'] for r in results['results']])
+        self.assertEqual(['move', 'test'],
+                         sorted(results['results'][0]['timings']))
+        self.assertIn('USER4', results['results'][3]['errmsg'])
+
+    @mock.patch("zvmsdk.vmops.VMOps._log_live_migrate_progress")
+    @mock.patch("zvmsdk.database.GuestDbOperator.update_guests_comments")
+    @mock.patch("zvmsdk.smtclient.SMTClient.live_migrate_move")
+    @mock.patch("zvmsdk.smtclient.SMTClient.execute_cmd")
+    @mock.patch("zvmsdk.smtclient.SMTClient.live_migrate_test")
+    @mock.patch("zvmsdk.utils.get_logged_on_users")
+    def test_live_migrate_bulk_no_progress(self, logged_on, migrate_test,
+                                           execute_cmd, migrate_move,
+                                           update_comments, log_progress):
+        logged_on.return_value = set(['USER1'])
+        migrate_move.side_effect = lambda *args: time.sleep(0.1)
+        for interval in (0, -1):
+            base.set_conf('guest', 'live_migrate_status_interval', interval)
+            try:
+                results = self.vmops.live_migrate_bulk(['USER1'], 'ZCC2',
+                                                       'SSI2', {})
+            finally:
+                base.set_conf('guest', 'live_migrate_status_interval', 30)
+            self.assertEqual(1, results['moved'])
+        log_progress.assert_not_called()
+
+    def test_get_migrate_lane(self):
+        lane = self.vmops._get_migrate_lane('SSI2')
+        self.assertIs(lane, self.vmops._get_migrate_lane('SSI2'))
+        self.assertIsNot(lane, self.vmops._get_migrate_lane('SSI3'))
+
+    @mock.patch("zvmsdk.utils.check_userid_exist")
+    @mock.patch("zvmsdk.smtclient.SMTClient.delete_vms")
+    @mock.patch("zvmsdk.database.GuestDbOperator.get_migrated_guest_list")
+    @mock.patch("zvmsdk.vmops.VMOps.guest_list")
+    def test_delete_vm_bulk(self, guest_list, migrated, delete_vms,
+                            userid_exist):
+        guest_list.return_value = ['USER1', 'USER2', 'USER5']
+        migrated.return_value = ['USER5']
+        userid_exist.side_effect = lambda userid: userid == 'USER3'
+        err = exception.SDKSMTRequestFailed({'rc': 400, 'rs': 104,
+                                             'overallRC': 8}, 'fake error')
+        delete_vms.return_value = [(None, {'directory': 1.0}),
+                                   (err, {'directory': 1.0})]
+        results = self.vmops.delete_vm_bulk(['USER1', 'USER2', 'USER3',
+                                             'USER4'])
+        delete_vms.assert_called_once_with(['USER1', 'USER2'])
+        self.assertEqual({'userid': 'USER1', 'result': 'success',
+                          'errmsg': '', 'timings': {'directory': 1.0}},
+                         results[0])
+        self.assertEqual(['failed', 'failed', 'success'],
+                         [r['result'] for r in results[1:]])
+        # USER3 exists but is not managed by SDK
+        self.assertIn('USER3', results[2]['errmsg'])
+        self.assertEqual({}, results[3]['timings'])
+
+    @mock.patch("zvmsdk.smtclient.SMTClient.namelist_add")
+    @mock.patch("zvmsdk.smtclient.SMTClient.create_vms")
+    def test_create_vm_bulk(self, create_vms, namelistadd):
+        guests = [{'userid': 'USER1'}, {'userid': 'USER2'}]
+        err = exception.SDKSMTRequestFailed({'rc': 4, 'rs': 8,
+                                             'overallRC': 8}, 'fake error')
+        create_vms.return_value = [([{'vdev': '0100'}], None,
+                                    {'directory': 1.0}),
+                                   (None, err, {'directory': 1.0})]
+        results = self.vmops.create_vm_bulk(guests)
+        create_vms.assert_called_once_with(guests)
+        namelistadd.assert_called_once_with('TSTNLIST', 'USER1')
+        self.assertEqual('success', results[0]['result'])
+        self.assertEqual([{'vdev': '0100'}], results[0]['disk_list'])
+        self.assertIn('namelist', results[0]['timings'])
+        self.assertEqual({'userid': 'USER2', 'result': 'failed',
+                          'errmsg': six.text_type(err), 'disk_list': [],
+                          'timings': {'directory': 1.0}}, results[1])
+
     @mock.patch("zvmsdk.smtclient.SMTClient.process_additional_minidisks")
     def test_guest_config_minidisks(self, process_additional_minidisks):
         userid = 'userid'
@@ -240,6 +367,112 @@ class SDKVMOpsTestCase(base.SDKTestCase):
         self.vmops.execute_cmd(userid, cmdStr)
         execute_cmd.assert_called_once_with(userid, cmdStr)
 
+    @mock.patch("zvmsdk.smtclient.SMTClient.execute_cmd_direct")
+    def test_execute_cmd_bulk(self, execute_cmd):
+        def _execute(userid, cmdStr, timeout=None):
+            if userid == 'USER3':
+                raise exception.SDKInternalError(msg='fake error')
+            if userid == 'USER1':
+                return {'overallRC': 0, 'rc': 0, 'rs': 0, 'strError': '',
+                        'response': ['4.18.0']}
+            return {'overallRC': 2, 'rc': 8, 'rs': 0, 'strError': '',
+                    'response': ['ULTSMP0320E command failed']}
+
+        execute_cmd.side_effect = _execute
+        base.set_conf('sdkserver', 'max_worker_count', 2)
+        try:
+            with mock.patch.object(zvmutils, 'run_in_parallel',
+                                   wraps=zvmutils.run_in_parallel) as run:
+                results = self.vmops.execute_cmd_bulk(
+                    ['USER1', 'USER2', 'USER3'], 'uname -r',
+                    concurrency=10, timeout=30)
+        finally:
+            base.set_conf('sdkserver', 'max_worker_count', 64)
+        self.assertEqual(2, run.call_args[1]['max_workers'])
+        execute_cmd.assert_any_call('USER1', 'uname -r', timeout=30)
+        self.assertEqual(['USER1', 'USER2', 'USER3'],
+                         [r['userid'] for r in results])
+        self.assertEqual((0, 0, ['4.18.0']),
+                         (results[0]['overallRC'], results[0]['rc'],
+                          results[0]['output']))
+        self.assertEqual('', results[0]['errmsg'])
+        self.assertEqual(8, results[1]['rc'])
+        self.assertEqual('ULTSMP0320E command failed', results[1]['errmsg'])
+        self.assertEqual(4, results[2]['overallRC'])
+        self.assertIn('fake error', results[2]['errmsg'])
+        for result in results:
+            self.assertIn('duration', result)
+
+    @mock.patch("zvmsdk.utils.PathUtils.get_console_log_path")
+    @mock.patch("zvmsdk.smtclient.SMTClient.get_users_console_output")
+    def test_get_console_output_bulk(self, get_output, log_path):
+        log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, log_dir)
+        log_path.side_effect = lambda userid: '%s/%s.log' % (log_dir, userid)
+        get_output.return_value = {
+            'USER1': ('boot\n', None),
+            'USER2': ('', exception.SDKInternalError(msg='fake error')),
+            'USER3': ('part\n', exception.SDKInternalError(msg='failed'))}
+
+        results = self.vmops.get_console_output_bulk(['USER1', 'USER2',
+                                                      'USER3'])
+        self.assertEqual({'output': 'boot\n', 'cursor': 5, 'skipped': 0,
+                          'errmsg': ''}, results['USER1'])
+        self.assertEqual('', results['USER2']['output'])
+        self.assertIn('fake error', results['USER2']['errmsg'])
+        # the output got before the error is logged
+        self.assertEqual('part\n', results['USER3']['output'])
+        self.assertIn('failed', results['USER3']['errmsg'])
+
+        # only the output after the cursor is returned
+        get_output.return_value = {'USER1': ('login:\n', None)}
+        results = self.vmops.get_console_output_bulk(['USER1'],
+                                                     {'USER1': 5})
+        self.assertEqual({'output': 'login:\n', 'cursor': 12, 'skipped': 0,
+                          'errmsg': ''}, results['USER1'])
+
+        # at most console_log_size kilobytes are returned
+        base.set_conf('guest', 'console_log_size', 0)
+        try:
+            results = self.vmops.get_console_output_bulk(['USER1'],
+                                                         {'USER1': 5})
+        finally:
+            base.set_conf('guest', 'console_log_size', 100)
+        self.assertEqual({'output': '', 'cursor': 19, 'skipped': 14,
+                          'errmsg': ''}, results['USER1'])
+
+    @mock.patch("zvmsdk.smtclient.SMTClient.prefetch_user_direct")
+    @mock.patch("zvmsdk.smtclient.SMTClient.live_resize")
+    @mock.patch("zvmsdk.utils.get_logged_on_users")
+    def test_live_resize_bulk(self, logged_on, live_resize, prefetch):
+        logged_on.return_value = set(['USER1', 'USER2', 'USER4'])
+        prefetch.return_value = {'USER4': exception.SDKSMTRequestFailed(
+            {'rc': 4, 'rs': 0}, 'failed')}
+
+        def _resize(userid, cpu_cnt=None, memory=None):
+            if userid == 'USER2':
+                raise exception.SDKConflictError(modID='guest', rs=2,
+                                                 userid=userid, active=4,
+                                                 req=cpu_cnt)
+            return {'total': 1.0}
+
+        live_resize.side_effect = _resize
+        results = self.vmops.live_resize_bulk([
+            {'userid': 'USER1', 'cpu_cnt': 2, 'memory': '2G'},
+            {'userid': 'USER2', 'cpu_cnt': 2},
+            {'userid': 'USER3', 'memory': '2G'},
+            {'userid': 'USER4', 'cpu_cnt': 4}])
+        prefetch.assert_called_once_with(['USER1', 'USER2', 'USER4'])
+        live_resize.assert_any_call('USER1', 2, '2G')
+        # the directory of USER4 can not be read, it is not resized
+        self.assertEqual(2, live_resize.call_count)
+        self.assertEqual({'userid': 'USER1', 'result': 'success',
+                          'errmsg': '', 'timings': {'total': 1.0}},
+                         results[0])
+        self.assertEqual(['failed', 'failed', 'failed'],
+                         [r['result'] for r in results[1:]])
+        self.assertIn('USER3', results[2]['errmsg'])
+
     @mock.patch("zvmsdk.smtclient.SMTClient.guest_stop")
     def test_guest_stop(self, gs):
         userid = 'userid'
@@ -301,6 +534,15 @@ class SDKVMOpsTestCase(base.SDKTestCase):
         self.vmops.guest_reboot('cbi00063')
         guest_reboot.assert_called_once_with('cbi00063')
 
+    @mock.patch('zvmsdk.vmops.VMOps.wait_for_reachable')
+    @mock.patch("zvmsdk.smtclient.SMTClient.guest_reboot")
+    def test_guest_reboot_timeout(self, guest_reboot, wait):
+        wait.return_value = False
+        self.assertRaises(exception.SDKGuestOperationError,
+                          self.vmops.guest_reboot, 'cbi00063', 60)
+        guest_reboot.assert_called_once_with('cbi00063')
+        wait.assert_called_once_with('cbi00063', 60)
+
     @mock.patch("zvmsdk.smtclient.SMTClient.guest_reset")
     def test_guest_reset(self, guest_reset):
         self.vmops.guest_reset('cbi00063')
@@ -220,6 +220,51 @@ class TestVolumeConfiguratorAPI(base.SDKTestCase):
                           self.configurator.check_IUCV_is_ready,
                           assigner_id)
 
+    @mock.patch("zvmsdk.smtclient.SMTClient.punch_file")
+    @mock.patch("zvmsdk.smtclient.SMTClient.execute_cmd_direct")
+    @mock.patch("zvmsdk.smtclient.SMTClient.execute_cmd")
+    @mock.patch("zvmsdk.volumeop.VolumeConfiguratorAPI.check_IUCV_is_ready")
+    def test_config_attach_batch(self, is_reachable, execute_cmd,
+                                 execute_cmd_direct, punch_file):
+        volumes = [{'fcp_list': ['1a11', '1b11'],
+                    'target_wwpns': ['1111', '1112'],
+                    'target_lun': lun, 'multipath': True,
+                    'os_version': 'rhel7', 'mount_point': '/dev/sdz'}
+                   for lun in ('2222', '3333', '4444')]
+        is_reachable.return_value = True
+        # the 2nd volume does not show up and the 3rd fails
+        execute_cmd_direct.return_value = {'rc': 1}
+        execute_cmd.return_value = ['0 0', '1 1', '2 2']
+
+        errors = self.configurator.config_attach_batch('userid1', volumes)
+        self.assertIsNone(errors[0])
+        self.assertIn('did not show up', errors[1])
+        self.assertIn('exit code is: 2', errors[2])
+        # all the volumes are configured in one run
+        punch_file.assert_called_once_with('userid1', mock.ANY, 'X')
+        execute_cmd_direct.assert_called_once_with(
+            'userid1', 'systemctl start zvmguestconfigure.service')
+        execute_cmd.assert_called_once_with(
+            'userid1', 'cat %s' % volumeop.VOLUME_BATCH_STATUS_FILE)
+
+    @mock.patch("zvmsdk.smtclient.SMTClient.punch_file")
+    @mock.patch("zvmsdk.smtclient.SMTClient.execute_cmd_direct")
+    @mock.patch("zvmsdk.volumeop.VolumeConfiguratorAPI.check_IUCV_is_ready")
+    def test_config_detach_batch_not_reachable(self, is_reachable,
+                                               execute_cmd_direct,
+                                               punch_file):
+        volumes = [{'fcp_list': ['1a11'], 'target_wwpns': ['1111'],
+                    'target_lun': lun, 'multipath': False,
+                    'os_version': 'rhel7', 'mount_point': '/dev/sdz',
+                    'connections': connections}
+                   for lun, connections in (('2222', 1), ('3333', 0))]
+        is_reachable.return_value = False
+
+        errors = self.configurator.config_detach_batch('userid1', volumes)
+        self.assertEqual([None, None], errors)
+        punch_file.assert_called_once_with('userid1', mock.ANY, 'X')
+        self.assertFalse(execute_cmd_direct.called)
+
     def test_config_force_attach(self):
         pass
 
@@ -422,41 +467,8 @@ class TestFCPManager(base.SDKTestCase):
         self.assertEqual('20076D8500005185', physical)
         self.assertEqual('50', self.fcpops._fcp_pool['b83e']._chpid.upper())
 
-    @mock.patch("zvmsdk.database.FCPDbOperator.new")
-    def test_add_fcp_free(self, db_new):
-        # case1, status is free
-        info = ['opnstk1: FCP device number: 1234',
-                'opnstk1:   Status: Free',
-                'opnstk1:   NPIV world wide port number: 20076D8500005182',
-                'opnstk1:   Channel path ID: 59',
-                'opnstk1:   Physical world wide port number: 20076D8500005181']
-        try:
-            self.fcpops._fcp_pool['1234'] = volumeop.FCP(info)
-            self.fcpops._add_fcp('1234', 0)
-            db_new.assert_called_once_with('1234', 0)
-        finally:
-            self.db_op.delete('1234')
-            self.fcpops._fcp_pool.pop('1234')
-
-    @mock.patch("zvmsdk.database.FCPDbOperator.new")
-    def test_add_fcp_active(self, db_new):
-        info = ['opnstk1: FCP device number: 1234',
-                'opnstk1:   Status: Active',
-                'opnstk1:   NPIV world wide port number: 20076D8500005182',
-                'opnstk1:   Channel path ID: 59',
-                'opnstk1:   Physical world wide port number: 20076D8500005181']
-        try:
-            self.fcpops._fcp_pool['1234'] = volumeop.FCP(info)
-            self.fcpops._add_fcp('1234', 1)
-            self.assertFalse(db_new.called)
-        finally:
-            self.fcpops._fcp_pool.pop('1234')
-
-    @mock.patch("zvmsdk.database.FCPDbOperator.update_path_of_fcp")
     @mock.patch("zvmsdk.volumeop.FCPManager._get_all_fcp_info")
-    @mock.patch("zvmsdk.volumeop.FCPManager._add_fcp")
-    def test_sync_db_fcp_list_path_update(self, mock_add, mock_get,
-                                          update_path):
+    def test_sync_db_fcp_list_path_update(self, mock_get):
 
         fcp_list = ['opnstk1: FCP device number: B83D',
                     'opnstk1:   Status: Free',
@@ -483,18 +495,19 @@ class TestFCPManager(base.SDKTestCase):
 
         try:
             self.fcpops._sync_db_fcp_list()
-            # the path id of c83d will be changed
-            update_path.assert_has_calls([mock.call('b83d', 0)])
-            # c83d is not in DB
-            mock_add.assert_has_calls([mock.call('c83d', 1)])
+            # a83d is not in fcp_list and not reserved, so it is removed
+            self.assertEqual([], self.db_op.get_from_fcp('a83d'))
+            # the path id of b83d will be changed
+            self.assertEqual(0, self.db_op.get_from_fcp('b83d')[0][4])
+            # c83d is not in DB, but it is not added for it is active
+            self.assertEqual([], self.db_op.get_from_fcp('c83d'))
         finally:
             self.db_op.delete('a83d')
             self.db_op.delete('b83d')
 
     @mock.patch("zvmsdk.volumeop.FCPManager._get_all_fcp_info")
-    @mock.patch("zvmsdk.volumeop.FCPManager._report_orphan_fcp")
-    @mock.patch("zvmsdk.volumeop.FCPManager._add_fcp")
-    def test_sync_db_fcp_list(self, mock_add, mock_report, mock_get):
+    @mock.patch("zvmsdk.database.FCPDbOperator.sync_fcp_list")
+    def test_sync_db_fcp_list(self, sync_fcp_list, mock_get):
 
         fcp_list = ['opnstk1: FCP device number: B83D',
                     'opnstk1:   Status: Free',
@@ -511,7 +524,7 @@ class TestFCPManager(base.SDKTestCase):
                     'opnstk1:   Physical world wide port number: '
                     '20076D8500005185',
                     'opnstk1: FCP device number: B83F',
-                    'opnstk1:   Status: Active',
+                    'opnstk1:   Status: Free',
                     'opnstk1:   NPIV world wide port number: '
                     '20076D8500005183',
                     'opnstk1:   Channel path ID: 50',
@@ -552,10 +565,10 @@ class TestFCPManager(base.SDKTestCase):
 
         try:
             self.fcpops._sync_db_fcp_list()
-            # b83c is not in fcp_list
-            mock_report.assert_called_once_with('b83c')
-            # b83f is not in DB
-            mock_add.assert_called_once_with('b83f', 0)
+            # b83f is not in DB and b83c is not in fcp_list, they are
+            # reconciled in one call
+            sync_fcp_list.assert_called_once_with([('b83f', 0)], [],
+                                                  ['b83c'])
         finally:
             self.db_op.delete('b83c')
             self.db_op.delete('b83d')
@@ -565,6 +578,56 @@ class TestFCPManager(base.SDKTestCase):
             self.db_op.delete('c83e')
             self.db_op.delete('c83f')
 
+    @mock.patch("zvmsdk.volumeop.FCPManager._sync_db_fcp_list")
+    @mock.patch("zvmsdk.volumeop.FCPManager._get_all_fcp_info")
+    def test_init_fcp_cached(self, mock_get, mock_sync):
+        mock_get.return_value = ['opnstk1: FCP device number: B83D',
+                                 'opnstk1:   Status: Free',
+                                 'opnstk1:   NPIV world wide port number: '
+                                 '20076D8500005182',
+                                 'opnstk1:   Channel path ID: 59',
+                                 'opnstk1:   Physical world wide port number: '
+                                 '20076D8500005181']
+        base.set_conf('volume', 'fcp_list', 'b83d')
+        fcpops = volumeop.FCPManager()
+        try:
+            fcpops.init_fcp('fakeuser')
+            fcpops.init_fcp('fakeuser2')
+            self.assertEqual(1, mock_get.call_count)
+            self.assertEqual(1, mock_sync.call_count)
+            self.assertTrue('b83d' in fcpops._fcp_pool)
+            # the FCPs not in fcp_list are got from the cache too
+            self.assertTrue('b83d' in fcpops.get_all_fcp_pool('fakeuser'))
+            self.assertEqual(1, mock_get.call_count)
+
+            # refresh on demand
+            fcpops.init_fcp('fakeuser', refresh=True)
+            self.assertEqual(2, mock_get.call_count)
+            fcpops.invalidate_fcp_topology()
+            fcpops.init_fcp('fakeuser')
+            self.assertEqual(3, mock_get.call_count)
+
+            # change of fcp_list makes the cache invalid
+            base.set_conf('volume', 'fcp_list', 'b83d-b83e')
+            fcpops.init_fcp('fakeuser')
+            self.assertEqual(4, mock_get.call_count)
+
+            # the cache is disabled by 0 interval
+            base.set_conf('volume', 'fcp_topology_refresh_interval', 0)
+            fcpops.init_fcp('fakeuser')
+            fcpops.init_fcp('fakeuser')
+            self.assertEqual(6, mock_get.call_count)
+        finally:
+            base.set_conf('volume', 'fcp_list', '')
+            base.set_conf('volume', 'fcp_topology_refresh_interval', 600)
+
+    @mock.patch("zvmsdk.hostops.HOSTOps.get_static_info")
+    def test_get_zvm_host(self, get_static_info):
+        get_static_info.return_value = {'zvm_host': 'fakehost'}
+        fcpops = volumeop.FCPManager()
+        self.assertEqual('fakehost', fcpops.get_zvm_host())
+        get_static_info.assert_called_once_with()
+
     @mock.patch("zvmsdk.volumeop.FCPManager._list_fcp_details")
     def test_get_all_fcp_info(self, list_details):
         list_details.return_value = []
@@ -613,22 +676,6 @@ class TestFCPManager(base.SDKTestCase):
                                                         '283c').upper()
         self.assertEqual('20076D8500005185', wwpn)
 
-    @mock.patch("zvmsdk.database.FCPDbOperator.delete")
-    @mock.patch("zvmsdk.database.FCPDbOperator.is_reserved")
-    def test_report_orphan_fcp_unreserved(self, is_reserved, db_delete):
-        # self.db_op.new('x001', 0)
-        is_reserved.return_value = False
-        self.fcpops._report_orphan_fcp('x001')
-        self.assertTrue(db_delete.called)
-
-    @mock.patch("zvmsdk.database.FCPDbOperator.delete")
-    @mock.patch("zvmsdk.database.FCPDbOperator.is_reserved")
-    def test_report_orphan_fcp_reserved(self, is_reserved, db_delete):
-        # self.db_op.new('x001', 0)
-        is_reserved.return_value = True
-        self.fcpops._report_orphan_fcp('x001')
-        self.assertFalse(db_delete.called)
-
     def test_add_fcp_for_assigner(self):
         # create 2 FCP
         self.db_op.new('a83c', 0)
@@ -805,11 +852,16 @@ class TestFCPVolumeManager(base.SDKTestCase):
         cls.volumeops = volumeop.FCPVolumeManager()
         cls.db_op = database.FCPDbOperator()
 
+    def setUp(self):
+        super(TestFCPVolumeManager, self).setUp()
+        # every case discovers the FCP topology it mocks
+        self.volumeops.fcp_mgr.invalidate_fcp_topology()
+
     # tearDownClass deleted to work around bug of 'no such table:fcp'
 
-    @mock.patch("zvmsdk.smtclient.SMTClient.get_host_info")
+    @mock.patch("zvmsdk.hostops.HOSTOps.get_static_info")
     @mock.patch("zvmsdk.volumeop.FCPManager._get_all_fcp_info")
-    def test_get_volume_connector(self, get_fcp_info, get_host_info):
+    def test_get_volume_connector(self, get_fcp_info, get_static_info):
         fcp_info = ['fakehost: FCP device number: B83C',
                     'fakehost:   Status: Free',
                     'fakehost:   NPIV world wide port number: '
@@ -819,7 +871,7 @@ class TestFCPVolumeManager(base.SDKTestCase):
                     '20076D8500005181']
 
         get_fcp_info.return_value = fcp_info
-        get_host_info.return_value = {'zvm_host': 'fakehost'}
+        get_static_info.return_value = {'zvm_host': 'fakehost'}
         base.set_conf('volume', 'fcp_list', 'b83c')
         # assign FCP
         self.db_op.new('b83c', 0)
@@ -1222,6 +1274,174 @@ class TestFCPVolumeManager(base.SDKTestCase):
         finally:
             self.db_op.delete('283c')
 
+    def _get_bulk_connection(self, assigner_id, fcps, lun,
+                             is_root_volume=False):
+        return {'os_version': 'rhel7',
+                'multipath': 'true',
+                'target_wwpn': ['20076D8500005182'],
+                'target_lun': lun,
+                'zvm_fcp': fcps,
+                'mount_point': '/dev/sd%s' % lun[-1],
+                'assigner_id': assigner_id,
+                'is_root_volume': is_root_volume}
+
+    @mock.patch("zvmsdk.volumeop.FCPManager.init_fcp")
+    @mock.patch("zvmsdk.utils.check_userid_exist")
+    @mock.patch("zvmsdk.volumeop.VolumeConfiguratorAPI.config_attach_batch")
+    @mock.patch("zvmsdk.volumeop.FCPVolumeManager._dedicate_fcp")
+    def test_attach_bulk(self, mock_dedicate, mock_config, mock_check,
+                         mock_init):
+        connection_infos = [
+            self._get_bulk_connection('user1', ['C123', 'D123'], '1111'),
+            self._get_bulk_connection('user2', ['c124'], '2222'),
+            self._get_bulk_connection('user1', ['c123', 'd123'], '3333')]
+        mock_check.return_value = True
+        mock_config.side_effect = lambda userid, volumes: [None] * len(
+            volumes)
+        for fcp in ('c123', 'd123', 'c124'):
+            self.db_op.new(fcp, 0)
+
+        try:
+            results = self.volumeops.attach_bulk(connection_infos)
+            self.assertEqual(['success'] * 3,
+                             [r['result'] for r in results])
+            self.assertEqual(['USER1', 'USER2', 'USER1'],
+                             [r['assigner_id'] for r in results])
+            self.assertEqual(['1111', '2222', '3333'],
+                             [r['target_lun'] for r in results])
+            # the FCP devices are dedicated only once
+            self.assertEqual(3, mock_dedicate.call_count)
+            mock_dedicate.assert_has_calls([mock.call('c123', 'USER1'),
+                                            mock.call('d123', 'USER1'),
+                                            mock.call('c124', 'USER2')],
+                                           any_order=True)
+            # one batch of configuration for each guest
+            self.assertEqual(2, mock_config.call_count)
+            configured = dict((c[0][0], [v['target_lun'] for v in c[0][1]])
+                              for c in mock_config.call_args_list)
+            self.assertEqual({'USER1': ['1111', '3333'],
+                              'USER2': ['2222']}, configured)
+            self.assertEqual(2, self.db_op.get_connections_from_fcp('c123'))
+        finally:
+            for fcp in ('c123', 'd123', 'c124'):
+                self.db_op.delete(fcp)
+
+    @mock.patch("zvmsdk.volumeop.FCPManager.init_fcp")
+    @mock.patch("zvmsdk.utils.check_userid_exist")
+    @mock.patch("zvmsdk.volumeop.VolumeConfiguratorAPI.config_attach_batch")
+    @mock.patch("zvmsdk.volumeop.FCPVolumeManager._undedicate_fcp")
+    @mock.patch("zvmsdk.volumeop.FCPVolumeManager._dedicate_fcp")
+    def test_attach_bulk_rollback(self, mock_dedicate, mock_undedicate,
+                                  mock_config, mock_check, mock_init):
+        connection_infos = [
+            self._get_bulk_connection('user1', ['c123'], '1111'),
+            self._get_bulk_connection('user1', ['c124'], '2222'),
+            self._get_bulk_connection('user1', ['c123'], '3333')]
+        mock_check.return_value = True
+
+        def _dedicate(fcp, userid):
+            if fcp == 'c124':
+                raise exception.SDKSMTRequestFailed({}, 'dedicate failed')
+
+        mock_dedicate.side_effect = _dedicate
+        mock_config.return_value = [None, 'attach script failed']
+        self.db_op.new('c123', 0)
+        self.db_op.new('c124', 0)
+
+        try:
+            results = self.volumeops.attach_bulk(connection_infos)
+            self.assertEqual(['success', 'failed', 'failed'],
+                             [r['result'] for r in results])
+            self.assertIn('dedicate failed', results[1]['errmsg'])
+            self.assertEqual('attach script failed', results[2]['errmsg'])
+            # the volume failed to dedicate FCP is not configured
+            volumes = mock_config.call_args[0][1]
+            self.assertEqual(['1111', '3333'],
+                             [v['target_lun'] for v in volumes])
+            # the connections of failed volumes are rolled back
+            self.assertEqual(1, self.db_op.get_connections_from_fcp('c123'))
+            self.assertEqual(0, self.db_op.get_connections_from_fcp('c124'))
+            mock_undedicate.assert_called_once_with('c124', 'USER1')
+        finally:
+            self.db_op.delete('c123')
+            self.db_op.delete('c124')
+
+    @mock.patch("zvmsdk.volumeop.FCPManager.init_fcp")
+    @mock.patch("zvmsdk.utils.check_userid_exist")
+    @mock.patch("zvmsdk.volumeop.VolumeConfiguratorAPI.config_attach_batch")
+    @mock.patch("zvmsdk.volumeop.FCPVolumeManager._undedicate_fcp")
+    @mock.patch("zvmsdk.volumeop.FCPVolumeManager._dedicate_fcp")
+    def test_attach_bulk_add_usage_failed(self, mock_dedicate,
+                                          mock_undedicate, mock_config,
+                                          mock_check, mock_init):
+        connection_infos = [
+            self._get_bulk_connection('user1', ['c123'], '1111'),
+            self._get_bulk_connection('user1', ['c123', 'c124'], '2222')]
+        mock_check.return_value = True
+        add_fcp = volumeop.FCPManager.add_fcp_for_assigner
+
+        def _add_fcp(fcp_mgr, fcp, assigner_id=None):
+            if fcp == 'c124':
+                raise exception.SDKObjectNotExistError(
+                    obj_desc='FCP c124', modID='volume')
+            return add_fcp(fcp_mgr, fcp, assigner_id)
+
+        self.db_op.new('c123', 0)
+        try:
+            with mock.patch.object(volumeop.FCPManager,
+                                   'add_fcp_for_assigner', autospec=True,
+                                   side_effect=_add_fcp):
+                results = self.volumeops.attach_bulk(connection_infos)
+            self.assertEqual(['failed', 'failed'],
+                             [r['result'] for r in results])
+            self.assertIn('FCP c124', results[0]['errmsg'])
+            # the usage added before the failure is undone
+            self.assertEqual(0, self.db_op.get_connections_from_fcp('c123'))
+            mock_dedicate.assert_not_called()
+            mock_config.assert_not_called()
+        finally:
+            self.db_op.delete('c123')
+
+    @mock.patch("zvmsdk.utils.check_userid_exist")
+    @mock.patch("zvmsdk.volumeop.VolumeConfiguratorAPI.config_attach_batch")
+    @mock.patch("zvmsdk.volumeop.VolumeConfiguratorAPI.config_detach_batch")
+    @mock.patch("zvmsdk.volumeop.FCPVolumeManager._undedicate_fcp")
+    def test_detach_bulk(self, mock_undedicate, mock_config,
+                         mock_config_attach, mock_check):
+        connection_infos = [
+            self._get_bulk_connection('user1', ['c123'], '1111'),
+            self._get_bulk_connection('user1', ['c123'], '2222'),
+            self._get_bulk_connection('user1', ['c124'], '3333'),
+            self._get_bulk_connection('user1', ['c125'], '4444')]
+        mock_check.return_value = True
+        mock_config.return_value = [None, None, None, 'device in use']
+        for fcp in ('c123', 'c124', 'c125'):
+            self.db_op.new(fcp, 0)
+        self.db_op.assign('c123', 'user1')
+        self.db_op.increase_usage('c123')
+        self.db_op.assign('c124', 'user1')
+        self.db_op.assign('c125', 'user1')
+
+        try:
+            results = self.volumeops.detach_bulk(connection_infos)
+            self.assertEqual(['success', 'success', 'success', 'failed'],
+                             [r['result'] for r in results])
+            # the detach scripts know the connections left on FCP
+            volumes = mock_config.call_args[0][1]
+            self.assertEqual([1, 0, 0, 0],
+                             [v['connections'] for v in volumes])
+            # the FCP devices without volumes are undedicated once
+            self.assertEqual(2, mock_undedicate.call_count)
+            mock_undedicate.assert_has_calls([mock.call('c123', 'USER1'),
+                                              mock.call('c124', 'USER1')])
+            # the failed volume is rolled back
+            self.assertEqual(1, self.db_op.get_connections_from_fcp('c125'))
+            volumes = mock_config_attach.call_args[0][1]
+            self.assertEqual(['4444'], [v['target_lun'] for v in volumes])
+        finally:
+            for fcp in ('c123', 'c124', 'c125'):
+                self.db_op.delete(fcp)
+
     def test_get_all_fcp_usage(self):
         self.db_op = database.FCPDbOperator()
         self.db_op.new('283c', 0)
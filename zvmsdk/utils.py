@@ -14,9 +14,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import bisect
 import contextlib
 import errno
 import functools
+import io
+import json
 import netaddr
 import os
 import pwd
@@ -26,10 +29,14 @@ import shutil
 import six
 import subprocess
 import sys
+import tarfile
 import tempfile
+import threading
 import time
 import traceback
 
+from six.moves import queue
+
 from zvmsdk import config
 from zvmsdk import constants
 from zvmsdk import exception
@@ -550,6 +557,47 @@ def make_dummy_image(image_path, d_type='CKD'):
         f.write(header.encode())
 
 
+class TarBuilder(object):
+    """Build a tar archive from generated contents without writing them
+    into files first.
+
+    The archive is kept in memory, and is spooled into a temporary file
+    only when it grows larger than max_size bytes.
+    """
+
+    def __init__(self, compress=False, max_size=4 * 1024 * 1024):
+        self._fileobj = tempfile.SpooledTemporaryFile(max_size=max_size)
+        self._tar = tarfile.open(fileobj=self._fileobj,
+                                 mode='w:gz' if compress else 'w')
+        self._mtime = time.time()
+
+    def add_dir(self, name, mode=0o755):
+        info = tarfile.TarInfo(name)
+        info.type = tarfile.DIRTYPE
+        info.mode = mode
+        info.mtime = self._mtime
+        self._tar.addfile(info)
+
+    def add_file(self, name, content, mode=0o644):
+        data = to_utf8(content)
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = mode
+        info.mtime = self._mtime
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def write(self, path):
+        """Finish the archive and write it into path."""
+        self._tar.close()
+        self._fileobj.seek(0)
+        try:
+            with open(path, 'wb') as f:
+                shutil.copyfileobj(self._fileobj, f)
+        finally:
+            self._fileobj.close()
+        return path
+
+
 @contextlib.contextmanager
 def acquire_lock(lock):
     """ lock wrapper """
@@ -560,6 +608,74 @@ def acquire_lock(lock):
         lock.release()
 
 
+def run_in_parallel(func, args_list, max_workers=1):
+    """Call func with each argument tuple in args_list by using at most
+    max_workers threads.
+
+    Return a list of (result, error) tuples in the same order as args_list,
+    error is the exception raised by that call, or None if it succeeded.
+    """
+    results = [None] * len(args_list)
+    tasks = queue.Queue()
+    for idx, args in enumerate(args_list):
+        tasks.put((idx, args))
+
+    def _worker():
+        while True:
+            try:
+                idx, args = tasks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[idx] = (func(*args), None)
+            except Exception as err:
+                results[idx] = (None, err)
+
+    worker_count = max(1, min(max_workers, len(args_list)))
+    workers = [threading.Thread(target=_worker) for i in range(worker_count)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def paginate(keys, limit=None, marker=None):
+    """Return the sorted keys after the marker, at most limit keys are
+    returned."""
+    keys = sorted(keys)
+    start = 0
+    if marker is not None:
+        start = bisect.bisect_right(keys, marker)
+    end = start + limit if limit else None
+    return keys[start:end]
+
+
+def select_fields(record, fields=None):
+    """Return the dict record with only the keys in fields, the record is
+    returned as is when fields is None."""
+    if fields is None:
+        return record
+    return dict((k, v) for k, v in record.items() if k in fields)
+
+
+def iter_json(data, chunk_size=65536):
+    """Encode data into JSON incrementally and yield the encoded bytes in
+    chunks of about chunk_size, so that a large result is never held in
+    memory as one encoded string."""
+    buf = []
+    size = 0
+    for piece in json.JSONEncoder().iterencode(data):
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buf).encode('utf-8')
+            buf = []
+            size = 0
+    if buf:
+        yield ''.join(buf).encode('utf-8')
+
+
 def check_userid_exist(userid, needLogon=False):
     """The successful output is: FBA0004  - DSC
     The successful output for device is (vmcp q 0100):
@@ -595,6 +711,32 @@ def check_userid_exist(userid, needLogon=False):
     return False
 
 
+def get_logged_on_users():
+    """Get the userids of all the guests logged on, in a set.
+
+    The output of 'vmcp q names' is like:
+    OPERATOR - SYSC    , DIRMAINT - DSC     , FTPSERVE - DSC
+    TEST0001 - DSC     , TEST0002 - SSI
+    VSM     - TCPIP
+    """
+    cmd = 'sudo /sbin/vmcp --buffer=1M q names'
+    rc, output = execute(cmd)
+    if rc != 0:
+        msg = "Failed to query logged on users, rc: %d, output: %s" % (
+            rc, output)
+        raise exception.SDKInternalError(msg=msg)
+
+    userids = set()
+    for line in output.splitlines():
+        if line.startswith('VSM'):
+            continue
+        for entry in line.split(','):
+            userid = entry.partition(' - ')[0].strip()
+            if userid:
+                userids.add(userid.upper())
+    return userids
+
+
 def check_userid_on_others(userid):
     try:
         check_userid_exist(userid)
@@ -16,6 +16,8 @@
 import os
 import six
 import shutil
+import threading
+import time
 
 from zvmsdk import config
 from zvmsdk import dist
@@ -23,6 +25,7 @@ from zvmsdk import exception
 from zvmsdk import log
 from zvmsdk import smtclient
 from zvmsdk import database
+from zvmsdk import statewatcher
 from zvmsdk import utils as zvmutils
 
 
@@ -42,16 +45,23 @@ class VMOps(object):
 
     def __init__(self):
         self._smtclient = smtclient.get_smtclient()
+        self._state_watcher = statewatcher.get_state_watcher()
         self._dist_manager = dist.LinuxDistManager()
         self._pathutils = zvmutils.PathUtils()
         self._namelist = zvmutils.get_namelist()
         self._GuestDbOperator = database.GuestDbOperator()
         self._ImageDbOperator = database.ImageDbOperator()
+        # destination -> semaphore of the relocations to it
+        self._migrate_lanes = {}
+        self._migrate_lanes_lock = threading.Lock()
 
     def get_power_state(self, userid):
         """Get power status of a z/VM instance."""
         return self._smtclient.get_power_state(userid)
 
+    def get_iucv_session_health(self, userid):
+        return self._smtclient.get_iucv_session_health(userid)
+
     def _get_cpu_num_from_user_dict(self, dict_info):
         cpu_num = 0
         for inf in dict_info:
@@ -115,20 +125,17 @@ class VMOps(object):
         return self._smtclient.get_guest_connection_status(userid)
 
     def wait_for_reachable(self, userid, timeout=CONF.guest.reachable_timeout):
-        """Return until guest reachable or timeout."""
-        def _check_reachable():
-            if not self.is_reachable(userid):
-                raise exception.SDKRetryException()
-        zvmutils.looping_call(_check_reachable, 5, 0, 5, timeout,
-                              exception.SDKRetryException)
+        """Return True when guest reachable, False when timeout."""
+        return self._state_watcher.wait_for(userid,
+                                            statewatcher.STATE_REACHABLE,
+                                            timeout)
 
     def guest_start(self, userid, timeout=0):
         """"Power on z/VM instance."""
         LOG.info("Begin to power on vm %s", userid)
         self._smtclient.guest_start(userid)
         if timeout > 0:
-            self.wait_for_reachable(userid, timeout)
-            if not self.is_reachable(userid):
+            if not self.wait_for_reachable(userid, timeout):
                 msg = ("compute node is not able to connect to the virtual "
                        "machine in %d seconds" % timeout)
                 raise exception.SDKGuestOperationError(rs=16, userid=userid,
@@ -142,7 +149,13 @@ class VMOps(object):
 
     def guest_softstop(self, userid, **kwargs):
         LOG.info("Begin to soft power off vm %s", userid)
-        self._smtclient.guest_softstop(userid, **kwargs)
+        timeout = kwargs.get('timeout') or CONF.guest.softstop_timeout
+        self._smtclient.guest_softstop(userid, wait=False)
+        if not self._state_watcher.wait_for(userid, statewatcher.STATE_OFF,
+                                            timeout):
+            raise exception.SDKGuestOperationError(rs=17, userid=userid,
+                                                   state='stopped',
+                                                   timeout=timeout)
         LOG.info("Complete soft power off vm %s", userid)
 
     def guest_pause(self, userid):
@@ -155,10 +168,15 @@ class VMOps(object):
         self._smtclient.guest_unpause(userid)
         LOG.info("Complete unpause vm %s", userid)
 
-    def guest_reboot(self, userid):
+    def guest_reboot(self, userid, timeout=0):
         """Reboot a guest vm."""
         LOG.info("Begin to reboot vm %s", userid)
         self._smtclient.guest_reboot(userid)
+        if timeout > 0:
+            if not self.wait_for_reachable(userid, timeout):
+                raise exception.SDKGuestOperationError(rs=17, userid=userid,
+                                                       state='reachable',
+                                                       timeout=timeout)
         LOG.info("Complete reboot vm %s", userid)
 
     def guest_reset(self, userid):
@@ -188,6 +206,128 @@ class VMOps(object):
             LOG.info("Testing the eligiblity of specific vm %s", userid)
             self._smtclient.live_migrate_test(userid, destination)
 
+    def _get_migrate_lane(self, destination):
+        with self._migrate_lanes_lock:
+            if destination not in self._migrate_lanes:
+                self._migrate_lanes[destination] = threading.Semaphore(
+                    CONF.guest.max_concurrent_live_migrate)
+            return self._migrate_lanes[destination]
+
+    def _live_migrate_move(self, userid, dest_zcc_userid, destination,
+                           parms, lane):
+        with lane:
+            # Add authorization for new zcc.
+            cmd = ('echo -n %s > /etc/iucv_authorized_userid\n' %
+                   dest_zcc_userid)
+            self._smtclient.execute_cmd(userid, cmd)
+            self._smtclient.live_migrate_move(userid, destination, parms)
+
+    def _log_live_migrate_progress(self, destination, total, timings):
+        moved = len([t for t in timings.values() if 'move' in t])
+        try:
+            status = self._smtclient.live_migrate_status()
+        except exception.SDKBaseException as err:
+            status = ["unknown: %s" % err.format_message()]
+        LOG.info("Live migrating guests to %s: %d of %d finished, the "
+                 "relocations in progress: %s", destination, moved, total,
+                 '; '.join(status) or 'none')
+
+    def live_migrate_bulk(self, userids, dest_zcc_userid, destination,
+                          parms, concurrency=None):
+        """Move the guests to destination. The eligibility of the guests is
+        tested in parallel, then the eligible guests are moved, at most
+        CONF.guest.max_concurrent_live_migrate guests are moved to the same
+        destination at the same time, and the guests moved are marked
+        migrated in database in one transaction."""
+        start = time.time()
+        errors = {}
+        timings = dict((userid, {}) for userid in userids)
+
+        def _timed(userid, step, func, *args):
+            step_start = time.time()
+            try:
+                return func(userid, *args)
+            finally:
+                timings[userid][step] = round(time.time() - step_start, 3)
+
+        def _run_step(candidates, step, results):
+            passed = []
+            for userid, (ret, err) in zip(candidates, results):
+                if err is None:
+                    passed.append(userid)
+                else:
+                    LOG.error("Failed to %s guest %s to %s: %s", step,
+                              userid, destination, err)
+                    errors[userid] = err
+            return passed
+
+        logged_on = zvmutils.get_logged_on_users()
+        to_test = []
+        for userid in userids:
+            if userid in logged_on:
+                to_test.append(userid)
+            else:
+                errors[userid] = exception.SDKConflictError(modID='guest',
+                                                            rs=1,
+                                                            userid=userid)
+
+        eligible = _run_step(to_test, 'test', zvmutils.run_in_parallel(
+            _timed, [(userid, 'test', self._smtclient.live_migrate_test,
+                      destination) for userid in to_test],
+            max_workers=CONF.sdkserver.max_worker_count))
+
+        lane = self._get_migrate_lane(destination)
+        workers = CONF.guest.max_concurrent_live_migrate
+        if concurrency:
+            workers = min(concurrency, workers)
+        move_results = []
+
+        def _move_all():
+            move_results.extend(zvmutils.run_in_parallel(
+                _timed, [(userid, 'move', self._live_migrate_move,
+                          dest_zcc_userid, destination, parms, lane)
+                         for userid in eligible],
+                max_workers=workers))
+
+        mover = threading.Thread(target=_move_all, name='LiveMigrateBulk')
+        mover.daemon = True
+        mover.start()
+        interval = CONF.guest.live_migrate_status_interval
+        if interval <= 0:
+            # the progress is not logged
+            mover.join()
+        while mover.is_alive():
+            mover.join(interval)
+            if not mover.is_alive():
+                break
+            self._log_live_migrate_progress(destination, len(eligible),
+                                            timings)
+        moved = _run_step(eligible, 'move', move_results)
+
+        if moved:
+            action = "mark guests %s migrated in database" % ', '.join(moved)
+            with zvmutils.log_and_reraise_sdkbase_error(action):
+                self._GuestDbOperator.update_guests_comments(
+                    moved, {'migrated': 1})
+
+        elapsed = round(time.time() - start, 3)
+        results = []
+        for userid in userids:
+            result = {'userid': userid, 'result': 'success', 'errmsg': '',
+                      'timings': timings[userid]}
+            if userid in errors:
+                result['result'] = 'failed'
+                result['errmsg'] = six.text_type(errors[userid])
+            results.append(result)
+        throughput = 0
+        if elapsed:
+            throughput = round(len(moved) * 60 / elapsed, 2)
+        LOG.info("Live migrated %d of %d guests to %s in %s seconds",
+                 len(moved), len(userids), destination, elapsed)
+        return {'results': results, 'moved': len(moved),
+                'failed': len(userids) - len(moved), 'elapsed': elapsed,
+                'throughput': throughput}
+
     def create_vm(self, userid, cpu, memory, disk_list,
                   user_profile, max_cpu, max_mem, ipl_from,
                   ipl_param, ipl_loadparam, dedicate_vdevs, loaddev, account,
@@ -206,6 +346,38 @@ class VMOps(object):
         self._smtclient.namelist_add(self._namelist, userid)
         return info
 
+    def create_vm_bulk(self, guests):
+        """Create the guests, return a list of the results in the order
+        of guests."""
+        LOG.info("Creating the user directory for vms %s",
+                 ', '.join(guest['userid'] for guest in guests))
+        results = self._smtclient.create_vms(guests)
+
+        created = [guest['userid'] for guest, (disks, err, timings)
+                   in zip(guests, results) if err is None]
+        start = time.time()
+        # add userids into smapi namelist
+        zvmutils.run_in_parallel(
+            self._smtclient.namelist_add,
+            [(self._namelist, userid) for userid in created],
+            max_workers=CONF.guest.max_concurrent_guest_create)
+        namelist_time = round(time.time() - start, 3)
+
+        bulk_results = []
+        for guest, (disks, err, timings) in zip(guests, results):
+            result = {'userid': guest['userid'], 'result': 'success',
+                      'errmsg': '', 'disk_list': disks or [],
+                      'timings': timings}
+            if err is None:
+                timings['namelist'] = namelist_time
+            else:
+                LOG.error("Failed to create guest %s: %s",
+                          guest['userid'], err)
+                result['result'] = 'failed'
+                result['errmsg'] = six.text_type(err)
+            bulk_results.append(result)
+        return bulk_results
+
     def create_disks(self, userid, disk_list):
         LOG.info("Beging to create disks for vm: %(userid)s, list: %(list)s",
                  {'userid': userid, 'list': disk_list})
@@ -277,11 +449,85 @@ class VMOps(object):
         self._smtclient.delete_vm(userid)
         LOG.info("Complete delete vm %s", userid)
 
+    def delete_vm_bulk(self, userids):
+        """Delete the guests, return a list of the results in the order
+        of userids. A guest which does not exist is reported deleted."""
+        in_db = (set(self.guest_list()) -
+                 set(self._GuestDbOperator.get_migrated_guest_list()))
+        errors = {}
+        to_delete = []
+        for userid in userids:
+            if userid in in_db:
+                to_delete.append(userid)
+            elif zvmutils.check_userid_exist(userid):
+                LOG.error("Guest '%s' does not exist in guests database" %
+                          userid)
+                errors[userid] = exception.SDKObjectNotExistError(
+                    obj_desc=("Guest '%s'" % userid), modID='guest')
+            else:
+                LOG.debug("The guest %s does not exist." % userid)
+
+        LOG.info("Begin to delete vms %s", ', '.join(to_delete))
+        results = dict(zip(to_delete, self._smtclient.delete_vms(to_delete)))
+
+        bulk_results = []
+        for userid in userids:
+            err, timings = results.get(userid, (errors.get(userid), {}))
+            result = {'userid': userid, 'result': 'success', 'errmsg': '',
+                      'timings': timings}
+            if err is not None:
+                LOG.error("Failed to delete guest %s: %s", userid, err)
+                result['result'] = 'failed'
+                result['errmsg'] = six.text_type(err)
+            bulk_results.append(result)
+        return bulk_results
+
     def execute_cmd(self, userid, cmdStr):
         """Execute commands on the guest vm."""
         LOG.debug("executing cmd: %s", cmdStr)
         return self._smtclient.execute_cmd(userid, cmdStr)
 
+    def _execute_cmd_timed(self, userid, cmdStr, timeout):
+        start = time.time()
+        results = self._smtclient.execute_cmd_direct(userid, cmdStr,
+                                                     timeout=timeout)
+        errmsg = ''
+        if results['overallRC'] != 0:
+            # the error messages of a failed command are in the response
+            errmsg = (results.get('strError') or
+                      '\n'.join(results['response']))
+        return {'userid': userid,
+                'overallRC': results['overallRC'],
+                'rc': results['rc'],
+                'rs': results['rs'],
+                'output': results['response'],
+                'errmsg': errmsg,
+                'duration': round(time.time() - start, 3)}
+
+    def execute_cmd_bulk(self, userid_list, cmdStr, concurrency=None,
+                         timeout=None):
+        """Execute the command on the guests in parallel, at most
+        concurrency guests are handled at a time."""
+        max_workers = CONF.sdkserver.max_worker_count
+        if concurrency:
+            max_workers = min(concurrency, max_workers)
+        LOG.debug("executing cmd on %d guests with %d workers: %s",
+                  len(userid_list), max_workers, cmdStr)
+        results = zvmutils.run_in_parallel(
+            self._execute_cmd_timed,
+            [(userid, cmdStr, timeout) for userid in userid_list],
+            max_workers=max_workers)
+        bulk_results = []
+        for userid, (result, err) in zip(userid_list, results):
+            if err is not None:
+                LOG.error("Failed to execute cmd on guest %s: %s",
+                          userid, err)
+                result = {'userid': userid, 'overallRC': 4, 'rc': 4,
+                          'rs': 0, 'output': [], 'errmsg': str(err),
+                          'duration': 0}
+            bulk_results.append(result)
+        return bulk_results
+
     def set_hostname(self, userid, hostname, os_version):
         """Punch a script that used to set the hostname of the guest.
 
@@ -400,6 +646,58 @@ class VMOps(object):
         LOG.info("Complete get console output on vm %s", userid)
         return log_data
 
+    def _read_console_log(self, userid, cursor=None):
+        """Read the console log of the guest after the cursor, which is an
+        offset in the log file. At most console_log_size kilobytes at the
+        end of the log are read.
+
+        Return a tuple of (log data, new cursor, number of bytes skipped).
+        """
+        log_size = CONF.guest.console_log_size * 1024
+        log_path = self._pathutils.get_console_log_path(userid)
+        if not os.path.exists(log_path):
+            return ('', 0, 0)
+
+        with open(log_path, 'rb') as log_fp:
+            log_fp.seek(0, os.SEEK_END)
+            end = log_fp.tell()
+            if cursor is None or cursor > end:
+                # a cursor beyond the end is from a log that was recreated
+                cursor = 0
+            start = max(cursor, end - log_size)
+            log_fp.seek(start)
+            log_data = log_fp.read(end - start)
+        return (log_data.decode('utf-8', 'replace'), end, start - cursor)
+
+    def get_console_output_bulk(self, userid_list, cursors=None):
+        """Collect the console output of the guests and return the log of
+        each guest after its cursor."""
+        cursors = cursors or {}
+        LOG.info("Begin to capture console log on vms %s",
+                 ', '.join(userid_list))
+        collected = self._smtclient.get_users_console_output(userid_list)
+
+        results = {}
+        for userid in userid_list:
+            console_log, err = collected[userid]
+            # the spool files received are gone from the reader, so the
+            # output got before an error is kept too
+            if console_log:
+                log_path = self._pathutils.get_console_log_path(userid)
+                with open(log_path, 'a+') as fp:
+                    fp.write(console_log)
+            if err is not None:
+                LOG.error("Failed to get console output of vm %s: %s",
+                          userid, err)
+            log_data, cursor, skipped = self._read_console_log(
+                userid, cursors.get(userid))
+            results[userid] = {'output': log_data, 'cursor': cursor,
+                               'skipped': skipped,
+                               'errmsg': '' if err is None else str(err)}
+        LOG.info("Complete get console output on vms %s",
+                 ', '.join(userid_list))
+        return results
+
     def check_guests_exist_in_db(self, userids, raise_exc=True):
         if not isinstance(userids, list):
             # convert userid string to list
@@ -461,6 +759,62 @@ class VMOps(object):
 
         LOG.info("Complete live resize cpu on vm %s", userid)
 
+    def live_resize(self, userid, cpu_cnt=None, memory=None):
+        # Check power state is 'on'
+        state = self.get_power_state(userid)
+        if state != 'on':
+            LOG.error("Failed to live resize guest %s, error: "
+                      "guest is inactive, cann't perform live resize." %
+                      userid)
+            raise exception.SDKConflictError(modID='guest', rs=1,
+                                             userid=userid)
+        timings = self._smtclient.live_resize(userid, cpu_cnt=cpu_cnt,
+                                              memory=memory)
+        LOG.info("Complete live resize on vm %s", userid)
+        return timings
+
+    def live_resize_bulk(self, resizes):
+        """Live resize the guests in parallel, return a list of the
+        results in the order of resizes."""
+        logged_on = zvmutils.get_logged_on_users()
+        results = [None] * len(resizes)
+        to_resize = []
+        for index, resize in enumerate(resizes):
+            if resize['userid'] in logged_on:
+                to_resize.append(index)
+            else:
+                err = exception.SDKConflictError(modID='guest', rs=1,
+                                                 userid=resize['userid'])
+                results[index] = (None, err)
+        # read the directory entries of all the guests at once, each resize
+        # then finds its defined cpus and memory in the cache
+        failed = self._smtclient.prefetch_user_direct(
+            [resizes[index]['userid'] for index in to_resize])
+        for index in list(to_resize):
+            err = failed.get(resizes[index]['userid'].upper())
+            if err is not None:
+                results[index] = (None, err)
+                to_resize.remove(index)
+        resize_results = zvmutils.run_in_parallel(
+            self._smtclient.live_resize,
+            [(resizes[index]['userid'], resizes[index].get('cpu_cnt'),
+              resizes[index].get('memory')) for index in to_resize],
+            max_workers=CONF.sdkserver.max_worker_count)
+        for index, result in zip(to_resize, resize_results):
+            results[index] = result
+
+        bulk_results = []
+        for resize, (timings, err) in zip(resizes, results):
+            result = {'userid': resize['userid'], 'result': 'success',
+                      'errmsg': '', 'timings': timings or {}}
+            if err is not None:
+                LOG.error("Failed to live resize guest %s: %s",
+                          resize['userid'], err)
+                result['result'] = 'failed'
+                result['errmsg'] = six.text_type(err)
+            bulk_results.append(result)
+        return bulk_results
+
     def resize_cpus(self, userid, count):
         LOG.info("Begin to resize cpu on vm %s", userid)
         # Do resize
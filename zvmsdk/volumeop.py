@@ -14,16 +14,19 @@
 
 
 import abc
+import collections
 import re
 import shutil
 import six
 import threading
+import time
 import os
 
 from zvmsdk import config
 from zvmsdk import database
 from zvmsdk import dist
 from zvmsdk import exception
+from zvmsdk import hostops
 from zvmsdk import log
 from zvmsdk import smtclient
 from zvmsdk import utils as zvmutils
@@ -47,6 +50,9 @@ PROTOCOL = 'protocol'
 FCPS = 'fcps'
 WWPNS = 'wwpns'
 DEDICATE = 'dedicate'
+# the file in the guest to store the exit codes of the batch volume
+# configuration scripts
+VOLUME_BATCH_STATUS_FILE = '/var/log/zvmsdk_volume_batch.status'
 
 
 def get_volumeop():
@@ -86,6 +92,12 @@ class VolumeOperatorAPI(object):
     def detach_volume_from_instance(self, connection_info):
         self._volume_manager.detach(connection_info)
 
+    def attach_volumes_to_instances(self, connection_infos):
+        return self._volume_manager.attach_bulk(connection_infos)
+
+    def detach_volumes_from_instances(self, connection_infos):
+        return self._volume_manager.detach_bulk(connection_infos)
+
     def volume_refresh_bootmap(self, fcpchannel, wwpn, lun,
                                transportfiles='', guest_networks=None):
         return self._volume_manager.volume_refresh_bootmap(fcpchannel, wwpn,
@@ -244,6 +256,137 @@ class VolumeConfiguratorAPI(object):
                  "%s is done." % (target_wwpns, target_lun, assigner_id,
                                   fcp_list))
 
+    def _run_batch_scripts(self, assigner_id, linuxdist, scripts,
+                           file_name):
+        """Punch the volume configuration scripts as one file and run it
+        by one start of zvmguestconfigure.
+
+        Returns the list of the exit codes of the scripts, or None if the
+        guest is not reachable, in which case the scripts will be run on
+        its next start.
+        """
+        batch_cmds = linuxdist.get_volume_batch_configuration_cmds(
+            scripts, VOLUME_BATCH_STATUS_FILE)
+        config_file, config_file_path = self._create_file(assigner_id,
+                                                          file_name,
+                                                          batch_cmds)
+        try:
+            self._smtclient.punch_file(assigner_id, config_file, "X")
+        finally:
+            LOG.debug('Removing the folder %s ', config_file_path)
+            shutil.rmtree(config_file_path)
+
+        if not self.check_IUCV_is_ready(assigner_id):
+            return None
+        # active mode should restart zvmguestconfigure to run reader file
+        active_cmds = linuxdist.create_active_net_interf_cmd()
+        ret = self._smtclient.execute_cmd_direct(assigner_id, active_cmds)
+        LOG.debug('batch volume scripts return values: %s' % ret)
+        if ret['rc'] == 0:
+            return [0] * len(scripts)
+
+        exit_codes = [None] * len(scripts)
+        try:
+            output = self._smtclient.execute_cmd(
+                assigner_id, 'cat %s' % VOLUME_BATCH_STATUS_FILE)
+            for line in output:
+                index, exit_code = line.split()
+                exit_codes[int(index)] = int(exit_code)
+        except Exception as err:
+            LOG.warning("Failed to get the exit codes of the volume scripts "
+                        "from %s: %s" % (assigner_id, six.text_type(err)))
+        if None in exit_codes:
+            # the scripts without status are deemed to fail in the same way
+            # as zvmguestconfigure
+            get_status_cmd = 'systemctl status zvmguestconfigure.service'
+            exit_code = self._get_status_code_from_systemctl(
+                assigner_id, get_status_cmd) or 1
+            exit_codes = [exit_code if code is None else code
+                          for code in exit_codes]
+        return exit_codes
+
+    def config_attach_batch(self, assigner_id, volumes):
+        """Configure the volumes on the target machine by one punched
+        script and one start of zvmguestconfigure.
+
+        :param volumes: list of dicts with the keys fcp_list, target_wwpns,
+            target_lun, multipath, os_version and mount_point.
+        :returns: list of error messages in the order of volumes, None for
+            the volumes configured successfully.
+        """
+        LOG.info("Begin to configure %d volumes on the target machine %s."
+                 % (len(volumes), assigner_id))
+        linuxdist = self._dist_manager.get_linux_dist(
+            volumes[0]['os_version'])()
+        scripts = [linuxdist.get_volume_attach_configuration_cmds(
+                       v['fcp_list'], v['target_wwpns'], v['target_lun'],
+                       v['multipath'], v['mount_point']) for v in volumes]
+        exit_codes = self._run_batch_scripts(assigner_id, linuxdist, scripts,
+                                             'atvol.sh')
+        errors = []
+        for volume, exit_code in zip(volumes, exit_codes or
+                                     [0] * len(volumes)):
+            errmsg = None
+            if exit_code == 1:
+                errmsg = ('attach script execution failed because the '
+                          'volume (WWPN:%s, LUN:%s) did not show up in '
+                          'the target machine %s , please check its '
+                          'connections.' % (volume['target_wwpns'],
+                                            volume['target_lun'],
+                                            assigner_id))
+            elif exit_code:
+                errmsg = ('attach script execution in the target machine '
+                          '%s for volume (WWPN:%s, LUN:%s) '
+                          'failed with unknown reason, exit code is: %s.'
+                          % (assigner_id, volume['target_wwpns'],
+                             volume['target_lun'], exit_code))
+            if errmsg:
+                LOG.error(errmsg)
+            errors.append(errmsg)
+        LOG.info("Configuration of %d volumes on the target machine %s is "
+                 "done." % (len(volumes), assigner_id))
+        return errors
+
+    def config_detach_batch(self, assigner_id, volumes):
+        """Deconfigure the volumes on the target machine by one punched
+        script and one start of zvmguestconfigure.
+
+        :param volumes: list of dicts with the keys of config_attach_batch
+            and connections, the connections left on the FCP devices after
+            the volume is detached.
+        :returns: list of error messages in the order of volumes, None for
+            the volumes deconfigured successfully.
+        """
+        LOG.info("Begin to deconfigure %d volumes on the target machine %s."
+                 % (len(volumes), assigner_id))
+        linuxdist = self._dist_manager.get_linux_dist(
+            volumes[0]['os_version'])()
+        scripts = [linuxdist.get_volume_detach_configuration_cmds(
+                       v['fcp_list'], v['target_wwpns'], v['target_lun'],
+                       v['multipath'], v['mount_point'], v['connections'])
+                   for v in volumes]
+        exit_codes = self._run_batch_scripts(assigner_id, linuxdist, scripts,
+                                             'devol.sh')
+        errors = []
+        for volume, exit_code in zip(volumes, exit_codes or
+                                     [0] * len(volumes)):
+            errmsg = None
+            if exit_code == 1:
+                errmsg = ('detach scripts execution failed because the '
+                          'device %s in the target virtual machine %s '
+                          'is in use.' % (volume['fcp_list'], assigner_id))
+            elif exit_code:
+                errmsg = ('detach scripts execution on fcp %s in the '
+                          'target virtual machine %s failed '
+                          'with unknow reason, exit code is: %s'
+                          % (volume['fcp_list'], assigner_id, exit_code))
+            if errmsg:
+                LOG.error(errmsg)
+            errors.append(errmsg)
+        LOG.info("Deconfiguration of %d volumes on the target machine %s is "
+                 "done." % (len(volumes), assigner_id))
+        return errors
+
     def _create_file(self, assigner_id, file_name, data):
         temp_folder = self._smtclient.get_guest_temp_path(assigner_id)
         file_path = os.path.join(temp_folder, file_name)
@@ -378,11 +521,22 @@ class FCPManager(object):
         self._fcp_pool = {}
         # _fcp_path_info store the FCP path mapping index by path no
         self._fcp_path_mapping = {}
+        # _all_fcp_pool store the objects of all the FCP found on the host
+        self._all_fcp_pool = {}
+        # the FCP topology above is discovered for _topology_fcp_list at
+        # _topology_time
+        self._topology_fcp_list = None
+        self._topology_time = None
+        self._topology_lock = threading.RLock()
         self.db = database.FCPDbOperator()
         self._smtclient = smtclient.get_smtclient()
 
-    def init_fcp(self, assigner_id):
-        """init_fcp to init the FCP managed by this host"""
+    def init_fcp(self, assigner_id, refresh=False):
+        """init_fcp to init the FCP managed by this host
+
+        The FCP topology is discovered from z/VM only when it is expired,
+        CONF.volume.fcp_list is changed or refresh is True.
+        """
         # TODO master_fcp_list (zvm_zhcp_fcp_list) really need?
         fcp_list = CONF.volume.fcp_list
         if fcp_list == '':
@@ -391,8 +545,28 @@ class FCPManager(object):
             LOG.info(errmsg)
             return
 
-        self._init_fcp_pool(fcp_list, assigner_id)
-        self._sync_db_fcp_list()
+        with zvmutils.acquire_lock(self._topology_lock):
+            if (not refresh and fcp_list == self._topology_fcp_list and
+                    self._is_topology_valid()):
+                return
+            self._init_fcp_pool(fcp_list, assigner_id)
+            self._sync_db_fcp_list()
+            self._topology_fcp_list = fcp_list
+            self._topology_time = time.time()
+
+    def _is_topology_valid(self):
+        return (self._topology_time is not None and
+                time.time() - self._topology_time <
+                CONF.volume.fcp_topology_refresh_interval)
+
+    def invalidate_fcp_topology(self):
+        """Make the next init_fcp discover the FCP topology again."""
+        with zvmutils.acquire_lock(self._topology_lock):
+            self._topology_time = None
+
+    def get_zvm_host(self):
+        """Get the name of the z/VM host from the cached host facts."""
+        return hostops.get_hostops().get_static_info()['zvm_host']
 
     def _init_fcp_pool(self, fcp_list, assigner_id):
         """The FCP infomation got from smt(zthin) looks like :
@@ -409,23 +583,20 @@ class FCPManager(object):
            host:   Physical world wide port number: xxxxxxxx
 
         """
-        self._fcp_path_mapping = self._expand_fcp_list(fcp_list)
+        fcp_path_mapping = self._expand_fcp_list(fcp_list)
         complete_fcp_set = set()
-        for path, fcp_set in self._fcp_path_mapping.items():
+        for path, fcp_set in fcp_path_mapping.items():
             complete_fcp_set = complete_fcp_set | fcp_set
-        fcp_info = self._get_all_fcp_info(assigner_id)
-        lines_per_item = 5
+        all_fcp_pool = self._parse_fcp_info(
+            self._get_all_fcp_info(assigner_id))
         # after process, _fcp_pool should be a list include FCP ojects
         # whose FCP ID are from CONF.volume.fcp_list and also should be
         # found in fcp_info
-        num_fcps = len(fcp_info) // lines_per_item
-        for n in range(0, num_fcps):
-            fcp_init_info = fcp_info[(5 * n):(5 * (n + 1))]
-            fcp = FCP(fcp_init_info)
-            dev_no = fcp.get_dev_no()
+        fcp_pool = {}
+        for dev_no, fcp in all_fcp_pool.items():
             if dev_no in complete_fcp_set:
                 if fcp.is_valid():
-                    self._fcp_pool[dev_no] = fcp
+                    fcp_pool[dev_no] = fcp
                 else:
                     errmsg = ("Find an invalid FCP device with properties {"
                               "dev_no: %(dev_no)s, "
@@ -441,6 +612,22 @@ class FCPManager(object):
                 # normal, FCP not used by cloud connector at all
                 msg = "Found a fcp %s not in fcp_list" % dev_no
                 LOG.debug(msg)
+        self._fcp_path_mapping = fcp_path_mapping
+        self._fcp_pool = fcp_pool
+        self._all_fcp_pool = all_fcp_pool
+
+    @staticmethod
+    def _parse_fcp_info(fcp_info):
+        """Parse the FCP information into FCP objects index by fcp id"""
+        fcp_pool = {}
+        lines_per_item = 5
+        num_fcps = len(fcp_info) // lines_per_item
+        for n in range(0, num_fcps):
+            fcp_init_info = fcp_info[(lines_per_item * n):
+                                     (lines_per_item * (n + 1))]
+            fcp = FCP(fcp_init_info)
+            fcp_pool[fcp.get_dev_no()] = fcp
+        return fcp_pool
 
     @staticmethod
     def _expand_fcp_list(fcp_list):
@@ -508,50 +695,46 @@ class FCPManager(object):
             path_no = path_no + 1
         return fcp_devices
 
-    def _report_orphan_fcp(self, fcp):
-        """check there is record in db but not in FCP configuration"""
-        LOG.warning("WARNING: fcp %s found in db but we can not use it "
-                    "because it is not in CONF.volume.fcp_list %s or "
-                    "it did not belongs to free status FCPs %s." %
-                    (fcp, CONF.volume.fcp_list, self._fcp_pool.keys()))
-        if not self.db.is_reserved(fcp):
-            self.db.delete(fcp)
-            LOG.info("Remove %s from fcp db" % fcp)
-
-    def _add_fcp(self, fcp, path):
-        """add fcp to db if it's not in db but in fcp list and init it"""
-        try:
-            LOG.info("fcp %s found in CONF.volume.fcp_list, add it to db" %
-                     fcp)
-            if self._fcp_pool[fcp].get_dev_status() == 'free':
-                self.db.new(fcp, path)
-            else:
-                LOG.warning("fcp %s was not added into database because it is "
-                            "not in Free status." % fcp)
-        except Exception:
-            LOG.info("failed to add fcp %s into db", fcp)
-
     def _sync_db_fcp_list(self):
         """sync db records from given fcp list, for example, you need
         warn if some FCP already removed while it's still in use,
         or info about the new FCP added"""
-        fcp_db_list = self.db.get_all()
-
-        for fcp_rec in fcp_db_list:
-            if not fcp_rec[0].lower() in self._fcp_pool.keys():
-                self._report_orphan_fcp(fcp_rec[0])
+        db_paths = dict((fcp_rec[0].lower(), fcp_rec[4])
+                        for fcp_rec in self.db.get_all())
+
+        # the records in db but not in FCP configuration
+        orphan_fcps = [fcp for fcp in db_paths if fcp not in self._fcp_pool]
+        if orphan_fcps:
+            LOG.warning("WARNING: fcp %s found in db but we can not use it "
+                        "because it is not in CONF.volume.fcp_list %s or "
+                        "it did not belongs to free status FCPs %s." %
+                        (orphan_fcps, CONF.volume.fcp_list,
+                         list(self._fcp_pool.keys())))
+        new_fcps = []
+        path_updates = []
         # firt loop is for getting the path No
         for path, fcp_list in self._fcp_path_mapping.items():
             for fcp in fcp_list:
-                if fcp.lower() in self._fcp_pool.keys():
-                    res = self.db.get_from_fcp(fcp)
-                    # if not found this record, a [] will be returned
-                    if len(res) == 0:
-                        self._add_fcp(fcp, path)
+                fcp = fcp.lower()
+                if fcp not in self._fcp_pool:
+                    continue
+                if fcp not in db_paths:
+                    # add fcp to db if it's not in db but in fcp list
+                    if self._fcp_pool[fcp].get_dev_status() == 'free':
+                        LOG.info("fcp %s found in CONF.volume.fcp_list, "
+                                 "add it to db" % fcp)
+                        new_fcps.append((fcp, path))
                     else:
-                        old_path = res[0][4]
-                        if old_path != path:
-                            self.db.update_path_of_fcp(fcp, path)
+                        LOG.warning("fcp %s was not added into database "
+                                    "because it is not in Free status." % fcp)
+                elif db_paths[fcp] != path:
+                    path_updates.append((fcp, path))
+
+        if not (new_fcps or path_updates or orphan_fcps):
+            return
+        removed = self.db.sync_fcp_list(new_fcps, path_updates, orphan_fcps)
+        if removed:
+            LOG.info("Remove %s from fcp db" % removed)
 
     def _list_fcp_details(self, userid, status):
         return self._smtclient.get_fcp_info_by_status(userid, status)
@@ -723,16 +906,10 @@ class FCPManager(object):
         return None
 
     def get_all_fcp_pool(self, assigner_id):
-        all_fcp_info = self._get_all_fcp_info(assigner_id)
-        all_fcp_pool = {}
-        lines_per_item = 5
-        num_fcps = len(all_fcp_info) // lines_per_item
-        for n in range(0, num_fcps):
-            fcp_init_info = all_fcp_info[(5 * n):(5 * (n + 1))]
-            fcp = FCP(fcp_init_info)
-            dev_no = fcp.get_dev_no()
-            all_fcp_pool[dev_no] = fcp
-        return all_fcp_pool
+        with zvmutils.acquire_lock(self._topology_lock):
+            if self._is_topology_valid():
+                return self._all_fcp_pool
+        return self._parse_fcp_info(self._get_all_fcp_info(assigner_id))
 
     def get_wwpn_for_fcp_not_in_conf(self, all_fcp_pool, fcp_no):
         fcp = all_fcp_pool.get(fcp_no)
@@ -989,6 +1166,240 @@ class FCPVolumeManager(object):
                      multipath, os_version, mount_point,
                      is_root_volume)
 
+    @staticmethod
+    def _get_volume(connection_info):
+        """Get the parameters of a volume from its connection_info"""
+        return {'fcp_list': [x.lower() for x in connection_info['zvm_fcp']],
+                'target_wwpns': connection_info['target_wwpn'],
+                'target_lun': connection_info['target_lun'],
+                'assigner_id': connection_info['assigner_id'].upper(),
+                'multipath': connection_info['multipath'].lower() == 'true',
+                'os_version': connection_info['os_version'],
+                'mount_point': connection_info['mount_point'],
+                'is_root_volume': connection_info.get('is_root_volume',
+                                                      False)}
+
+    def _run_bulk(self, batch_func, connection_infos):
+        """Group the volumes by assigner and call batch_func with the
+        assigner and its volumes, the assigners are handled in parallel.
+
+        batch_func returns the error messages of the volumes, None for the
+        volumes handled successfully.
+        """
+        volumes = [self._get_volume(ci) for ci in connection_infos]
+        groups = collections.OrderedDict()
+        for index, volume in enumerate(volumes):
+            groups.setdefault(volume['assigner_id'], []).append(index)
+        batch_results = zvmutils.run_in_parallel(
+            batch_func, [(assigner_id, [volumes[i] for i in indexes])
+                         for assigner_id, indexes in groups.items()],
+            max_workers=CONF.sdkserver.max_worker_count)
+
+        results = [None] * len(volumes)
+        for indexes, (errors, err) in zip(groups.values(), batch_results):
+            if err is not None:
+                if isinstance(err, exception.SDKBaseException):
+                    errmsg = err.format_message()
+                else:
+                    errmsg = six.text_type(err)
+                errors = [errmsg] * len(indexes)
+            for index, errmsg in zip(indexes, errors):
+                volume = volumes[index]
+                results[index] = {'assigner_id': volume['assigner_id'],
+                                  'target_lun': volume['target_lun'],
+                                  'mount_point': volume['mount_point'],
+                                  'result': 'failed' if errmsg else 'success',
+                                  'errmsg': errmsg or ''}
+        return results
+
+    def _attach_batch(self, assigner_id, volumes):
+        """Attach the volumes to one guest in one batch
+
+        The FCP devices first attached are dedicated once, then the volumes
+        are configured by one punched script and one start of
+        zvmguestconfigure in the guest.
+        """
+        LOG.info("Start to attach %d volumes on machine %s."
+                 % (len(volumes), assigner_id))
+        errors = [None] * len(volumes)
+        to_config = [i for i, volume in enumerate(volumes)
+                     if not volume['is_root_volume']]
+        if to_config and not zvmutils.check_userid_exist(assigner_id):
+            errmsg = "User directory '%s' does not exist." % assigner_id
+            LOG.error(errmsg)
+            for i in to_config:
+                errors[i] = errmsg
+            to_config = []
+
+        self.fcp_mgr.init_fcp(assigner_id)
+        # added maps the volumes to the FCP devices whose usage is added,
+        # new_fcps are the FCP devices first attached, which need to be
+        # dedicated
+        added = collections.OrderedDict()
+        new_fcps = []
+        try:
+            for i, volume in enumerate(volumes):
+                if errors[i]:
+                    continue
+                added[i] = []
+                for fcp in volume['fcp_list']:
+                    new = self.fcp_mgr.add_fcp_for_assigner(fcp, assigner_id)
+                    added[i].append(fcp)
+                    # FCP devices for root volume will be defined in user
+                    # directory
+                    if new and not volume['is_root_volume']:
+                        new_fcps.append(fcp)
+        except exception.SDKBaseException as err:
+            errmsg = ("Add FCP devices failed with "
+                      "error:" + err.format_message())
+            LOG.error(errmsg)
+            # undo the usage added for the volumes of the batch
+            for i, fcp_list in added.items():
+                self._rollback_dedicated_fcp(fcp_list, assigner_id,
+                                             all_fcp_list=fcp_list)
+            raise exception.SDKBaseException(msg=errmsg)
+
+        failed_fcps = {}
+        for fcp in new_fcps:
+            LOG.info("Start to dedicate FCP %s to %s." % (fcp, assigner_id))
+            try:
+                self._dedicate_fcp(fcp, assigner_id)
+            except exception.SDKBaseException as err:
+                failed_fcps[fcp] = ("Dedicate FCP devices failed with "
+                                    "error:" + err.format_message())
+                LOG.error(failed_fcps[fcp])
+        for i in to_config:
+            for fcp in volumes[i]['fcp_list']:
+                if fcp in failed_fcps:
+                    errors[i] = failed_fcps[fcp]
+
+        # online and configure volumes in target userid
+        to_config = [i for i in to_config if not errors[i]]
+        if to_config:
+            try:
+                config_errors = self.config_api.config_attach_batch(
+                    assigner_id, [volumes[i] for i in to_config])
+            except exception.SDKBaseException as err:
+                errmsg = ("Configure volumes failed with "
+                          "error:" + err.format_message())
+                LOG.error(errmsg)
+                config_errors = [errmsg] * len(to_config)
+            for i, errmsg in zip(to_config, config_errors):
+                errors[i] = errmsg
+
+        for i, fcp_list in added.items():
+            if errors[i]:
+                self._rollback_dedicated_fcp(fcp_list, assigner_id,
+                                             all_fcp_list=fcp_list)
+        LOG.info("Attaching %d volumes on machine %s is done, %d failed."
+                 % (len(volumes), assigner_id, len([e for e in errors if e])))
+        return errors
+
+    def _detach_batch(self, assigner_id, volumes):
+        """Detach the volumes from one guest in one batch
+
+        The volumes are deconfigured by one punched script and one start
+        of zvmguestconfigure in the guest, then the FCP devices without
+        volumes any more are undedicated once.
+        """
+        LOG.info("Start to detach %d volumes on machine %s."
+                 % (len(volumes), assigner_id))
+        errors = [None] * len(volumes)
+        # fcp_connections is like {'1a10': 0, '1b10': 3}
+        # the values are the connections colume value in database
+        fcp_connections = {}
+        for volume in volumes:
+            connections = 0
+            try:
+                for fcp in volume['fcp_list']:
+                    connections = self.fcp_mgr.decrease_fcp_usage(
+                        fcp, assigner_id)
+                    fcp_connections[fcp] = connections
+            except exception.SDKObjectNotExistError:
+                connections = 0
+                LOG.warning("The connections of FCP device %s is 0.", fcp)
+            volume['connections'] = connections
+
+        to_config = [i for i, volume in enumerate(volumes)
+                     if not volume['is_root_volume']]
+        if not to_config:
+            return errors
+        # when detaching volumes, if userid not exist, no need to
+        # raise exception. we stop here after the database operations done.
+        if not zvmutils.check_userid_exist(assigner_id):
+            LOG.warning("Found %s not exist when trying to detach volumes "
+                        "from it.", assigner_id)
+            return errors
+
+        try:
+            config_errors = self.config_api.config_detach_batch(
+                assigner_id, [volumes[i] for i in to_config])
+        except exception.SDKBaseException as err:
+            errmsg = "Deconfigure volumes failed with error:" + \
+                err.format_message()
+            LOG.error(errmsg)
+            config_errors = [errmsg] * len(to_config)
+        for i, errmsg in zip(to_config, config_errors):
+            errors[i] = errmsg
+
+        failed = [i for i in to_config if errors[i]]
+        for i in failed:
+            for fcp in volumes[i]['fcp_list']:
+                # rollback the connections data before remove disks
+                self.fcp_mgr.increase_fcp_usage(fcp, assigner_id)
+                fcp_connections[fcp] = fcp_connections.get(fcp, 0) + 1
+        if failed:
+            with zvmutils.ignore_errors():
+                self.config_api.config_attach_batch(
+                    assigner_id, [volumes[i] for i in failed])
+
+        undedicated = set()
+        for i in to_config:
+            for fcp in volumes[i]['fcp_list']:
+                if fcp in undedicated or fcp_connections.get(fcp, 0):
+                    continue
+                undedicated.add(fcp)
+                LOG.info("Start to undedicate FCP %s from "
+                         "%s." % (fcp, assigner_id))
+                try:
+                    self._undedicate_fcp(fcp, assigner_id)
+                except exception.SDKBaseException as err:
+                    results = err.results or {}
+                    rc = results.get('rc')
+                    rs = results.get('rs')
+                    if rc == 404 or rc == 204 and rs == 8:
+                        # We ignore the already undedicate FCP device
+                        # exception.
+                        LOG.warning("The FCP device %s has already "
+                                    "undedicdated", fcp)
+                    else:
+                        errmsg = ("Undedicate FCP device %s failed with "
+                                  "error:%s" % (fcp, err.format_message()))
+                        LOG.error(errmsg)
+                        for j in to_config:
+                            if fcp in volumes[j]['fcp_list']:
+                                errors[j] = errors[j] or errmsg
+        LOG.info("Detaching %d volumes on machine %s is done, %d failed."
+                 % (len(volumes), assigner_id, len([e for e in errors if e])))
+        return errors
+
+    def attach_bulk(self, connection_infos):
+        """Attach volumes to guests
+
+        The volumes are grouped by assigner, the volumes of one assigner
+        are attached in one batch and the assigners are handled in
+        parallel.
+
+        Returns a list of the results in the order of connection_infos,
+        each is a dict with the keys assigner_id, target_lun, mount_point,
+        result ('success' or 'failed') and errmsg.
+        """
+        return self._run_bulk(self._attach_batch, connection_infos)
+
+    def detach_bulk(self, connection_infos):
+        """Detach volumes from guests, in the same way as attach_bulk"""
+        return self._run_bulk(self._detach_batch, connection_infos)
+
     def get_volume_connector(self, assigner_id, reserve):
         """Get connector information of the instance for attaching to volumes.
 
@@ -1044,8 +1455,7 @@ class FCPVolumeManager(object):
             LOG.error(errmsg)
             return empty_connector
 
-        inv_info = self._smtclient.get_host_info()
-        zvm_host = inv_info['zvm_host']
+        zvm_host = self.fcp_mgr.get_zvm_host()
         if zvm_host == '':
             errmsg = "zvm host not specified."
             LOG.error(errmsg)